@@ -7,7 +7,8 @@
 
 import os
 import json
-from typing import Any, Dict, Optional, Tuple
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
 from dataclasses import dataclass
 try:
     from .crypto_manager import ConfigCrypto
@@ -23,6 +24,26 @@ except ImportError:
                 return config
 
 
+# 进程级配置文件缓存：文件绝对路径 -> (((mtime_ns, size), 附加标识), 解析/解密结果)
+_config_file_cache: Dict[str, Tuple[Tuple[Tuple[int, int], Any], Dict[str, Any]]] = {}
+_config_file_cache_lock = threading.Lock()
+
+
+def _file_signature(file_path: str) -> Optional[Tuple[int, int]]:
+    """文件的 (mtime_ns, size)，文件不存在时为 None"""
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def clear_config_cache():
+    """清空进程内的配置文件缓存"""
+    with _config_file_cache_lock:
+        _config_file_cache.clear()
+
+
 @dataclass
 class ConfigData:
     """配置数据类 - 只定义字段类型，不设置默认值"""
@@ -154,20 +175,51 @@ class ConfigManager:
         print("✓ 配置加载完成")
         return self._config_data
     
+    def _load_cached_file(self, file_path: str, loader: Callable[[str], Dict[str, Any]],
+                          variant: Any = None) -> Dict[str, Any]:
+        """
+        按文件的修改时间与大小缓存解析结果，文件未变化时直接返回缓存
+        
+        Args:
+            file_path: 配置文件路径
+            loader: 实际读取并解析文件的函数
+            variant: 影响解析结果的附加标识（如私钥指纹），变化后重新加载
+            
+        Returns:
+            dict: 配置字典（副本）
+        """
+        cache_key = os.path.abspath(file_path)
+        with _config_file_cache_lock:
+            file_signature = _file_signature(file_path)
+            if file_signature is None:
+                _config_file_cache.pop(cache_key, None)
+                return {}
+            signature = (file_signature, variant)
+            
+            cached = _config_file_cache.get(cache_key)
+            if cached and cached[0] == signature:
+                return dict(cached[1])
+            
+            result = loader(file_path)
+            # 失败（空结果）不缓存，下次加载时重试
+            if result:
+                _config_file_cache[cache_key] = (signature, result)
+            return dict(result)
+    
     def _load_public_config(self) -> Dict[str, Any]:
         """加载公开配置"""
-        if not os.path.exists(self.public_config_file):
-            return {}
-        
-        return self._parse_env_file(self.public_config_file)
+        return self._load_cached_file(self.public_config_file, self._parse_env_file)
     
     def _load_encrypted_config(self) -> Dict[str, Any]:
-        """加载加密配置"""
-        if not os.path.exists(self.encrypted_file):
-            return {}
-        
+        """加载加密配置（解密结果在进程内缓存，加密文件或私钥变化后重新解密）"""
+        key_fingerprint = getattr(self.crypto, 'key_fingerprint', None)
+        variant = key_fingerprint() if key_fingerprint else None
+        return self._load_cached_file(self.encrypted_file, self._decrypt_config_file, variant)
+    
+    def _decrypt_config_file(self, file_path: str) -> Dict[str, Any]:
+        """读取并解密加密配置文件"""
         try:
-            with open(self.encrypted_file, 'r', encoding='utf-8') as f:
+            with open(file_path, 'r', encoding='utf-8') as f:
                 encrypted_content = f.read()
             
             # 尝试解析为 JSON（兼容旧格式）
@@ -190,10 +242,7 @@ class ConfigManager:
     
     def _load_env_file(self) -> Dict[str, Any]:
         """加载 .env 文件"""
-        if not os.path.exists(self.env_file):
-            return {}
-        
-        return self._parse_env_file(self.env_file)
+        return self._load_cached_file(self.env_file, self._parse_env_file)
     
     def _parse_env_file(self, file_path: str) -> Dict[str, Any]:
         """解析 .env 格式文件"""
@@ -308,6 +357,8 @@ class ConfigManager:
             
             with open(self.encrypted_file, 'w', encoding='utf-8') as f:
                 f.write(encrypted_content)
+            with _config_file_cache_lock:
+                _config_file_cache.pop(os.path.abspath(self.encrypted_file), None)
             
             print(f"✓ 敏感配置已加密保存到: {self.encrypted_file}")
             
@@ -323,6 +374,8 @@ class ConfigManager:
             public_config: 公开的非敏感配置
         """
         try:
+            with _config_file_cache_lock:
+                _config_file_cache.pop(os.path.abspath(self.public_config_file), None)
             with open(self.public_config_file, 'w', encoding='utf-8') as f:
                 f.write("# 公开配置（非敏感信息）\n")
                 f.write("# 此文件可以安全提交到版本控制系统\n\n")
@@ -10,13 +10,28 @@ import json
 import base64
 import getpass
 import hashlib
-from typing import Dict, Any, Optional
+import threading
+from typing import Dict, Any, Optional, Tuple
 from cryptography.hazmat.primitives.asymmetric import rsa, padding
 from cryptography.hazmat.primitives import serialization, hashes
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
 from cryptography.hazmat.backends import default_backend
 
 
+# 进程级私钥缓存：(私钥路径, 密钥来源) -> (私钥来源指纹, 私钥)
+_private_key_cache: Dict[Tuple[str, Tuple[str, ...]], Tuple[Tuple[Optional[Tuple[int, int]], Optional[str]], Any]] = {}
+_private_key_cache_lock = threading.Lock()
+
+
+def _key_file_signature(path: str) -> Optional[Tuple[int, int]]:
+    """私钥文件的 (mtime_ns, size)，文件不存在时为 None"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
 class ConfigCrypto:
     """配置加密管理器"""
     
@@ -30,6 +45,7 @@ class ConfigCrypto:
         self.key_sources = key_sources or ['file', 'env', 'prompt']
         self.private_key = None
         self.public_key = None
+        self._private_key_fingerprint = None
         
         # 密钥文件路径 - 根据操作系统自动适配到用户根目录
         # 密钥文件路径 - 根据操作系统自动适配到用户根目录
@@ -114,13 +130,41 @@ class ConfigCrypto:
         
         return private_key, public_key
     
+    def key_fingerprint(self) -> Tuple[Optional[Tuple[int, int]], Optional[str]]:
+        """
+        当前私钥来源的指纹：私钥文件签名与环境变量私钥的 SHA-256 摘要
+        
+        Returns:
+            tuple: (私钥文件签名, 环境变量私钥摘要)，不存在的部分为 None
+        """
+        env_digest = None
+        if 'env' in self.key_sources:
+            key_data = os.getenv('RSA_PRIVATE_KEY')
+            if key_data:
+                env_digest = hashlib.sha256(key_data.encode()).hexdigest()
+        return _key_file_signature(self.private_key_path), env_digest
+    
     def load_private_key(self) -> Optional[rsa.RSAPrivateKey]:
         """
-        按优先级加载私钥
+        按优先级加载私钥（同一进程内只加载一次，私钥文件或环境变量私钥变化后重新加载）
         
         Returns:
             RSAPrivateKey: 私钥对象，如果加载失败返回 None
         """
+        cache_key = (self.private_key_path, tuple(self.key_sources))
+        with _private_key_cache_lock:
+            signature = self.key_fingerprint()
+            cached = _private_key_cache.get(cache_key)
+            if cached and cached[0] == signature:
+                return cached[1]
+            
+            key = self._load_private_key_from_sources()
+            if key:
+                _private_key_cache[cache_key] = (signature, key)
+            return key
+    
+    def _load_private_key_from_sources(self) -> Optional[rsa.RSAPrivateKey]:
+        """按 key_sources 顺序尝试加载私钥"""
         for source in self.key_sources:
             try:
                 if source == 'file':
@@ -280,8 +324,10 @@ class ConfigCrypto:
         Returns:
             dict: 解密后的配置字典
         """
-        if not self.private_key:
+        fingerprint = self.key_fingerprint()
+        if not self.private_key or fingerprint != self._private_key_fingerprint:
             self.private_key = self.load_private_key()
+            self._private_key_fingerprint = fingerprint
             if not self.private_key:
                 raise ValueError("无法加载私钥")
         
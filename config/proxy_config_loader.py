@@ -35,12 +35,15 @@ class ProxyConfig:
     proxies: List[Dict[str, Any]] = None
     user_agent_rotation: bool = True
     domain_specific: Dict[str, Dict[str, Any]] = None
+    health_check: Dict[str, Any] = None
     
     def __post_init__(self):
         if self.proxies is None:
             self.proxies = []
         if self.domain_specific is None:
             self.domain_specific = {}
+        if self.health_check is None:
+            self.health_check = {}
 
 
 class ProxyConfigLoader:
@@ -107,7 +110,8 @@ class ProxyConfigLoader:
                 timeout=merged_config.get('retry_settings', {}).get('timeout', 10),
                 proxies=proxies,
                 user_agent_rotation=merged_config.get('user_agent', {}).get('rotation', True),
-                domain_specific=merged_config.get('domain_specific', {})
+                domain_specific=merged_config.get('domain_specific', {}),
+                health_check=merged_config.get('proxy_pool', {}).get('health_check', {})
             )
             
             logger.info(f"✅ 代理配置加载成功，环境: {self.environment}")
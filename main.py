@@ -8,19 +8,60 @@
 import sys
 import os
 import time
+from contextlib import contextmanager
+
+_PROCESS_STARTED = time.perf_counter()
+
+# 启动各阶段耗时（秒），通过 --verbose 或 FIND_DEMAND_STARTUP_REPORT=1 输出
+STARTUP_TIMINGS = {}
+
+# 按需加载的重量级依赖，启动报告中列出本次命令实际加载了哪些
+HEAVY_MODULES = ('pandas', 'aiohttp', 'sentence_transformers', 'sklearn', 'datasketch', 'nltk', 'playwright')
+
+
+@contextmanager
+def _startup_timer(name):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        STARTUP_TIMINGS[name] = time.perf_counter() - started
+
 
 # 添加src目录到Python路径
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
-# 导入重构后的模块
-from src.cli_parser import setup_argument_parser, display_analysis_parameters, print_quiet_summary
-from src.demand_mining_manager import IntegratedDemandMiningManager
-from src.command_handlers import (
-    handle_stats_display, handle_input_file_analysis, handle_keywords_analysis,
-    handle_discover_analysis, handle_enhanced_features, handle_hot_keywords,
-    handle_all_workflow, handle_demand_validation, refresh_dashboard_data
-)
-from src.utils.telemetry import telemetry_manager
+# 导入重构后的模块（重量级模块与管理器在各命令首次使用时加载）
+with _startup_timer('import src.cli_parser'):
+    from src.cli_parser import setup_argument_parser, display_analysis_parameters, print_quiet_summary
+with _startup_timer('import src.demand_mining_manager'):
+    from src.demand_mining_manager import IntegratedDemandMiningManager
+with _startup_timer('import src.command_handlers'):
+    from src.command_handlers import (
+        handle_stats_display, handle_input_file_analysis, handle_keywords_analysis,
+        handle_discover_analysis, handle_enhanced_features, handle_hot_keywords,
+        handle_all_workflow, handle_demand_validation, refresh_dashboard_data
+    )
+with _startup_timer('import src.utils.telemetry'):
+    from src.utils.telemetry import telemetry_manager
+
+
+def print_startup_report():
+    """打印启动耗时报告（导入与初始化各阶段）"""
+    total = time.perf_counter() - _PROCESS_STARTED
+    print("\n⏱️ 启动耗时报告:")
+    for name, seconds in STARTUP_TIMINGS.items():
+        print(f"   {name}: {seconds * 1000:.1f} ms")
+    print(f"   总计（至命令分发）: {total * 1000:.1f} ms")
+    loaded = [name for name in HEAVY_MODULES if name in sys.modules]
+    print(f"   已加载的重量级依赖: {', '.join(loaded) if loaded else '无'}")
+    print("   提示: 使用 python -X importtime main.py ... 查看逐模块导入耗时")
+
+
+def _record_startup_telemetry():
+    for name, seconds in STARTUP_TIMINGS.items():
+        telemetry_manager.set_gauge(f"startup.{name.replace(' ', '.')}_ms", round(seconds * 1000, 1))
+    telemetry_manager.set_gauge('startup.total_ms', round((time.perf_counter() - _PROCESS_STARTED) * 1000, 1))
 
 
 def main():
@@ -30,8 +71,9 @@ def main():
     print("=" * 60)
     
     # 解析命令行参数
-    parser = setup_argument_parser()
-    args = parser.parse_args()
+    with _startup_timer('parse arguments'):
+        parser = setup_argument_parser()
+        args = parser.parse_args()
     
     # 显示分析参数
     display_analysis_parameters(args)
@@ -40,7 +82,11 @@ def main():
     
     try:
         # 创建集成需求挖掘管理器
-        manager = IntegratedDemandMiningManager(args.config)
+        with _startup_timer('init IntegratedDemandMiningManager'):
+            manager = IntegratedDemandMiningManager(args.config)
+        _record_startup_telemetry()
+        if args.verbose or os.getenv('FIND_DEMAND_STARTUP_REPORT', '').strip().lower() in ('1', 'true', 'yes', 'on'):
+            print_startup_report()
         
         # 显示管理器统计信息
         if handle_stats_display(manager, args):
@@ -4,9 +4,11 @@
 
 from __future__ import annotations
 
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import pandas as pd
 import requests
@@ -47,6 +49,7 @@ class SourceSnapshot:
     notes: List[str] = field(default_factory=list)
     rate_limit: Optional[RateLimitInfo] = None
     extra: Dict[str, Any] = field(default_factory=dict)
+    latency_seconds: Optional[float] = None
 
     def to_dict(self) -> Dict[str, Any]:
         payload = {
@@ -59,6 +62,8 @@ class SourceSnapshot:
         }
         if self.rate_limit:
             payload['rate_limit'] = self.rate_limit.to_dict()
+        if self.latency_seconds is not None:
+            payload['latency_seconds'] = round(self.latency_seconds, 3)
         return payload
 
 
@@ -273,16 +278,76 @@ class ProductHuntSeedCollector:
         return entries
 
 
+SeedSource = Callable[[int], Tuple[pd.DataFrame, SourceSnapshot]]
+
+
 class CommunitySeedCollector:
-    """整合 Reddit 与 Product Hunt 的社区种子采集器."""
+    """整合 Reddit 与 Product Hunt 的社区种子采集器.
+
+    已注册的数据源并发采集，整体耗时取决于最慢的数据源；
+    超过 ``source_timeout`` 仍未返回的数据源记为超时，不阻塞其余结果。
+    """
+
+    DEFAULT_SOURCE_TIMEOUT = 30.0
 
     def __init__(
         self,
         reddit_collector: Optional[RedditSeedCollector] = None,
         product_hunt_collector: Optional[ProductHuntSeedCollector] = None,
+        source_timeout: float = DEFAULT_SOURCE_TIMEOUT,
     ) -> None:
         self.reddit_collector = reddit_collector or RedditSeedCollector()
         self.product_hunt_collector = product_hunt_collector or ProductHuntSeedCollector()
+        self.source_timeout = source_timeout
+        self.sources: Dict[str, SeedSource] = {}
+        self.register_source('reddit', lambda max_items: self.reddit_collector.collect())
+        self.register_source('product_hunt', lambda max_items: self.product_hunt_collector.collect(limit=max_items))
+
+    def register_source(self, name: str, collect: SeedSource) -> None:
+        """注册种子数据源，collect(max_items) 返回 (DataFrame, SourceSnapshot)."""
+        self.sources[name] = collect
+
+    @staticmethod
+    def _run_source(name: str, collect: SeedSource, max_items: int) -> Tuple[pd.DataFrame, SourceSnapshot]:
+        started = time.perf_counter()
+        try:
+            frame, snapshot = collect(max_items)
+        except Exception as exc:
+            frame = pd.DataFrame(columns=['query', 'source'])
+            snapshot = SourceSnapshot(source=name, attempted=1, failed=1, notes=[str(exc)])
+        snapshot.latency_seconds = time.perf_counter() - started
+        return frame, snapshot
+
+    def _collect_sources(self, max_items: int) -> List[Tuple[pd.DataFrame, SourceSnapshot]]:
+        """并发采集所有数据源，按注册顺序返回结果."""
+        if not self.sources:
+            return []
+        executor = ThreadPoolExecutor(max_workers=len(self.sources), thread_name_prefix='community-seed')
+        try:
+            futures = {
+                name: executor.submit(self._run_source, name, collect, max_items)
+                for name, collect in self.sources.items()
+            }
+            wait(futures.values(), timeout=self.source_timeout)
+        finally:
+            # 超时的数据源在后台线程中自行结束，不再等待
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        results: List[Tuple[pd.DataFrame, SourceSnapshot]] = []
+        for name, future in futures.items():
+            if future.done() and not future.cancelled():
+                results.append(future.result())
+                continue
+            snapshot = SourceSnapshot(
+                source=name,
+                attempted=1,
+                failed=1,
+                notes=[f'timeout after {self.source_timeout:.0f}s'],
+                extra={'timed_out': True},
+                latency_seconds=self.source_timeout,
+            )
+            results.append((pd.DataFrame(columns=['query', 'source']), snapshot))
+        return results
 
     def collect(self, max_items: int = 50) -> Tuple[pd.DataFrame, Dict[str, Any]]:
         frames: List[pd.DataFrame] = []
@@ -291,15 +356,12 @@ class CommunitySeedCollector:
             'sources': []
         }
 
-        reddit_df, reddit_snapshot = self.reddit_collector.collect()
-        diagnostics['sources'].append(reddit_snapshot.to_dict())
-        if not reddit_df.empty:
-            frames.append(reddit_df)
-
-        ph_df, ph_snapshot = self.product_hunt_collector.collect(limit=max_items)
-        diagnostics['sources'].append(ph_snapshot.to_dict())
-        if not ph_df.empty:
-            frames.append(ph_df)
+        started = time.perf_counter()
+        for source_df, snapshot in self._collect_sources(max_items):
+            diagnostics['sources'].append(snapshot.to_dict())
+            if not source_df.empty:
+                frames.append(source_df)
+        diagnostics['latency_seconds'] = round(time.perf_counter() - started, 3)
 
         if not frames:
             diagnostics['total_candidates'] = 0
@@ -322,6 +384,7 @@ class CommunitySeedCollector:
         payload = {
             'generated_at': metrics.get('generated_at'),
             'total_candidates': metrics.get('total_candidates'),
+            'latency_seconds': metrics.get('latency_seconds'),
             'sources': metrics.get('sources'),
         }
         if extra:
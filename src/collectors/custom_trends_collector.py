@@ -8,11 +8,14 @@ import requests
 import json
 import time
 import random
-from typing import List, Dict, Optional, Callable, TypeVar, Any, Union
+from typing import List, Dict, Optional, Callable, TypeVar, Any, Union, Tuple
+import numpy as np
 import pandas as pd
 import logging
 from functools import wraps
 import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 logger = logging.getLogger(__name__)
 
@@ -85,10 +88,16 @@ class TrendsAPIClient:
 
         # 简单的内存缓存
         self._cache: Dict[str, Any] = {}
+        # 按线程记录最近一次请求是否遇到429，供并发抓取决定是否继续提交请求
+        self._request_state = threading.local()
 
     
     # _init_session 方法已移至 GoogleTrendsSession 类中统一管理
     
+    def supports_concurrent_requests(self) -> bool:
+        """当前会话能否被多个线程同时使用（Playwright 后端只能在创建它的线程上请求）"""
+        return not getattr(self.trends_session, 'thread_bound', False)
+
     def set_rate_limit_callback(self, callback: Callable[[float, str], None]) -> None:
         """注册限流事件回调"""
         self._rate_limit_callback = callback
@@ -165,8 +174,9 @@ class TrendsAPIClient:
             if self.proxies:
                 s.proxies.update(self.proxies)
 
+            trends_session = self.trends_session
             try:
-                response = self.trends_session.make_request(
+                response = trends_session.make_request(
                     method.upper(),
                     url,
                     timeout=self.timeout,
@@ -183,6 +193,7 @@ class TrendsAPIClient:
                 return {}
 
             if response.status_code == 429:
+                self._request_state.rate_limited = True
                 if attempt < self.retries:
                     logger.warning(f"⚠️ 遇到429错误，第{attempt + 1}次重试")
                     logger.warning(f"🔗 请求URL: {url}")
@@ -190,8 +201,9 @@ class TrendsAPIClient:
                     logger.warning(f"⏳ 节流提示，额外等待 {penalty:.1f} 秒")
                     self._notify_rate_limit(penalty, 'high')
                     try:
-                        from .google_trends_session import reset_global_session
-                        reset_global_session()
+                        from .google_trends_session import get_global_session, reset_global_session
+                        # 并发请求同时遇到429时，同一个session只重置一次
+                        reset_global_session(stale=trends_session)
                         self.trends_session = get_global_session()
                         self.session = self.trends_session.get_session()
                     except Exception as reset_error:
@@ -283,10 +295,13 @@ class CustomTrendsCollector(TrendsAPIClient):
     
     def __init__(self, hl: str = 'en-US', tz: int = 360, geo: str = '', 
                  timeout: tuple = (5, 20), proxies: Optional[Dict[str, str]] = None, 
-                 retries: int = 1, backoff_factor: float = 0.5):
+                 retries: int = 1, backoff_factor: float = 0.5, max_widget_workers: int = 5):
         """初始化采集器"""
         super().__init__(hl, tz, timeout, proxies, retries, backoff_factor)
         
+        # 同一 explore token 下各 widget 数据请求的并发上限（请求发起仍受全局频率控制器约束）
+        self.max_widget_workers = max(int(max_widget_workers), 1)
+        
         # 请求参数
         self.kw_list: List[str] = []
         self.cat: int = 0
@@ -303,6 +318,10 @@ class CustomTrendsCollector(TrendsAPIClient):
         self.geo = geo
         self.gprop = gprop
         
+        return self._make_payload(kw_list, cat, timeframe, geo, gprop)
+    
+    def _make_payload(self, kw_list: List[str], cat: int, timeframe: str, geo: str, gprop: str) -> JsonDict:
+        """构建请求载荷（不修改实例状态，可在多线程中使用）"""
         # 标准化时间格式
         normalized_timeframe = self._normalize_timeframe(timeframe)
         
@@ -358,7 +377,10 @@ class CustomTrendsCollector(TrendsAPIClient):
             raise ValueError("请先设置关键词列表")
         
         payload = self.build_payload(self.kw_list, self.cat, self.timeframe, self.geo, self.gprop)
-        
+        return self._request_token(payload)
+    
+    def _request_token(self, payload: JsonDict) -> JsonDict:
+        """以指定载荷请求 explore token"""
         token_payload = {
             'hl': self.hl,
             'tz': self.tz,
@@ -383,6 +405,70 @@ class CustomTrendsCollector(TrendsAPIClient):
                 
         return None
     
+    def _find_widgets(self, token_response: JsonDict, widget_id: str) -> List[JsonDict]:
+        """查找某类widget的全部实例（多关键词载荷下ID形如 RELATED_QUERIES_0）"""
+        if not token_response or 'widgets' not in token_response:
+            return []
+        
+        prefix = f"{widget_id}_"
+        return [
+            widget for widget in token_response['widgets']
+            if widget.get('id') == widget_id or str(widget.get('id', '')).startswith(prefix)
+        ]
+    
+    def _widget_keyword(self, widget: JsonDict, position: int,
+                        kw_list: Optional[List[str]] = None) -> Optional[str]:
+        """根据widget请求中的关键词限制确定其对应的关键词"""
+        try:
+            restriction = widget['request']['restriction']['complexKeywordsRestriction']
+            return restriction['keyword'][0]['value']
+        except (KeyError, IndexError, TypeError):
+            pass
+        
+        # 无关键词限制时退回ID后缀序号，再退回widget出现顺序
+        kw_list = self.kw_list if kw_list is None else kw_list
+        suffix = str(widget.get('id', '')).rsplit('_', 1)[-1]
+        index = int(suffix) if suffix.isdigit() else position
+        if 0 <= index < len(kw_list):
+            return kw_list[index]
+        return None
+    
+    def _fetch_widgets_data(self, widgets: List[JsonDict], url: str) -> List[JsonDict]:
+        """并发获取同一 token 下多个widget的数据，结果与widgets顺序一致"""
+        return self._fetch_widget_requests([(widget, url) for widget in widgets])
+    
+    def _fetch_widget_requests(self, requests_plan: List[Tuple[JsonDict, str]]) -> List[JsonDict]:
+        """
+        获取 (widget, 数据接口) 列表的数据，结果与输入顺序一致；任一请求遇到429后不再发起新的请求
+        
+        会话允许跨线程使用时以有限并发获取，Playwright 等绑定线程的后端在调用线程上依次获取。
+        """
+        rate_limited = threading.Event()
+        skipped: List[JsonDict] = []
+        
+        def fetch(item: Tuple[JsonDict, str]) -> JsonDict:
+            if rate_limited.is_set():
+                skipped.append(item[0])
+                return {}
+            self._request_state.rate_limited = False
+            result = self._get_widget_data(*item)
+            if getattr(self._request_state, 'rate_limited', False):
+                rate_limited.set()
+            return result
+        
+        if len(requests_plan) <= 1 or not self.supports_concurrent_requests():
+            responses = [fetch(item) for item in requests_plan]
+        else:
+            workers = min(self.max_widget_workers, len(requests_plan))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='trends-widget') as executor:
+                responses = list(executor.map(fetch, requests_plan))
+        
+        if rate_limited.is_set():
+            # 向调用线程传递限流状态，外层并发抓取同样据此停止提交
+            self._request_state.rate_limited = True
+            logger.warning(f"⚠️ widget数据请求遇到429，跳过剩余 {len(skipped)} 个请求")
+        return responses
+    
     def _get_widget_data(self, widget: JsonDict, url: str) -> JsonDict:
         """获取widget数据"""
         data_payload = {
@@ -442,16 +528,36 @@ class CustomTrendsCollector(TrendsAPIClient):
             logger.error("无法获取时间序列数据")
             return pd.DataFrame()
         
-        # 解析数据
+        return self._parse_interest_over_time(data_response, self.kw_list)
+    
+    def _parse_interest_over_time(self, data_response: JsonDict, kw_list: List[str]) -> DataFrame:
+        """解析时间序列widget数据
+
+        直接读取数值型 time 字段(Unix秒)与 value 数组到 NumPy 数组，一次性构建带 DatetimeIndex 的DataFrame；
+        仅当响应缺少 time 字段或数值不规整时退回按 formattedTime 字符串解析。
+        """
         timeline_data = data_response['default']['timelineData']
+        if not timeline_data:
+            return pd.DataFrame()
+        
+        try:
+            times = np.array([point['time'] for point in timeline_data], dtype=np.int64)
+            values = np.array([point['value'] for point in timeline_data], dtype=np.int64)
+        except (KeyError, TypeError, ValueError):
+            return self._parse_interest_over_time_formatted(timeline_data, kw_list)
         
-        # 构建DataFrame
+        width = min(values.shape[1] if values.ndim == 2 else 0, len(kw_list))
+        index = pd.DatetimeIndex(times.astype('datetime64[s]').astype('datetime64[ns]'), name='date')
+        return pd.DataFrame(values[:, :width], index=index, columns=list(kw_list[:width]))
+    
+    def _parse_interest_over_time_formatted(self, timeline_data: List[JsonDict], kw_list: List[str]) -> DataFrame:
+        """按 formattedTime 字符串解析时间序列（兼容缺少 time 字段的响应）"""
         df_data = []
         for point in timeline_data:
             row = {'date': point['formattedTime']}
             for i, value in enumerate(point['value']):
-                if i < len(self.kw_list):
-                    row[self.kw_list[i]] = value
+                if i < len(kw_list):
+                    row[kw_list[i]] = value
             df_data.append(row)
         
         df = pd.DataFrame(df_data)
@@ -490,7 +596,11 @@ class CustomTrendsCollector(TrendsAPIClient):
             logger.error("无法获取地区数据")
             return pd.DataFrame()
         
-        # 解析数据
+        return self._parse_interest_by_region(data_response, self.kw_list, inc_geo_code)
+    
+    def _parse_interest_by_region(self, data_response: JsonDict, kw_list: List[str],
+                                  inc_geo_code: bool) -> DataFrame:
+        """解析地区分布widget数据"""
         geo_data = data_response['default']['geoMapData']
         
         df_data = []
@@ -500,8 +610,8 @@ class CustomTrendsCollector(TrendsAPIClient):
                 'geoCode': item['geoCode'] if inc_geo_code else None
             }
             for i, value in enumerate(item['value']):
-                if i < len(self.kw_list):
-                    row[self.kw_list[i]] = value
+                if i < len(kw_list):
+                    row[kw_list[i]] = value
             df_data.append(row)
         
         df = pd.DataFrame(df_data)
@@ -511,91 +621,174 @@ class CustomTrendsCollector(TrendsAPIClient):
         return df
     
     def _process_ranked_list(self, ranked_list: JsonDict, is_topic: bool = True) -> DataFrame:
-        """处理排名列表数据"""
-        items = []
-        for item in ranked_list.get('rankedKeyword', []):
-            if is_topic:
-                topic_data = item.get('topic', {})
-                items.append({
-                    'topic_title': topic_data.get('title', ''),
-                    'topic_type': topic_data.get('type', ''),
-                    'value': item.get('value', 0)
-                })
-            else:
-                items.append({
-                    'query': item.get('query', ''),
-                    'value': item.get('value', 0)
-                })
+        """处理排名列表数据：按列收集后一次性构建DataFrame"""
+        ranked = ranked_list.get('rankedKeyword', [])
+        values = np.array([item.get('value', 0) for item in ranked])
+        
+        if is_topic:
+            topics = [item.get('topic', {}) for item in ranked]
+            columns = {
+                'topic_title': np.array([topic.get('title', '') for topic in topics], dtype=object),
+                'topic_type': np.array([topic.get('type', '') for topic in topics], dtype=object),
+                'value': values
+            }
+        else:
+            columns = {
+                'query': np.array([item.get('query', '') for item in ranked], dtype=object),
+                'value': values
+            }
         
-        return pd.DataFrame(items)
+        return pd.DataFrame(columns, copy=False)
     
-    @error_handler(dict)
-    def related_topics(self) -> Dict[str, Dict[str, DataFrame]]:
-        """获取相关主题"""
+    def _related_by_keyword(self, widget_id: str, is_topic: bool) -> Dict[str, Dict[str, DataFrame]]:
+        """获取相关查询/主题：每个widget只写入其自身对应的关键词"""
         token_response = self._get_token_response()
-        results: Dict[str, Dict[str, DataFrame]] = {}
+        widgets = self._find_widgets(token_response, widget_id)
+        if not widgets:
+            return {}
         
-        # 查找相关主题widgets
-        for widget in token_response.get('widgets', []):
-            if widget.get('id') == 'RELATED_TOPICS':
-                data_response = self._get_widget_data(widget, self.RELATED_TOPICS_URL)
-                
-                if data_response and 'default' in data_response:
-                    # 解析相关主题数据
-                    related_data = data_response['default']
-                    
-                    # 处理top和rising数据
-                    for kw in self.kw_list:
-                        if kw not in results:
-                            results[kw] = {}
-                        
-                        if 'rankedList' in related_data:
-                            for ranked_list in related_data['rankedList']:
-                                list_type = 'top' if ranked_list.get('rankedKeyword', [{}])[0].get('topic', {}).get('type') == 'ENTITY' else 'rising'
-                                results[kw][list_type] = self._process_ranked_list(ranked_list, is_topic=True)
+        responses = self._fetch_widgets_data(widgets, self.RELATED_TOPICS_URL)
+        return self._parse_related_widgets(widgets, responses, is_topic, self.kw_list)
+    
+    def _parse_related_widgets(self, widgets: List[JsonDict], responses: List[JsonDict],
+                               is_topic: bool, kw_list: List[str]) -> Dict[str, Dict[str, DataFrame]]:
+        """将相关查询/主题widget数据按各自关键词归类"""
+        results: Dict[str, Dict[str, DataFrame]] = {}
+        for position, (widget, data_response) in enumerate(zip(widgets, responses)):
+            keyword = self._widget_keyword(widget, position, kw_list)
+            if keyword is None:
+                logger.warning(f"无法确定 {widget.get('id')} 对应的关键词，已跳过")
+                continue
+            
+            keyword_result = results.setdefault(keyword, {})
+            if not data_response or 'default' not in data_response:
+                continue
+            
+            # rankedList 依次为 top 与 rising
+            ranked_lists = data_response['default'].get('rankedList', [])
+            for list_type, ranked_list in zip(('top', 'rising'), ranked_lists):
+                keyword_result[list_type] = self._process_ranked_list(ranked_list, is_topic=is_topic)
         
         return results
     
+    # fetch_widgets 支持的widget: 名称 -> (widget ID, 数据接口, 是否按关键词拆分为多个实例)
+    WIDGET_SPECS = {
+        'interest_over_time': ('TIMESERIES', TrendsAPIClient.INTEREST_OVER_TIME_URL, False),
+        'interest_by_region': ('GEO_MAP', TrendsAPIClient.INTEREST_BY_REGION_URL, False),
+        'related_queries': ('RELATED_QUERIES', TrendsAPIClient.RELATED_TOPICS_URL, True),
+        'related_topics': ('RELATED_TOPICS', TrendsAPIClient.RELATED_TOPICS_URL, True),
+    }
+    
     @error_handler(dict)
-    def related_queries(self) -> Dict[str, Dict[str, DataFrame]]:
-        """获取相关查询"""
-        token_response = self._get_token_response()
-        results: Dict[str, Dict[str, DataFrame]] = {}
+    def fetch_widgets(self, kw_list: List[str], widgets: Optional[List[str]] = None,
+                      timeframe: str = 'today 12-m', geo: str = '', cat: int = 0, gprop: str = '',
+                      resolution: str = 'COUNTRY', inc_low_vol: bool = True,
+                      inc_geo_code: bool = False) -> Dict[str, Any]:
+        """
+        一次 explore 请求获取同一组关键词的多个widget数据
         
-        # 查找相关查询widgets
-        for widget in token_response.get('widgets', []):
-            if widget.get('id') == 'RELATED_QUERIES':
-                data_response = self._get_widget_data(widget, self.RELATED_TOPICS_URL)
-                
-                if data_response and 'default' in data_response:
-                    related_data = data_response['default']
-                    
-                    for kw in self.kw_list:
-                        if kw not in results:
-                            results[kw] = {}
-                        
-                        if 'rankedList' in related_data:
-                            for ranked_list in related_data['rankedList']:
-                                list_type = 'top' if 'top' in str(ranked_list) else 'rising'
-                                results[kw][list_type] = self._process_ranked_list(ranked_list, is_topic=False)
+        所有widget数据请求共用一个 token，会话允许跨线程使用时以有限并发获取；不修改实例上的载荷状态，
+        后端不绑定线程时可由多个线程并发调用。
+        
+        Args:
+            kw_list: 关键词列表(最多5个)
+            widgets: 需要的widget名称，取自 WIDGET_SPECS，默认全部
+            timeframe/geo/cat/gprop: 载荷参数，含义同 build_payload
+            resolution/inc_low_vol/inc_geo_code: 地区分布参数，含义同 interest_by_region
+            
+        Returns:
+            widget名称 -> 解析结果；interest_* 为DataFrame，related_* 为 {关键词: {'top', 'rising'}}
+        """
+        names = list(widgets or self.WIDGET_SPECS)
+        unknown = [name for name in names if name not in self.WIDGET_SPECS]
+        if unknown:
+            raise ValueError(f"不支持的widget: {unknown}")
+        
+        token_response = self._request_token(self._make_payload(kw_list, cat, timeframe, geo, gprop))
+        
+        # 规划全部widget数据请求
+        planned: Dict[str, List[JsonDict]] = {}
+        requests_plan: List[Tuple[JsonDict, str]] = []
+        for name in names:
+            widget_id, url, per_keyword = self.WIDGET_SPECS[name]
+            if per_keyword:
+                found = self._find_widgets(token_response, widget_id)
+            else:
+                widget = self._find_widget(token_response, widget_id)
+                found = [widget] if widget else []
+            if name == 'interest_by_region':
+                for widget in found:
+                    widget['request']['resolution'] = resolution
+                    widget['request']['includeLowSearchVolumeGeos'] = inc_low_vol
+            planned[name] = found
+            requests_plan.extend((widget, url) for widget in found)
+        
+        responses = iter(self._fetch_widget_requests(requests_plan))
+        
+        results: Dict[str, Any] = {}
+        for name in names:
+            found = planned[name]
+            data_responses = [next(responses) for _ in found]
+            if name in ('related_queries', 'related_topics'):
+                results[name] = self._parse_related_widgets(
+                    found, data_responses, name == 'related_topics', kw_list)
+                continue
+            
+            data_response = data_responses[0] if data_responses else None
+            if not data_response or 'default' not in data_response:
+                logger.warning(f"未获取到 {name} 数据")
+                results[name] = pd.DataFrame()
+            elif name == 'interest_over_time':
+                results[name] = self._parse_interest_over_time(data_response, kw_list)
+            else:
+                results[name] = self._parse_interest_by_region(data_response, kw_list, inc_geo_code)
         
         return results
-
+    
     @error_handler(dict)
-    def batch_related_queries(
+    def related_for(self, kw_list: List[str], timeframe: str = 'today 12-m', geo: str = '',
+                    cat: int = 0, gprop: str = '') -> Dict[str, Dict[str, Dict[str, DataFrame]]]:
+        """
+        一次 explore 请求同时获取一组关键词(最多5个)的相关查询与相关主题
+        
+        Returns:
+            {'queries': {关键词: {'top', 'rising'}}, 'topics': {关键词: {'top', 'rising'}}}
+        """
+        results = self.fetch_widgets(kw_list, widgets=['related_queries', 'related_topics'],
+                                     timeframe=timeframe, geo=geo, cat=cat, gprop=gprop)
+        return {
+            'queries': results.get('related_queries', {}),
+            'topics': results.get('related_topics', {}),
+        }
+    
+    @error_handler(dict)
+    def related_topics(self) -> Dict[str, Dict[str, DataFrame]]:
+        """获取相关主题"""
+        return self._related_by_keyword('RELATED_TOPICS', is_topic=True)
+    
+    @error_handler(dict)
+    def related_queries(self) -> Dict[str, Dict[str, DataFrame]]:
+        """获取相关查询"""
+        return self._related_by_keyword('RELATED_QUERIES', is_topic=False)
+
+    BATCH_SIZE = 5  # Google Trends API 单个载荷的关键词上限
+    
+    def _batch_related(
         self,
+        fetch: Callable[[], Dict[str, Dict[str, DataFrame]]],
+        label: str,
         keywords: List[str],
-        timeframe: str = 'today 3-m',
-        geo: str = '',
-        cat: int = 0,
-        gprop: str = '',
-        delay_per_batch: int = 5
+        timeframe: str,
+        geo: str,
+        cat: int,
+        gprop: str,
+        delay_per_batch: float
     ) -> Dict[str, Dict[str, DataFrame]]:
-        """为大量关键词自动分批获取其'相关查询'"""
+        """按每批5个关键词构建载荷，一次 explore 请求覆盖整批关键词"""
         final_results: Dict[str, Dict[str, DataFrame]] = {}
-        batch_size = 5  # Google Trends API 限制
+        batch_size = self.BATCH_SIZE
 
-        logger.info(f"开始为 {len(keywords)} 个关键词批量获取相关查询...")
+        logger.info(f"开始为 {len(keywords)} 个关键词批量获取{label}...")
 
         for i in range(0, len(keywords), batch_size):
             batch = keywords[i:i + batch_size]
@@ -604,8 +797,7 @@ class CustomTrendsCollector(TrendsAPIClient):
             # 设置当前批次的关键词
             self.build_payload(batch, cat=cat, timeframe=timeframe, geo=geo, gprop=gprop)
             
-            # 获取相关查询数据
-            batch_result = self.related_queries()
+            batch_result = fetch()
 
             if batch_result:
                 final_results.update(batch_result)
@@ -613,12 +805,40 @@ class CustomTrendsCollector(TrendsAPIClient):
                 logger.warning(f"批次 {i//batch_size + 1} 未返回任何数据。")
 
             # 在批次之间添加延迟
-            if i + batch_size < len(keywords):
+            if i + batch_size < len(keywords) and delay_per_batch > 0:
                 logger.info(f"批次处理完成，暂停 {delay_per_batch} 秒...")
                 time.sleep(delay_per_batch)
         
-        logger.info(f"所有批次处理完成，共获取了 {len(final_results)} 个关键词的相关查询。")
+        logger.info(f"所有批次处理完成，共获取了 {len(final_results)} 个关键词的{label}。")
         return final_results
+
+    @error_handler(dict)
+    def batch_related_queries(
+        self,
+        keywords: List[str],
+        timeframe: str = 'today 3-m',
+        geo: str = '',
+        cat: int = 0,
+        gprop: str = '',
+        delay_per_batch: float = 5
+    ) -> Dict[str, Dict[str, DataFrame]]:
+        """为大量关键词自动分批获取其'相关查询'"""
+        return self._batch_related(self.related_queries, '相关查询', keywords,
+                                   timeframe, geo, cat, gprop, delay_per_batch)
+
+    @error_handler(dict)
+    def batch_related_topics(
+        self,
+        keywords: List[str],
+        timeframe: str = 'today 3-m',
+        geo: str = '',
+        cat: int = 0,
+        gprop: str = '',
+        delay_per_batch: float = 5
+    ) -> Dict[str, Dict[str, DataFrame]]:
+        """为大量关键词自动分批获取其'相关主题'"""
+        return self._batch_related(self.related_topics, '相关主题', keywords,
+                                   timeframe, geo, cat, gprop, delay_per_batch)
     
     @error_handler(pd.DataFrame)
     def trending_searches(self, pn: str = 'united_states') -> DataFrame:
@@ -778,16 +998,14 @@ class CustomTrendsCollector(TrendsAPIClient):
             # 构建payload
             self.build_payload(keywords, timeframe=timeframe, geo=geo)
 
-            # 获取趋势数据
-            interest_data = self.interest_over_time()
-
-            # 获取相关查询
-            related_queries = self.related_queries()
+            # 一次 explore 请求获取趋势数据与相关查询
+            widgets = self.fetch_widgets(keywords, widgets=['interest_over_time', 'related_queries'],
+                                         timeframe=timeframe, geo=geo)
 
             # 构建返回数据
             result = {
-                'interest_over_time': interest_data,
-                'related_queries': related_queries,
+                'interest_over_time': widgets.get('interest_over_time', pd.DataFrame()),
+                'related_queries': widgets.get('related_queries', {}),
                 'keyword': keywords[0] if len(keywords) == 1 else keywords,
                 'timeframe': timeframe,
                 'geo': geo
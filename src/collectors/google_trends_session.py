@@ -91,6 +91,7 @@ class PlaywrightResponseAdapter:
             )
 
 from .request_rate_limiter import wait_for_next_request, register_rate_limit_event
+from .playwright_context_pool import PooledContext, get_playwright_context_pool
 
 class GoogleTrendsSession:
     """Google Trends Session 管理类"""
@@ -112,6 +113,8 @@ class GoogleTrendsSession:
         self._playwright = None
         self._playwright_browser = None
         self._playwright_context = None
+        self._context_lease: Optional[PooledContext] = None
+        self.use_context_pool = self._resolve_context_pool_flag()
         logger.debug(
             "GoogleTrendsSession 初始化，后端=%s，代理=%s",
             self.client_backend,
@@ -201,6 +204,17 @@ class GoogleTrendsSession:
                 'X-Client-Data': 'CK6/ygEIlLbJAQjBtskBCKmdygEIptzKAQj8tc0BCJrdzgEIk7nOARis7c4B'
             }
 
+    @staticmethod
+    def _resolve_context_pool_flag() -> bool:
+        """是否复用进程级 Playwright 上下文池"""
+        flag = os.getenv('FIND_DEMAND_PLAYWRIGHT_POOL', '1').strip().lower()
+        return flag not in {'0', 'false', 'no'}
+
+    @property
+    def thread_bound(self) -> bool:
+        """Playwright 同步对象只能在创建它的线程上使用，此类会话不能交给工作线程发请求"""
+        return self.client_backend == 'playwright'
+
     def _resolve_backend(self, backend: Optional[str]) -> str:
         """解析会话使用的HTTP后端"""
         candidates = [
@@ -415,6 +429,20 @@ class GoogleTrendsSession:
         if sync_playwright is None:  # pragma: no cover - 运行环境缺少playwright
             raise RuntimeError("Playwright 未安装，无法启用浏览器指纹会话")
 
+        locale = (self.headers.get('Accept-Language') or 'en-US').split(',')[0]
+        user_agent = self.headers.get('User-Agent')
+
+        context_kwargs: Dict[str, Any] = {
+            'ignore_https_errors': True,
+            'locale': locale,
+        }
+        if user_agent:
+            context_kwargs['user_agent'] = user_agent
+
+        if self.use_context_pool:
+            self._lease_pooled_context(context_kwargs)
+            return
+
         headless_flag = os.getenv('FIND_DEMAND_PLAYWRIGHT_HEADLESS', '1').strip().lower()
         headless = headless_flag not in {'0', 'false', 'no'}
 
@@ -432,16 +460,6 @@ class GoogleTrendsSession:
                 args=launch_args,
             )
 
-        locale = (self.headers.get('Accept-Language') or 'en-US').split(',')[0]
-        user_agent = self.headers.get('User-Agent')
-
-        context_kwargs: Dict[str, Any] = {
-            'ignore_https_errors': True,
-            'locale': locale,
-        }
-        if user_agent:
-            context_kwargs['user_agent'] = user_agent
-
         if self._playwright_context is not None:
             try:
                 self._playwright_context.close()
@@ -453,6 +471,36 @@ class GoogleTrendsSession:
         self.session = self._playwright_context.request
         logger.debug("Playwright 请求上下文已创建 (headless=%s)", headless)
 
+    def _lease_pooled_context(self, context_kwargs: Dict[str, Any]) -> None:
+        """从上下文池租借浏览器上下文，已预热的上下文可跳过初始化流程"""
+        if self._context_lease is not None:
+            self._release_pooled_context(discard=True)
+
+        lease = get_playwright_context_pool().lease(context_kwargs, self.headers.copy())
+        self._context_lease = lease
+        self._playwright_context = lease.context
+        self.session = lease.request
+        if lease.warmed:
+            self.initialized = True
+            logger.debug("复用已预热的 Playwright 上下文 (第%d次租用)", lease.uses)
+        else:
+            logger.debug("已从上下文池租借新的 Playwright 上下文")
+
+    def _release_pooled_context(self, discard: bool = False) -> None:
+        """将上下文归还至池中，归还前同步cookie到磁盘"""
+        lease = self._context_lease
+        if lease is None:
+            return
+        if not discard:
+            self._persist_session_cookies()
+        self._context_lease = None
+        self._playwright_context = None
+        self.session = None
+        try:
+            get_playwright_context_pool().release(lease, healthy=not discard)
+        except Exception as release_error:
+            logger.debug(f"归还 Playwright 上下文失败: {release_error}")
+
     def _playwright_cookies_to_jar(self) -> RequestsCookieJar:
         jar = RequestsCookieJar()
         if not self._playwright_context:
@@ -748,6 +796,8 @@ class GoogleTrendsSession:
 
             if trends_response.status_code == 200:
                 self.initialized = True
+                if self._context_lease is not None:
+                    self._context_lease.warmed = True
                 logger.info("✅ Google Trends会话初始化成功")
             else:
                 penalty = register_rate_limit_event('high')
@@ -764,8 +814,11 @@ class GoogleTrendsSession:
     def reset_session(self) -> None:
         """重置会话"""
         try:
-            self._close_session()
+            # 重置通常源于429，被限流的上下文不再放回池中
+            self._close_session(discard=True)
             self._create_session()
+            # 即便租到已预热的上下文，限流后也必须重新走一遍初始化流程
+            self.initialized = False
             self._init_session()
             if not self.initialized:
                 raise RuntimeError("Google Trends会话重置失败，未获得有效会话")
@@ -791,7 +844,10 @@ class GoogleTrendsSession:
             except Exception as header_error:
                 logger.debug(f"会话header更新失败: {header_error}")
 
-    def _close_playwright(self) -> None:
+    def _close_playwright(self, discard: bool = False) -> None:
+        if self._context_lease is not None:
+            self._release_pooled_context(discard=discard)
+            return
         if self.session:
             try:
                 dispose = getattr(self.session, "dispose", None)
@@ -822,9 +878,9 @@ class GoogleTrendsSession:
                 self._playwright = None
         self.session = None
 
-    def _close_session(self) -> None:
+    def _close_session(self, discard: bool = False) -> None:
         if self.client_backend == 'playwright':
-            self._close_playwright()
+            self._close_playwright(discard=discard)
             return
         if self.session:
             try:
@@ -1017,10 +1073,14 @@ class GoogleTrendsSession:
         """POST请求"""
         return self.make_request('POST', url, **kwargs)
     
-    def close(self) -> None:
-        """关闭session"""
+    def close(self, discard: bool = False) -> None:
+        """关闭session
+
+        Args:
+            discard: Playwright 上下文池模式下是否丢弃上下文而非归还复用
+        """
         try:
-            self._close_session()
+            self._close_session(discard=discard)
             self.initialized = False
             logger.debug("Google Trends session已关闭")
         except Exception as e:
@@ -1043,12 +1103,25 @@ def get_global_session() -> GoogleTrendsSession:
                 logger.debug("创建Google Trends会话管理器实例")
     return _global_session
 
-def reset_global_session() -> None:
-    """重置全局session（线程安全）"""
+def reset_global_session(stale: Optional[GoogleTrendsSession] = None) -> bool:
+    """
+    重置全局session（线程安全）
+    
+    Args:
+        stale: 触发重置的session；全局session已不是它时说明其他线程已完成重置，不再重复重置
+        
+    Returns:
+        bool: 是否实际执行了重置
+    """
     global _global_session
     
     with _session_lock:
+        if stale is not None and _global_session is not stale:
+            logger.debug("全局Session已由其他请求重置，跳过")
+            return False
         if _global_session:
-            _global_session.close()
+            _global_session.close(discard=True)
             _global_session = GoogleTrendsSession()
             logger.info("全局Session已重置")
+            return True
+    return False
@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Playwright 浏览器上下文池
+复用已预热的浏览器上下文，避免每个会话重复启动 Chromium 并重放初始化流程
+"""
+
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    from playwright.sync_api import sync_playwright  # type: ignore
+except ImportError:  # pragma: no cover
+    sync_playwright = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LAUNCH_ARGS = [
+    "--disable-blink-features=AutomationControlled",
+    "--disable-dev-shm-usage",
+]
+
+
+@dataclass
+class PooledContext:
+    """池中租出的浏览器上下文"""
+
+    context: Any
+    signature: str
+    created_at: float = field(default_factory=time.time)
+    last_used: float = field(default_factory=time.time)
+    uses: int = 0
+    warmed: bool = False
+
+    @property
+    def request(self) -> Any:
+        return self.context.request
+
+
+class PlaywrightContextPool:
+    """共享单个浏览器实例的上下文池，支持租借/归还与健康检查
+
+    Playwright 同步 API 的对象绑定在创建它的线程上，因此池实例同样只能在
+    所属线程中使用；多线程场景请通过 ``get_playwright_context_pool`` 获取
+    当前线程对应的池。
+    """
+
+    def __init__(
+        self,
+        max_idle: int = 4,
+        max_context_age: float = 1800.0,
+        max_context_uses: int = 200,
+        headless: Optional[bool] = None,
+        playwright_factory: Optional[Callable[[], Any]] = None,
+    ) -> None:
+        self.max_idle = max(int(max_idle), 0)
+        self.max_context_age = max(float(max_context_age), 0.0)
+        self.max_context_uses = max(int(max_context_uses), 1)
+        if headless is None:
+            headless_flag = os.getenv('FIND_DEMAND_PLAYWRIGHT_HEADLESS', '1').strip().lower()
+            headless = headless_flag not in {'0', 'false', 'no'}
+        self.headless = headless
+        self._playwright_factory = playwright_factory
+        self._playwright = None
+        self._browser = None
+        self._idle: List[PooledContext] = []
+        self._leased: Dict[int, PooledContext] = {}
+        self._owner_thread = threading.get_ident()
+        self._lock = threading.RLock()
+        self._stats: Dict[str, int] = {
+            'browser_launches': 0,
+            'contexts_created': 0,
+            'leases': 0,
+            'reused': 0,
+            'discarded': 0,
+        }
+
+    # ------------------------------------------------------------------
+    # 浏览器生命周期
+    # ------------------------------------------------------------------
+    def _start_playwright(self) -> Any:
+        if self._playwright_factory is not None:
+            return self._playwright_factory()
+        if sync_playwright is None:  # pragma: no cover - 运行环境缺少playwright
+            raise RuntimeError("Playwright 未安装，无法创建浏览器上下文池")
+        return sync_playwright().start()
+
+    def _ensure_browser(self) -> Any:
+        if self._browser is not None and self._browser_connected():
+            return self._browser
+
+        if self._browser is not None:
+            logger.warning("Playwright 浏览器连接已断开，重新启动")
+            self._drop_all_contexts()
+            self._browser = None
+
+        if self._playwright is None:
+            self._playwright = self._start_playwright()
+
+        self._browser = self._playwright.chromium.launch(
+            headless=self.headless,
+            args=list(DEFAULT_LAUNCH_ARGS),
+        )
+        self._stats['browser_launches'] += 1
+        logger.debug("Playwright 浏览器已启动 (headless=%s)", self.headless)
+        return self._browser
+
+    def _browser_connected(self) -> bool:
+        is_connected = getattr(self._browser, 'is_connected', None)
+        if not callable(is_connected):
+            return True
+        try:
+            return bool(is_connected())
+        except Exception:
+            return False
+
+    # ------------------------------------------------------------------
+    # 租借与归还
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _make_signature(context_kwargs: Dict[str, Any]) -> str:
+        return json.dumps(context_kwargs, sort_keys=True, default=str)
+
+    def lease(
+        self,
+        context_kwargs: Optional[Dict[str, Any]] = None,
+        extra_headers: Optional[Dict[str, str]] = None,
+    ) -> PooledContext:
+        """租借一个浏览器上下文，优先复用已预热且健康的空闲上下文"""
+        self._check_thread()
+        context_kwargs = dict(context_kwargs or {})
+        signature = self._make_signature(context_kwargs)
+
+        with self._lock:
+            self._stats['leases'] += 1
+            while True:
+                entry = self._pop_idle(signature)
+                if entry is None:
+                    break
+                if self.is_healthy(entry):
+                    self._stats['reused'] += 1
+                    break
+                self._close_entry(entry)
+                entry = None
+
+            if entry is None:
+                browser = self._ensure_browser()
+                context = browser.new_context(**context_kwargs)
+                entry = PooledContext(context=context, signature=signature)
+                self._stats['contexts_created'] += 1
+                logger.debug("Playwright 上下文池新建上下文 (当前租出 %d 个)", len(self._leased))
+
+            if extra_headers:
+                try:
+                    entry.context.set_extra_http_headers(dict(extra_headers))
+                except Exception as header_error:
+                    logger.debug(f"Playwright 上下文 header 设置失败: {header_error}")
+
+            entry.uses += 1
+            entry.last_used = time.time()
+            self._leased[id(entry)] = entry
+            return entry
+
+    def release(self, entry: Optional[PooledContext], healthy: bool = True) -> None:
+        """归还上下文；不健康或超出空闲上限的上下文会被关闭"""
+        if entry is None:
+            return
+        with self._lock:
+            self._leased.pop(id(entry), None)
+            entry.last_used = time.time()
+            if not healthy or len(self._idle) >= self.max_idle or not self.is_healthy(entry):
+                self._close_entry(entry)
+                return
+            self._idle.append(entry)
+
+    def discard(self, entry: Optional[PooledContext]) -> None:
+        """丢弃上下文（例如遇到429后需要全新指纹）"""
+        self.release(entry, healthy=False)
+
+    def is_healthy(self, entry: PooledContext) -> bool:
+        """检查上下文是否仍可复用"""
+        if self._browser is None or not self._browser_connected():
+            return False
+        if self.max_context_age and time.time() - entry.created_at > self.max_context_age:
+            return False
+        if entry.uses >= self.max_context_uses:
+            return False
+        try:
+            entry.context.cookies()
+        except Exception as probe_error:
+            logger.debug(f"Playwright 上下文健康检查失败: {probe_error}")
+            return False
+        return True
+
+    def _pop_idle(self, signature: str) -> Optional[PooledContext]:
+        # 优先返回已预热的上下文，其次按最近使用顺序
+        candidates = [entry for entry in self._idle if entry.signature == signature]
+        if not candidates:
+            return None
+        candidates.sort(key=lambda item: (item.warmed, item.last_used))
+        entry = candidates[-1]
+        self._idle.remove(entry)
+        return entry
+
+    def _close_entry(self, entry: PooledContext) -> None:
+        self._stats['discarded'] += 1
+        try:
+            entry.context.close()
+        except Exception:
+            pass
+
+    def _drop_all_contexts(self) -> None:
+        for entry in self._idle:
+            self._close_entry(entry)
+        self._idle.clear()
+        self._leased.clear()
+
+    def owned_by_current_thread(self) -> bool:
+        return threading.get_ident() == self._owner_thread
+
+    def _check_thread(self) -> None:
+        if not self.owned_by_current_thread():
+            raise RuntimeError("PlaywrightContextPool 只能在创建它的线程中使用")
+
+    # ------------------------------------------------------------------
+    # 统计与关闭
+    # ------------------------------------------------------------------
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['idle'] = len(self._idle)
+            stats['leased'] = len(self._leased)
+            return stats
+
+    def close(self) -> None:
+        """关闭所有上下文、浏览器与 Playwright 驱动（必须在所属线程中调用）"""
+        self._check_thread()
+        with self._lock:
+            for entry in list(self._leased.values()):
+                self._close_entry(entry)
+            self._drop_all_contexts()
+            if self._browser is not None:
+                try:
+                    self._browser.close()
+                except Exception:
+                    pass
+                finally:
+                    self._browser = None
+            if self._playwright is not None:
+                try:
+                    self._playwright.stop()
+                except Exception:
+                    pass
+                finally:
+                    self._playwright = None
+
+
+# 每个线程一个池（Playwright 同步 API 的线程约束），进程退出时统一关闭
+_thread_pools = threading.local()
+_all_pools: List[PlaywrightContextPool] = []
+_pools_lock = threading.Lock()
+
+
+def _pool_settings_from_env() -> Dict[str, Any]:
+    settings: Dict[str, Any] = {}
+    env_map = {
+        'FIND_DEMAND_PLAYWRIGHT_POOL_SIZE': ('max_idle', int),
+        'FIND_DEMAND_PLAYWRIGHT_CONTEXT_TTL': ('max_context_age', float),
+        'FIND_DEMAND_PLAYWRIGHT_CONTEXT_MAX_USES': ('max_context_uses', int),
+    }
+    for env_key, (name, caster) in env_map.items():
+        raw = os.getenv(env_key)
+        if not raw:
+            continue
+        try:
+            settings[name] = caster(raw)
+        except ValueError:
+            logger.warning(f"忽略无效的 {env_key} 配置: {raw}")
+    return settings
+
+
+def get_playwright_context_pool() -> PlaywrightContextPool:
+    """获取当前线程的浏览器上下文池"""
+    pool = getattr(_thread_pools, 'pool', None)
+    if pool is None:
+        pool = PlaywrightContextPool(**_pool_settings_from_env())
+        _thread_pools.pool = pool
+        with _pools_lock:
+            _all_pools.append(pool)
+        logger.debug("创建 Playwright 上下文池")
+    return pool
+
+
+def close_thread_playwright_context_pool() -> None:
+    """关闭当前线程的上下文池；使用过上下文池的工作线程应在退出前调用"""
+    pool = getattr(_thread_pools, 'pool', None)
+    if pool is None:
+        return
+    _thread_pools.pool = None
+    with _pools_lock:
+        if pool in _all_pools:
+            _all_pools.remove(pool)
+    try:
+        pool.close()
+    except Exception as close_error:
+        logger.debug(f"关闭 Playwright 上下文池失败: {close_error}")
+
+
+def shutdown_playwright_context_pools() -> None:
+    """关闭当前线程所属的上下文池
+
+    Playwright 同步对象只能在创建它的线程中操作，其他线程的池须由所属线程通过
+    ``close_thread_playwright_context_pool`` 关闭；这里仅解除其登记，浏览器进程随驱动退出。
+    """
+    with _pools_lock:
+        pools = list(_all_pools)
+        _all_pools.clear()
+    for pool in pools:
+        if not pool.owned_by_current_thread():
+            logger.debug("跳过其他线程创建的 Playwright 上下文池")
+            continue
+        try:
+            pool.close()
+        except Exception as close_error:
+            logger.debug(f"关闭 Playwright 上下文池失败: {close_error}")
+    if getattr(_thread_pools, 'pool', None) is not None:
+        _thread_pools.pool = None
+
+
+atexit.register(shutdown_playwright_context_pools)
@@ -4,9 +4,16 @@
 
 from __future__ import annotations
 
+import json
+import logging
+import os
+import threading
+import time
 import xml.etree.ElementTree as ET
-from dataclasses import dataclass
-from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
 
 import requests
 import pandas as pd
@@ -27,6 +34,12 @@ DEFAULT_FEEDS = [
     }
 ]
 
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_CACHE_PATH = PROJECT_ROOT / 'output' / 'cache' / 'rss_hotspot' / 'feed_validators.json'
+DEFAULT_MAX_WORKERS = 4
+
+logger = logging.getLogger(__name__)
+
 
 def _build_session() -> requests.Session:
     session = requests.Session()
@@ -45,23 +58,49 @@ class FeedEntry:
 
 
 class RSSHotspotCollector:
-    """从多个 RSS 源提取热点词条"""
+    """从多个 RSS 源提取热点词条
 
-    def __init__(self, feeds: Optional[List[Dict[str, str]]] = None, timeout: int = 8):
+    各订阅源并发抓取；服务端返回的 ETag/Last-Modified 连同解析结果缓存在本地，
+    下次请求携带条件头，源未更新时直接复用缓存（304）而不重新下载与解析。
+    """
+
+    def __init__(
+        self,
+        feeds: Optional[List[Dict[str, str]]] = None,
+        timeout: int = 8,
+        cache_path: Optional[Path] = DEFAULT_CACHE_PATH,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+    ):
         self.feeds = feeds or DEFAULT_FEEDS
         self.session = _build_session()
         self.timeout = timeout
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.max_workers = max(int(max_workers), 1)
+        self._validators: Dict[str, Dict[str, Any]] = self._load_validators()
+        self._validators_dirty = False
+        self._lock = threading.Lock()
+        self.last_stats: Dict[str, int] = {}
 
     def collect(self, max_items: int = 30) -> pd.DataFrame:
-        entries: List[FeedEntry] = []
+        feeds = [feed for feed in self.feeds if feed.get('url')]
+        self.last_stats = {'feeds': len(feeds), 'fetched': 0, 'not_modified': 0, 'failed': 0}
 
-        for feed in self.feeds:
-            url = feed.get('url')
-            label = feed.get('label', 'RSS')
-            if not url:
-                continue
-            entries.extend(self._fetch_feed(url, label, max_items=max_items))
+        if len(feeds) > 1 and self.max_workers > 1:
+            workers = min(self.max_workers, len(feeds))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='rss') as executor:
+                batches = list(executor.map(
+                    lambda feed: self._fetch_feed(feed['url'], feed.get('label', 'RSS'), max_items=max_items),
+                    feeds,
+                ))
+        else:
+            batches = [
+                self._fetch_feed(feed['url'], feed.get('label', 'RSS'), max_items=max_items)
+                for feed in feeds
+            ]
+
+        self._save_validators()
 
+        entries: List[FeedEntry] = [entry for batch in batches for entry in batch]
         if not entries:
             return pd.DataFrame(columns=['query', 'source', 'feed_link'])
 
@@ -86,27 +125,150 @@ class RSSHotspotCollector:
         return pd.DataFrame(records)
 
     def _fetch_feed(self, url: str, label: str, max_items: int = 30) -> List[FeedEntry]:
+        cached = self._get_cached_feed(url, max_items)
+
         try:
-            response = self.session.get(url, timeout=self.timeout)
+            response = self.session.get(
+                url, timeout=self.timeout, headers=self._conditional_headers(cached), stream=True
+            )
+            if response.status_code == 304:
+                response.close()
+                if cached:
+                    self._bump_stat('not_modified')
+                    return self._entries_from_cache(cached, label, max_items)
+                # 本地无可复用的缓存（如中间代理自行返回 304），按缓存未命中重新完整拉取
+                response = self.session.get(
+                    url,
+                    timeout=self.timeout,
+                    headers={'Cache-Control': 'no-cache', 'Pragma': 'no-cache'},
+                    stream=True,
+                )
             response.raise_for_status()
+            if response.status_code == 304:
+                raise requests.HTTPError(f"304 without cached entry: {url}", response=response)
         except Exception:
+            self._bump_stat('failed')
             return []
 
         try:
-            content = response.text
-            root = ET.fromstring(content)
+            entries = self._parse_feed_stream(response, label, max_items)
         except Exception:
+            self._bump_stat('failed')
             return []
+        finally:
+            response.close()
+
+        self._bump_stat('fetched')
+        self._store_validators(url, response, entries, max_items)
+        return entries
+
+    @staticmethod
+    def _conditional_headers(cached: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        """仅在本地存在可复用的缓存条目时才携带条件请求头"""
+        headers: Dict[str, str] = {}
+        if not cached:
+            return headers
+        if cached.get('etag'):
+            headers['If-None-Match'] = cached['etag']
+        if cached.get('last_modified'):
+            headers['If-Modified-Since'] = cached['last_modified']
+        return headers
+
+    @staticmethod
+    def _parse_feed_stream(response: requests.Response, label: str, max_items: int) -> List[FeedEntry]:
+        """流式解析 RSS，取满 max_items 条后立即停止读取
+
+        取满之前遇到格式错误时整源视为失败（抛出 ParseError），不返回半截结果。
+        """
+        raw = response.raw
+        try:
+            raw.decode_content = True
+        except AttributeError:
+            pass
 
         entries: List[FeedEntry] = []
-        count = 0
-        for item in root.findall('.//item'):
-            title = item.findtext('title')
-            link = item.findtext('link')
+        for _, element in ET.iterparse(raw, events=('end',)):
+            if element.tag != 'item':
+                continue
+            title = element.findtext('title')
+            link = element.findtext('link')
+            element.clear()
             if title:
                 entries.append(FeedEntry(title=title, source=label, link=link))
-                count += 1
-            if count >= max_items:
+            if len(entries) >= max_items:
                 break
 
         return entries
+
+    # ------------------------------------------------------------------
+    # 条件请求缓存
+    # ------------------------------------------------------------------
+    def _load_validators(self) -> Dict[str, Dict[str, Any]]:
+        if not self.cache_path or not self.cache_path.exists():
+            return {}
+        try:
+            with self.cache_path.open('r', encoding='utf-8') as fh:
+                data = json.load(fh)
+            return data if isinstance(data, dict) else {}
+        except Exception as load_error:
+            logger.debug(f"RSS 条件请求缓存读取失败: {load_error}")
+            return {}
+
+    def _save_validators(self) -> None:
+        if not self.cache_path or not self._validators_dirty:
+            return
+        with self._lock:
+            payload = dict(self._validators)
+            self._validators_dirty = False
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.cache_path.with_suffix('.tmp')
+            with tmp_path.open('w', encoding='utf-8') as fh:
+                json.dump(payload, fh, ensure_ascii=False)
+            os.replace(tmp_path, self.cache_path)
+        except Exception as save_error:
+            logger.debug(f"RSS 条件请求缓存写入失败: {save_error}")
+
+    def _get_cached_feed(self, url: str, max_items: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            cached = self._validators.get(url)
+        if not cached or not (cached.get('etag') or cached.get('last_modified')):
+            return None
+        # 缓存条目不足以满足本次 max_items 时需完整重新拉取
+        if cached.get('truncated') and len(cached.get('entries') or []) < max_items:
+            return None
+        return cached
+
+    def _store_validators(
+        self,
+        url: str,
+        response: requests.Response,
+        entries: List[FeedEntry],
+        max_items: int,
+    ) -> None:
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if not etag and not last_modified:
+            return
+        with self._lock:
+            self._validators[url] = {
+                'etag': etag,
+                'last_modified': last_modified,
+                'entries': [asdict(entry) for entry in entries],
+                'truncated': len(entries) >= max_items,
+                'fetched_at': time.time(),
+            }
+            self._validators_dirty = True
+
+    @staticmethod
+    def _entries_from_cache(cached: Dict[str, Any], label: str, max_items: int) -> List[FeedEntry]:
+        entries: List[FeedEntry] = []
+        for item in (cached.get('entries') or [])[:max_items]:
+            title = item.get('title')
+            if title:
+                entries.append(FeedEntry(title=title, source=label, link=item.get('link')))
+        return entries
+
+    def _bump_stat(self, key: str) -> None:
+        with self._lock:
+            self.last_stats[key] = self.last_stats.get(key, 0) + 1
@@ -8,20 +8,35 @@ import json
 import time
 import os
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Any, Callable, Dict, Iterable, List, Optional
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
 
 import requests
+from requests.adapters import HTTPAdapter
 
 
 DEFAULT_TIMEOUT = 8
 DEFAULT_MIN_INTERVAL = 0.35
 DEFAULT_MAX_SEED_SAMPLES = 40
 DEFAULT_MAX_REQUESTS = 200
+DEFAULT_MAX_WORKERS = 5
 
+# 各数据源的最小请求间隔（秒），未列出的来源使用 min_interval；
+# 节奏按目标主机统一控制，共用同一主机的来源（Google/YouTube 联想）共享同一预算
+DEFAULT_SOURCE_MIN_INTERVALS: Dict[str, float] = {
+    'reddit_suggestions': 1.0,
+    'people_also_ask': 1.0,
+}
 
-def _build_session() -> requests.Session:
+
+def _build_session(pool_size: int = DEFAULT_MAX_WORKERS) -> requests.Session:
     session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=max(pool_size, 1), pool_maxsize=max(pool_size, 1))
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
     session.headers.update({
         'User-Agent': 'Mozilla/5.0 (KeywordRadar/1.0; +https://github.com/find-demand)',
         'Accept': 'application/json,text/plain,*/*',
@@ -30,6 +45,26 @@ def _build_session() -> requests.Session:
     return session
 
 
+class _HostRateBudget:
+    """单个目标主机的请求节奏控制，按最小间隔预约下一次请求时间"""
+
+    def __init__(self):
+        self._next_ts = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self, min_interval: float) -> None:
+        min_interval = max(float(min_interval), 0.0)
+        if min_interval <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_ts)
+            self._next_ts = start + min_interval
+        delay = start - now
+        if delay > 0:
+            time.sleep(delay)
+
+
 @dataclass
 class Suggestion:
     term: str
@@ -48,8 +83,11 @@ class SuggestionCollector:
         max_seed_samples: int = DEFAULT_MAX_SEED_SAMPLES,
         max_requests: Optional[int] = DEFAULT_MAX_REQUESTS,
         max_collectors_per_seed: Optional[int] = None,
+        max_workers: Optional[int] = DEFAULT_MAX_WORKERS,
+        source_min_intervals: Optional[Dict[str, float]] = None,
     ):
-        self.session = _build_session()
+        self.max_workers = max(int(max_workers), 1) if max_workers else 1
+        self.session = _build_session(self.max_workers)
         self.timeout = timeout
         self.serp_api_key = self._load_serp_api_key()
         self.min_interval = max(float(min_interval), 0.0)
@@ -61,22 +99,37 @@ class SuggestionCollector:
             else None
         )
 
+        self.source_min_intervals = dict(DEFAULT_SOURCE_MIN_INTERVALS)
+        if source_min_intervals:
+            self.source_min_intervals.update(source_min_intervals)
+
         self._last_request_ts: float = 0.0
         self._request_count: int = 0
         self._stats: Dict[str, Any] = {}
+        self._budgets: Dict[str, _HostRateBudget] = {}
+        self._counter_lock = threading.Lock()
         self.logger = logging.getLogger(__name__)
 
-    def fetch_google_autocomplete(self, keyword: str, lang: str = 'en') -> List[str]:
+    def fetch_google_autocomplete(
+        self,
+        keyword: str,
+        lang: str = 'en',
+        source: str = 'google_autocomplete',
+    ) -> List[str]:
         url = 'https://suggestqueries.google.com/complete/search'
         params = {
             'client': 'firefox',
             'q': keyword,
             'hl': lang,
         }
-        return self._fetch_suggestions(url, params, keyword)
+        return self._fetch_suggestions(url, params, keyword, source=source)
 
     def fetch_google_autocomplete_cn(self, keyword: str) -> List[str]:
-        return self.fetch_google_autocomplete(keyword, lang='zh-CN')
+        return self.fetch_google_autocomplete(
+            keyword,
+            lang='zh-CN',
+            source='google_autocomplete_cn',
+        )
 
     def fetch_youtube_suggestions(self, keyword: str) -> List[str]:
         url = 'https://suggestqueries.google.com/complete/search'
@@ -85,7 +138,7 @@ class SuggestionCollector:
             'ds': 'yt',
             'q': keyword,
         }
-        return self._fetch_suggestions(url, params, keyword)
+        return self._fetch_suggestions(url, params, keyword, source='youtube_suggestions')
 
     def fetch_reddit_suggestions(self, keyword: str, limit: int = 10) -> List[str]:
         url = 'https://www.reddit.com/search.json'
@@ -96,7 +149,7 @@ class SuggestionCollector:
             'restrict_sr': 'false',
             't': 'month'
         }
-        if not self._acquire_slot():
+        if not self._acquire_slot('reddit_suggestions', url):
             return []
 
         try:
@@ -158,25 +211,29 @@ class SuggestionCollector:
 
         self._reset_counters(len(seeds_cleaned))
 
-        all_suggestions: List[Suggestion] = []
-        seen_terms: Dict[str, str] = {}
+        if self.max_workers > 1 and len(collectors) > 1:
+            results = self._fetch_concurrently(seeds_cleaned, collectors)
+        else:
+            results = self._fetch_sequentially(seeds_cleaned, collectors)
 
-        for seed in seeds_cleaned:
-            self._stats['seeds_processed'] += 1
-
-            for collector in collectors:
-                if self._limit_reached():
-                    self.logger.warning(
-                        "SuggestionCollector: 达到最大请求数 %s，提前结束收集",
-                        self.max_requests,
-                    )
-                    return all_suggestions
+        if self._limit_reached():
+            self.logger.warning(
+                "SuggestionCollector: 达到最大请求数 %s，提前结束收集",
+                self.max_requests,
+            )
 
-                try:
-                    terms = collector(seed)
-                except Exception:
-                    terms = []
+        # 按 (种子, 来源) 的原始顺序合并，保证去重结果与并发调度无关
+        all_suggestions: List[Suggestion] = []
+        seen_terms: Dict[str, str] = {}
+        processed_seeds: set[int] = set()
 
+        for seed_index, seed in enumerate(seeds_cleaned):
+            for collector_index, collector in enumerate(collectors):
+                key = (seed_index, collector_index)
+                if key not in results:
+                    continue
+                processed_seeds.add(seed_index)
+                terms = results[key]
                 if not terms:
                     continue
 
@@ -200,6 +257,8 @@ class SuggestionCollector:
                     if count >= per_seed_limit:
                         break
 
+        self._stats['seeds_processed'] = len(processed_seeds)
+
         if self.logger.isEnabledFor(logging.INFO):
             self.logger.info(
                 "SuggestionCollector: 本次收集结束，处理 %d/%d 个种子，发送 %d 次请求，获得 %d 条建议",
@@ -211,6 +270,57 @@ class SuggestionCollector:
 
         return all_suggestions
 
+    def _fetch_sequentially(
+        self,
+        seeds: List[str],
+        collectors: List[Callable[[str], List[str]]],
+    ) -> Dict[Tuple[int, int], List[str]]:
+        results: Dict[Tuple[int, int], List[str]] = {}
+        for seed_index, seed in enumerate(seeds):
+            for collector_index, collector in enumerate(collectors):
+                if self._limit_reached():
+                    return results
+                results[(seed_index, collector_index)] = self._run_collector(collector, seed)
+        return results
+
+    def _fetch_concurrently(
+        self,
+        seeds: List[str],
+        collectors: List[Callable[[str], List[str]]],
+    ) -> Dict[Tuple[int, int], List[str]]:
+        """每个来源一条独立通道并行执行，慢源或被限流的来源不会阻塞其他来源"""
+        results: Dict[Tuple[int, int], List[str]] = {}
+        results_lock = threading.Lock()
+
+        def run_lane(collector_index: int, collector: Callable[[str], List[str]]) -> None:
+            for seed_index, seed in enumerate(seeds):
+                if self._limit_reached():
+                    return
+                terms = self._run_collector(collector, seed)
+                with results_lock:
+                    results[(seed_index, collector_index)] = terms
+
+        workers = min(self.max_workers, len(collectors))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='suggestion') as executor:
+            futures = [
+                executor.submit(run_lane, collector_index, collector)
+                for collector_index, collector in enumerate(collectors)
+            ]
+            for future in futures:
+                try:
+                    future.result()
+                except Exception as lane_error:
+                    self.logger.debug("SuggestionCollector: 来源通道异常: %s", lane_error)
+
+        return results
+
+    @staticmethod
+    def _run_collector(collector: Callable[[str], List[str]], seed: str) -> List[str]:
+        try:
+            return collector(seed) or []
+        except Exception:
+            return []
+
     def get_last_stats(self) -> Dict[str, Any]:
         """获取最近一次 collect 的统计数据"""
         return dict(self._stats)
@@ -219,6 +329,7 @@ class SuggestionCollector:
     def _reset_counters(self, seed_count: int) -> None:
         self._last_request_ts = 0.0
         self._request_count = 0
+        self._budgets = {}
         self._stats = {
             'seeds_total': seed_count,
             'seeds_processed': 0,
@@ -230,24 +341,38 @@ class SuggestionCollector:
     def _limit_reached(self) -> bool:
         return bool(self.max_requests and self._request_count >= self.max_requests)
 
-    def _acquire_slot(self) -> bool:
-        if self._limit_reached():
-            return False
-
-        if self.min_interval > 0 and self._last_request_ts > 0.0:
-            elapsed = time.monotonic() - self._last_request_ts
-            wait_time = self.min_interval - elapsed
-            if wait_time > 0:
-                time.sleep(wait_time)
+    def _get_budget(self, host: str) -> _HostRateBudget:
+        with self._counter_lock:
+            budget = self._budgets.get(host)
+            if budget is None:
+                budget = _HostRateBudget()
+                self._budgets[host] = budget
+            return budget
+
+    def _acquire_slot(self, source: str = 'default', url: str = '') -> bool:
+        # 先预占全局请求配额，再按目标主机的节奏等待（同主机的不同来源共享预算）
+        with self._counter_lock:
+            if self._limit_reached():
+                return False
+            self._request_count += 1
+            if self._stats:
+                self._stats['requests_sent'] = self._request_count
+
+        host = urlparse(url).netloc or source
+        self._get_budget(host).wait(self.source_min_intervals.get(source, self.min_interval))
         return True
 
     def _register_request(self) -> None:
         self._last_request_ts = time.monotonic()
-        self._request_count += 1
-        self._stats['requests_sent'] = self._request_count
 
-    def _fetch_suggestions(self, url: str, params: Dict[str, str], keyword: str) -> List[str]:
-        if not self._acquire_slot():
+    def _fetch_suggestions(
+        self,
+        url: str,
+        params: Dict[str, str],
+        keyword: str,
+        source: str = 'default',
+    ) -> List[str]:
+        if not self._acquire_slot(source, url):
             return []
 
         try:
@@ -296,11 +421,12 @@ class SuggestionCollector:
             'api_key': self.serp_api_key,
             'num': 10
         }
-        if not self._acquire_slot():
+        url = 'https://serpapi.com/search'
+        if not self._acquire_slot('people_also_ask', url):
             return []
 
         try:
-            response = self.session.get('https://serpapi.com/search', params=params, timeout=self.timeout)
+            response = self.session.get(url, params=params, timeout=self.timeout)
             response.raise_for_status()
             data = response.json()
         except Exception:
@@ -11,20 +11,77 @@ from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
 import pandas as pd
 import re
+import threading
 import time
 import random
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Optional
 import logging
 
+try:
+    from lxml import etree, html as lxml_html
+except ImportError:  # pragma: no cover - lxml 不可用时使用 BeautifulSoup 解析
+    etree = None
+    lxml_html = None
+
+
+VOLUME_PATTERN = re.compile(r'\d+k?/Month', re.IGNORECASE)
+VOLUME_IN_PARENS_PATTERN = re.compile(r'\(\d+k?/Month\)')
+VOLUME_NUMBER_PATTERN = re.compile(r'(\d+(?:\.\d+)?)k?', re.IGNORECASE)
+DIGITS_PATTERN = re.compile(r'^\d+$')
+
+
+def _class_xpath(class_name: str) -> str:
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {class_name} ')"
+
+
+def _selector_xpath(selector: str) -> str:
+    """将简单的标签/类选择器转换为相对 XPath（保持与 select_one 相同的文档顺序语义）"""
+    if selector.startswith('.'):
+        return f".//*[{_class_xpath(selector[1:])}]"
+    return f".//{selector}"
+
+
+if etree is not None:
+    # 预编译的 XPath：卡片容器按 class 子串匹配，与 BeautifulSoup 版本的判断一致
+    _CARD_XPATH = etree.XPath(
+        "//div[contains(@class, 'max-w-sm') and contains(@class, 'bg-white') and contains(@class, 'rounded-lg')]"
+    )
+    _DESCRIPTION_XPATHS = [
+        etree.XPath(_selector_xpath(selector))
+        for selector in ('.description', '.desc', '.summary', 'p', '.content', '.detail')
+    ]
+    _CATEGORY_XPATHS = [
+        etree.XPath(_selector_xpath(selector))
+        for selector in ('.category', '.tag', '.label', '.badge', '.chip')
+    ]
+
 
 class TrendingKeywordsCollector:
     """TrendingKeywords.net 数据收集器"""
     
-    def __init__(self):
+    def __init__(self,
+                 concurrent_fetch: bool = True,
+                 max_workers: int = 3,
+                 min_request_interval: float = 0.5,
+                 parser: Optional[str] = None):
+        """
+        Args:
+            concurrent_fetch: 是否并发抓取多页
+            max_workers: 并发抓取的最大线程数
+            min_request_interval: 并发模式下相邻请求发起的最小间隔(秒)
+            parser: 'lxml' 或 'bs4'，默认 lxml 可用时使用 lxml
+        """
         self.base_url = "https://trendingkeywords.net/"
         self.session = self._create_session()
         self.ssl_retry_attempts = 3
         self.ssl_retry_backoff = 1.2
+        self.concurrent_fetch = concurrent_fetch
+        self.max_workers = max(1, max_workers)
+        self.min_request_interval = max(0.0, min_request_interval)
+        self.parser = parser or ('lxml' if etree is not None else 'bs4')
+        self._politeness_lock = threading.Lock()
+        self._next_request_at = 0.0
         
         # 设置日志
         self.logger = logging.getLogger(__name__)
@@ -88,42 +145,31 @@ class TrendingKeywordsCollector:
             raise last_error
         raise RuntimeError("请求未能成功且未捕获具体异常")
         
-    def fetch_trending_keywords(self, max_pages: int = 3, delay_range: tuple = (1, 3)) -> pd.DataFrame:
+    def _page_url(self, page: int) -> str:
+        return self.base_url if page == 1 else f"{self.base_url}?page={page}"
+
+    def fetch_trending_keywords(self,
+                                max_pages: int = 3,
+                                delay_range: tuple = (1, 3),
+                                concurrent: Optional[bool] = None) -> pd.DataFrame:
         """
         获取热门关键词数据
         
         Args:
             max_pages: 最大抓取页数
-            delay_range: 请求间隔时间范围(秒)
+            delay_range: 顺序模式下的请求间隔时间范围(秒)
+            concurrent: 是否并发抓取，默认使用 self.concurrent_fetch
             
         Returns:
             包含关键词数据的DataFrame
         """
-        all_keywords = []
+        use_concurrent = self.concurrent_fetch if concurrent is None else concurrent
         
         try:
-            for page in range(1, max_pages + 1):
-                self.logger.info(f"正在抓取第 {page} 页...")
-                self.logger.info(f"请求 url: {self.base_url}")
-                # 构建页面URL
-                if page == 1:
-                    url = self.base_url
-                else:
-                    url = f"{self.base_url}?page={page}"
-                
-                # 获取页面数据
-                keywords = self._fetch_page_keywords(url)
-                if keywords:
-                    all_keywords.extend(keywords)
-                    self.logger.info(f"第 {page} 页获取到 {len(keywords)} 个关键词")
-                else:
-                    self.logger.warning(f"第 {page} 页未获取到数据")
-                    break
-                
-                # 随机延迟避免被封
-                if page < max_pages:
-                    delay = random.uniform(*delay_range)
-                    time.sleep(delay)
+            if use_concurrent and max_pages > 1:
+                all_keywords = self._fetch_pages_concurrently(max_pages)
+            else:
+                all_keywords = self._fetch_pages_sequentially(max_pages, delay_range)
             
             # 转换为DataFrame
             if all_keywords:
@@ -138,17 +184,74 @@ class TrendingKeywordsCollector:
             self.logger.error(f"获取热门关键词失败: {e}")
             return pd.DataFrame()
     
-    def _fetch_page_keywords(self, url: str) -> List[Dict]:
+    def _fetch_pages_sequentially(self, max_pages: int, delay_range: tuple) -> List[Dict]:
+        all_keywords = []
+        for page in range(1, max_pages + 1):
+            self.logger.info(f"正在抓取第 {page} 页...")
+            url = self._page_url(page)
+            self.logger.info(f"请求 url: {url}")
+            
+            # 获取页面数据
+            keywords = self._fetch_page_keywords(url)
+            if keywords:
+                all_keywords.extend(keywords)
+                self.logger.info(f"第 {page} 页获取到 {len(keywords)} 个关键词")
+            else:
+                self.logger.warning(f"第 {page} 页未获取到数据")
+                break
+            
+            # 随机延迟避免被封
+            if page < max_pages:
+                delay = random.uniform(*delay_range)
+                time.sleep(delay)
+        return all_keywords
+    
+    def _fetch_pages_concurrently(self, max_pages: int) -> List[Dict]:
+        """并发抓取多页：每轮最多提交 max_workers 页并保证相邻请求的发起间隔，结果按页序合并，遇到空页后不再提交"""
+        workers = min(self.max_workers, max_pages)
+        self.logger.info(f"并发抓取 {max_pages} 页 (并发数 {workers})...")
+        
+        all_keywords = []
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='trending-page') as executor:
+            for wave_start in range(1, max_pages + 1, workers):
+                wave = range(wave_start, min(wave_start + workers, max_pages + 1))
+                futures = [
+                    executor.submit(self._fetch_page_keywords, self._page_url(page), polite=True)
+                    for page in wave
+                ]
+                for page, future in zip(wave, futures):
+                    keywords = future.result()
+                    if not keywords:
+                        # 与顺序模式一致：遇到空页即视为列表结束，本轮之后的页不再请求
+                        self.logger.warning(f"第 {page} 页未获取到数据")
+                        return all_keywords
+                    all_keywords.extend(keywords)
+                    self.logger.info(f"第 {page} 页获取到 {len(keywords)} 个关键词")
+        return all_keywords
+    
+    def _wait_for_request_slot(self) -> None:
+        """礼貌性限速：相邻请求的发起时间至少间隔 min_request_interval"""
+        with self._politeness_lock:
+            now = time.monotonic()
+            start_at = max(now, self._next_request_at)
+            self._next_request_at = start_at + self.min_request_interval
+        if start_at > now:
+            time.sleep(start_at - now)
+    
+    def _fetch_page_keywords(self, url: str, polite: bool = False) -> List[Dict]:
         """
         获取单页关键词数据
         
         Args:
             url: 页面URL
+            polite: 是否在请求前等待礼貌性间隔（并发模式）
             
         Returns:
             关键词数据列表
         """
         try:
+            if polite:
+                self._wait_for_request_slot()
             response = self._request_with_retries(url, timeout=10)
             response.raise_for_status()
 
@@ -156,20 +259,7 @@ class TrendingKeywordsCollector:
             if not getattr(response, "encoding", None) or response.encoding.lower() == "iso-8859-1":
                 response.encoding = response.apparent_encoding or "utf-8"
 
-            # 使用 text（已按 encoding 解码）并改用 lxml 解析器（更健壮）
-            soup = BeautifulSoup(response.text, "lxml")
-            keywords = []
-            
-            # 查找关键词条目
-            # 根据网站结构，关键词通常在特定的容器中
-            keyword_containers = self._find_keyword_containers(soup)
-            
-            for container in keyword_containers:
-                keyword_data = self._extract_keyword_data(container)
-                if keyword_data:
-                    keywords.append(keyword_data)
-            
-            return keywords
+            return self.parse_page(response.text)
             
         except requests.RequestException as e:
             self.logger.error(f"请求页面失败 {url}: {e}")
@@ -178,6 +268,83 @@ class TrendingKeywordsCollector:
             self.logger.error(f"解析页面失败 {url}: {e}")
             return []
 
+    def parse_page(self, html: str, parser: Optional[str] = None) -> List[Dict]:
+        """解析页面HTML为关键词列表"""
+        backend = parser or self.parser
+        if backend == 'lxml' and etree is not None:
+            keywords = self._parse_page_lxml(html)
+            if keywords is not None:
+                return keywords
+        return self._parse_page_bs4(html)
+
+    def _parse_page_bs4(self, html: str) -> List[Dict]:
+        # 使用 text（已按 encoding 解码）并改用 lxml 解析器（更健壮）
+        soup = BeautifulSoup(html, "lxml")
+        keywords = []
+        
+        # 查找关键词条目
+        # 根据网站结构，关键词通常在特定的容器中
+        keyword_containers = self._find_keyword_containers(soup)
+        
+        for container in keyword_containers:
+            keyword_data = self._extract_keyword_data(container)
+            if keyword_data:
+                keywords.append(keyword_data)
+        
+        return keywords
+
+    def _parse_page_lxml(self, html: str) -> Optional[List[Dict]]:
+        """使用 lxml 与预编译 XPath 解析卡片；未找到卡片时返回 None 以回退到 BeautifulSoup 的启发式查找"""
+        if not html or not html.strip():
+            return []
+        try:
+            document = lxml_html.fromstring(html)
+        except (ValueError, etree.ParserError):
+            return None
+        cards = _CARD_XPATH(document)
+        if not cards:
+            return None
+        self.logger.info(f"找到 {len(cards)} 个卡片容器")
+        
+        keywords = []
+        for card in cards[:50]:
+            # 每张卡片只提取一次文本，各字段共用
+            text = card.text_content()
+            lines = [line.strip() for line in text.split('\n') if line.strip()]
+            keyword = self._keyword_from_lines(lines)
+            if not keyword:
+                continue
+            volume_match = VOLUME_PATTERN.search(text)
+            volume_text = volume_match.group(0) if volume_match else None
+            description = self._description_from_lines(lines)
+            if description is None:
+                description = self._first_xpath_text(card, _DESCRIPTION_XPATHS, min_length=10)
+            category = self._first_xpath_text(card, _CATEGORY_XPATHS)
+            keywords.append({
+                'keyword': keyword.strip(),
+                'search_volume': self._volume_from_text(volume_text),
+                'volume_text': volume_text,
+                'description': description.strip() if description else '',
+                'category': category.strip() if category else '',
+                'source': 'TrendingKeywords.net',
+                'query': keyword.strip()
+            })
+        return keywords
+
+    @staticmethod
+    def _first_xpath_text(card, xpaths, min_length: int = 0) -> Optional[str]:
+        """按选择器优先级取第一个命中元素的文本（与 select_one 逐个尝试的顺序一致）"""
+        for xpath in xpaths:
+            elements = xpath(card)
+            if not elements:
+                continue
+            text = elements[0].text_content().strip()
+            if not min_length:
+                return text
+            text = VOLUME_PATTERN.sub('', text).strip()
+            if text and len(text) > min_length:
+                return text
+        return None
 
     def _find_keyword_containers(self, soup: BeautifulSoup) -> List:
         """
@@ -267,25 +434,7 @@ class TrendingKeywordsCollector:
         lines = [line.strip() for line in full_text.split('\n') if line.strip()]
         
         if lines:
-            # 第一行通常是关键词名称
-            first_line = lines[0]
-            
-            # 清理文本，移除搜索量信息
-            clean_line = re.sub(r'\(\d+k?/Month\)', '', first_line).strip()
-            clean_line = re.sub(r'\d+k?/Month', '', clean_line).strip()
-            
-            # 验证是否为有效的关键词
-            if not clean_line:
-                return None
-            if len(clean_line) <= 1 or len(clean_line) >= 100:
-                return None
-            if clean_line.startswith('http'):
-                return None
-            if re.match(r'^\d+$', clean_line):
-                return None
-            if 'Last 90 days' in clean_line or clean_line == 'Detail':
-                return None
-            return clean_line
+            return self._keyword_from_lines(lines)
         
         # 备用方案：尝试其他选择器
         selectors = [
@@ -306,12 +455,51 @@ class TrendingKeywordsCollector:
         
         return None
     
-    def _extract_search_volume(self, container) -> int:
-        """提取搜索量数值"""
-        volume_text = self._extract_volume_text(container)
+    @staticmethod
+    def _keyword_from_lines(lines: List[str]) -> Optional[str]:
+        """第一行通常是关键词名称，移除搜索量信息后校验"""
+        if not lines:
+            return None
+        clean_line = VOLUME_IN_PARENS_PATTERN.sub('', lines[0]).strip()
+        clean_line = VOLUME_PATTERN.sub('', clean_line).strip()
+        
+        # 验证是否为有效的关键词
+        if not clean_line:
+            return None
+        if len(clean_line) <= 1 or len(clean_line) >= 100:
+            return None
+        if clean_line.startswith('http'):
+            return None
+        if DIGITS_PATTERN.match(clean_line):
+            return None
+        if 'Last 90 days' in clean_line or clean_line == 'Detail':
+            return None
+        return clean_line
+    
+    @staticmethod
+    def _description_from_lines(lines: List[str]) -> Optional[str]:
+        """查找描述行（通常是较长的文本，不包含搜索量）"""
+        for line in lines:
+            # 跳过关键词名称、搜索量、链接文本
+            if (VOLUME_PATTERN.search(line) or
+                'Last 90 days' in line or
+                'Detail' == line.strip() or
+                len(line) < 20):
+                continue
+            
+            # 找到描述文本
+            if len(line) > 20 and len(line) < 500:
+                # 清理描述文本
+                desc = VOLUME_PATTERN.sub('', line).strip()
+                if desc:
+                    return desc
+        return None
+    
+    @staticmethod
+    def _volume_from_text(volume_text: Optional[str]) -> int:
         if volume_text:
             # 提取数字
-            match = re.search(r'(\d+(?:\.\d+)?)k?', volume_text, re.IGNORECASE)
+            match = VOLUME_NUMBER_PATTERN.search(volume_text)
             if match:
                 num = float(match.group(1))
                 # 如果包含k，乘以1000
@@ -320,6 +508,10 @@ class TrendingKeywordsCollector:
                 return int(num)
         return 0
     
+    def _extract_search_volume(self, container) -> int:
+        """提取搜索量数值"""
+        return self._volume_from_text(self._extract_volume_text(container))
+    
     def _extract_volume_text(self, container) -> Optional[str]:
         """提取搜索量文本"""
         text = container.get_text()
@@ -333,21 +525,9 @@ class TrendingKeywordsCollector:
         full_text = container.get_text()
         lines = [line.strip() for line in full_text.split('\n') if line.strip()]
         
-        # 查找描述行（通常是较长的文本，不包含搜索量）
-        for line in lines:
-            # 跳过关键词名称、搜索量、链接文本
-            if (re.search(r'\d+k?/Month', line, re.IGNORECASE) or
-                'Last 90 days' in line or
-                'Detail' == line.strip() or
-                len(line) < 20):
-                continue
-            
-            # 找到描述文本
-            if len(line) > 20 and len(line) < 500:
-                # 清理描述文本
-                desc = re.sub(r'\d+k?/Month', '', line).strip()
-                if desc:
-                    return desc
+        desc = self._description_from_lines(lines)
+        if desc:
+            return desc
         
         # 备用方案：查找特定元素
         desc_selectors = [
@@ -446,8 +626,50 @@ class TrendingKeywordsCollector:
         return filepath
 
 
+def benchmark_parsers(html_pages: List[str], rounds: int = 20) -> Dict[str, float]:
+    """
+    解析器微基准：在保存的样例页面上比较各解析后端的单页耗时
+    
+    Args:
+        html_pages: 页面HTML列表
+        rounds: 重复轮数
+        
+    Returns:
+        各解析后端的平均单页耗时(毫秒)
+    """
+    collector = TrendingKeywordsCollector(concurrent_fetch=False)
+    backends = ['bs4'] + (['lxml'] if etree is not None else [])
+    results = {}
+    for backend in backends:
+        collector.parse_page(html_pages[0], parser=backend)  # 预热
+        started = time.perf_counter()
+        for _ in range(rounds):
+            for page in html_pages:
+                collector.parse_page(page, parser=backend)
+        elapsed = time.perf_counter() - started
+        results[backend] = elapsed / (rounds * len(html_pages)) * 1000
+    return results
+
+
 def main():
     """测试函数"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='TrendingKeywords.net 数据收集器')
+    parser.add_argument('--benchmark', nargs='+', metavar='HTML', help='在保存的样例页面上运行解析器微基准')
+    parser.add_argument('--rounds', type=int, default=20, help='微基准重复轮数')
+    args = parser.parse_args()
+    
+    if args.benchmark:
+        pages = []
+        for path in args.benchmark:
+            with open(path, 'r', encoding='utf-8') as f:
+                pages.append(f.read())
+        print(f"⏱️ 解析器微基准: {len(pages)} 个页面 x {args.rounds} 轮")
+        for backend, ms_per_page in benchmark_parsers(pages, args.rounds).items():
+            print(f"  {backend:>5}: {ms_per_page:.2f} ms/页")
+        return
+    
     collector = TrendingKeywordsCollector()
     
     print("🔍 开始获取 TrendingKeywords.net 数据...")
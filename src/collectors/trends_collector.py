@@ -560,6 +560,74 @@ class TrendsCollector:
             self.logger.error(f"获取相关主题失败: {e}")
             return {}
 
+    def get_batch_related_queries(self, keywords, geo='', timeframe='today 12-m', delay_per_batch=0):
+        """批量获取相关查询：每5个关键词共用一次 explore 请求，结果按关键词区分"""
+        return self._get_batch_related('batch_related_queries', "Google Trends 批量相关查询",
+                                       keywords, geo, timeframe, delay_per_batch)
+
+    def get_batch_related_topics(self, keywords, geo='', timeframe='today 12-m', delay_per_batch=0):
+        """批量获取相关主题：每5个关键词共用一次 explore 请求，结果按关键词区分"""
+        return self._get_batch_related('batch_related_topics', "Google Trends 批量相关主题",
+                                       keywords, geo, timeframe, delay_per_batch)
+
+    def get_keyword_profile(self, keywords, geo='', timeframe='today 12-m', widgets=None):
+        """一次 explore 请求获取关键词的兴趣度、地区分布、相关查询与相关主题（可选子集）"""
+        if not self.trends_collector:
+            self.logger.error("trends_collector 未初始化")
+            return {}
+
+        if not self._ensure_ready("Google Trends 关键词画像"):
+            return {}
+
+        if isinstance(keywords, str):
+            keywords = [keywords]
+
+        try:
+            return self.trends_collector.fetch_widgets(list(keywords), widgets=widgets,
+                                                       timeframe=timeframe, geo=geo)
+        except Exception as e:
+            self.logger.error(f"获取关键词画像失败: {e}")
+            return {}
+
+    def supports_concurrent_requests(self):
+        """底层会话能否被多个线程同时使用；Playwright 后端只能在创建它的线程上请求"""
+        if not self.trends_collector or not hasattr(self.trends_collector, 'supports_concurrent_requests'):
+            return False
+        return self.trends_collector.supports_concurrent_requests()
+
+    def get_related_for_batch(self, keywords, geo='', timeframe='today 12-m'):
+        """一次 explore 请求获取至多5个关键词的相关查询与相关主题；supports_concurrent_requests() 为真时可并发调用"""
+        if not self.trends_collector:
+            self.logger.error("trends_collector 未初始化")
+            return {}
+
+        if not self._ensure_ready("Google Trends 相关查询/主题"):
+            return {}
+
+        try:
+            return self.trends_collector.related_for(list(keywords), timeframe=timeframe, geo=geo)
+        except Exception as e:
+            self.logger.error(f"获取相关查询/主题失败: {e}")
+            return {}
+
+    def _get_batch_related(self, method_name, action_desc, keywords, geo, timeframe, delay_per_batch):
+        if not self.trends_collector:
+            self.logger.error("trends_collector 未初始化")
+            return {}
+
+        if not self._ensure_ready(action_desc):
+            return {}
+
+        if isinstance(keywords, str):
+            keywords = [keywords]
+
+        try:
+            batch_method = getattr(self.trends_collector, method_name)
+            return batch_method(list(keywords), timeframe=timeframe, geo=geo, delay_per_batch=delay_per_batch)
+        except Exception as e:
+            self.logger.error(f"{action_desc}失败: {e}")
+            return {}
+
     def get_interest_by_region(self, keyword, geo='', timeframe='today 12-m'):
         """获取按地区分布的兴趣度"""
         if not self.trends_collector:
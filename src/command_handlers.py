@@ -12,6 +12,7 @@ from pathlib import Path
 import re
 import time
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from typing import Dict, Any, List, Optional, Set
 
@@ -23,12 +24,11 @@ from src.utils.enhanced_features import (
     monitor_competitors, predict_keyword_trends, generate_seo_audit,
     batch_build_websites
 )
-from src.demand_mining.tools.multi_platform_keyword_discovery import MultiPlatformKeywordDiscovery
-from src.collectors.suggestion_sources import SuggestionCollector
-from src.collectors.rss_hotspot_collector import RSSHotspotCollector
 from src.utils.telemetry import telemetry_manager
 from src.utils.workflow_cache import WorkflowCacheManager
 
+# 多平台发现工具与采集器依赖较重（aiohttp、sentence-transformers 等），在对应命令的处理函数中按需导入
+
 
 def handle_stats_display(manager, args):
     """处理统计信息显示"""
@@ -185,10 +185,21 @@ def _extract_records_from_df(df: Optional[pd.DataFrame], source_label: str, seed
     return records
 
 
+TRENDS_PAYLOAD_SIZE = 5
+
+
 def _collect_trends_related_candidates(trends_collector, seed_keywords: List[str],
                                        geo: str = '', timeframe: str = 'today 12-m',
-                                       per_category_limit: int = 5) -> pd.DataFrame:
-    """基于种子关键词补集 Google Trends 相关查询/主题建议"""
+                                       per_category_limit: int = 5,
+                                       max_workers: int = 3) -> pd.DataFrame:
+    """基于种子关键词补集 Google Trends 相关查询/主题建议
+
+    先规划全部请求：每5个种子共用一次 explore 请求（相关查询与相关主题 widget 共用 token），
+    每个种子一次 Suggestion 请求；会话允许跨线程使用时以有限并发派发，否则在调用线程上依次执行，
+    实际请求间隔由全局频率控制器约束。
+    每个任务完成后即检查冷却；结果先按任务缓存，最后按种子顺序合并并对 seen_terms 去重，
+    保证去重结果与行顺序不受请求完成先后影响。
+    """
     if not trends_collector or not seed_keywords:
         return pd.DataFrame(columns=['query', 'source'])
 
@@ -209,112 +220,90 @@ def _collect_trends_related_candidates(trends_collector, seed_keywords: List[str
         return pd.DataFrame(columns=['query', 'source'])
 
     seen_terms: Set[str] = set(seen_seed)
-    rows: List[Dict[str, Any]] = []
 
-    for seed in unique_seeds:
-        if hasattr(trends_collector, 'is_in_cooldown') and trends_collector.is_in_cooldown():
-            print("⚠️ Google Trends 处于冷却期，终止相关查询采集")
-            break
-        try:
-            related_queries = trends_collector.get_related_queries(seed, geo=geo, timeframe=timeframe)
-        except Exception as exc:
-            print(f"⚠️ 获取 {seed} 相关查询失败: {exc}")
-            related_queries = {}
-
-        seed_map = None
-        if isinstance(related_queries, dict):
-            seed_map = related_queries.get(seed)
-            if seed_map is None and len(related_queries) == 1:
-                seed_map = next(iter(related_queries.values()))
-
-        if isinstance(seed_map, dict):
-            rows.extend(_extract_records_from_df(
-                seed_map.get('rising'),
-                'Google Trends Related Rising',
-                seed,
-                per_category_limit,
-                seen_terms
-            ))
-            rows.extend(_extract_records_from_df(
-                seed_map.get('top'),
-                'Google Trends Related Top',
-                seed,
-                per_category_limit,
-                seen_terms
-            ))
-        elif isinstance(related_queries, pd.DataFrame):
-            rows.extend(_extract_records_from_df(
-                related_queries,
-                'Google Trends Related Queries',
-                seed,
-                per_category_limit,
-                seen_terms
-            ))
+    def in_cooldown() -> bool:
+        return hasattr(trends_collector, 'is_in_cooldown') and trends_collector.is_in_cooldown()
+
+    def fetch_related(batch: List[str]) -> Dict[str, Dict[str, Any]]:
+        """返回 {种子: {'queries': ..., 'topics': ...}}"""
+        if hasattr(trends_collector, 'get_related_for_batch'):
+            combined = trends_collector.get_related_for_batch(batch, geo=geo, timeframe=timeframe) or {}
+            queries = combined.get('queries') or {}
+            topics = combined.get('topics') or {}
+            return {seed: {'queries': queries.get(seed), 'topics': topics.get(seed)} for seed in batch}
+
+        # 兼容仅提供单关键词接口的采集器
+        results = {}
+        for seed in batch:
+            results[seed] = {
+                'queries': _pick_seed_result(trends_collector.get_related_queries(seed, geo=geo, timeframe=timeframe), seed),
+                'topics': _pick_seed_result(trends_collector.get_related_topics(seed, geo=geo, timeframe=timeframe), seed),
+            }
+        return results
+
+    def fetch_suggestions(seed: str) -> List[Any]:
+        return trends_collector.get_suggestions(seed) or []
+
+    if in_cooldown():
+        print("⚠️ Google Trends 处于冷却期，终止相关查询采集")
+        return pd.DataFrame(columns=['query', 'source'])
+
+    batches = [unique_seeds[i:i + TRENDS_PAYLOAD_SIZE] for i in range(0, len(unique_seeds), TRENDS_PAYLOAD_SIZE)]
+    tasks = [('related', index, fetch_related, batch) for index, batch in enumerate(batches)]
+    if hasattr(trends_collector, 'get_suggestions'):
+        tasks.extend(('suggestion', seed, fetch_suggestions, seed) for seed in unique_seeds)
+
+    related_results: Dict[int, Dict[str, Dict[str, Any]]] = {}
+    suggestion_results: Dict[str, List[Any]] = {}
 
+    def record(kind: str, target: Any, run: Any) -> bool:
+        """缓存单个任务的结果，返回是否进入冷却"""
         try:
-            related_topics = trends_collector.get_related_topics(seed, geo=geo, timeframe=timeframe)
+            result = run()
         except Exception as exc:
-            print(f"⚠️ 获取 {seed} 相关主题失败: {exc}")
-            related_topics = {}
+            label = '相关查询/主题' if kind == 'related' else 'Suggestion'
+            print(f"⚠️ 获取 {batches[target] if kind == 'related' else target} {label}失败: {exc}")
+            result = None
 
-        if hasattr(trends_collector, 'is_in_cooldown') and trends_collector.is_in_cooldown():
-            print("⚠️ Google Trends 冷却中，停止继续采集相关主题")
-            break
+        if kind == 'related' and isinstance(result, dict):
+            related_results[target] = result
+        elif kind == 'suggestion' and result:
+            suggestion_results[target] = result
 
-        topic_map = None
-        if isinstance(related_topics, dict):
-            topic_map = related_topics.get(seed)
-            if topic_map is None and len(related_topics) == 1:
-                topic_map = next(iter(related_topics.values()))
-
-        if isinstance(topic_map, dict):
-            rows.extend(_extract_records_from_df(
-                topic_map.get('rising'),
-                'Google Trends Related Topics Rising',
-                seed,
-                per_category_limit,
-                seen_terms,
-                text_fields=['topic_title', 'title', 'query']
-            ))
-            rows.extend(_extract_records_from_df(
-                topic_map.get('top'),
-                'Google Trends Related Topics Top',
-                seed,
-                per_category_limit,
-                seen_terms,
-                text_fields=['topic_title', 'title', 'query']
-            ))
-        elif isinstance(related_topics, pd.DataFrame):
-            rows.extend(_extract_records_from_df(
-                related_topics,
-                'Google Trends Related Topics',
-                seed,
-                per_category_limit,
-                seen_terms,
-                text_fields=['topic_title', 'title', 'query']
-            ))
+        if in_cooldown():
+            print("⚠️ Google Trends 处于冷却期，终止相关查询采集")
+            return True
+        return False
 
+    # Playwright 等绑定线程的会话只能在调用线程上请求，此时按计划顺序依次执行
+    supports_concurrency = getattr(trends_collector, 'supports_concurrent_requests', None)
+    concurrent = max_workers > 1 and (supports_concurrency is None or supports_concurrency())
+    if not concurrent:
+        for kind, target, func, arg in tasks:
+            if record(kind, target, lambda: func(arg)):
+                break
+    else:
+        executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='trends-expand')
         try:
-            suggestions = trends_collector.get_suggestions(seed) or []
-        except Exception as exc:
-            print(f"⚠️ 获取 {seed} Suggestion 失败: {exc}")
-            suggestions = []
-
-        for suggestion in suggestions[:max(per_category_limit, 0)]:
-            title = suggestion.get('title') if isinstance(suggestion, dict) else None
-            if not title:
-                continue
-            normalized = str(title).strip().lower()
-            if not normalized or normalized in seen_terms:
-                continue
-            rows.append({
-                'query': str(title).strip(),
-                'source': 'Google Trends Suggestion',
-                'seed': seed
-            })
-            seen_terms.add(normalized)
-
-        time.sleep(0.5)
+            futures = {executor.submit(func, arg): (kind, target) for kind, target, func, arg in tasks}
+            for future in as_completed(futures):
+                kind, target = futures[future]
+                if record(kind, target, future.result):
+                    break
+        finally:
+            # 冷却或异常时丢弃尚未开始的请求
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    # 按种子顺序合并：每个种子依次取相关查询、相关主题与 Suggestion
+    rows: List[Dict[str, Any]] = []
+    for position, seed in enumerate(unique_seeds):
+        seed_result = related_results.get(position // TRENDS_PAYLOAD_SIZE, {}).get(seed) or {}
+        rows.extend(_related_records(seed_result.get('queries'), seed, per_category_limit,
+                                     seen_terms, is_topic=False))
+        rows.extend(_related_records(seed_result.get('topics'), seed, per_category_limit,
+                                     seen_terms, is_topic=True))
+        if seed in suggestion_results:
+            rows.extend(_suggestion_records(suggestion_results[seed], seed, per_category_limit, seen_terms))
 
     if not rows:
         return pd.DataFrame(columns=['query', 'source'])
@@ -322,6 +311,53 @@ def _collect_trends_related_candidates(trends_collector, seed_keywords: List[str
     return pd.DataFrame(rows)
 
 
+def _pick_seed_result(related: Any, seed: str) -> Any:
+    """从单关键词接口的返回中取出该种子的结果"""
+    if isinstance(related, dict):
+        seed_map = related.get(seed)
+        if seed_map is None and len(related) == 1:
+            seed_map = next(iter(related.values()))
+        return seed_map
+    return related
+
+
+def _related_records(related: Any, seed: str, limit: int, seen_terms: Set[str],
+                     is_topic: bool) -> List[Dict[str, Any]]:
+    """将单个种子的相关查询/主题结果转换为候选记录"""
+    label = 'Google Trends Related Topics' if is_topic else 'Google Trends Related'
+    text_fields = ['topic_title', 'title', 'query'] if is_topic else None
+    if isinstance(related, dict):
+        records = _extract_records_from_df(related.get('rising'), f'{label} Rising', seed,
+                                           limit, seen_terms, text_fields=text_fields)
+        records.extend(_extract_records_from_df(related.get('top'), f'{label} Top', seed,
+                                                limit, seen_terms, text_fields=text_fields))
+        return records
+    if isinstance(related, pd.DataFrame):
+        source = label if is_topic else 'Google Trends Related Queries'
+        return _extract_records_from_df(related, source, seed, limit, seen_terms, text_fields=text_fields)
+    return []
+
+
+def _suggestion_records(suggestions: List[Any], seed: str, limit: int,
+                        seen_terms: Set[str]) -> List[Dict[str, Any]]:
+    """将 Suggestion 结果转换为候选记录"""
+    records: List[Dict[str, Any]] = []
+    for suggestion in suggestions[:max(limit, 0)]:
+        title = suggestion.get('title') if isinstance(suggestion, dict) else None
+        if not title:
+            continue
+        normalized = str(title).strip().lower()
+        if not normalized or normalized in seen_terms:
+            continue
+        records.append({
+            'query': str(title).strip(),
+            'source': 'Google Trends Suggestion',
+            'seed': seed
+        })
+        seen_terms.add(normalized)
+    return records
+
+
 def _generate_keyword_combinations(seed_keywords: List[str], manager, long_tail_limit: int = 4,
                                    prefix_limit: int = 3, head_limit: int = 3) -> pd.DataFrame:
     """基于种子词生成组合关键词"""
@@ -470,6 +506,8 @@ def handle_discover_analysis(manager, args):
     """处理多平台关键词发现"""
     if not args.discover:
         return False
+    
+    from src.demand_mining.tools.multi_platform_keyword_discovery import MultiPlatformKeywordDiscovery
         
     seed_profile = getattr(args, 'seed_profile', None)
     seed_limit = getattr(args, 'seed_limit', None)
@@ -688,6 +726,9 @@ def handle_hot_keywords(manager, args):
     if not args.hotkeywords:
         return False
     
+    from src.collectors.rss_hotspot_collector import RSSHotspotCollector
+    from src.collectors.suggestion_sources import SuggestionCollector
+    
     # 搜索热门关键词：使用 fetch_rising_queries 获取关键词并进行需求挖掘
     if not args.quiet:
         print("🔥 开始搜索热门关键词并进行需求挖掘...")
@@ -905,6 +946,10 @@ def handle_all_workflow(manager, args):
     if not args.all:
         return False
     
+    from src.demand_mining.tools.multi_platform_keyword_discovery import MultiPlatformKeywordDiscovery
+    from src.collectors.rss_hotspot_collector import RSSHotspotCollector
+    from src.collectors.suggestion_sources import SuggestionCollector
+    
     if not args.quiet:
         print("🚀 开始完整的关键词分析工作流程...")
         print("   第一步: 搜索热门关键词 (Google Trends + TrendingKeywords.net)")
@@ -983,10 +1028,6 @@ def handle_all_workflow(manager, args):
                     {'cached_at': cached_hot.get('cached_at')},
                 )
 
-        cached_discovery_record = cache_manager.load_stage(WorkflowCacheManager.STAGE_DISCOVERY)
-        if cached_discovery_record:
-            cached_discovery_payload = cached_discovery_record.get('payload', {})
-
     if resume_enabled and not args.quiet:
         print("♻️ 启用断点恢复 (--resume)")
 
@@ -1284,6 +1325,16 @@ def handle_all_workflow(manager, args):
                 print("⚠️ 无有效种子关键词可用于多平台发现，流程终止。")
             return True
 
+        # 发现结果按种子词内容寻址，相同种子词直接复用先前的输出
+        discovery_inputs = {'seed_terms': prepared_seeds}
+        if resume_enabled:
+            cached_discovery_record = cache_manager.load_stage(
+                WorkflowCacheManager.STAGE_DISCOVERY,
+                inputs=discovery_inputs,
+            )
+            if cached_discovery_record:
+                cached_discovery_payload = cached_discovery_record.get('payload', {})
+
         if cached_discovery_payload and cached_discovery_payload.get('seed_terms') == prepared_seeds:
             discovery_from_cache = True
             df = pd.DataFrame(cached_discovery_payload.get('records', []))
@@ -1295,10 +1346,6 @@ def handle_all_workflow(manager, args):
                 {'cached_at': cached_discovery_record.get('cached_at') if cached_discovery_record else None}
             )
         else:
-            if cached_discovery_payload and cached_discovery_payload.get('seed_terms') != prepared_seeds:
-                cache_manager.clear_stage(WorkflowCacheManager.STAGE_DISCOVERY)
-                cached_discovery_payload = None
-                cached_discovery_record = None
             if not args.quiet:
                 extra_seed_count = len([kw for kw in prepared_seeds if kw not in seed_keywords])
                 if extra_seed_count > 0:
@@ -1313,7 +1360,8 @@ def handle_all_workflow(manager, args):
                     {
                         'records': df.where(pd.notnull(df), None).to_dict('records'),
                         'seed_terms': prepared_seeds,
-                    }
+                    },
+                    inputs=discovery_inputs,
                 )
 
         unique_keywords = []
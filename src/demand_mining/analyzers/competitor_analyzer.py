@@ -2,11 +2,17 @@
 # -*- coding: utf-8 -*-
 """竞争对手分析器 - 用于分析关键词的竞争对手情况和竞争强度"""
 
+import numpy as np
 import pandas as pd
 from typing import Dict, List, Optional
 from urllib.parse import urlparse
 from .base_analyzer import BaseAnalyzer
 
+try:
+    from src.demand_mining.core.serp_parser import SerpParser
+except ImportError:
+    SerpParser = None
+
 try:
     from src.utils import Logger, FileUtils
     from src.demand_mining.analyzers.serp_analyzer import SerpAnalyzer
@@ -49,6 +55,8 @@ class CompetitorAnalyzer(BaseAnalyzer):
         except:
             self.serp_analyzer = None
         
+        self.serp_parser = SerpParser() if SerpParser else None
+        
         self.competition_grades = {
             'A': {'min_score': 80, 'description': '极高竞争'},
             'B': {'min_score': 60, 'description': '高竞争'},
@@ -170,94 +178,136 @@ class CompetitorAnalyzer(BaseAnalyzer):
         """分析竞争对手的内容空白和机会"""
         raise RuntimeError("竞品内容差距分析需要真实竞品语料，目前未实现")
     
-    def analyze_competitors(self, df: pd.DataFrame, keyword_col: str = 'query') -> pd.DataFrame:
-        """分析DataFrame中关键词的竞争对手情况"""
+    def analyze_competitors(self, df: pd.DataFrame, keyword_col: str = 'query',
+                            serp_results: Optional[Dict[str, Dict]] = None) -> pd.DataFrame:
+        """
+        基于已获取的SERP数据批量分析关键词的竞争对手情况，不发起任何网络请求
+        
+        Args:
+            df: 关键词数据
+            keyword_col: 关键词列名
+            serp_results: 关键词 -> SERP原始数据；缺省时从 SERP 缓存读取
+            
+        Returns:
+            附加竞争分析列的DataFrame；无SERP数据的关键词评分为空
+        """
         if not self.validate_input(df, [keyword_col]):
             return df
+        if not self.serp_parser:
+            raise RuntimeError("SERP 解析器不可用，无法执行竞争对手分析")
+
+        self.log_analysis_start("竞争对手", f"，共 {len(df)} 个关键词")
+        keywords = df[keyword_col].astype(str).tolist()
+        if serp_results is None:
+            serp_results = self._load_cached_serp_results(keywords)
+
+        # 先汇总全部结果中的域名，一次性建立域名权重索引
+        payloads = [serp_results.get(keyword) or None for keyword in keywords]
+        authority_index = self._build_authority_index(payloads)
+        self.serp_parser.prime_domain_authority(authority_index)
+
+        # 解析为 (行号, 排名, 域名, 品牌强度, 竞争类型) 长表
+        row_count = len(keywords)
+        serp_scores = np.full(row_count, np.nan)
+        opportunity_scores = np.full(row_count, np.nan)
+        competitor_rows = []
+        for row, (keyword, payload) in enumerate(zip(keywords, payloads)):
+            if not payload:
+                continue
+            structure = self.serp_parser.parse_serp_structure(payload, keyword)
+            if not structure.organic_results:
+                continue
+            serp_scores[row] = structure.difficulty_score * 100
+            opportunity_scores[row] = structure.opportunity_score * 100
+            for competitor in self.serp_parser.extract_competitor_info(structure.organic_results):
+                competitor_rows.append((row, competitor.position, competitor.domain,
+                                        competitor.brand_strength, competitor.competitor_type))
 
-        raise RuntimeError("竞争对手分析功能需要接入真实 SERP/SEO 数据，目前未实现")
+        competitors = pd.DataFrame(competitor_rows,
+                                   columns=['row', 'position', 'domain', 'brand_strength', 'competitor_type'])
+        competitors['domain_authority'] = competitors['domain'].map(authority_index)
+        competitors['is_strong'] = competitors['brand_strength'] == 'strong'
+        competitors['is_inner_page'] = competitors['competitor_type'] == 'inner_page'
+        grouped = competitors.sort_values(['row', 'position']).groupby('row')
+        per_row = pd.DataFrame({
+            'avg_domain_authority': grouped['domain_authority'].mean(),
+            'top_competitor_domain': grouped['domain'].first(),
+            'strong_competitor_count': grouped['is_strong'].sum(),
+            'inner_page_competitor_count': grouped['is_inner_page'].sum(),
+        }).reindex(range(row_count))
+
+        # 向量化合成评分：内容与外链暂无数据源，按 SERP 与域名权重重新归一化
+        avg_authority = per_row['avg_domain_authority'].to_numpy(dtype=float)
+        available_weight = self.serp_weight + self.domain_weight
+        competition_scores = np.round(
+            (self.serp_weight * serp_scores + self.domain_weight * avg_authority) / available_weight, 1
+        )
+        has_data = ~np.isnan(competition_scores)
+
+        grades = list(self.competition_grades)
+        grade_values = np.select(
+            [competition_scores >= self.competition_grades[grade]['min_score'] for grade in grades],
+            grades,
+            default='F'
+        )
+        grade_values = np.where(has_data, grade_values, None)
 
-        self.log_analysis_start("竞争对手分析", f"，共 {len(df)} 个关键词")
         result_df = df.copy()
-        
-        # 初始化结果列
-        columns = [
-            'competition_score', 'competition_grade', 'competition_description',
-            'serp_competition_score', 'avg_domain_authority', 'top_competitor_domain',
-            'content_competition_score', 'content_quality', 'content_depth',
-            'backlink_competition_score', 'avg_backlinks', 'link_quality',
-            'opportunity_score', 'content_gaps', 'recommended_strategy'
+        result_df['competition_score'] = competition_scores
+        result_df['competition_grade'] = grade_values
+        result_df['competition_description'] = [
+            self.competition_grades[grade]['description'] if grade else None for grade in grade_values
         ]
-        for col in columns:
-            result_df[col] = None
-        
-        # 分析每个关键词
-        for idx, row in result_df.iterrows():
-            keyword = str(row[keyword_col])
-            
-            try:
-                # 获取各项分析数据
-                serp_data = self.analyze_serp_competition(keyword)
-                content_data = self.analyze_content_competition(keyword)
-                backlink_data = self.analyze_backlink_competition(keyword)
-                
-                # 计算综合评分
-                competition_score = self.calculate_competition_score(serp_data, content_data, backlink_data)
-                grade = self._get_competition_level(competition_score)
-                
-                # 分析机会
-                gaps_data = self.analyze_competitor_gaps(keyword, serp_data['top_competitors'])
-                strategy = self._generate_strategy(competition_score, gaps_data, keyword)
-                
-                # 更新数据
-                updates = {
-                    'competition_score': float(competition_score),
-                    'competition_grade': grade,
-                    'competition_description': self.competition_grades[grade]['description'],
-                    'serp_competition_score': float(serp_data['serp_score']),
-                    'avg_domain_authority': float(serp_data['avg_domain_authority']),
-                    'top_competitor_domain': serp_data['top_competitors'][0]['domain'] if serp_data['top_competitors'] else '',
-                    'content_competition_score': float(content_data['content_score']),
-                    'content_quality': content_data['content_quality'],
-                    'content_depth': content_data['content_depth'],
-                    'backlink_competition_score': float(backlink_data['backlink_score']),
-                    'avg_backlinks': int(backlink_data['avg_backlinks']),
-                    'link_quality': backlink_data['link_quality'],
-                    'opportunity_score': float(gaps_data['opportunity_score']),
-                    'content_gaps': '; '.join(gaps_data['content_gaps'][:2]),
-                    'recommended_strategy': strategy
-                }
-                
-                for key, value in updates.items():
-                    result_df.at[idx, key] = value
-                
-                if (idx + 1) % 10 == 0:
-                    self.logger.info(f"已分析 {idx + 1}/{len(df)} 个关键词")
-                    
-            except Exception as e:
-                self.logger.error(f"分析关键词 '{keyword}' 时出错: {e}")
-                # 设置默认值
-                defaults = {
-                    'competition_score': 50.0, 'competition_grade': 'C',
-                    'competition_description': '中等竞争', 'opportunity_score': 50.0,
-                    'recommended_strategy': '需要进一步分析'
-                }
-                for key, value in defaults.items():
-                    result_df.at[idx, key] = value
-        
-        # 数据类型转换
-        numeric_cols = ['competition_score', 'serp_competition_score', 'avg_domain_authority',
-                       'content_competition_score', 'backlink_competition_score', 'opportunity_score']
-        for col in numeric_cols:
-            if col in result_df.columns:
-                result_df[col] = pd.to_numeric(result_df[col], errors='coerce')
-        
-        if 'avg_backlinks' in result_df.columns:
-            result_df['avg_backlinks'] = pd.to_numeric(result_df['avg_backlinks'], errors='coerce').fillna(0).astype(int)
-        
-        self.log_analysis_complete("竞争对手分析", len(result_df))
+        result_df['serp_competition_score'] = np.round(serp_scores, 1)
+        result_df['avg_domain_authority'] = np.round(avg_authority, 1)
+        result_df['top_competitor_domain'] = per_row['top_competitor_domain'].fillna('').to_numpy()
+        result_df['strong_competitor_count'] = per_row['strong_competitor_count'].fillna(0).astype(int).to_numpy()
+        result_df['inner_page_competitor_count'] = per_row['inner_page_competitor_count'].fillna(0).astype(int).to_numpy()
+        result_df['opportunity_score'] = np.round(opportunity_scores, 1)
+        result_df['serp_data_available'] = has_data
+        result_df['recommended_strategy'] = [
+            self._generate_strategy(score, {'opportunity_score': opportunity}, keyword)
+            if available else '缺少SERP数据，需要进一步分析'
+            for score, opportunity, keyword, available
+            in zip(competition_scores, opportunity_scores, keywords, has_data)
+        ]
+
+        missing = int((~has_data).sum())
+        if missing:
+            self.logger.warning(f"{missing} 个关键词缺少可用的SERP数据，未计算竞争评分")
+        self.log_analysis_complete("竞争对手", len(result_df))
         return result_df
     
+    def _load_cached_serp_results(self, keywords: List[str]) -> Dict[str, Dict]:
+        """从 SERP 缓存读取已获取的搜索结果"""
+        if not self.serp_analyzer:
+            self.logger.warning("SERP 分析器未启用，无可用的缓存SERP数据")
+            return {}
+        return self.serp_analyzer.get_cached_search_results(list(dict.fromkeys(keywords)))
+    
+    def _build_authority_index(self, payloads: List[Optional[Dict]]) -> Dict[str, int]:
+        """为全部SERP结果中出现的域名预先计算权重，每个域名只估算一次"""
+        domains = set()
+        for payload in payloads:
+            if not payload:
+                continue
+            for result in payload.get('organic_results', payload.get('items', []))[:10]:
+                url = result.get('link', result.get('url', ''))
+                if url:
+                    domains.add(urlparse(url).netloc.lower())
+
+        parser_db = self.serp_parser.domain_authority_db
+        index = {}
+        for domain in domains:
+            normalized = domain.replace('www.', '').strip('/')
+            if normalized in self.domain_authority_db:
+                index[domain] = self.domain_authority_db[normalized]
+            elif normalized in parser_db:
+                index[domain] = parser_db[normalized]
+            else:
+                index[domain] = self.get_domain_authority(normalized)
+        return index
+    
     def _generate_strategy(self, competition_score: float, gaps_data: Dict, keyword: str) -> str:
         """生成推荐策略"""
         strategies = []
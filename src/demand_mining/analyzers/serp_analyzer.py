@@ -1297,7 +1297,25 @@ class SerpAnalyzer:
             'analysis_time': datetime.now().isoformat()
         }
     
-    def _get_cached_result(self, keyword: str) -> Optional[Dict]:
+    def get_cached_search_results(self, keywords: List[str], ignore_expiry: bool = True) -> Dict[str, Dict]:
+        """
+        仅从本地缓存读取搜索结果，不发起任何网络请求
+        
+        Args:
+            keywords: 关键词列表
+            ignore_expiry: 是否忽略缓存有效期（竞争格局变化较慢，默认复用已付费获取的结果）
+            
+        Returns:
+            Dict[str, Dict]: 关键词 -> SERP原始数据，未命中缓存的关键词不包含在内
+        """
+        results = {}
+        for keyword in keywords:
+            cached = self._get_cached_result(keyword, ignore_expiry=ignore_expiry)
+            if cached:
+                results[keyword] = cached
+        return results
+    
+    def _get_cached_result(self, keyword: str, ignore_expiry: bool = False) -> Optional[Dict]:
         """获取缓存的搜索结果"""
         cache_key = hashlib.md5(keyword.encode()).hexdigest()
         cache_file = os.path.join(self.cache_dir, f"{cache_key}.json")
@@ -1307,6 +1325,9 @@ class SerpAnalyzer:
                 with open(cache_file, 'r', encoding='utf-8') as f:
                     cached_data = json.load(f)
                 
+                if ignore_expiry:
+                    return cached_data.get('data')
+                
                 # 检查缓存是否过期
                 cache_time = datetime.fromisoformat(cached_data.get('timestamp', ''))
                 if datetime.now() - cache_time < timedelta(seconds=self.cache_duration):
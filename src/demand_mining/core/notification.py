@@ -14,19 +14,26 @@
 创建时间: 2025-01-27
 """
 
+import atexit
+import os
 import smtplib
 import json
+import threading
+import time
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.header import Header
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Tuple
 from dataclasses import dataclass
 from enum import Enum
 import logging
 from pathlib import Path
 
+from .notification_outbox import KIND_MESSAGE, KIND_TASK_REMINDER, NotificationOutbox
+
 
 class NotificationType(Enum):
     """通知类型枚举"""
@@ -64,6 +71,15 @@ class NotificationConfig:
     wechat_enabled: bool = False
     dingtalk_enabled: bool = False
     
+    # 异步投递配置：通知先写入发件箱，由后台调度器并行发送
+    async_delivery: bool = True
+    outbox_path: str = "output/notification_outbox.db"
+    max_attempts: int = 5
+    retry_backoff: float = 30.0  # 首次重试间隔(秒)，之后指数递增
+    digest_window: float = 60.0  # 任务提醒合并窗口(秒)
+    smtp_idle_timeout: float = 60.0  # SMTP 连接空闲多久后关闭(秒)
+    shutdown_timeout: float = 10.0  # 进程退出时等待发件箱投递的时间(秒)
+    
     def __post_init__(self):
         if self.email_recipients is None:
             self.email_recipients = []
@@ -99,6 +115,26 @@ class NotificationManager:
         self.config = config
         self.logger = logging.getLogger(__name__)
         
+        # 复用的 HTTP 会话与 SMTP 连接
+        self._http = requests.Session()
+        self._smtp: Optional[smtplib.SMTP] = None
+        self._smtp_last_used = 0.0
+        self._smtp_lock = threading.Lock()
+        
+        # 发件箱与后台调度器
+        self.outbox = NotificationOutbox(config.outbox_path) if config.async_delivery else None
+        self._cond = threading.Condition()
+        self._wake = False
+        self._stopping = False
+        self._flush_requested = 0
+        self._flush_done = 0
+        self._dispatcher: Optional[threading.Thread] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        
+        # 上次运行遗留的未送达通知继续投递
+        if self.outbox and os.path.exists(config.outbox_path) and self.outbox.pending_count():
+            self._ensure_dispatcher()
+        
     def send_notification(self, 
                          message: str, 
                          subject: str = "需求挖掘系统通知",
@@ -114,10 +150,13 @@ class NotificationManager:
             priority: 优先级
             
         Returns:
-            Dict[str, bool]: 各通知方式的发送结果
+            Dict[str, bool]: 各通知方式的发送结果；异步模式下表示是否已写入发件箱
         """
         if notification_types is None:
             notification_types = self._get_enabled_notification_types()
+        
+        if self.outbox is not None:
+            return self._enqueue(notification_types, KIND_MESSAGE, subject, message, priority)
             
         results = {}
         
@@ -147,6 +186,14 @@ class NotificationManager:
         """
         if not tasks:
             return {}
+        
+        if self.outbox is not None:
+            # 合并窗口内的多次提醒由调度器汇总为一条摘要发送
+            payload = {'tasks': [self._task_to_dict(task) for task in tasks]}
+            return self._enqueue(
+                self._get_enabled_notification_types(), KIND_TASK_REMINDER, "", "", Priority.HIGH,
+                payload=payload, delay=self.config.digest_window
+            )
             
         # 按优先级分组
         high_priority_tasks = [t for t in tasks if t.priority == Priority.HIGH]
@@ -218,12 +265,15 @@ class NotificationManager:
             # 添加邮件内容
             msg.attach(MIMEText(message, 'plain', 'utf-8'))
             
-            # 发送邮件
-            server = smtplib.SMTP(self.config.smtp_server, self.config.smtp_port)
-            server.starttls()
-            server.login(self.config.email_user, self.config.email_password)
-            server.sendmail(self.config.email_user, self.config.email_recipients, msg.as_string())
-            server.quit()
+            # 发送邮件（复用已登录的 SMTP 连接）
+            with self._smtp_lock:
+                server = self._get_smtp()
+                try:
+                    server.sendmail(self.config.email_user, self.config.email_recipients, msg.as_string())
+                except Exception:
+                    self._close_smtp()
+                    raise
+                self._smtp_last_used = time.time()
             
             self.logger.info(f"邮件通知发送成功: {subject}")
             return True
@@ -263,7 +313,7 @@ class NotificationManager:
                 }
             }
             
-            response = requests.post(
+            response = self._http.post(
                 self.config.wechat_webhook_url,
                 json=payload,
                 timeout=10
@@ -313,7 +363,6 @@ class NotificationManager:
             
             # 如果配置了密钥，添加签名
             if self.config.dingtalk_secret:
-                import time
                 import hmac
                 import hashlib
                 import base64
@@ -330,7 +379,7 @@ class NotificationManager:
             else:
                 url = self.config.dingtalk_webhook_url
             
-            response = requests.post(url, json=payload, timeout=10)
+            response = self._http.post(url, json=payload, timeout=10)
             
             if response.status_code == 200:
                 result = response.json()
@@ -348,6 +397,231 @@ class NotificationManager:
             self.logger.error(f"钉钉通知发送失败: {e}")
             return False
     
+    def _get_smtp(self) -> smtplib.SMTP:
+        """获取已登录的 SMTP 连接，空闲过久或失效时重新建立（需持有 _smtp_lock）"""
+        if self._smtp is not None:
+            idle = time.time() - self._smtp_last_used
+            try:
+                if idle < self.config.smtp_idle_timeout and self._smtp.noop()[0] == 250:
+                    return self._smtp
+            except Exception:
+                pass
+            self._close_smtp()
+        server = smtplib.SMTP(self.config.smtp_server, self.config.smtp_port, timeout=30)
+        server.starttls()
+        server.login(self.config.email_user, self.config.email_password)
+        self._smtp = server
+        return server
+    
+    def _close_smtp(self):
+        """关闭 SMTP 连接（需持有 _smtp_lock）"""
+        if self._smtp is None:
+            return
+        try:
+            self._smtp.quit()
+        except Exception:
+            pass
+        self._smtp = None
+    
+    def _close_idle_smtp(self):
+        with self._smtp_lock:
+            if self._smtp is not None and time.time() - self._smtp_last_used >= self.config.smtp_idle_timeout:
+                self._close_smtp()
+    
+    # ------------------------------------------------------------------
+    # 发件箱与后台调度
+    # ------------------------------------------------------------------
+    def _enqueue(self,
+                 notification_types: List[NotificationType],
+                 kind: str,
+                 subject: str,
+                 message: str,
+                 priority: Priority,
+                 payload: Optional[Dict[str, Any]] = None,
+                 delay: float = 0.0) -> Dict[str, bool]:
+        """写入发件箱并唤醒调度器，立即返回"""
+        channels = [t.value for t in notification_types if self._channel_configured(t)]
+        results = {t.value: t.value in channels for t in notification_types}
+        if not channels:
+            return results
+        try:
+            self.outbox.enqueue(
+                channels, kind, subject, message, priority.value,
+                payload=payload, not_before=time.time() + delay if delay else None
+            )
+        except Exception as e:
+            self.logger.error(f"写入通知发件箱失败: {e}")
+            return {channel: False for channel in results}
+        self._ensure_dispatcher()
+        with self._cond:
+            self._wake = True
+            self._cond.notify_all()
+        return results
+    
+    def _channel_configured(self, notification_type: NotificationType) -> bool:
+        if notification_type == NotificationType.EMAIL:
+            return self.config.email_enabled and bool(self.config.email_recipients)
+        if notification_type == NotificationType.WECHAT:
+            return self.config.wechat_enabled and bool(self.config.wechat_webhook_url)
+        if notification_type == NotificationType.DINGTALK:
+            return self.config.dingtalk_enabled and bool(self.config.dingtalk_webhook_url)
+        return False
+    
+    def _ensure_dispatcher(self):
+        with self._cond:
+            if self._dispatcher is not None and self._dispatcher.is_alive():
+                return
+            self._stopping = False
+            self._executor = ThreadPoolExecutor(max_workers=len(NotificationType), thread_name_prefix='notify')
+            self._dispatcher = threading.Thread(target=self._dispatch_loop, name='notification-dispatcher', daemon=True)
+            self._dispatcher.start()
+        atexit.register(self.close)
+    
+    def _dispatch_loop(self):
+        wait_seconds: Optional[float] = 0.0
+        while True:
+            with self._cond:
+                self._cond.wait_for(
+                    lambda: self._stopping or self._wake or self._flush_requested > self._flush_done,
+                    timeout=wait_seconds
+                )
+                self._wake = False
+                flush_target = self._flush_requested
+                force = flush_target > self._flush_done
+                if self._stopping and not force:
+                    return
+            
+            try:
+                # flush 时忽略退避与合并窗口，立即尝试全部待发送记录
+                records = self.outbox.due(now=float('inf') if force else None)
+                if records:
+                    self._dispatch(records)
+            except Exception as e:  # pragma: no cover - 调度线程不应退出
+                self.logger.error(f"通知调度失败: {e}")
+            
+            if force:
+                with self._cond:
+                    self._flush_done = flush_target
+                    self._cond.notify_all()
+            self._close_idle_smtp()
+            
+            next_due = self.outbox.next_due_at()
+            wait_seconds = min(max(next_due - time.time(), 0.0), 60.0) if next_due is not None else 60.0
+    
+    def _dispatch(self, records: List[Dict[str, Any]]):
+        """按渠道分组并行发送；同一渠道内顺序发送以复用连接"""
+        if any(record['kind'] == KIND_TASK_REMINDER for record in records):
+            # 任一提醒到期时，合并窗口内稍后入队的提醒一并汇总发送
+            seen = {record['id'] for record in records}
+            records = records + [r for r in self.outbox.pending_of_kind(KIND_TASK_REMINDER) if r['id'] not in seen]
+        by_channel: Dict[str, List[Dict[str, Any]]] = {}
+        for record in records:
+            by_channel.setdefault(record['channel'], []).append(record)
+        futures = [
+            self._executor.submit(self._deliver_channel, channel, channel_records)
+            for channel, channel_records in by_channel.items()
+        ]
+        for future in futures:
+            future.result()
+    
+    def _deliver_channel(self, channel: str, records: List[Dict[str, Any]]):
+        deliveries: List[Tuple[List[int], str, str, Priority]] = []
+        reminders = [r for r in records if r['kind'] == KIND_TASK_REMINDER]
+        if reminders:
+            subject, message = self._build_reminder_digest(reminders)
+            deliveries.append(([r['id'] for r in reminders], subject, message, Priority.HIGH))
+        for record in records:
+            if record['kind'] != KIND_TASK_REMINDER:
+                deliveries.append(([record['id']], record['subject'], record['message'], Priority(record['priority'])))
+        
+        notification_type = NotificationType(channel)
+        for ids, subject, message, priority in deliveries:
+            try:
+                ok = self._send_via(notification_type, subject, message, priority)
+                error = "" if ok else "发送返回失败"
+            except Exception as e:
+                ok, error = False, str(e)
+            if ok:
+                self.outbox.mark_sent(ids)
+            else:
+                self.outbox.mark_retry(ids, error, self.config.max_attempts, self.config.retry_backoff)
+    
+    def _send_via(self, notification_type: NotificationType, subject: str, message: str, priority: Priority) -> bool:
+        if notification_type == NotificationType.EMAIL:
+            return self._send_email(subject, message, priority)
+        if notification_type == NotificationType.WECHAT:
+            return self._send_wechat(message, priority)
+        if notification_type == NotificationType.DINGTALK:
+            return self._send_dingtalk(subject, message, priority)
+        return False
+    
+    def _build_reminder_digest(self, reminders: List[Dict[str, Any]]) -> Tuple[str, str]:
+        """将合并窗口内的多次任务提醒汇总为一条消息，同一任务只保留最新一次"""
+        tasks: Dict[str, Task] = {}
+        for record in reminders:
+            for task_data in record['payload'].get('tasks', []):
+                task = self._task_from_dict(task_data)
+                tasks[task.id] = task
+        all_tasks = list(tasks.values())
+        message = self._generate_task_reminder_message(
+            [t for t in all_tasks if t.priority == Priority.HIGH],
+            [t for t in all_tasks if t.priority == Priority.MEDIUM],
+            [t for t in all_tasks if t.priority == Priority.LOW],
+        )
+        return f"任务截止提醒 - {datetime.now().strftime('%Y-%m-%d')}", message
+    
+    @staticmethod
+    def _task_to_dict(task: Task) -> Dict[str, Any]:
+        return {
+            'id': task.id,
+            'title': task.title,
+            'description': task.description,
+            'priority': task.priority.value,
+            'deadline': task.deadline.isoformat(),
+            'status': task.status,
+        }
+    
+    @staticmethod
+    def _task_from_dict(data: Dict[str, Any]) -> Task:
+        return Task(
+            id=str(data['id']),
+            title=data['title'],
+            description=data.get('description', ''),
+            priority=Priority(data['priority']),
+            deadline=datetime.fromisoformat(data['deadline']),
+            status=data.get('status', 'pending'),
+        )
+    
+    def flush(self, timeout: Optional[float] = None) -> Dict[str, int]:
+        """立即尝试投递发件箱中全部待发送通知（忽略退避与合并窗口），返回发件箱统计"""
+        if self.outbox is None:
+            return {}
+        self._ensure_dispatcher()
+        with self._cond:
+            self._flush_requested += 1
+            target = self._flush_requested
+            self._cond.notify_all()
+            self._cond.wait_for(lambda: self._flush_done >= target, timeout=timeout)
+        return self.outbox.get_stats()
+    
+    def close(self):
+        """投递剩余通知后停止调度器并关闭连接；未送达的通知保留在发件箱中"""
+        dispatcher = self._dispatcher
+        if dispatcher is not None and dispatcher.is_alive():
+            self.flush(timeout=self.config.shutdown_timeout)
+            with self._cond:
+                self._stopping = True
+                self._cond.notify_all()
+            dispatcher.join(timeout=1.0)
+        self._dispatcher = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        with self._smtp_lock:
+            self._close_smtp()
+        self._http.close()
+        atexit.unregister(self.close)
+    
     def _get_enabled_notification_types(self) -> List[NotificationType]:
         """
         获取启用的通知类型
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+通知发件箱 - 基于SQLite的持久化通知队列，每个通知渠道一行，独立重试
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from typing import Any, Dict, List, Optional
+
+
+STATUS_PENDING = 'pending'
+STATUS_SENT = 'sent'
+STATUS_FAILED = 'failed'
+
+KIND_MESSAGE = 'message'
+KIND_TASK_REMINDER = 'task_reminder'
+
+
+class NotificationOutbox:
+    """通知发件箱
+
+    入队只写入一行即返回；后台调度器按 next_attempt_at 取出到期记录发送，
+    进程退出后未送达的记录保留在库中，下次启动继续投递。
+    """
+
+    def __init__(self, db_path: str):
+        """
+        初始化通知发件箱
+
+        Args:
+            db_path: SQLite 数据库路径
+        """
+        self.db_path = db_path
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _ensure_database(self) -> None:
+        if self._initialized:
+            return
+        with self._init_lock:
+            if self._initialized:
+                return
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with closing(self._connect()) as conn, conn:
+                conn.execute('PRAGMA journal_mode=WAL')
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS outbox (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        channel TEXT NOT NULL,
+                        kind TEXT NOT NULL,
+                        subject TEXT,
+                        message TEXT,
+                        priority TEXT NOT NULL,
+                        payload TEXT,
+                        status TEXT NOT NULL,
+                        attempts INTEGER NOT NULL DEFAULT 0,
+                        next_attempt_at REAL NOT NULL,
+                        created_at REAL NOT NULL,
+                        sent_at REAL,
+                        last_error TEXT
+                    )
+                ''')
+                conn.execute('CREATE INDEX IF NOT EXISTS idx_outbox_due ON outbox(status, next_attempt_at)')
+            self._initialized = True
+
+    def enqueue(self,
+                channels: List[str],
+                kind: str,
+                subject: str,
+                message: str,
+                priority: str,
+                payload: Optional[Dict[str, Any]] = None,
+                not_before: Optional[float] = None) -> List[int]:
+        """为每个渠道写入一条待发送记录，返回记录ID"""
+        self._ensure_database()
+        now = time.time()
+        payload_json = json.dumps(payload, ensure_ascii=False, default=str) if payload else None
+        ids = []
+        with closing(self._connect()) as conn, conn:
+            for channel in channels:
+                cursor = conn.execute(
+                    '''INSERT INTO outbox
+                       (channel, kind, subject, message, priority, payload, status, next_attempt_at, created_at)
+                       VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+                    (channel, kind, subject, message, priority, payload_json, STATUS_PENDING,
+                     not_before if not_before is not None else now, now)
+                )
+                ids.append(cursor.lastrowid)
+        return ids
+
+    def due(self, now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """获取已到发送时间的待发送记录"""
+        self._ensure_database()
+        now = time.time() if now is None else now
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                'SELECT * FROM outbox WHERE status = ? AND next_attempt_at <= ? ORDER BY id',
+                (STATUS_PENDING, now)
+            ).fetchall()
+        return [self._row_to_dict(row) for row in rows]
+
+    def pending_of_kind(self, kind: str) -> List[Dict[str, Any]]:
+        """获取某类全部待发送记录（不论是否到期），用于合并提醒"""
+        self._ensure_database()
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                'SELECT * FROM outbox WHERE status = ? AND kind = ? ORDER BY id', (STATUS_PENDING, kind)
+            ).fetchall()
+        return [self._row_to_dict(row) for row in rows]
+
+    def next_due_at(self) -> Optional[float]:
+        """最早一条待发送记录的发送时间"""
+        self._ensure_database()
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                'SELECT MIN(next_attempt_at) FROM outbox WHERE status = ?', (STATUS_PENDING,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def pending_count(self) -> int:
+        self._ensure_database()
+        with closing(self._connect()) as conn:
+            return conn.execute('SELECT COUNT(*) FROM outbox WHERE status = ?', (STATUS_PENDING,)).fetchone()[0]
+
+    def mark_sent(self, ids: List[int]) -> None:
+        if not ids:
+            return
+        with closing(self._connect()) as conn, conn:
+            conn.executemany(
+                'UPDATE outbox SET status = ?, sent_at = ?, attempts = attempts + 1, last_error = NULL WHERE id = ?',
+                [(STATUS_SENT, time.time(), record_id) for record_id in ids]
+            )
+
+    def mark_retry(self, ids: List[int], error: str, max_attempts: int, backoff_base: float) -> None:
+        """记录一次失败：未超过最大次数时按指数退避重新排期，否则标记为失败"""
+        if not ids:
+            return
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            for record_id in ids:
+                row = conn.execute('SELECT attempts FROM outbox WHERE id = ?', (record_id,)).fetchone()
+                attempts = (row[0] if row else 0) + 1
+                if attempts >= max_attempts:
+                    conn.execute(
+                        'UPDATE outbox SET status = ?, attempts = ?, last_error = ? WHERE id = ?',
+                        (STATUS_FAILED, attempts, error, record_id)
+                    )
+                else:
+                    conn.execute(
+                        'UPDATE outbox SET attempts = ?, next_attempt_at = ?, last_error = ? WHERE id = ?',
+                        (attempts, now + backoff_base * (2 ** (attempts - 1)), error, record_id)
+                    )
+
+    def get_stats(self) -> Dict[str, int]:
+        self._ensure_database()
+        with closing(self._connect()) as conn:
+            rows = conn.execute('SELECT status, COUNT(*) FROM outbox GROUP BY status').fetchall()
+        stats = {STATUS_PENDING: 0, STATUS_SENT: 0, STATUS_FAILED: 0}
+        stats.update({status: count for status, count in rows})
+        return stats
+
+    @staticmethod
+    def _row_to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        record = dict(row)
+        record['payload'] = json.loads(record['payload']) if record.get('payload') else {}
+        return record
@@ -13,23 +13,32 @@
 创建时间: 2025-01-27
 """
 
+import atexit
+import importlib.util
 import logging
 import random
 import threading
 import time
-from typing import Any, Dict, List, Optional, Tuple, TYPE_CHECKING, Union
-from dataclasses import dataclass
-from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple, TYPE_CHECKING, Union
+from dataclasses import dataclass, field
+from collections import OrderedDict, defaultdict, deque
+from http.cookiejar import CookieJar, DefaultCookiePolicy
 from fake_useragent import UserAgent
 from urllib.parse import urlparse
 
 import requests
+from requests.adapters import HTTPAdapter
 
 try:
     import httpx  # type: ignore
 except ImportError:  # pragma: no cover
     httpx = None
 
+# httpx 的 HTTP/2 需要额外安装 h2，缺失时退回 HTTP/1.1 长连接
+HTTP2_AVAILABLE = importlib.util.find_spec('h2') is not None
+
 if TYPE_CHECKING:  # pragma: no cover
     from httpx import Response as HTTPXResponse
 
@@ -38,6 +47,27 @@ logger = logging.getLogger(__name__)
 
 ResponseType = Union[requests.Response, "HTTPXResponse"]
 
+# 长连接客户端池参数：空闲超时(秒)与最多保留的客户端数量
+CLIENT_IDLE_TIMEOUT = 300.0
+MAX_POOLED_CLIENTS = 32
+DIRECT_CLIENT_KEY = 'direct'
+
+# 代理健康检查默认参数
+DEFAULT_HEALTH_CHECK = {
+    'enabled': False,
+    'test_url': 'http://httpbin.org/ip',
+    'check_interval': 300,
+    'max_workers': 8,
+    'ewma_alpha': 0.3,
+    'min_success_rate': 0.7,
+    'probe_window': 10,
+}
+
+
+def _reject_all_cookies_policy() -> DefaultCookiePolicy:
+    """不保存也不回传任何 Cookie：池化客户端被多个调用方共享，Cookie 不能在调用之间串用"""
+    return DefaultCookiePolicy(allowed_domains=[])
+
 
 @dataclass
 class ProxyInfo:
@@ -52,6 +82,52 @@ class ProxyInfo:
     last_used: float = 0
     is_active: bool = True
     response_time: float = 0
+    latency_ewma: float = 0
+    probe_count: int = 0
+    probe_failures: int = 0
+    last_probe_at: float = 0
+    recent_probes: Deque[bool] = field(
+        default_factory=lambda: deque(maxlen=DEFAULT_HEALTH_CHECK['probe_window']), repr=False
+    )
+    
+    def observe_latency(self, latency: float, alpha: float = 0.3):
+        """记录一次成功请求的耗时，更新延迟指数滑动平均"""
+        self.response_time = latency
+        if self.latency_ewma <= 0:
+            self.latency_ewma = latency
+        else:
+            self.latency_ewma = alpha * latency + (1 - alpha) * self.latency_ewma
+    
+    def record_probe(self, ok: bool, latency: Optional[float] = None, alpha: float = 0.3,
+                     min_success_rate: float = 0.7, window: Optional[int] = None):
+        """记录一次健康探测结果（探测计数独立于真实请求计数）
+
+        是否启用按最近 window 次探测的成功率判断，而非累计成功率，
+        长期稳定的代理开始连续失败时也能很快被停用。
+        """
+        if window and window != self.recent_probes.maxlen:
+            self.recent_probes = deque(self.recent_probes, maxlen=max(int(window), 1))
+        self.probe_count += 1
+        self.last_probe_at = time.time()
+        self.recent_probes.append(ok)
+        if ok:
+            if latency is not None:
+                self.observe_latency(latency, alpha)
+        else:
+            self.probe_failures += 1
+        self.is_active = self.probe_success_rate >= min_success_rate
+    
+    @property
+    def probe_success_rate(self) -> float:
+        """最近探测窗口内的成功率"""
+        if not self.recent_probes:
+            return 0
+        return sum(self.recent_probes) / len(self.recent_probes)
+    
+    @property
+    def health_score(self) -> float:
+        """选择代理时使用的健康度：有探测数据时取窗口探测成功率，否则退回真实请求成功率"""
+        return self.probe_success_rate if self.recent_probes else self.success_rate
     
     @property
     def success_rate(self) -> float:
@@ -75,6 +151,22 @@ class ProxyInfo:
         }
 
 
+@dataclass
+class PooledClient:
+    """按 (代理, 后端) 复用的长连接客户端
+
+    in_use 为正在使用该客户端的调用数；被移出池的客户端标记为 retired，
+    待最后一个使用方归还后才关闭。
+    """
+    backend: str
+    client: Any
+    created_at: float
+    last_used: float
+    request_count: int = 0
+    in_use: int = 0
+    retired: bool = False
+
+
 class RateLimiter:
     """请求频率控制器"""
     
@@ -135,7 +227,8 @@ class ProxyManager:
                  max_retries: int = 3,
                  timeout: int = 10,
                  enabled: bool = True,
-                 domain_configs: Optional[Dict[str, Dict[str, Any]]] = None):
+                 domain_configs: Optional[Dict[str, Dict[str, Any]]] = None,
+                 health_check: Optional[Dict[str, Any]] = None):
         """
         初始化代理管理器
         
@@ -145,6 +238,7 @@ class ProxyManager:
             request_delay: 请求延迟范围(秒)
             max_retries: 最大重试次数
             timeout: 请求超时时间(秒)
+            health_check: 健康检查配置 (enabled/test_url/check_interval/max_workers/ewma_alpha/min_success_rate/probe_window)
         """
         self.proxies: List[ProxyInfo] = []
         self.enabled = enabled
@@ -158,6 +252,20 @@ class ProxyManager:
         self.user_agent = UserAgent()
         self.lock = threading.Lock()
         
+        # 长连接客户端池：键为 (代理URL或direct, 后端)，避免每次请求重新握手
+        self.client_idle_timeout = CLIENT_IDLE_TIMEOUT
+        self.max_pooled_clients = MAX_POOLED_CLIENTS
+        self._clients: "OrderedDict[Tuple[str, str], PooledClient]" = OrderedDict()
+        self._clients_lock = threading.Lock()
+        self._client_stats = {'created': 0, 'reused': 0, 'evicted': 0}
+        self._request_latency_total = 0.0
+        self._request_latency_count = 0
+        
+        # 健康检查：并发探测与可选的后台定时刷新
+        self.health_check = {**DEFAULT_HEALTH_CHECK, **(health_check or {})}
+        self._health_thread: Optional[threading.Thread] = None
+        self._health_stop = threading.Event()
+        
         # 初始化代理池
         if proxies:
             self._load_proxies(proxies)
@@ -226,7 +334,9 @@ class ProxyManager:
     def remove_proxy(self, host: str, port: int):
         """移除代理"""
         with self.lock:
+            removed = [p for p in self.proxies if p.host == host and p.port == port]
             self.proxies = [p for p in self.proxies if not (p.host == host and p.port == port)]
+        self._close_clients_for({p.proxy_url for p in removed})
         logger.info(f"移除代理: {host}:{port}")
     
     def get_best_proxy(self) -> Optional[ProxyInfo]:
@@ -237,8 +347,8 @@ class ProxyManager:
             if not active_proxies:
                 return None
             
-            # 按成功率和响应时间排序
-            active_proxies.sort(key=lambda p: (-p.success_rate, p.response_time, p.last_used))
+            # 按探测健康度和延迟滑动平均排序（无探测数据时退回请求成功率与最近一次响应时间）
+            active_proxies.sort(key=lambda p: (-p.health_score, p.latency_ewma or p.response_time, p.last_used))
             return active_proxies[0]
     
     def get_random_proxy(self) -> Optional[ProxyInfo]:
@@ -290,18 +400,140 @@ class ProxyManager:
                 )
         return httpx.Timeout(timeout=self.timeout)
 
+    # ------------------------------------------------------------------
+    # 长连接客户端池
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _proxy_url_from_kwargs(request_kwargs: Dict[str, Any]) -> Optional[str]:
+        proxies = request_kwargs.get('proxies') or {}
+        return proxies.get('https') or proxies.get('http')
+
+    def _create_requests_session(self) -> requests.Session:
+        """创建带连接池的 requests 会话（不在请求之间保留 Cookie）"""
+        session = requests.Session()
+        session.cookies.set_policy(_reject_all_cookies_policy())
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def _create_httpx_client(self, proxy_url: Optional[str]) -> "httpx.Client":
+        """创建 httpx 长连接客户端，代理在客户端级别绑定（不在请求之间保留 Cookie）"""
+        assert httpx is not None
+        client_kwargs: Dict[str, Any] = {
+            'cookies': CookieJar(policy=_reject_all_cookies_policy()),
+            'http2': HTTP2_AVAILABLE,
+            'timeout': self._build_httpx_timeout(self.timeout),
+            'trust_env': False,
+            'follow_redirects': True,
+        }
+        if not proxy_url:
+            return httpx.Client(**client_kwargs)
+        try:
+            return httpx.Client(proxy=proxy_url, **client_kwargs)
+        except TypeError:  # pragma: no cover - httpx < 0.26 只支持 proxies 参数
+            return httpx.Client(proxies=proxy_url, **client_kwargs)
+
+    @contextmanager
+    def _lease_client(self, backend: str, proxy_url: Optional[str]) -> Iterator[Any]:
+        """租用 (代理, 后端) 对应的长连接客户端，退出时归还"""
+        entry = self._acquire_client(backend, proxy_url)
+        try:
+            yield entry.client
+        finally:
+            self._release_client(entry)
+
+    def _acquire_client(self, backend: str, proxy_url: Optional[str]) -> PooledClient:
+        """取出客户端并登记占用，不存在时创建"""
+        key = (proxy_url or DIRECT_CLIENT_KEY, backend)
+        now = time.time()
+        evicted: List[PooledClient] = []
+        with self._clients_lock:
+            for client_key, entry in list(self._clients.items()):
+                # 正在使用的客户端不算空闲
+                if entry.in_use == 0 and now - entry.last_used > self.client_idle_timeout:
+                    evicted.append(self._clients.pop(client_key))
+
+            entry = self._clients.get(key)
+            if entry is not None:
+                self._clients.move_to_end(key)
+                self._client_stats['reused'] += 1
+            else:
+                if backend == 'httpx':
+                    client = self._create_httpx_client(proxy_url)
+                else:
+                    client = self._create_requests_session()
+                entry = PooledClient(backend=backend, client=client, created_at=now, last_used=now)
+                self._clients[key] = entry
+                self._client_stats['created'] += 1
+                while len(self._clients) > self.max_pooled_clients:
+                    evicted.append(self._clients.popitem(last=False)[1])
+
+            entry.last_used = now
+            entry.request_count += 1
+            entry.in_use += 1
+            self._client_stats['evicted'] += len(evicted)
+            closing = self._retire(evicted)
+
+        self._close_pooled(closing)
+        return entry
+
+    def _release_client(self, entry: PooledClient) -> None:
+        """归还客户端；已移出池且无人使用时关闭"""
+        with self._clients_lock:
+            entry.in_use -= 1
+            entry.last_used = time.time()
+            closing = [entry] if entry.retired and entry.in_use == 0 else []
+        self._close_pooled(closing)
+
+    @staticmethod
+    def _retire(entries: List[PooledClient]) -> List[PooledClient]:
+        """标记移出池的客户端，返回可以立即关闭的部分（需持有 _clients_lock）"""
+        for entry in entries:
+            entry.retired = True
+        return [entry for entry in entries if entry.in_use == 0]
+
+    @staticmethod
+    def _close_pooled(entries: List[PooledClient]) -> None:
+        for entry in entries:
+            try:
+                entry.client.close()
+            except Exception as exc:  # pragma: no cover - 关闭失败不影响主流程
+                logger.debug(f"关闭HTTP客户端失败: {exc}")
+
+    def _close_clients_for(self, proxy_urls: set) -> None:
+        """关闭指定代理的全部客户端（使用中的客户端在归还后关闭）"""
+        if not proxy_urls:
+            return
+        with self._clients_lock:
+            keys = [key for key in self._clients if key[0] in proxy_urls]
+            closing = self._retire([self._clients.pop(key) for key in keys])
+        self._close_pooled(closing)
+
+    def close(self) -> None:
+        """停止健康检查并关闭所有长连接客户端（使用中的客户端在归还后关闭）"""
+        self.stop_health_checks(timeout=1.0)
+        with self._clients_lock:
+            closing = self._retire(list(self._clients.values()))
+            self._clients.clear()
+        self._close_pooled(closing)
+
+    def get_client_pool_stats(self) -> Dict[str, Any]:
+        """获取长连接客户端池统计"""
+        with self._clients_lock:
+            stats = dict(self._client_stats)
+            stats['open_clients'] = len(self._clients)
+        return stats
+
     def _perform_requests_call(
         self,
         method: str,
         url: str,
         request_kwargs: Dict[str, Any],
     ) -> requests.Response:
-        """使用 requests 发起请求"""
-        if method.upper() == 'GET':
-            return requests.get(url, **request_kwargs)
-        if method.upper() == 'POST':
-            return requests.post(url, **request_kwargs)
-        return requests.request(method, url, **request_kwargs)
+        """使用 requests 发起请求（复用会话连接）"""
+        with self._lease_client('requests', self._proxy_url_from_kwargs(request_kwargs)) as session:
+            return session.request(method.upper(), url, **request_kwargs)
 
     def _perform_httpx_call(
         self,
@@ -309,71 +541,93 @@ class ProxyManager:
         url: str,
         request_kwargs: Dict[str, Any],
     ) -> Optional["HTTPXResponse"]:
-        """使用 httpx 发起请求"""
+        """使用 httpx 发起请求（复用客户端连接）"""
         if httpx is None:
             return None
 
-        timeout = request_kwargs.get('timeout', self.timeout)
-        timeout_obj = self._build_httpx_timeout(timeout)
-
-        headers = request_kwargs.get('headers', {})
-        proxies = request_kwargs.get('proxies')
-
-        client_kwargs: Dict[str, Any] = {
-            'http2': True,
-            'timeout': timeout_obj,
-            'headers': headers,
-            'trust_env': False,
-            'follow_redirects': True,
-        }
-        if proxies:
-            client_kwargs['proxies'] = proxies
-
-        extra_kwargs = {k: v for k, v in request_kwargs.items() if k not in {'headers', 'timeout', 'proxies'}}
+        extra_kwargs = {k: v for k, v in request_kwargs.items() if k not in {'timeout', 'proxies'}}
+        extra_kwargs['timeout'] = self._build_httpx_timeout(request_kwargs.get('timeout', self.timeout))
         if 'allow_redirects' in extra_kwargs:
             extra_kwargs['follow_redirects'] = extra_kwargs.pop('allow_redirects')
 
-        with httpx.Client(**client_kwargs) as client:
-            response = client.request(method, url, **extra_kwargs)
-            return response
+        with self._lease_client('httpx', self._proxy_url_from_kwargs(request_kwargs)) as client:
+            return client.request(method, url, **extra_kwargs)
     
-    def test_proxy(self, proxy: ProxyInfo, test_url: str = "http://httpbin.org/ip") -> bool:
-        """测试代理可用性"""
+    def test_proxy(self, proxy: ProxyInfo, test_url: Optional[str] = None) -> bool:
+        """测试代理可用性，结果写入代理的探测统计与延迟滑动平均"""
+        test_url = test_url or self.health_check['test_url']
+        alpha = self.health_check['ewma_alpha']
+        min_success_rate = self.health_check['min_success_rate']
+        window = self.health_check['probe_window']
         try:
-            start_time = time.time()
-            response = requests.get(
-                test_url,
-                proxies=proxy.to_dict(),
-                timeout=self.timeout,
-                headers={'User-Agent': self.get_random_user_agent()}
-            )
-            response_time = time.time() - start_time
+            with self._lease_client('requests', proxy.proxy_url) as session:
+                start_time = time.time()
+                response = session.get(
+                    test_url,
+                    proxies=proxy.to_dict(),
+                    timeout=self.timeout,
+                    headers={'User-Agent': self.get_random_user_agent()}
+                )
+                response_time = time.time() - start_time
             
-            if response.status_code == 200:
-                proxy.success_count += 1
-                proxy.response_time = response_time
-                proxy.last_used = time.time()
+            ok = response.status_code == 200
+            with self.lock:
+                proxy.record_probe(ok, response_time, alpha, min_success_rate, window)
+            if ok:
                 logger.debug(f"代理测试成功: {proxy.proxy_url}, 响应时间: {response_time:.2f}s")
-                return True
             else:
-                proxy.failure_count += 1
                 logger.warning(f"代理测试失败: {proxy.proxy_url}, 状态码: {response.status_code}")
-                return False
+            return ok
                 
         except Exception as e:
-            proxy.failure_count += 1
+            with self.lock:
+                proxy.record_probe(False, alpha=alpha, min_success_rate=min_success_rate, window=window)
             logger.warning(f"代理测试异常: {proxy.proxy_url}, 错误: {e}")
             return False
     
-    def test_all_proxies(self):
-        """测试所有代理"""
-        logger.info("开始测试所有代理...")
-        for proxy in self.proxies:
-            is_working = self.test_proxy(proxy)
-            proxy.is_active = is_working
+    def test_all_proxies(self, test_url: Optional[str] = None, max_workers: Optional[int] = None) -> Dict[str, int]:
+        """并发测试所有代理，返回活跃数量统计"""
+        with self.lock:
+            proxies = list(self.proxies)
+        if not proxies:
+            return {'total': 0, 'active': 0}
+
+        logger.info(f"开始测试所有代理 ({len(proxies)} 个)...")
+        workers = min(max(int(max_workers or self.health_check['max_workers']), 1), len(proxies))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='proxy-probe') as executor:
+            list(executor.map(lambda proxy: self.test_proxy(proxy, test_url), proxies))
         
-        active_count = sum(1 for p in self.proxies if p.is_active)
-        logger.info(f"代理测试完成，活跃代理数: {active_count}/{len(self.proxies)}")
+        active_count = sum(1 for p in proxies if p.is_active)
+        logger.info(f"代理测试完成，活跃代理数: {active_count}/{len(proxies)}")
+        return {'total': len(proxies), 'active': active_count}
+    
+    def start_health_checks(self, interval: Optional[float] = None) -> bool:
+        """启动后台线程定期并发探测代理池"""
+        if self._health_thread and self._health_thread.is_alive():
+            return False
+        check_interval = float(interval or self.health_check['check_interval'])
+        self._health_stop.clear()
+
+        def _loop():
+            while not self._health_stop.is_set():
+                try:
+                    self.test_all_proxies()
+                except Exception as exc:  # pragma: no cover - 后台线程不应中断
+                    logger.warning(f"代理健康检查失败: {exc}")
+                self._health_stop.wait(check_interval)
+
+        self._health_thread = threading.Thread(target=_loop, name='proxy-health', daemon=True)
+        self._health_thread.start()
+        logger.info(f"代理健康检查已启动，间隔 {check_interval:.0f} 秒")
+        return True
+    
+    def stop_health_checks(self, timeout: Optional[float] = None):
+        """停止后台健康检查线程"""
+        self._health_stop.set()
+        thread = self._health_thread
+        if thread and thread.is_alive() and thread is not threading.current_thread():
+            thread.join(timeout)
+        self._health_thread = None
     
     def make_request(
         self,
@@ -435,10 +689,13 @@ class ProxyManager:
                     raise RuntimeError("未获得有效响应")
 
                 response_time = time.time() - start_time
+                with self._clients_lock:
+                    self._request_latency_total += response_time
+                    self._request_latency_count += 1
 
                 if current_proxy:
                     current_proxy.success_count += 1
-                    current_proxy.response_time = response_time
+                    current_proxy.observe_latency(response_time, self.health_check['ewma_alpha'])
                     current_proxy.last_used = time.time()
 
                 logger.debug(f"请求成功: {url}, 状态码: {response.status_code}, 响应时间: {response_time:.2f}s")
@@ -478,7 +735,8 @@ class ProxyManager:
                     'total_proxies': 0,
                     'active_proxies': 0,
                     'success_rate': 0,
-                    'avg_response_time': 0
+                    'avg_response_time': 0,
+                    **self._request_latency_stats(),
                 }
             
             total_success = sum(p.success_count for p in self.proxies)
@@ -492,8 +750,19 @@ class ProxyManager:
                 'total_proxies': total_proxies,
                 'active_proxies': active_proxies,
                 'success_rate': success_rate,
-                'avg_response_time': avg_response_time
+                'avg_response_time': avg_response_time,
+                **self._request_latency_stats(),
             }
+
+    def _request_latency_stats(self) -> Dict[str, Any]:
+        """全部请求的平均耗时与客户端池复用情况"""
+        with self._clients_lock:
+            count = self._request_latency_count
+            avg_latency = self._request_latency_total / count if count else 0
+        return {
+            'avg_request_latency': avg_latency,
+            'client_pool': self.get_client_pool_stats(),
+        }
     
     def cleanup_inactive_proxies(self, min_success_rate: float = 0.3):
         """清理不活跃的代理"""
@@ -543,8 +812,11 @@ class ProxyManagerSingleton:
                     max_retries=config.max_retries,
                     timeout=config.timeout,
                     enabled=config.enabled,
-                    domain_configs=config.domain_specific
+                    domain_configs=config.domain_specific,
+                    health_check=config.health_check
                 )
+                if cls._instance.health_check.get('enabled') and cls._instance.enabled and cls._instance.proxies:
+                    cls._instance.start_health_checks()
                 logger.info(f"✅ 代理管理器已从配置文件初始化，加载了 {len(config.proxies)} 个代理")
             except Exception as e:
                 logger.warning(f"⚠️ 从配置文件加载代理设置失败: {e}，使用默认设置")
@@ -558,6 +830,16 @@ def get_proxy_manager() -> ProxyManager:
     return ProxyManagerSingleton.get_instance()
 
 
+def shutdown_proxy_manager() -> None:
+    """进程退出时关闭单例持有的长连接客户端"""
+    instance = ProxyManagerSingleton._instance
+    if instance is not None:
+        instance.close()
+
+
+atexit.register(shutdown_proxy_manager)
+
+
 if __name__ == "__main__":
     # 示例用法
     import json
@@ -102,6 +102,15 @@ class SerpParser:
             'contact': [r'/contact', r'/support', r'/help']
         }
         
+        # 每种内容类型的模式预编译为一个正则
+        self._content_type_regexes = [
+            (content_type, re.compile('|'.join(patterns)))
+            for content_type, patterns in self.content_patterns.items()
+        ]
+        
+        # 预置的域名权重索引（批量分析时由调用方一次性计算后注入，优先于内置数据库）
+        self._authority_index: Dict[str, int] = {}
+        
         # SEO信号权重
         self.seo_weights = {
             'title_keyword_match': 0.25,
@@ -425,8 +434,16 @@ class SerpParser:
         else:
             return 'inner_page'
     
+    def prime_domain_authority(self, authorities: Dict[str, int]) -> None:
+        """注入预先计算的域名权重索引，避免批量解析时逐条重复估算"""
+        self._authority_index.update(authorities)
+    
     def _get_domain_authority(self, domain: str) -> int:
         """获取域名权重"""
+        indexed = self._authority_index.get(domain)
+        if indexed is not None:
+            return indexed
+        
         # 检查内置数据库
         if domain in self.domain_authority_db:
             return self.domain_authority_db[domain]
@@ -499,10 +516,9 @@ class SerpParser:
         parsed_url = urlparse(url)
         path = parsed_url.path.lower()
         
-        for content_type, patterns in self.content_patterns.items():
-            for pattern in patterns:
-                if re.search(pattern, path):
-                    return content_type
+        for content_type, regex in self._content_type_regexes:
+            if regex.search(path):
+                return content_type
         
         return 'unknown'
     
@@ -2,13 +2,19 @@
 # -*- coding: utf-8 -*-
 """
 需求挖掘管理器模块
+
+各管理器在首次访问时才导入，避免只用到其中一个管理器时加载全部分析依赖
 """
 
-from .base_manager import BaseManager
-from .keyword_manager import KeywordManager
-from .discovery_manager import DiscoveryManager
-from .trend_manager import TrendManager
-from .task_manager import TaskManager
+import importlib
+
+_LAZY_EXPORTS = {
+    'BaseManager': '.base_manager',
+    'KeywordManager': '.keyword_manager',
+    'DiscoveryManager': '.discovery_manager',
+    'TrendManager': '.trend_manager',
+    'TaskManager': '.task_manager',
+}
 
 __all__ = [
     'BaseManager',
@@ -16,4 +22,17 @@ __all__ = [
     'DiscoveryManager',
     'TrendManager',
     'TaskManager'
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -4,6 +4,7 @@
 发现管理器 - 负责多平台关键词发现功能
 """
 
+import importlib.util
 import os
 import sys
 from datetime import datetime
@@ -36,6 +37,12 @@ class DiscoveryManager(BaseManager):
                 self._discoverer = None
         return self._discoverer
     
+    def _discoverer_module_available(self) -> bool:
+        """只确认发现工具模块可用而不实例化，避免统计信息触发完整发现依赖的加载"""
+        if self._discoverer is not None:
+            return True
+        return importlib.util.find_spec('src.demand_mining.tools.multi_platform_keyword_discovery') is not None
+    
     def analyze(self,
                 search_terms: Optional[List[str]] = None,
                 output_dir: str = None,
@@ -142,7 +149,7 @@ class DiscoveryManager(BaseManager):
     
     def get_supported_platforms(self) -> List[str]:
         """获取支持的平台列表"""
-        if self.discoverer is None:
+        if not self._discoverer_module_available():
             return []
         
         # 返回支持的平台列表
@@ -160,6 +167,6 @@ class DiscoveryManager(BaseManager):
         stats = self.get_stats()
         stats.update({
             'supported_platforms': self.get_supported_platforms(),
-            'discoverer_available': self.discoverer is not None
+            'discoverer_available': self._discoverer_module_available()
         })
         return stats
@@ -13,11 +13,6 @@ import pandas as pd
 from pathlib import Path
 from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional, Tuple, Union
-from src.demand_mining.analyzers.intent_analyzer_v2 import IntentAnalyzerV2 as IntentAnalyzer
-from src.demand_mining.analyzers.market_analyzer import MarketAnalyzer
-from src.demand_mining.analyzers.keyword_analyzer import KeywordAnalyzer
-from src.demand_mining.analyzers.comprehensive_analyzer import ComprehensiveAnalyzer
-from src.demand_mining.analyzers.serp_analyzer import SerpAnalyzer
 from src.utils.telemetry import telemetry_manager
 
 # 添加项目根目录到路径
@@ -246,6 +241,7 @@ class KeywordManager(BaseManager):
     def intent_analyzer(self):
         """延迟加载意图分析器"""
         if self._intent_analyzer is None:
+            from src.demand_mining.analyzers.intent_analyzer_v2 import IntentAnalyzerV2 as IntentAnalyzer
             self._intent_analyzer = IntentAnalyzer()
         return self._intent_analyzer
     
@@ -253,6 +249,7 @@ class KeywordManager(BaseManager):
     def market_analyzer(self):
         """延迟加载市场分析器"""
         if self._market_analyzer is None:
+            from src.demand_mining.analyzers.market_analyzer import MarketAnalyzer
             self._market_analyzer = MarketAnalyzer()
         return self._market_analyzer
     
@@ -260,6 +257,7 @@ class KeywordManager(BaseManager):
     def keyword_analyzer(self):
         """延迟加载关键词分析器"""
         if self._keyword_analyzer is None:
+            from src.demand_mining.analyzers.keyword_analyzer import KeywordAnalyzer
             self._keyword_analyzer = KeywordAnalyzer()
         return self._keyword_analyzer
     
@@ -267,6 +265,7 @@ class KeywordManager(BaseManager):
     def comprehensive_analyzer(self):
         """延迟加载综合分析器"""
         if self._comprehensive_analyzer is None:
+            from src.demand_mining.analyzers.comprehensive_analyzer import ComprehensiveAnalyzer
             self._comprehensive_analyzer = ComprehensiveAnalyzer()
         return self._comprehensive_analyzer
 
@@ -283,6 +282,7 @@ class KeywordManager(BaseManager):
                 self._serp_analyzer = False
                 return None
             try:
+                from src.demand_mining.analyzers.serp_analyzer import SerpAnalyzer
                 analyzer = SerpAnalyzer(use_proxy=self.config.get('serp', {}).get('use_proxy', True))
                 if not getattr(analyzer, 'credentials_available', True):
                     warning = getattr(analyzer, 'credential_warning', None) or '未检测到SERP相关API凭证，跳过SERP信号提取'
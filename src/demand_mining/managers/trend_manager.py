@@ -14,7 +14,6 @@ project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(o
 sys.path.insert(0, project_root)
 
 from .base_manager import BaseManager
-from ..root_word_trends_analyzer import RootWordTrendsAnalyzer
 from ..core.trends_cache import TrendsCache
 
 
@@ -25,8 +24,7 @@ class TrendManager(BaseManager):
         super().__init__(config_path)
         self._trend_analyzer = None
         self._root_manager = None
-        # 集成现有的 RootWordTrendsAnalyzer
-        self.root_analyzer = RootWordTrendsAnalyzer()
+        self._root_analyzer = None
         # 集成趋势数据缓存机制
         self.trends_cache = TrendsCache(
             cache_dir=os.path.join(self.output_dir, 'trends_cache'),
@@ -45,6 +43,14 @@ class TrendManager(BaseManager):
         }
         print("📈 趋势管理器初始化完成（已启用缓存）")
     
+    @property
+    def root_analyzer(self):
+        """延迟加载词根趋势分析器（集成现有的 RootWordTrendsAnalyzer）"""
+        if self._root_analyzer is None:
+            from ..root_word_trends_analyzer import RootWordTrendsAnalyzer
+            self._root_analyzer = RootWordTrendsAnalyzer()
+        return self._root_analyzer
+    
     @property
     def trend_analyzer(self):
         """延迟加载趋势分析器 - 使用单例模式避免重复创建"""
@@ -15,7 +15,6 @@ from typing import Dict, Any, List, Union, Sequence, Tuple, Optional
 # 添加src目录到Python路径
 sys.path.insert(0, os.path.join(os.path.dirname(__file__)))
 
-from src.demand_mining.managers import KeywordManager, DiscoveryManager, TrendManager
 from src.utils.logger import setup_logger
 
 
@@ -39,13 +38,63 @@ class IntegratedDemandMiningManager:
         self.config_path = config_path
         self.logger = setup_logger(__name__)
         
-        # 初始化各个管理器
-        self.keyword_manager = KeywordManager(config_path)
-        self.discovery_manager = DiscoveryManager(config_path)
-        self.trend_manager = TrendManager(config_path)
-        self.config = getattr(self.keyword_manager, 'config', {})
-        
-        # 初始化新词检测器
+        # 各管理器与新词检测器在首次使用时才创建，--stats/--report 等轻量命令无需加载完整分析栈
+        self._keyword_manager = None
+        self._discovery_manager = None
+        self._trend_manager = None
+        self._new_word_detector = None
+        self._new_word_detection_available: Optional[bool] = None
+
+        print("🚀 集成需求挖掘管理器初始化完成")
+        print("📊 关键词管理器、发现管理器、趋势管理器将按需加载")
+
+    @property
+    def keyword_manager(self):
+        """延迟加载关键词管理器"""
+        if self._keyword_manager is None:
+            from src.demand_mining.managers.keyword_manager import KeywordManager
+            self._keyword_manager = KeywordManager(self.config_path)
+        return self._keyword_manager
+
+    @property
+    def discovery_manager(self):
+        """延迟加载发现管理器"""
+        if self._discovery_manager is None:
+            from src.demand_mining.managers.discovery_manager import DiscoveryManager
+            self._discovery_manager = DiscoveryManager(self.config_path)
+        return self._discovery_manager
+
+    @property
+    def trend_manager(self):
+        """延迟加载趋势管理器"""
+        if self._trend_manager is None:
+            from src.demand_mining.managers.trend_manager import TrendManager
+            self._trend_manager = TrendManager(self.config_path)
+        return self._trend_manager
+
+    @property
+    def config(self) -> Dict[str, Any]:
+        return getattr(self.keyword_manager, 'config', {})
+
+    @property
+    def new_word_detector(self):
+        """延迟加载新词检测器"""
+        if self._new_word_detection_available is None:
+            self._init_new_word_detector()
+        return self._new_word_detector
+
+    @property
+    def new_word_detection_available(self) -> bool:
+        if self._new_word_detection_available is None:
+            self._init_new_word_detector()
+        return self._new_word_detection_available
+
+    @new_word_detection_available.setter
+    def new_word_detection_available(self, value: bool) -> None:
+        self._new_word_detection_available = bool(value)
+
+    def _init_new_word_detector(self) -> None:
+        """初始化新词检测器"""
         try:
             from src.demand_mining.analyzers.new_word_detector import NewWordDetector
             new_word_cfg = {}
@@ -73,19 +122,15 @@ class IntegratedDemandMiningManager:
                 if isinstance(grade_cfg, dict):
                     detector_kwargs['grade_thresholds'] = grade_cfg
 
-            self.new_word_detector = NewWordDetector(**detector_kwargs)
-            self.new_word_detection_available = True
+            self._new_word_detector = NewWordDetector(**detector_kwargs)
+            self._new_word_detection_available = True
             print("✅ 新词检测器初始化成功")
+            print("🔍 新词检测功能已启用")
         except ImportError as e:
-            self.new_word_detector = None
-            self.new_word_detection_available = False
+            self._new_word_detector = None
+            self._new_word_detection_available = False
             print(f"⚠️ 新词检测器初始化失败: {e}")
 
-        print("🚀 集成需求挖掘管理器初始化完成")
-        print("📊 已加载关键词管理器、发现管理器、趋势管理器")
-        if self.new_word_detection_available:
-            print("🔍 新词检测功能已启用")
-
     def analyze_keywords(
         self,
         input_data: Union[str, Sequence[str], pd.DataFrame],
@@ -654,11 +699,15 @@ class IntegratedDemandMiningManager:
             return f"报告生成失败: {e}"
 
     def get_manager_stats(self) -> Dict[str, Any]:
-        """获取所有管理器的统计信息"""
+        """获取所有管理器的统计信息；尚未创建的管理器标记为未加载，不会为统计而加载"""
+        managers = {
+            'keyword_manager': (self._keyword_manager, 'get_stats'),
+            'discovery_manager': (self._discovery_manager, 'get_discovery_stats'),
+            'trend_manager': (self._trend_manager, 'get_stats'),
+        }
         return {
-            'keyword_manager': self.keyword_manager.get_stats(),
-            'discovery_manager': self.discovery_manager.get_discovery_stats(),
-            'trend_manager': self.trend_manager.get_stats(),
+            name: getattr(manager, stats_method)() if manager is not None else '未加载'
+            for name, (manager, stats_method) in managers.items()
         }
     
     def expand_keywords_comprehensive(self, seed_keywords: List[str], 
@@ -9,10 +9,12 @@ from .base_deployer import BaseDeployer
 from .cloudflare_deployer import CloudflareDeployer
 from .vercel_deployer import VercelDeployer
 from .deployment_manager import DeploymentManager
+from .deployment_history_store import DeploymentHistoryStore
 
 __all__ = [
     'BaseDeployer',
     'CloudflareDeployer', 
     'VercelDeployer',
-    'DeploymentManager'
+    'DeploymentManager',
+    'DeploymentHistoryStore'
 ]
\ No newline at end of file
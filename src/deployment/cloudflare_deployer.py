@@ -7,12 +7,21 @@ Cloudflare Pages 部署器
 
 import os
 import json
+import base64
+import hashlib
+import mimetypes
 import requests
 import time
 from typing import Dict, List, Optional, Any, Tuple
 from .base_deployer import BaseDeployer
 
 
+# 增量上传：每批上传的最大字节数与文件数
+UPLOAD_BATCH_MAX_BYTES = 20 * 1024 * 1024
+UPLOAD_BATCH_MAX_FILES = 500
+DEFAULT_MANIFEST_DIR = os.path.join('output', 'deployment_manifests', 'cloudflare')
+
+
 class CloudflareDeployer(BaseDeployer):
     """Cloudflare Pages 部署器"""
 
@@ -26,18 +35,28 @@ class CloudflareDeployer(BaseDeployer):
                 - account_id: Cloudflare Account ID
                 - project_name: 项目名称
                 - custom_domain: 自定义域名（可选）
+                - incremental_upload: 是否按文件哈希增量上传（默认开启）
+                - manifest_dir: 增量上传清单目录（可选）
+                - api_base: API地址（可选，默认官方地址）
         """
         super().__init__(config)
         self.api_token = self.config.get('api_token')
         self.account_id = self.config.get('account_id')
         self.project_name = self.config.get('project_name')
         self.custom_domain = self.config.get('custom_domain')
+        self.incremental_upload = self.config.get('incremental_upload', True)
+        self.manifest_dir = self.config.get('manifest_dir') or DEFAULT_MANIFEST_DIR
         
-        self.api_base = 'https://api.cloudflare.com/client/v4'
+        self.api_base = self.config.get('api_base') or 'https://api.cloudflare.com/client/v4'
         self.headers = {
             'Authorization': f'Bearer {self.api_token}',
             'Content-Type': 'application/json'
         }
+        
+        # 增量模式下直接从源目录读取文件，不再复制到临时目录
+        self.source_dir: Optional[str] = None
+        self.staging_dir: Optional[str] = None
+        self.upload_stats: Dict[str, int] = {}
 
     def validate_config(self) -> Tuple[bool, str]:
         """验证Cloudflare配置"""
@@ -71,42 +90,51 @@ class CloudflareDeployer(BaseDeployer):
         except Exception as e:
             return False, f"API连接测试失败: {e}"
 
-    def prepare_files(self, source_dir: str, temp_dir: str) -> bool:
-        """准备Cloudflare Pages部署文件"""
-        try:
-            # 复制所有文件到临时目录
-            exclude_patterns = [
-                '.git',
-                '.gitignore',
-                'node_modules',
-                '.env',
-                '*.log',
-                '.DS_Store'
-            ]
-            
-            if not self.copy_files(source_dir, temp_dir, exclude_patterns):
-                return False
-            
-            # 生成_headers文件（用于设置HTTP头）
-            headers_content = """/*
+    # 复制/上传时排除的文件
+    EXCLUDE_PATTERNS = [
+        '.git',
+        '.gitignore',
+        'node_modules',
+        '.env',
+        '*.log',
+        '.DS_Store',
+        '.build_manifest.json'
+    ]
+
+    # _headers文件（用于设置HTTP头）
+    HEADERS_CONTENT = """/*
   X-Frame-Options: DENY
   X-Content-Type-Options: nosniff
   X-XSS-Protection: 1; mode=block
   Referrer-Policy: strict-origin-when-cross-origin
 """
+
+    # _redirects文件（用于SPA路由）
+    REDIRECTS_CONTENT = """# SPA fallback
+/*    /index.html   200
+"""
+
+    def prepare_files(self, source_dir: str, temp_dir: str) -> bool:
+        """准备Cloudflare Pages部署文件"""
+        try:
+            if self.incremental_upload:
+                # 增量模式：上传时直接从源目录流式读取，_headers/_redirects随部署请求提交
+                self.source_dir = source_dir
+                self.staging_dir = temp_dir
+                self.log("增量上传模式：跳过文件复制")
+                return True
+            
+            # 复制所有文件到临时目录
+            if not self.copy_files(source_dir, temp_dir, self.EXCLUDE_PATTERNS):
+                return False
             
             headers_path = os.path.join(temp_dir, '_headers')
             with open(headers_path, 'w', encoding='utf-8') as f:
-                f.write(headers_content)
-            
-            # 生成_redirects文件（用于SPA路由）
-            redirects_content = """# SPA fallback
-/*    /index.html   200
-"""
+                f.write(self.HEADERS_CONTENT)
             
             redirects_path = os.path.join(temp_dir, '_redirects')
             with open(redirects_path, 'w', encoding='utf-8') as f:
-                f.write(redirects_content)
+                f.write(self.REDIRECTS_CONTENT)
             
             self.log("Cloudflare Pages文件准备完成")
             return True
@@ -156,8 +184,17 @@ class CloudflareDeployer(BaseDeployer):
             self.log(f"创建项目失败: {e}", 'error')
             return False
 
+    def validate_files(self, temp_dir: str) -> Tuple[bool, str]:
+        """验证部署文件（增量模式下验证源目录）"""
+        if self.incremental_upload and self.source_dir and temp_dir == self.staging_dir:
+            temp_dir = self.source_dir
+        return super().validate_files(temp_dir)
+
     def upload_files(self, temp_dir: str) -> bool:
         """上传文件到Cloudflare Pages"""
+        if self.incremental_upload and self.source_dir and temp_dir == self.staging_dir:
+            return self.upload_files_incremental(self.source_dir)
+        
         try:
             # 创建ZIP压缩包
             zip_path = os.path.join(os.path.dirname(temp_dir), f'{self.project_name}.zip')
@@ -194,6 +231,224 @@ class CloudflareDeployer(BaseDeployer):
             self.log(f"文件上传失败: {e}", 'error')
             return False
 
+    # ------------------------------------------------------------------
+    # 增量上传
+    # ------------------------------------------------------------------
+    def upload_files_incremental(self, source_dir: str) -> bool:
+        """按内容哈希增量上传：只上传服务端缺失的文件，部署清单引用全部文件
+
+        全部哈希都交给 check-missing 判断（服务端资源可能已过期清理）；
+        本地上传清单只用于跳过大小与修改时间均未变化文件的重新读取与哈希计算。
+        """
+        session = requests.Session()
+        try:
+            manifest_path = self._get_manifest_path()
+            previous = self._load_upload_manifest(manifest_path)
+            files, hashed = self._scan_source_files(source_dir, previous)
+            if not files:
+                self.log("源目录中没有可上传的文件", 'error')
+                return False
+            
+            previous_files = previous.get('files', {})
+            all_hashes = sorted({info['hash'] for info in files.values()})
+            changed = sum(1 for path, info in files.items() if previous_files.get(path) != info['hash'])
+            self.upload_stats = {
+                'files': len(files),
+                'hashed': hashed,
+                'changed': changed,
+                'uploaded': 0,
+                'bytes_uploaded': 0,
+            }
+            
+            jwt = self._get_upload_token(session)
+            upload_headers = {'Authorization': f'Bearer {jwt}', 'Content-Type': 'application/json'}
+            
+            missing = self._check_missing_hashes(session, upload_headers, all_hashes)
+            if missing:
+                files_by_hash = {info['hash']: info for info in files.values()}
+                self._upload_assets(session, upload_headers, [files_by_hash[h] for h in missing])
+            
+            # 刷新全部哈希的保留期，避免未变化的资源被服务端清理
+            response = session.post(
+                f'{self.api_base}/pages/assets/upsert-hashes',
+                headers=upload_headers,
+                json={'hashes': all_hashes}
+            )
+            if response.status_code != 200:
+                self.log(f"资源哈希登记失败: {response.status_code} - {response.text}", 'error')
+                return False
+            
+            deployment_manifest = {path: info['hash'] for path, info in files.items()}
+            response = session.post(
+                f'{self.api_base}/accounts/{self.account_id}/pages/projects/{self.project_name}/deployments',
+                headers={'Authorization': f'Bearer {self.api_token}'},
+                files={
+                    'manifest': (None, json.dumps(deployment_manifest)),
+                    '_headers': ('_headers', self.HEADERS_CONTENT),
+                    '_redirects': ('_redirects', self.REDIRECTS_CONTENT),
+                }
+            )
+            if response.status_code != 200:
+                self.log(f"创建部署失败: {response.status_code} - {response.text}", 'error')
+                return False
+            
+            deployment_data = response.json()
+            self.deployment_id = deployment_data['result']['id']
+            self.deployment_url = deployment_data['result']['url']
+            self._save_upload_manifest(manifest_path, deployment_manifest, files)
+            
+            self.log(
+                f"增量上传完成：共 {len(files)} 个文件，变化 {changed} 个，"
+                f"实际上传 {self.upload_stats['uploaded']} 个 "
+                f"({self.upload_stats['bytes_uploaded'] / 1024:.1f}KB)，部署ID: {self.deployment_id}"
+            )
+            return True
+            
+        except Exception as e:
+            self.log(f"增量上传失败: {e}", 'error')
+            return False
+        finally:
+            session.close()
+
+    def _scan_source_files(self, source_dir: str,
+                           previous: Optional[Dict[str, Any]] = None) -> Tuple[Dict[str, Dict[str, Any]], int]:
+        """遍历源目录并流式计算每个文件的内容哈希
+
+        大小与修改时间都与上次上传清单一致的文件直接沿用记录的哈希，不再读取。
+
+        Returns:
+            (files, hashed) — hashed 为实际读取计算哈希的文件数
+        """
+        previous = previous or {}
+        previous_hashes = previous.get('files') or {}
+        previous_stats = previous.get('file_stats') or {}
+        files: Dict[str, Dict[str, Any]] = {}
+        hashed = 0
+        for root, dirs, filenames in os.walk(source_dir):
+            dirs[:] = [d for d in dirs if not self._is_excluded(d)]
+            for filename in sorted(filenames):
+                rel_path = os.path.relpath(os.path.join(root, filename), source_dir).replace(os.sep, '/')
+                if self._is_excluded(filename) or self._is_excluded(rel_path):
+                    continue
+                file_path = os.path.join(root, filename)
+                key = '/' + rel_path
+                stat = os.stat(file_path)
+                file_stat = [stat.st_size, stat.st_mtime_ns]
+                file_hash = previous_hashes.get(key)
+                if not file_hash or previous_stats.get(key) != file_stat:
+                    file_hash = self._hash_file(file_path)
+                    hashed += 1
+                files[key] = {
+                    'path': file_path,
+                    'hash': file_hash,
+                    'size': stat.st_size,
+                    'stat': file_stat,
+                    'content_type': mimetypes.guess_type(filename)[0] or 'application/octet-stream',
+                }
+        return files, hashed
+
+    def _is_excluded(self, name: str) -> bool:
+        for pattern in self.EXCLUDE_PATTERNS:
+            if pattern.startswith('*.'):
+                if name.endswith(pattern[1:]):
+                    return True
+            elif pattern in name.split('/'):
+                return True
+        return False
+
+    @staticmethod
+    def _hash_file(file_path: str) -> str:
+        """资源哈希：文件内容加扩展名，截取32位十六进制作为资源键"""
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(64 * 1024), b''):
+                digest.update(chunk)
+        digest.update(os.path.splitext(file_path)[1].lstrip('.').encode('utf-8'))
+        return digest.hexdigest()[:32]
+
+    def _get_upload_token(self, session: requests.Session) -> str:
+        response = session.get(
+            f'{self.api_base}/accounts/{self.account_id}/pages/projects/{self.project_name}/upload-token',
+            headers=self.headers
+        )
+        if response.status_code != 200:
+            raise RuntimeError(f"获取上传令牌失败: {response.status_code} - {response.text}")
+        return response.json()['result']['jwt']
+
+    def _check_missing_hashes(self, session: requests.Session, headers: Dict[str, str],
+                              hashes: List[str]) -> List[str]:
+        response = session.post(
+            f'{self.api_base}/pages/assets/check-missing',
+            headers=headers,
+            json={'hashes': hashes}
+        )
+        if response.status_code != 200:
+            raise RuntimeError(f"资源比对失败: {response.status_code} - {response.text}")
+        return list(response.json().get('result') or [])
+
+    def _upload_assets(self, session: requests.Session, headers: Dict[str, str],
+                       assets: List[Dict[str, Any]]) -> None:
+        """分批上传缺失资源，每批只在内存中保留当前批次的文件内容"""
+        batch: List[Dict[str, Any]] = []
+        batch_bytes = 0
+        for asset in assets:
+            if batch and (batch_bytes + asset['size'] > UPLOAD_BATCH_MAX_BYTES
+                          or len(batch) >= UPLOAD_BATCH_MAX_FILES):
+                self._post_asset_batch(session, headers, batch)
+                batch, batch_bytes = [], 0
+            batch.append(asset)
+            batch_bytes += asset['size']
+        if batch:
+            self._post_asset_batch(session, headers, batch)
+
+    def _post_asset_batch(self, session: requests.Session, headers: Dict[str, str],
+                          batch: List[Dict[str, Any]]) -> None:
+        payload = []
+        for asset in batch:
+            with open(asset['path'], 'rb') as f:
+                payload.append({
+                    'key': asset['hash'],
+                    'value': base64.b64encode(f.read()).decode('ascii'),
+                    'metadata': {'contentType': asset['content_type']},
+                    'base64': True,
+                })
+        response = session.post(f'{self.api_base}/pages/assets/upload', headers=headers, json=payload)
+        if response.status_code != 200:
+            raise RuntimeError(f"资源上传失败: {response.status_code} - {response.text}")
+        self.upload_stats['uploaded'] += len(batch)
+        self.upload_stats['bytes_uploaded'] += sum(asset['size'] for asset in batch)
+
+    def _get_manifest_path(self) -> str:
+        return os.path.join(self.manifest_dir, f'{self.account_id}_{self.project_name}.json')
+
+    def _load_upload_manifest(self, manifest_path: str) -> Dict[str, Any]:
+        if not os.path.exists(manifest_path):
+            return {}
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            return manifest if isinstance(manifest, dict) else {}
+        except Exception as e:
+            self.log(f"读取上传清单失败，将全量比对: {e}", 'warning')
+            return {}
+
+    def _save_upload_manifest(self, manifest_path: str, files: Dict[str, str],
+                              scanned: Optional[Dict[str, Dict[str, Any]]] = None) -> None:
+        try:
+            os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+            tmp_path = manifest_path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'project_name': self.project_name,
+                    'deployment_id': self.deployment_id,
+                    'updated_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                    'files': files,
+                    'file_stats': {path: info['stat'] for path, info in (scanned or {}).items()},
+                }, f, ensure_ascii=False, indent=1, sort_keys=True)
+            os.replace(tmp_path, manifest_path)
+        except Exception as e:
+            self.log(f"保存上传清单失败: {e}", 'warning')
+
     def deploy(self, temp_dir: str) -> Tuple[bool, str]:
         """执行Cloudflare Pages部署"""
         try:
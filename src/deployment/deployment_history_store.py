@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+部署历史存储 - 基于SQLite的追加式部署记录，按部署服务、项目与时间建立索引
+"""
+
+import os
+import json
+import sqlite3
+import threading
+from contextlib import closing
+from typing import Dict, List, Any, Optional
+
+
+HISTORY_DB_NAME = 'deployment_history.db'
+LEGACY_HISTORY_NAME = 'deployment_history.json'
+
+
+def _prefix_upper_bound(prefix: str) -> Optional[str]:
+    """以 prefix 开头的字符串的上界（不含）；SQLite 按 UTF-8 字节比较，与码点顺序一致"""
+    while prefix:
+        last = ord(prefix[-1])
+        if last < 0x10FFFF:
+            # 跳过无法编码为 UTF-8 的代理区码点
+            return prefix[:-1] + chr(0xE000 if last == 0xD7FF else last + 1)
+        prefix = prefix[:-1]
+    return None
+
+
+class DeploymentHistoryStore:
+    """部署历史存储
+
+    每条部署记录只追加一行，筛选与统计直接在索引列上完成，
+    只有命中的记录才会反序列化完整内容。
+    """
+
+    def __init__(self, base_dir: str = 'output'):
+        """
+        初始化部署历史存储
+
+        Args:
+            base_dir: 历史数据库所在目录
+        """
+        self.base_dir = base_dir
+        self.db_path = os.path.join(base_dir, HISTORY_DB_NAME)
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _ensure_database(self) -> None:
+        """创建表与索引，并一次性导入旧版JSON历史"""
+        if self._initialized:
+            return
+        with self._init_lock:
+            if self._initialized:
+                return
+            os.makedirs(self.base_dir, exist_ok=True)
+            with closing(self._connect()) as conn, conn:
+                conn.execute('PRAGMA journal_mode=WAL')
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS deployments (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        timestamp TEXT NOT NULL,
+                        deployer TEXT NOT NULL,
+                        project_directory TEXT,
+                        source_dir TEXT,
+                        success INTEGER NOT NULL,
+                        result TEXT,
+                        record TEXT NOT NULL
+                    )
+                ''')
+                conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+                conn.execute('CREATE INDEX IF NOT EXISTS idx_deployer ON deployments(deployer, timestamp)')
+                conn.execute('CREATE INDEX IF NOT EXISTS idx_project ON deployments(project_directory, timestamp)')
+                conn.execute('CREATE INDEX IF NOT EXISTS idx_timestamp ON deployments(timestamp)')
+                self._import_legacy_history(conn)
+            self._initialized = True
+
+    def _import_legacy_history(self, conn: sqlite3.Connection) -> None:
+        legacy_file = os.path.join(self.base_dir, LEGACY_HISTORY_NAME)
+        if not os.path.exists(legacy_file):
+            return
+        if conn.execute("SELECT 1 FROM meta WHERE key = 'legacy_imported'").fetchone():
+            return
+        try:
+            with open(legacy_file, 'r', encoding='utf-8') as f:
+                legacy_records = json.load(f)
+        except Exception as e:
+            print(f"⚠️ 读取旧版部署历史失败: {e}")
+            legacy_records = []
+        for record in legacy_records if isinstance(legacy_records, list) else []:
+            self._insert(conn, record)
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('legacy_imported', ?)", (legacy_file,))
+        if legacy_records:
+            print(f"📝 已导入旧版部署历史 {len(legacy_records)} 条: {legacy_file}")
+
+    @staticmethod
+    def _insert(conn: sqlite3.Connection, record: Dict[str, Any]) -> None:
+        conn.execute(
+            '''INSERT INTO deployments
+               (timestamp, deployer, project_directory, source_dir, success, result, record)
+               VALUES (?, ?, ?, ?, ?, ?, ?)''',
+            (
+                record.get('timestamp', ''),
+                record.get('deployer', ''),
+                record.get('project_directory', ''),
+                record.get('source_dir', ''),
+                1 if record.get('success') else 0,
+                str(record.get('result', '')),
+                json.dumps(record, ensure_ascii=False, default=str),
+            )
+        )
+
+    def append(self, record: Dict[str, Any]) -> None:
+        """追加一条部署记录"""
+        self._ensure_database()
+        with closing(self._connect()) as conn, conn:
+            self._insert(conn, record)
+
+    def query(self,
+              deployer: str = None,
+              project: str = None,
+              success_only: bool = False,
+              limit: int = None,
+              newest_first: bool = False) -> List[Dict[str, Any]]:
+        """
+        筛选部署记录
+
+        Args:
+            deployer: 部署服务名称
+            project: 项目目录前缀（区分大小写，按 idx_project 索引范围查找）
+            success_only: 仅返回成功的部署
+            limit: 最多返回条数
+            newest_first: 是否按时间倒序
+
+        Returns:
+            部署记录列表
+        """
+        self._ensure_database()
+        clauses, params = [], []
+        if deployer:
+            clauses.append('deployer = ?')
+            params.append(deployer)
+        if project:
+            # 前缀匹配写成区间比较，可直接走 idx_project（LIKE '%x%' 只能全表扫描）
+            upper = _prefix_upper_bound(project)
+            if upper is None:
+                clauses.append('project_directory >= ?')
+                params.append(project)
+            else:
+                clauses.append('project_directory >= ? AND project_directory < ?')
+                params.extend([project, upper])
+        if success_only:
+            clauses.append('success = 1')
+
+        sql = 'SELECT record FROM deployments'
+        if clauses:
+            sql += ' WHERE ' + ' AND '.join(clauses)
+        sql += ' ORDER BY timestamp {0}, id {0}'.format('DESC' if newest_first else 'ASC')
+        if limit:
+            sql += ' LIMIT ?'
+            params.append(int(limit))
+
+        with closing(self._connect()) as conn:
+            rows = conn.execute(sql, params).fetchall()
+        return [json.loads(row['record']) for row in rows]
+
+    def count(self) -> int:
+        """部署记录总数"""
+        self._ensure_database()
+        with closing(self._connect()) as conn:
+            return conn.execute('SELECT COUNT(*) FROM deployments').fetchone()[0]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """按部署服务与项目聚合统计"""
+        self._ensure_database()
+        with closing(self._connect()) as conn:
+            total, successful = conn.execute(
+                'SELECT COUNT(*), COALESCE(SUM(success), 0) FROM deployments'
+            ).fetchone()
+            deployer_rows = conn.execute(
+                'SELECT deployer, COUNT(*) AS total, SUM(success) AS success '
+                'FROM deployments GROUP BY deployer'
+            ).fetchall()
+            project_rows = conn.execute(
+                'SELECT project_directory, COUNT(*) AS total, SUM(success) AS success, '
+                'MAX(timestamp) AS last_deployment FROM deployments GROUP BY project_directory'
+            ).fetchall()
+
+        deployer_stats = {
+            row['deployer']: {
+                'total': row['total'],
+                'success': row['success'],
+                'failed': row['total'] - row['success'],
+            }
+            for row in deployer_rows
+        }
+        project_stats = {
+            (row['project_directory'] or 'unknown'): {
+                'total': row['total'],
+                'success': row['success'],
+                'failed': row['total'] - row['success'],
+                'last_deployment': row['last_deployment'] or '',
+            }
+            for row in project_rows
+        }
+
+        return {
+            'total_deployments': total,
+            'successful_deployments': successful,
+            'failed_deployments': total - successful,
+            'success_rate': (successful / total * 100) if total > 0 else 0,
+            'deployer_stats': deployer_stats,
+            'project_stats': project_stats
+        }
+
+
+_stores: Dict[str, DeploymentHistoryStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_history_store(base_dir: str = 'output') -> DeploymentHistoryStore:
+    """获取目录对应的部署历史存储（进程内复用）"""
+    key = os.path.abspath(base_dir)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = DeploymentHistoryStore(base_dir)
+            _stores[key] = store
+        return store
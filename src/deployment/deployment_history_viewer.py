@@ -16,7 +16,7 @@ from typing import Dict, List, Any
 project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 sys.path.insert(0, project_root)
 
-from src.deployment.deployment_manager import DeploymentManager
+from src.deployment.deployment_history_store import get_history_store
 
 
 def format_timestamp(timestamp_str: str) -> str:
@@ -48,8 +48,7 @@ def print_deployment_record(record: Dict[str, Any], index: int = None) -> None:
 
 def show_deployment_history(base_dir: str = 'output') -> None:
     """显示部署历史"""
-    manager = DeploymentManager()
-    history = manager.load_deployment_history_from_file(base_dir)
+    history = get_history_store(base_dir).query(newest_first=True)
     
     if not history:
         print("📝 暂无部署历史记录")
@@ -58,17 +57,13 @@ def show_deployment_history(base_dir: str = 'output') -> None:
     print(f"📋 部署历史记录 (共 {len(history)} 条)")
     print("=" * 60)
     
-    # 按时间倒序排列
-    history.sort(key=lambda x: x['timestamp'], reverse=True)
-    
     for i, record in enumerate(history, 1):
         print_deployment_record(record, i)
 
 
 def show_deployment_stats(base_dir: str = 'output') -> None:
     """显示部署统计"""
-    manager = DeploymentManager()
-    stats = manager.get_deployment_stats()
+    stats = get_history_store(base_dir).get_stats()
     
     print("📊 部署统计信息")
     print("=" * 60)
@@ -102,17 +97,12 @@ def show_deployment_stats(base_dir: str = 'output') -> None:
 
 def show_recent_deployments(base_dir: str = 'output', count: int = 5) -> None:
     """显示最近的部署记录"""
-    manager = DeploymentManager()
-    history = manager.load_deployment_history_from_file(base_dir)
+    recent = get_history_store(base_dir).query(limit=count, newest_first=True)
     
-    if not history:
+    if not recent:
         print("📝 暂无部署历史记录")
         return
     
-    # 按时间倒序排列，取最近的几条
-    history.sort(key=lambda x: x['timestamp'], reverse=True)
-    recent = history[:count]
-    
     print(f"🕒 最近 {len(recent)} 次部署")
     print("=" * 60)
     
@@ -125,24 +115,18 @@ def filter_deployments(base_dir: str = 'output',
                       project: str = None,
                       success_only: bool = False) -> None:
     """筛选部署记录"""
-    manager = DeploymentManager()
-    history = manager.load_deployment_history_from_file(base_dir)
-    
-    if not history:
+    store = get_history_store(base_dir)
+    if not store.count():
         print("📝 暂无部署历史记录")
         return
     
-    # 应用筛选条件
-    filtered = history
-    
-    if deployer:
-        filtered = [r for r in filtered if r['deployer'] == deployer]
-    
-    if project:
-        filtered = [r for r in filtered if project in r.get('project_directory', '')]
-    
-    if success_only:
-        filtered = [r for r in filtered if r['success']]
+    # 筛选条件直接在索引列上执行
+    filtered = store.query(
+        deployer=deployer,
+        project=project,
+        success_only=success_only,
+        newest_first=True
+    )
     
     if not filtered:
         print("📝 没有符合条件的部署记录")
@@ -153,7 +137,7 @@ def filter_deployments(base_dir: str = 'output',
     if deployer:
         conditions.append(f"部署服务={deployer}")
     if project:
-        conditions.append(f"项目包含={project}")
+        conditions.append(f"项目前缀={project}")
     if success_only:
         conditions.append("仅成功")
     
@@ -162,9 +146,6 @@ def filter_deployments(base_dir: str = 'output',
     print(f"🔍 筛选结果 (条件: {condition_str}, 共 {len(filtered)} 条)")
     print("=" * 60)
     
-    # 按时间倒序排列
-    filtered.sort(key=lambda x: x['timestamp'], reverse=True)
-    
     for i, record in enumerate(filtered, 1):
         print_deployment_record(record, i)
 
@@ -178,7 +159,7 @@ def main():
                        default='recent', help='操作类型')
     parser.add_argument('--count', '-c', type=int, default=5, help='显示记录数量')
     parser.add_argument('--deployer', help='筛选部署服务')
-    parser.add_argument('--project', help='筛选项目名称')
+    parser.add_argument('--project', help='筛选项目名称（前缀匹配）')
     parser.add_argument('--success-only', action='store_true', help='仅显示成功的部署')
     
     args = parser.parse_args()
@@ -7,10 +7,18 @@
 
 import os
 import json
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime
 
+import requests
+
 from .base_deployer import BaseDeployer
+from .deployment_history_store import get_history_store
 from .cloudflare_deployer import CloudflareDeployer
 from .vercel_deployer import VercelDeployer
 
@@ -24,6 +32,18 @@ class DeploymentManager:
         'vercel': VercelDeployer
     }
 
+    # 配置、源文件等确定性错误，重试不会改变结果
+    NON_RETRYABLE_ERRORS = (
+        '不支持的部署服务', '配置验证失败', '源文件目录不存在',
+        '文件验证失败', '文件准备失败', '准备后文件验证失败',
+    )
+    # 瞬时错误：限流（429）、服务端错误（5xx）与网络异常、超时
+    TRANSIENT_STATUS_PATTERN = re.compile(r'(?:失败|错误|error|status)\S*[:：]?\s*(?:429|5\d\d)\b', re.IGNORECASE)
+    TRANSIENT_ERROR_MARKERS = (
+        'timeout', 'timed out', 'connection', 'temporarily unavailable', 'too many requests',
+        '超时', '稍后重试',
+    )
+
     def __init__(self, config_path: str = None):
         """
         初始化部署管理器
@@ -34,6 +54,7 @@ class DeploymentManager:
         self.config_path = config_path
         self.config = self._load_config()
         self.deployment_history = []
+        self._history_lock = threading.Lock()
 
     def _load_config(self) -> Dict[str, Any]:
         """加载部署配置"""
@@ -68,7 +89,13 @@ class DeploymentManager:
             "deployment_settings": {
                 "auto_cleanup": True,
                 "max_retries": 3,
-                "timeout": 300
+                "timeout": 300,
+                "max_workers": 4,
+                "retry_backoff": 2.0,
+                "provider_concurrency": {
+                    "cloudflare": 4,
+                    "vercel": 2
+                }
             }
         }
 
@@ -216,10 +243,10 @@ class DeploymentManager:
                 'deployment_info': deployer.get_deployment_info(),
                 'config_used': custom_config or {}
             }
-            self.deployment_history.append(deployment_record)
-            
             # 保存部署历史到文件
-            self._save_deployment_history_to_file(deployment_record)
+            with self._history_lock:
+                self.deployment_history.append(deployment_record)
+                self._save_deployment_history_to_file(deployment_record)
             
             return success, result, deployment_record
             
@@ -231,12 +258,15 @@ class DeploymentManager:
                 'timestamp': datetime.now().isoformat(),
                 'deployer': deployer_name,
                 'source_dir': source_dir,
+                'project_directory': self._extract_project_directory(source_dir),
                 'project_info': project_info or {},
                 'success': False,
                 'result': error_msg,
                 'deployment_info': {}
             }
-            self.deployment_history.append(deployment_record)
+            with self._history_lock:
+                self.deployment_history.append(deployment_record)
+                self._save_deployment_history_to_file(deployment_record)
             
             return False, error_msg, {}
             
@@ -297,6 +327,184 @@ class DeploymentManager:
         except Exception as e:
             return False, f"部署项目失败: {e}", {}
 
+    def deploy_websites_batch(self,
+                              sites: List[Dict[str, Any]],
+                              max_workers: int = None,
+                              provider_limits: Dict[str, int] = None,
+                              max_retries: int = None,
+                              retry_backoff: float = None) -> Dict[str, Any]:
+        """
+        并发部署多个网站
+        
+        Args:
+            sites: 站点列表，每项包含 source_dir，可选 deployer_name、custom_config、project_info
+            max_workers: 全局并发数，默认取 deployment_settings.max_workers
+            provider_limits: 每个部署服务的并发上限，默认取 deployment_settings.provider_concurrency
+            max_retries: 单个站点瞬时失败（网络、429、5xx）后的最大重试次数，默认取 deployment_settings.max_retries
+            retry_backoff: 重试退避基数（秒），第n次重试等待 backoff * 2^(n-1)
+            
+        Returns:
+            汇总报告：成功/失败数量、总耗时、按服务统计以及按输入顺序排列的站点结果
+        """
+        settings = self.config.get('deployment_settings', {})
+        max_workers = max(int(max_workers or settings.get('max_workers', 4)), 1)
+        max_retries = max(int(settings.get('max_retries', 3) if max_retries is None else max_retries), 0)
+        retry_backoff = float(settings.get('retry_backoff', 2.0) if retry_backoff is None else retry_backoff)
+        limits = dict(settings.get('provider_concurrency', {}))
+        limits.update(provider_limits or {})
+        
+        default_deployer = self.config.get('default_deployer', 'vercel')
+        semaphores = {
+            name: threading.BoundedSemaphore(max(int(limits.get(name, max_workers)), 1))
+            for name in self.SUPPORTED_DEPLOYERS
+        }
+        
+        results: List[Optional[Dict[str, Any]]] = [None] * len(sites)
+        pending = []
+        for index, site in enumerate(sites):
+            deployer_name = site.get('deployer_name') or default_deployer
+            source_dir = site.get('source_dir', '')
+            # 不可恢复的错误直接记为失败，不占用并发与重试
+            if deployer_name not in self.SUPPORTED_DEPLOYERS:
+                results[index] = self._batch_site_result(index, site, deployer_name, False,
+                                                         f"不支持的部署服务: {deployer_name}", 0, 0.0)
+            elif not source_dir or not os.path.exists(source_dir):
+                results[index] = self._batch_site_result(index, site, deployer_name, False,
+                                                         f"源文件目录不存在: {source_dir}", 0, 0.0)
+            else:
+                pending.append((index, site, deployer_name))
+        
+        print(f"🚀 批量部署 {len(sites)} 个网站 (并发 {max_workers}, 重试 {max_retries} 次)")
+        started = time.perf_counter()
+        
+        if pending:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(pending)),
+                                    thread_name_prefix='deploy') as executor:
+                futures = {
+                    executor.submit(self._deploy_site_with_retry, index, site, deployer_name,
+                                    semaphores[deployer_name], max_retries, retry_backoff): index
+                    for index, site, deployer_name in pending
+                }
+                for future in as_completed(futures):
+                    result = future.result()
+                    results[futures[future]] = result
+                    icon = '✅' if result['success'] else '❌'
+                    print(f"{icon} [{result['deployer']}] {result['project_name'] or result['source_dir']} "
+                          f"({result['attempts']} 次尝试, {result['duration']:.1f}s)")
+        
+        return self._build_batch_report(results, time.perf_counter() - started)
+
+    def _deploy_site_with_retry(self,
+                                index: int,
+                                site: Dict[str, Any],
+                                deployer_name: str,
+                                semaphore: threading.BoundedSemaphore,
+                                max_retries: int,
+                                retry_backoff: float) -> Dict[str, Any]:
+        """在服务并发上限内部署单个站点，仅对瞬时错误指数退避重试"""
+        started = time.perf_counter()
+        attempts = 0
+        success, result, record = False, '', {}
+        
+        while attempts <= max_retries:
+            if attempts:
+                # 退避期间不占用服务并发名额
+                delay = retry_backoff * (2 ** (attempts - 1))
+                time.sleep(delay + random.uniform(0, delay * 0.1))
+            attempts += 1
+            network_error = False
+            with semaphore:
+                try:
+                    success, result, record = self.deploy_website(
+                        source_dir=site['source_dir'],
+                        deployer_name=deployer_name,
+                        custom_config=site.get('custom_config'),
+                        project_info=site.get('project_info')
+                    )
+                except Exception as e:
+                    network_error = isinstance(e, (requests.ConnectionError, requests.Timeout))
+                    success, result, record = False, f"部署过程中发生错误: {e}", {}
+            if success or not (network_error or self._is_transient_failure(result, record)):
+                break
+        
+        return self._batch_site_result(index, site, deployer_name, success, result, attempts,
+                                       time.perf_counter() - started, record)
+
+    @classmethod
+    def _is_transient_failure(cls, result: str, record: Dict[str, Any] = None) -> bool:
+        """根据错误信息与部署日志判断失败是否为可重试的瞬时错误"""
+        result = str(result or '')
+        if result.startswith(cls.NON_RETRYABLE_ERRORS):
+            return False
+        messages = [result]
+        for entry in (record or {}).get('deployment_info', {}).get('deployment_logs', []):
+            if entry.get('level') == 'error':
+                messages.append(str(entry.get('message', '')))
+        for message in messages:
+            if cls.TRANSIENT_STATUS_PATTERN.search(message):
+                return True
+            lowered = message.lower()
+            if any(marker in lowered for marker in cls.TRANSIENT_ERROR_MARKERS):
+                return True
+        return False
+
+    @staticmethod
+    def _batch_site_result(index: int,
+                           site: Dict[str, Any],
+                           deployer_name: str,
+                           success: bool,
+                           result: str,
+                           attempts: int,
+                           duration: float,
+                           record: Dict[str, Any] = None) -> Dict[str, Any]:
+        project_name = (
+            (record or {}).get('deployment_info', {}).get('config', {}).get('project_name')
+            or (site.get('custom_config') or {}).get('project_name')
+            or ''
+        )
+        return {
+            'index': index,
+            'source_dir': site.get('source_dir', ''),
+            'deployer': deployer_name,
+            'project_name': project_name,
+            'success': success,
+            'result': result,
+            'attempts': attempts,
+            'duration': round(duration, 3),
+        }
+
+    @staticmethod
+    def _build_batch_report(results: List[Dict[str, Any]], total_duration: float) -> Dict[str, Any]:
+        """汇总批量部署结果与耗时"""
+        provider_stats: Dict[str, Dict[str, Any]] = {}
+        for result in results:
+            stats = provider_stats.setdefault(result['deployer'], {
+                'total': 0, 'success': 0, 'failed': 0, 'retries': 0, 'total_duration': 0.0
+            })
+            stats['total'] += 1
+            stats['success' if result['success'] else 'failed'] += 1
+            stats['retries'] += max(result['attempts'] - 1, 0)
+            stats['total_duration'] += result['duration']
+        for stats in provider_stats.values():
+            stats['avg_duration'] = round(stats['total_duration'] / stats['total'], 3) if stats['total'] else 0.0
+            stats['total_duration'] = round(stats['total_duration'], 3)
+        
+        succeeded = len([r for r in results if r['success']])
+        serial_duration = sum(r['duration'] for r in results)
+        report = {
+            'total': len(results),
+            'succeeded': succeeded,
+            'failed': len(results) - succeeded,
+            'duration': round(total_duration, 3),
+            'serial_duration': round(serial_duration, 3),
+            'provider_stats': provider_stats,
+            'results': results,
+        }
+        
+        print(f"📊 批量部署完成: 成功 {succeeded}/{len(results)}，"
+              f"总耗时 {total_duration:.1f}s (逐个累计 {serial_duration:.1f}s)")
+        return report
+
     def get_deployment_history(self) -> List[Dict[str, Any]]:
         """获取部署历史"""
         return self.deployment_history
@@ -412,7 +620,13 @@ class DeploymentManager:
                 "deployment_settings": {
                     "auto_cleanup": True,
                     "max_retries": 3,
-                    "timeout": 300
+                    "timeout": 300,
+                    "max_workers": 4,
+                    "retry_backoff": 2.0,
+                    "provider_concurrency": {
+                        "cloudflare": 4,
+                        "vercel": 2
+                    }
                 }
             }
             
@@ -449,100 +663,48 @@ class DeploymentManager:
             return os.path.basename(source_dir)
 
     def _save_deployment_history_to_file(self, deployment_record: Dict[str, Any]) -> None:
-        """保存部署历史到文件"""
+        """追加部署记录到历史存储"""
         try:
-            # 确定历史文件路径
+            # 确定历史存储目录
             history_dir = os.path.dirname(os.path.dirname(deployment_record['source_dir']))
             if not history_dir or not os.path.exists(history_dir):
                 history_dir = 'output'  # 默认目录
             
-            history_file = os.path.join(history_dir, 'deployment_history.json')
-            
-            # 读取现有历史
-            history = []
-            if os.path.exists(history_file):
-                with open(history_file, 'r', encoding='utf-8') as f:
-                    history = json.load(f)
-            
-            # 添加新记录
-            history.append(deployment_record)
-            
-            # 保持最近100条记录
-            if len(history) > 100:
-                history = history[-100:]
+            store = get_history_store(history_dir)
+            store.append(deployment_record)
             
-            # 保存历史
-            os.makedirs(os.path.dirname(history_file), exist_ok=True)
-            with open(history_file, 'w', encoding='utf-8') as f:
-                json.dump(history, f, ensure_ascii=False, indent=2)
-            
-            print(f"📝 部署历史已更新: {history_file}")
+            print(f"📝 部署历史已更新: {store.db_path}")
             
         except Exception as e:
             print(f"⚠️ 保存部署历史失败: {e}")
 
     def load_deployment_history_from_file(self, base_dir: str = 'output') -> List[Dict[str, Any]]:
-        """从文件加载部署历史"""
+        """从历史存储加载部署历史（按时间正序）"""
         try:
-            history_file = os.path.join(base_dir, 'deployment_history.json')
-            if os.path.exists(history_file):
-                with open(history_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            return []
+            return get_history_store(base_dir).query()
         except Exception as e:
             print(f"读取部署历史失败: {e}")
             return []
 
-    def get_deployment_stats(self) -> Dict[str, Any]:
+    def get_deployment_stats(self, base_dir: str = 'output') -> Dict[str, Any]:
         """
         获取部署统计信息
         
+        Args:
+            base_dir: 历史存储目录
+            
         Returns:
             统计信息字典
         """
-        # 合并内存中的历史和文件中的历史
-        all_history = self.deployment_history + self.load_deployment_history_from_file()
-        
-        total_deployments = len(all_history)
-        successful_deployments = len([r for r in all_history if r['success']])
-        failed_deployments = total_deployments - successful_deployments
-        
-        deployer_stats = {}
-        project_stats = {}
-        
-        for record in all_history:
-            deployer = record['deployer']
-            project = record.get('project_directory', 'unknown')
-            
-            # 部署服务统计
-            if deployer not in deployer_stats:
-                deployer_stats[deployer] = {'total': 0, 'success': 0, 'failed': 0}
-            
-            deployer_stats[deployer]['total'] += 1
-            if record['success']:
-                deployer_stats[deployer]['success'] += 1
-            else:
-                deployer_stats[deployer]['failed'] += 1
-            
-            # 项目统计
-            if project not in project_stats:
-                project_stats[project] = {'total': 0, 'success': 0, 'failed': 0, 'last_deployment': ''}
-            
-            project_stats[project]['total'] += 1
-            if record['success']:
-                project_stats[project]['success'] += 1
-            else:
-                project_stats[project]['failed'] += 1
-            
-            # 更新最后部署时间
-            if record['timestamp'] > project_stats[project]['last_deployment']:
-                project_stats[project]['last_deployment'] = record['timestamp']
-        
-        return {
-            'total_deployments': total_deployments,
-            'successful_deployments': successful_deployments,
-            'failed_deployments': failed_deployments,
-            'success_rate': (successful_deployments / total_deployments * 100) if total_deployments > 0 else 0,
-            'deployer_stats': deployer_stats,
-            'project_stats': project_stats
-        }
+        try:
+            return get_history_store(base_dir).get_stats()
+        except Exception as e:
+            print(f"读取部署统计失败: {e}")
+            return {
+                'total_deployments': 0,
+                'successful_deployments': 0,
+                'failed_deployments': 0,
+                'success_rate': 0,
+                'deployer_stats': {},
+                'project_stats': {}
+            }
@@ -10,7 +10,7 @@ import json
 import subprocess
 import time
 from typing import Dict, List, Optional, Any, Tuple
-from base_deployer import BaseDeployer
+from .base_deployer import BaseDeployer
 
 
 class VercelDeployer(BaseDeployer):
@@ -151,6 +151,7 @@ class VercelDeployer(BaseDeployer):
                 '.env',
                 '*.log',
                 '.DS_Store',
+                '.build_manifest.json',
                 '.vercel',
                 '__pycache__',
                 '*.pyc'
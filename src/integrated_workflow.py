@@ -9,7 +9,9 @@
 import os
 import sys
 import json
+import time
 import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
 from typing import Dict, List, Any, Optional
 
@@ -20,6 +22,99 @@ from src.demand_mining.managers.keyword_manager import KeywordManager
 from src.website_builder.builder_core import IntentBasedWebsiteBuilder
 from src.demand_mining.analyzers.new_word_detector import NewWordDetector
 from src.demand_mining.managers.discovery_manager import DiscoveryManager
+from src.utils.telemetry import telemetry_manager
+
+
+# 建站进程内共享的只读资源（意图分析器、页面模板），每个进程只初始化一次。
+# 部署器（含 DeploymentManager/HTMLGenerator）持有部署配置与单次构建状态，按站点单独创建。
+_BUILD_WORKER_RESOURCES: Dict[str, Any] = {}
+
+
+def _init_website_build_worker() -> None:
+    """初始化建站进程的共享资源
+
+    某项资源创建失败时不放入共享表，由 IntentBasedWebsiteBuilder 按原逻辑自行创建，
+    错误会在对应站点的结果中体现。
+    """
+    if _BUILD_WORKER_RESOURCES:
+        return
+
+    def _analyzer():
+        from src.demand_mining.analyzers.intent_analyzer_v2 import IntentAnalyzerV2
+        return IntentAnalyzerV2(use_v2=True, enable_website_recommendations=True)
+
+    def _template_manager():
+        from src.website_builder.page_templates import PageTemplateManager
+        return PageTemplateManager()
+
+    for name, factory in (
+        ('analyzer', _analyzer),
+        ('template_manager', _template_manager),
+    ):
+        try:
+            _BUILD_WORKER_RESOURCES[name] = factory()
+        except Exception as e:
+            print(f"⚠️ 共享建站资源 {name} 初始化失败，将由各站点单独创建: {e}")
+
+
+def _create_website_deployer(deployment_config_path: Optional[str] = None) -> Any:
+    """为单个站点创建部署器；部署模块不可用时返回 None，由构建器按原逻辑处理"""
+    try:
+        from src.website_builder.website_deployer import WebsiteDeployer
+    except ImportError:
+        return None
+    return WebsiteDeployer(deployment_config_path)
+
+
+def _build_website_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    """构建单个网站并返回状态与分阶段耗时（可在子进程中执行）"""
+    timings: Dict[str, float] = {}
+    started = time.perf_counter()
+
+    def _finish(status: str, **extra: Any) -> Dict[str, Any]:
+        outcome = {
+            'status': status,
+            'duration': time.perf_counter() - started,
+            'timings': timings,
+            'worker_pid': os.getpid(),
+        }
+        outcome.update(extra)
+        return outcome
+
+    try:
+        stage_started = time.perf_counter()
+        builder = IntentBasedWebsiteBuilder(
+            intent_data_path=job['intent_file_path'],
+            output_dir=job['output_dir'],
+            config=job['project_config'],
+            website_deployer=_create_website_deployer(job.get('deployment_config_path')),
+            **_BUILD_WORKER_RESOURCES
+        )
+        timings['init'] = time.perf_counter() - stage_started
+
+        stage_started = time.perf_counter()
+        loaded = builder.load_intent_data()
+        timings['load_intent_data'] = time.perf_counter() - stage_started
+        if not loaded:
+            return _finish('failed', error='意图数据加载失败')
+
+        for stage_name, step in (
+            ('structure', builder.generate_website_structure),
+            ('content_plan', builder.create_content_plan),
+        ):
+            stage_started = time.perf_counter()
+            step()
+            timings[stage_name] = time.perf_counter() - stage_started
+
+        stage_started = time.perf_counter()
+        source_dir = builder.generate_website_source()
+        timings['source'] = time.perf_counter() - stage_started
+        if not source_dir:
+            return _finish('failed', error='源代码生成失败')
+
+        return _finish('success', source_dir=source_dir)
+    except Exception as e:
+        return _finish('failed', error=str(e))
 
 
 class IntegratedWorkflow:
@@ -49,7 +144,8 @@ class IntegratedWorkflow:
             'auto_deploy': True,          # 是否自动部署
             'deployment_platform': 'cloudflare',  # 部署平台
             'use_tailwind': True,         # 使用TailwindCSS
-            'generate_reports': True      # 生成分析报告
+            'generate_reports': True,     # 生成分析报告
+            'website_build_workers': 1    # 建站并行进程数（1为串行，0或'auto'为CPU核数）
         }
     
     def _ensure_output_dirs(self):
@@ -162,6 +258,13 @@ class IntegratedWorkflow:
             print(f"🏗️ 生成了 {len(website_results)} 个网站项目")
             print(f"📋 报告路径: {report_path}")
             
+        except Exception as e:
+            workflow_results['end_time'] = datetime.now().isoformat()
+            workflow_results['status'] = 'failed'
+            workflow_results['error'] = str(e)
+            print(f"❌ 工作流执行失败: {e}")
+            return workflow_results
+            
         return workflow_results
 
     @staticmethod
@@ -219,14 +322,7 @@ class IntegratedWorkflow:
                 f"   {idx}. {item['keyword']} | 分数 {item['score']:.1f} | 动量 {item['momentum']} | "
                 f"Δ7D {item['delta']:.1f} | 等级 {item['grade']} | 置信度 {item['confidence']}"
             )
-            
-        except Exception as e:
-            workflow_results['end_time'] = datetime.now().isoformat()
-            workflow_results['status'] = 'failed'
-            workflow_results['error'] = str(e)
-            print(f"❌ 工作流执行失败: {e}")
-            return workflow_results
-    
+
     def _run_multi_platform_discovery(self, initial_keywords: List[str]) -> Dict[str, Any]:
         """执行多平台关键词发现"""
         output_dir = os.path.join(self.output_base_dir, 'multi_platform_keywords')
@@ -290,7 +386,6 @@ class IntegratedWorkflow:
             df = pd.read_csv(keywords_file)
             
             # 执行新词检测
-        try:
             from src.demand_mining.analyzers.new_word_detector_singleton import get_new_word_detector
             new_word_detector = get_new_word_detector()
             new_word_results = new_word_detector.detect_new_words(df)
@@ -383,8 +478,13 @@ class IntegratedWorkflow:
         return high_value[:max_projects]
     
     def _batch_generate_websites(self, keywords: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """批量生成网站（基于建站建议）"""
-        website_results = []
+        """批量生成网站（基于建站建议）
+
+        website_build_workers > 1 时使用进程池并行建站，每个站点独立成败，
+        各站点的分阶段耗时写入 telemetry。
+        """
+        website_results: List[Optional[Dict[str, Any]]] = [None] * len(keywords)
+        jobs: List[Dict[str, Any]] = []
         
         for i, keyword_data in enumerate(keywords, 1):
             keyword = keyword_data['keyword']
@@ -403,6 +503,7 @@ class IntegratedWorkflow:
             print(f"   AI工具类别: {ai_category}")
             print(f"   开发优先级: {priority_level}")
             
+            project_name = 'unknown'
             try:
                 # 准备意图数据文件
                 intent_data = self._prepare_intent_data(keyword_data)
@@ -413,69 +514,140 @@ class IntegratedWorkflow:
                 
                 # 创建项目配置（基于建站建议）
                 project_config = self._create_project_config(website_recommendations, project_name)
-                
-                # 创建网站建设器
-                builder = IntentBasedWebsiteBuilder(
-                    intent_data_path=intent_file_path,
-                    output_dir=os.path.join(self.output_base_dir, 'websites'),
-                    config=project_config
-                )
-                
-                # 执行建站流程
-                if builder.load_intent_data():
-                    structure = builder.generate_website_structure()
-                    content_plan = builder.create_content_plan()
-                    source_dir = builder.generate_website_source()
-                    
-                    if source_dir:
-                        website_results.append({
-                            'keyword': keyword,
-                            'project_name': project_name,
-                            'source_dir': source_dir,
-                            'intent_info': intent_info,
-                            'website_recommendations': website_recommendations,
-                            'opportunity_score': keyword_data.get('opportunity_score', 0),
-                            'development_priority': priority_level,
-                            'website_type': website_type,
-                            'ai_category': ai_category,
-                            'status': 'success'
-                        })
-                        print(f"✅ 网站生成成功: {source_dir}")
-                        
-                        # 显示域名建议
-                        domain_suggestions = website_recommendations.get('domain_suggestions', [])
-                        if domain_suggestions:
-                            print(f"   推荐域名: {', '.join(domain_suggestions[:3])}")
-                    else:
-                        website_results.append({
-                            'keyword': keyword,
-                            'project_name': project_name,
-                            'website_type': website_type,
-                            'status': 'failed',
-                            'error': '源代码生成失败'
-                        })
-                        print(f"❌ 网站生成失败: {keyword}")
-                else:
-                    website_results.append({
-                        'keyword': keyword,
-                        'project_name': project_name,
-                        'website_type': website_type,
-                        'status': 'failed',
-                        'error': '意图数据加载失败'
-                    })
-                    print(f"❌ 意图数据加载失败: {keyword}")
-                    
             except Exception as e:
-                website_results.append({
+                website_results[i - 1] = {
                     'keyword': keyword,
-                    'project_name': project_name if 'project_name' in locals() else 'unknown',
+                    'project_name': project_name,
                     'website_type': website_type,
                     'status': 'failed',
                     'error': str(e)
-                })
+                }
                 print(f"❌ 网站生成异常: {keyword} - {e}")
+                continue
+
+            jobs.append({
+                'index': i - 1,
+                'keyword': keyword,
+                'project_name': project_name,
+                'intent_file_path': intent_file_path,
+                'output_dir': os.path.join(self.output_base_dir, 'websites'),
+                'project_config': project_config,
+                'deployment_config_path': self.config.get('deployment_config_path'),
+                'intent_info': intent_info,
+                'website_recommendations': website_recommendations,
+                'opportunity_score': keyword_data.get('opportunity_score', 0),
+                'development_priority': priority_level,
+                'website_type': website_type,
+                'ai_category': ai_category,
+            })
+
+        workers = self._resolve_build_workers(len(jobs))
+        batch_started = time.perf_counter()
+        if workers > 1:
+            print(f"⚙️ 使用 {workers} 个进程并行生成 {len(jobs)} 个网站")
+            outcomes = self._run_build_jobs_in_pool(jobs, workers)
+        else:
+            outcomes = self._run_build_jobs_serial(jobs)
+        batch_elapsed = time.perf_counter() - batch_started
+
+        for job, outcome in zip(jobs, outcomes):
+            website_results[job['index']] = self._build_website_result(job, outcome)
+            self._record_build_telemetry(job, outcome)
+
+        succeeded = sum(1 for outcome in outcomes if outcome.get('status') == 'success')
+        telemetry_manager.set_gauge('website_build.last_batch', {
+            'sites': len(jobs),
+            'succeeded': succeeded,
+            'failed': len(jobs) - succeeded,
+            'workers': workers,
+            'wall_time': round(batch_elapsed, 3),
+            'total_site_time': round(sum(outcome.get('duration', 0.0) for outcome in outcomes), 3),
+        })
         
-        return website_results
+        return [result for result in website_results if result is not None]
+
+    def _resolve_build_workers(self, job_count: int) -> int:
+        """解析建站并行进程数：1 为串行，0 或 'auto' 为 CPU 核数"""
+        if job_count <= 1:
+            return 1
+        raw = self.config.get('website_build_workers', 1)
+        if raw in (0, 'auto', None):
+            raw = os.cpu_count() or 1
+        try:
+            workers = int(raw)
+        except (TypeError, ValueError):
+            workers = 1
+        return max(1, min(workers, job_count))
+
+    def _run_build_jobs_serial(self, jobs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """在当前进程中依次建站（共享只读资源仅初始化一次）"""
+        if not jobs:
+            return []
+        _init_website_build_worker()
+        return [_build_website_job(job) for job in jobs]
+
+    def _run_build_jobs_in_pool(self, jobs: List[Dict[str, Any]], workers: int) -> List[Dict[str, Any]]:
+        """使用进程池并行建站，单个站点失败或进程池崩溃不会影响其他结果的收集"""
+        outcomes: Dict[int, Dict[str, Any]] = {}
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_website_build_worker,
+        ) as executor:
+            futures = {executor.submit(_build_website_job, job): job['index'] for job in jobs}
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    outcomes[index] = future.result()
+                except Exception as e:
+                    outcomes[index] = {'status': 'failed', 'error': f'建站进程异常: {e}', 'duration': 0.0, 'timings': {}}
+        return [outcomes[job['index']] for job in jobs]
+
+    def _build_website_result(self, job: Dict[str, Any], outcome: Dict[str, Any]) -> Dict[str, Any]:
+        """将建站结果整理为工作流结果记录"""
+        keyword = job['keyword']
+        if outcome.get('status') == 'success':
+            print(f"✅ 网站生成成功: {outcome['source_dir']} ({outcome.get('duration', 0.0):.1f}s)")
+            
+            # 显示域名建议
+            domain_suggestions = job['website_recommendations'].get('domain_suggestions', [])
+            if domain_suggestions:
+                print(f"   推荐域名: {', '.join(domain_suggestions[:3])}")
+            return {
+                'keyword': keyword,
+                'project_name': job['project_name'],
+                'source_dir': outcome['source_dir'],
+                'intent_info': job['intent_info'],
+                'website_recommendations': job['website_recommendations'],
+                'opportunity_score': job['opportunity_score'],
+                'development_priority': job['development_priority'],
+                'website_type': job['website_type'],
+                'ai_category': job['ai_category'],
+                'build_duration': outcome.get('duration', 0.0),
+                'status': 'success'
+            }
+
+        print(f"❌ 网站生成失败: {keyword} - {outcome.get('error', '未知错误')}")
+        return {
+            'keyword': keyword,
+            'project_name': job['project_name'],
+            'website_type': job['website_type'],
+            'build_duration': outcome.get('duration', 0.0),
+            'status': 'failed',
+            'error': outcome.get('error', '未知错误')
+        }
+
+    @staticmethod
+    def _record_build_telemetry(job: Dict[str, Any], outcome: Dict[str, Any]) -> None:
+        status = outcome.get('status', 'failed')
+        telemetry_manager.increment_counter(f'website_build.{status}')
+        telemetry_manager.log_event('website_build', job['keyword'], {
+            'project_name': job['project_name'],
+            'status': status,
+            'duration': round(outcome.get('duration', 0.0), 3),
+            'timings': outcome.get('timings', {}),
+            'worker_pid': outcome.get('worker_pid'),
+            'error': outcome.get('error'),
+        })
     
     def _generate_project_name_with_recommendations(self, keyword: str, recommendations: Dict[str, Any]) -> str:
         """基于建站建议生成项目名称"""
@@ -723,6 +895,8 @@ class IntegratedWorkflow:
             report_content += f"{status_icon} **{website['keyword']}**\n"
             if website.get('status') == 'success':
                 report_content += f"  - 项目目录: {website.get('source_dir', '')}\n"
+                if website.get('build_duration') is not None:
+                    report_content += f"  - 构建耗时: {website['build_duration']:.1f}s\n"
             else:
                 report_content += f"  - 错误: {website.get('error', '')}\n"
         
@@ -808,6 +982,7 @@ def main():
     parser.add_argument('--min-score', type=int, default=60, help='最低机会分数阈值')
     parser.add_argument('--max-projects', type=int, default=5, help='最大项目数量')
     parser.add_argument('--no-deploy', action='store_true', help='跳过自动部署')
+    parser.add_argument('--build-workers', default=1, help='建站并行进程数（1为串行，0或auto为CPU核数）')
     
     args = parser.parse_args()
     
@@ -818,7 +993,8 @@ def main():
         'auto_deploy': not args.no_deploy,
         'deployment_platform': 'cloudflare',
         'use_tailwind': True,
-        'generate_reports': True
+        'generate_reports': True,
+        'website_build_workers': 'auto' if str(args.build_workers).lower() == 'auto' else int(args.build_workers)
     }
     
     # 如果有配置文件，加载配置
@@ -1,5 +1,6 @@
 import requests
 from bs4 import BeautifulSoup
+import asyncio
 import time
 import json
 import os
@@ -10,33 +11,64 @@ import html
 import hashlib
 from pathlib import Path
 
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover - 缺少aiohttp时退回同步模式
+    aiohttp = None
+
+HTML_PAGES_DIR = 'src/spider/html_pages'
+CRAWL_STATE_FILE = os.path.join(HTML_PAGES_DIR, '.crawl_state.json')
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+
+class _HostThrottle:
+    """按主机限制最小请求间隔，所有协程共享"""
+
+    def __init__(self, min_interval):
+        self.min_interval = max(float(min_interval), 0.0)
+        self._locks = {}
+        self._last_hit = {}
+
+    async def wait(self, url):
+        if self.min_interval <= 0:
+            return
+        host = urlparse(url).netloc.lower()
+        lock = self._locks.setdefault(host, asyncio.Lock())
+        async with lock:
+            wait_time = self.min_interval - (time.monotonic() - self._last_hit.get(host, 0.0))
+            if wait_time > 0:
+                await asyncio.sleep(wait_time)
+            self._last_hit[host] = time.monotonic()
+
+
 class LummStudioSpider:
-    def __init__(self):
+    def __init__(self, page_concurrency=4, image_concurrency=8, host_interval=0.3):
         self.base_url = "https://www.lummstudio.com"
         self.start_url = "https://www.lummstudio.com/docs/seo/miniclass"
         self.session = requests.Session()
+        # 不声明br压缩，避免未安装brotli时返回无法解码的内容
         self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+            'User-Agent': USER_AGENT,
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
             'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
-            'Accept-Encoding': 'gzip, deflate, br',
+            'Accept-Encoding': 'gzip, deflate',
             'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
         })
         self.scraped_urls = set()
         self.data = []
         
+        # 并发模式参数：页面与图片各自的并发上限，以及同一主机的最小请求间隔
+        self.page_concurrency = max(int(page_concurrency), 1)
+        self.image_concurrency = max(int(image_concurrency), 1)
+        self.host_interval = host_interval
+        self.crawl_stats = {}
+        self._inflight_images = {}
+        
     def get_page_content(self, url):
         """获取页面内容"""
         try:
-            # 更新请求头，移除可能导致问题的压缩设置
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-                'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
-                'Connection': 'keep-alive',
-            }
-            response = requests.get(url, headers=headers, timeout=15)
+            response = self.session.get(url, timeout=15)
             response.raise_for_status()
             return response.text
         except Exception as e:
@@ -187,6 +219,12 @@ class LummStudioSpider:
     
     def save_individual_html(self, article_data, html_content):
         """保存单个文章为HTML文件"""
+        # 创建完整的HTML页面
+        full_html = self.create_complete_html(article_data, html_content)
+        return self._write_article_html(article_data, full_html)
+    
+    def _write_article_html(self, article_data, full_html):
+        """写入文章HTML文件"""
         # 创建安全的文件名
         safe_title = re.sub(r'[<>:"/\\|?*]', '_', article_data.get('original_title', article_data.get('title', 'untitled')))
         safe_title = safe_title[:100]  # 限制文件名长度
@@ -199,7 +237,7 @@ class LummStudioSpider:
             filename = f"{safe_title}.html"
         
         # 创建保存目录
-        save_dir = os.path.join('src/spider/html_pages')
+        save_dir = os.path.join(HTML_PAGES_DIR)
         os.makedirs(save_dir, exist_ok=True)
         
         filepath = os.path.join(save_dir, filename)
@@ -209,9 +247,6 @@ class LummStudioSpider:
             os.remove(filepath)
             print(f"删除旧文件: {filename}")
         
-        # 创建完整的HTML页面
-        full_html = self.create_complete_html(article_data, html_content)
-        
         with open(filepath, 'w', encoding='utf-8') as f:
             f.write(full_html)
         
@@ -220,14 +255,7 @@ class LummStudioSpider:
     
     def create_complete_html(self, article_data, original_html):
         """创建完整的HTML页面"""
-        soup = BeautifulSoup(original_html, 'html.parser')
-        
-        # 提取主要内容
-        main_content = soup.find('main') or soup.find('article') or soup.find('div', {'class': re.compile(r'.*content.*')})
-        
-        if not main_content:
-            # 如果找不到主要内容区域，使用整个body
-            main_content = soup.find('body') or soup
+        main_content = self._extract_main_content(original_html)
         
         # 处理图片下载
         print(f"  正在处理图片...")
@@ -237,6 +265,22 @@ class LummStudioSpider:
         if failed_images:
             article_data['failed_images'] = failed_images
         
+        return self._render_article_html(article_data, main_content)
+    
+    @staticmethod
+    def _extract_main_content(original_html):
+        """提取文章主要内容区域"""
+        soup = BeautifulSoup(original_html, 'html.parser')
+        
+        main_content = soup.find('main') or soup.find('article') or soup.find('div', {'class': re.compile(r'.*content.*')})
+        
+        if not main_content:
+            # 如果找不到主要内容区域，使用整个body
+            main_content = soup.find('body') or soup
+        return main_content
+    
+    def _render_article_html(self, article_data, main_content):
+        """渲染完整文章页面"""
         # 创建新的HTML文档
         html_template = f"""<!DOCTYPE html>
 <html lang="zh-CN">
@@ -345,9 +389,9 @@ class LummStudioSpider:
         
         return html_template
     
-    def download_image(self, img_url, save_dir, max_retries=3):
-        """下载图片到本地，支持重试机制"""
-        # 生成图片文件名
+    @staticmethod
+    def _image_filename(img_url):
+        """根据图片URL生成安全的本地文件名"""
         parsed_url = urlparse(img_url)
         img_name = os.path.basename(parsed_url.path)
         if not img_name or '.' not in img_name:
@@ -356,7 +400,21 @@ class LummStudioSpider:
             img_name = f"image_{img_hash}.jpg"
         
         # 确保文件名安全
-        img_name = re.sub(r'[<>:"/\\|?*]', '_', img_name)
+        return re.sub(r'[<>:"/\\|?*]', '_', img_name)
+    
+    def _resolve_image_url(self, src):
+        """转换为绝对URL，无法处理的相对路径返回None"""
+        if src.startswith('//'):
+            return 'https:' + src
+        if src.startswith('/'):
+            return urljoin(self.base_url, src)
+        if src.startswith('http'):
+            return src
+        return None
+    
+    def download_image(self, img_url, save_dir, max_retries=3):
+        """下载图片到本地，支持重试机制"""
+        img_name = self._image_filename(img_url)
         img_path = os.path.join(save_dir, img_name)
         
         # 如果图片已存在，直接返回
@@ -366,12 +424,9 @@ class LummStudioSpider:
         # 重试下载
         for attempt in range(max_retries):
             try:
-                headers = {
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-                    'Referer': 'https://www.lummstudio.com/'
-                }
+                headers = {'Referer': 'https://www.lummstudio.com/'}
                 
-                response = requests.get(img_url, headers=headers, timeout=15, stream=True)
+                response = self.session.get(img_url, headers=headers, timeout=15, stream=True)
                 response.raise_for_status()
                 
                 with open(img_path, 'wb') as f:
@@ -396,7 +451,7 @@ class LummStudioSpider:
         """处理HTML中的图片，下载到本地并更新链接"""
         # 创建图片保存目录
         safe_title = re.sub(r'[<>:"/\\|?*]', '_', article_title)[:50]
-        img_dir = os.path.join('src/spider/html_pages/images', safe_title)
+        img_dir = os.path.join(HTML_PAGES_DIR, 'images', safe_title)
         os.makedirs(img_dir, exist_ok=True)
         
         # 查找所有图片标签
@@ -410,13 +465,8 @@ class LummStudioSpider:
                 continue
             
             # 转换为绝对URL
-            if src.startswith('//'):
-                img_url = 'https:' + src
-            elif src.startswith('/'):
-                img_url = urljoin(self.base_url, src)
-            elif src.startswith('http'):
-                img_url = src
-            else:
+            img_url = self._resolve_image_url(src)
+            if not img_url:
                 continue
             
             # 下载图片
@@ -438,7 +488,7 @@ class LummStudioSpider:
     
     def cleanup_old_html_files(self):
         """清理旧的HTML文件和图片"""
-        save_dir = os.path.join('src/spider/html_pages')
+        save_dir = os.path.join(HTML_PAGES_DIR)
         if os.path.exists(save_dir):
             # 清理HTML文件
             html_files = [f for f in os.listdir(save_dir) if f.endswith('.html') and f != 'index.html']
@@ -465,8 +515,18 @@ class LummStudioSpider:
             if html_files:
                 print("旧文件清理完成")
     
-    def crawl(self):
-        """开始爬取"""
+    def crawl(self, async_mode=True):
+        """开始爬取
+
+        Args:
+            async_mode: 是否使用并发模式（需要aiohttp），否则逐篇同步爬取
+        """
+        if async_mode and aiohttp is not None:
+            return asyncio.run(self.crawl_async())
+        return self._crawl_sync()
+    
+    def _crawl_sync(self):
+        """同步逐篇爬取"""
         print("开始爬取 LummStudio SEO 小课堂...")
         
         # 清理旧的HTML文件
@@ -526,6 +586,327 @@ class LummStudioSpider:
             'data': self.data
         }
 
+    # ------------------------------------------------------------------
+    # 并发模式
+    # ------------------------------------------------------------------
+    async def crawl_async(self):
+        """并发爬取：页面与图片分别使用有界并发池，共享连接池与按主机的请求间隔
+
+        已爬取文章记录在爬取状态文件中，再次爬取时发送条件请求，未变化的文章直接复用；
+        图片按URL与内容哈希去重，已在本地的图片不再下载。
+        """
+        print("开始爬取 LummStudio SEO 小课堂 (并发模式)...")
+        started = time.perf_counter()
+        state = self._load_crawl_state()
+        self.crawl_stats = {
+            'articles_fetched': 0,
+            'articles_not_modified': 0,
+            'articles_unchanged': 0,
+            'articles_failed': 0,
+            'images_downloaded': 0,
+            'images_reused': 0,
+            'images_failed': 0,
+        }
+        self._inflight_images = {}
+        throttle = _HostThrottle(self.host_interval)
+        connector = aiohttp.TCPConnector(limit=self.page_concurrency + self.image_concurrency, ttl_dns_cache=300)
+        timeout = aiohttp.ClientTimeout(total=15)
+        
+        async with aiohttp.ClientSession(headers=dict(self.session.headers), connector=connector,
+                                         timeout=timeout) as session:
+            print(f"正在获取主页面: {self.start_url}")
+            _, main_content, _ = await self._fetch_page_async(session, throttle, self.start_url)
+            if not main_content:
+                print("无法获取主页面内容")
+                return
+            
+            article_links = self.parse_article_links(main_content)
+            print(f"找到 {len(article_links)} 篇文章")
+            
+            pending = []
+            seen = set(self.scraped_urls)
+            for link_info in article_links:
+                if link_info['url'] not in seen:
+                    seen.add(link_info['url'])
+                    pending.append(link_info)
+            
+            page_semaphore = asyncio.Semaphore(self.page_concurrency)
+            image_semaphore = asyncio.Semaphore(self.image_concurrency)
+            results = await asyncio.gather(*(
+                self._crawl_article_async(session, throttle, page_semaphore, image_semaphore, link_info, state)
+                for link_info in pending
+            ))
+        
+        html_files = []
+        for link_info, (article_data, html_file) in zip(pending, results):
+            if article_data:
+                self.data.append(article_data)
+                self.scraped_urls.add(link_info['url'])
+                html_files.append(html_file)
+        
+        self._remove_delisted_articles(state, {link_info['url'] for link_info in article_links})
+        self._prune_stale_outputs(state, html_files)
+        self._save_crawl_state(state)
+        
+        stats = self.crawl_stats
+        print(f"爬取完成！共获取 {len(self.data)} 篇文章，耗时 {time.perf_counter() - started:.1f}s")
+        print(f"  新抓取 {stats['articles_fetched']} 篇，未修改 {stats['articles_not_modified']} 篇，"
+              f"内容未变 {stats['articles_unchanged']} 篇，失败 {stats['articles_failed']} 篇")
+        print(f"  图片下载 {stats['images_downloaded']} 张，复用 {stats['images_reused']} 张，"
+              f"失败 {stats['images_failed']} 张")
+        
+        json_file = self.save_data()
+        md_file = self.save_markdown()
+        
+        return {
+            'total_articles': len(self.data),
+            'json_file': json_file,
+            'markdown_file': md_file,
+            'html_files': html_files,
+            'data': self.data,
+            'stats': dict(stats)
+        }
+    
+    async def _fetch_page_async(self, session, throttle, url, headers=None):
+        """获取页面，返回 (状态码, 内容, 响应头)；失败时内容为None"""
+        try:
+            await throttle.wait(url)
+            async with session.get(url, headers=headers) as response:
+                if response.status == 304:
+                    return 304, None, response.headers
+                response.raise_for_status()
+                return response.status, await response.text(), response.headers
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"获取页面失败 {url}: {e}")
+            return None, None, {}
+    
+    async def _crawl_article_async(self, session, throttle, page_semaphore, image_semaphore, link_info, state):
+        """爬取单篇文章，返回 (文章数据, HTML文件路径)"""
+        url = link_info['url']
+        cached = state['articles'].get(url)
+        reusable = bool(cached and cached.get('html_file') and os.path.exists(cached['html_file']))
+        
+        conditional_headers = {}
+        if reusable:
+            if cached.get('etag'):
+                conditional_headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                conditional_headers['If-Modified-Since'] = cached['last_modified']
+        
+        async with page_semaphore:
+            status, content, headers = await self._fetch_page_async(
+                session, throttle, url, conditional_headers or None
+            )
+        
+        if status == 304 and reusable:
+            self.crawl_stats['articles_not_modified'] += 1
+            print(f"未修改，复用本地文件: {link_info['title']}")
+            return cached['data'], cached['html_file']
+        
+        if not content:
+            self.crawl_stats['articles_failed'] += 1
+            print(f"跳过无法获取的页面: {url}")
+            return None, None
+        
+        content_hash = hashlib.sha256(content.encode('utf-8')).hexdigest()
+        validators = {'etag': headers.get('ETag'), 'last_modified': headers.get('Last-Modified')}
+        if reusable and cached.get('content_hash') == content_hash:
+            self.crawl_stats['articles_unchanged'] += 1
+            cached.update(validators)
+            print(f"内容未变化，复用本地文件: {link_info['title']}")
+            return cached['data'], cached['html_file']
+        
+        print(f"正在处理: {link_info['title']}")
+        article_data = self.parse_article_content(content, url)
+        article_data.update({
+            'original_title': link_info['title'],
+            'date': link_info['date']
+        })
+        
+        main_content = self._extract_main_content(content)
+        main_content, failed_images = await self._process_images_async(
+            session, throttle, image_semaphore, main_content,
+            article_data.get('original_title', article_data.get('title', 'untitled')), state
+        )
+        if failed_images:
+            article_data['failed_images'] = failed_images
+        
+        html_file = self._write_article_html(article_data, self._render_article_html(article_data, main_content))
+        if cached and cached.get('html_file') not in (None, html_file) and os.path.exists(cached['html_file']):
+            os.remove(cached['html_file'])
+        
+        state['articles'][url] = dict(validators, content_hash=content_hash, html_file=html_file, data=article_data)
+        self.crawl_stats['articles_fetched'] += 1
+        return article_data, html_file
+    
+    async def _process_images_async(self, session, throttle, image_semaphore, soup, article_title, state):
+        """并发下载文章中的图片并更新链接"""
+        safe_title = re.sub(r'[<>:"/\\|?*]', '_', article_title)[:50]
+        img_dir = os.path.join(HTML_PAGES_DIR, 'images', safe_title)
+        os.makedirs(img_dir, exist_ok=True)
+        
+        targets = []
+        for img in soup.find_all('img'):
+            src = img.get('src')
+            img_url = self._resolve_image_url(src) if src else None
+            if img_url:
+                targets.append((img, img_url))
+        
+        results = await asyncio.gather(*(
+            self._get_image_async(session, throttle, image_semaphore, img_url, img_dir, safe_title, state)
+            for _, img_url in targets
+        ))
+        
+        failed_images = []
+        for (img, _), (relative_path, failed_info) in zip(targets, results):
+            if relative_path:
+                img['src'] = relative_path
+            elif failed_info:
+                failed_images.append(failed_info)
+        return soup, failed_images
+    
+    def _get_image_async(self, session, throttle, image_semaphore, img_url, img_dir, safe_title, state):
+        """同一图片URL在一次爬取中只下载一次"""
+        task = self._inflight_images.get(img_url)
+        if task is None:
+            task = asyncio.ensure_future(
+                self._download_image_async(session, throttle, image_semaphore, img_url, img_dir, safe_title, state)
+            )
+            self._inflight_images[img_url] = task
+        return task
+    
+    async def _download_image_async(self, session, throttle, image_semaphore, img_url, img_dir, safe_title,
+                                    state, max_retries=3):
+        """下载图片，返回 (相对HTML目录的路径, 失败信息)"""
+        known = state['images'].get(img_url)
+        if known and os.path.exists(os.path.join(HTML_PAGES_DIR, known['path'])):
+            self.crawl_stats['images_reused'] += 1
+            return known['path'], None
+        
+        img_name = self._image_filename(img_url)
+        img_path = os.path.join(img_dir, img_name)
+        body = None
+        for attempt in range(max_retries):
+            try:
+                await throttle.wait(img_url)
+                async with image_semaphore:
+                    async with session.get(img_url, headers={'Referer': 'https://www.lummstudio.com/'}) as response:
+                        response.raise_for_status()
+                        body = await response.read()
+                break
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt < max_retries - 1:
+                    print(f"  图片下载失败 (尝试 {attempt + 1}/{max_retries}): {img_name}")
+                    await asyncio.sleep(2)
+                else:
+                    print(f"  图片下载最终失败 {img_url}: {e}")
+                    self.crawl_stats['images_failed'] += 1
+                    return None, {'url': img_url, 'filename': img_name, 'path': img_path}
+        
+        # 按内容哈希去重：相同图片只保存一份
+        digest = hashlib.sha256(body).hexdigest()
+        existing = state['image_hashes'].get(digest)
+        if existing and os.path.exists(os.path.join(HTML_PAGES_DIR, existing)):
+            relative_path = existing
+            self.crawl_stats['images_reused'] += 1
+        else:
+            if os.path.exists(img_path):
+                # 同名但内容不同的图片，追加哈希前缀避免覆盖
+                stem, ext = os.path.splitext(img_name)
+                img_name = f"{stem}_{digest[:8]}{ext}"
+                img_path = os.path.join(img_dir, img_name)
+            with open(img_path, 'wb') as f:
+                f.write(body)
+            relative_path = f"images/{safe_title}/{img_name}"
+            state['image_hashes'][digest] = relative_path
+            self.crawl_stats['images_downloaded'] += 1
+            print(f"  图片已下载: {img_name}")
+        
+        state['images'][img_url] = {'path': relative_path, 'sha256': digest}
+        return relative_path, None
+    
+    def _remove_delisted_articles(self, state, listed_urls):
+        """删除已不在文章列表中的文章文件"""
+        for url in list(state['articles']):
+            if url in listed_urls:
+                continue
+            html_file = state['articles'].pop(url).get('html_file')
+            if html_file and os.path.exists(html_file):
+                os.remove(html_file)
+                print(f"删除已下线文章: {os.path.basename(html_file)}")
+    
+    def _prune_stale_outputs(self, state, html_files):
+        """与同步模式的清理保持一致：输出目录只保留本次爬取的文章及其引用的图片
+
+        同步模式在爬取前清空目录；并发模式需要复用已有文件，改为爬取后删除未被本次结果引用的文件。
+        """
+        save_dir = os.path.join(HTML_PAGES_DIR)
+        if not os.path.exists(save_dir):
+            return
+        
+        keep_html = {os.path.abspath(path) for path in html_files}
+        referenced_images = set()
+        for path in keep_html:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    page = f.read()
+            except OSError:
+                continue
+            referenced_images.update(
+                html.unescape(src) for src in re.findall(r'src="(images/[^"]+)"', page)
+            )
+        
+        for file in os.listdir(save_dir):
+            file_path = os.path.join(save_dir, file)
+            if file.endswith('.html') and file != 'index.html' and os.path.abspath(file_path) not in keep_html:
+                try:
+                    os.remove(file_path)
+                    print(f"删除旧文件: {file}")
+                except Exception as e:
+                    print(f"删除文件失败 {file}: {e}")
+        
+        img_dir = os.path.join(save_dir, 'images')
+        removed_images = 0
+        for root, dirs, files in os.walk(img_dir, topdown=False):
+            for file in files:
+                file_path = os.path.join(root, file)
+                relative_path = os.path.relpath(file_path, save_dir).replace(os.sep, '/')
+                if relative_path not in referenced_images:
+                    os.remove(file_path)
+                    removed_images += 1
+            if root != img_dir and not os.listdir(root):
+                os.rmdir(root)
+        if removed_images:
+            print(f"清理 {removed_images} 个未引用的图片文件")
+        
+        # 已删除图片对应的索引一并移除，下次需要时重新下载
+        state['images'] = {url: info for url, info in state['images'].items()
+                           if info.get('path') in referenced_images}
+        state['image_hashes'] = {digest: path for digest, path in state['image_hashes'].items()
+                                 if path in referenced_images}
+    
+    @staticmethod
+    def _load_crawl_state():
+        state = {'articles': {}, 'images': {}, 'image_hashes': {}}
+        if os.path.exists(CRAWL_STATE_FILE):
+            try:
+                with open(CRAWL_STATE_FILE, 'r', encoding='utf-8') as f:
+                    loaded = json.load(f)
+                for key in state:
+                    if isinstance(loaded.get(key), dict):
+                        state[key] = loaded[key]
+            except Exception as e:
+                print(f"读取爬取状态失败，将全量爬取: {e}")
+        return state
+    
+    @staticmethod
+    def _save_crawl_state(state):
+        os.makedirs(HTML_PAGES_DIR, exist_ok=True)
+        tmp_path = CRAWL_STATE_FILE + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(tmp_path, CRAWL_STATE_FILE)
+
 def main():
     spider = LummStudioSpider()
     result = spider.crawl()
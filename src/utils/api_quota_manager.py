@@ -5,13 +5,50 @@ API配额管理器
 管理各种API的月度限制和降级逻辑
 """
 
+import atexit
 import json
 import os
+import tempfile
+import threading
+from contextlib import contextmanager
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional, Callable
+from typing import Dict, Any, Optional, Callable, Iterator
 from dataclasses import dataclass, asdict
 import pandas as pd
 
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+# 每次从共享配额文件预留的调用次数上限
+DEFAULT_RESERVE_BATCH = 20
+
+
+@contextmanager
+def _locked_file(lock_path: str) -> Iterator[None]:
+    """跨进程独占锁（锁文件 + flock/msvcrt），平台不支持时退化为无锁"""
+    os.makedirs(os.path.dirname(lock_path) or '.', exist_ok=True)
+    with open(lock_path, 'a+b') as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        elif msvcrt is not None:  # pragma: no cover - Windows
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            elif msvcrt is not None:  # pragma: no cover - Windows
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
 @dataclass
 class APIQuota:
     """API配额配置"""
@@ -29,12 +66,22 @@ class APIQuota:
             self.reset_date = next_month.replace(day=1).strftime("%Y-%m-%d")
 
 class APIQuotaManager:
-    """API配额管理器"""
+    """API配额管理器
+
+    配额文件中的 current_usage 记录所有进程已预留的调用次数。进程在文件锁下
+    按批预留配额并原子写回，之后在本地扣减预留额度，不再为每次调用读写磁盘；
+    多个进程的预留总和不会超过月度上限。未用完的预留在 flush() 或进程退出时归还。
+    """
     
-    def __init__(self, quota_file: str = "config/api_quotas.json"):
+    def __init__(self, quota_file: str = "config/api_quotas.json", reserve_batch: int = DEFAULT_RESERVE_BATCH):
         self.quota_file = quota_file
+        self.lock_file = f"{quota_file}.lock"
+        self.reserve_batch = max(int(reserve_batch), 1)
         self.quotas: Dict[str, APIQuota] = {}
         self.fallback_handlers: Dict[str, Callable] = {}
+        # API名称 -> [本地剩余预留次数, 预留时的重置日期]
+        self._reservations: Dict[str, list] = {}
+        self._lock = threading.RLock()
         
         # 默认API配额配置
         self.default_quotas = {
@@ -51,19 +98,15 @@ class APIQuotaManager:
     def load_quotas(self):
         """加载配额数据"""
         try:
-            if os.path.exists(self.quota_file):
-                with open(self.quota_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                
-                for api_name, quota_data in data.items():
-                    self.quotas[api_name] = APIQuota(**quota_data)
-                    
-                print(f"✓ 已加载API配额配置: {len(self.quotas)} 个API")
-            else:
-                # 使用默认配置
-                self.quotas = self.default_quotas.copy()
-                self.save_quotas()
-                print("✓ 已创建默认API配额配置")
+            with _locked_file(self.lock_file):
+                if os.path.exists(self.quota_file):
+                    self._read_quota_file()
+                    print(f"✓ 已加载API配额配置: {len(self.quotas)} 个API")
+                else:
+                    # 使用默认配置
+                    self.quotas = self.default_quotas.copy()
+                    self._write_quota_file()
+                    print("✓ 已创建默认API配额配置")
                 
         except Exception as e:
             print(f"⚠️ 加载API配额配置失败: {e}")
@@ -72,18 +115,46 @@ class APIQuotaManager:
     def save_quotas(self):
         """保存配额数据"""
         try:
-            os.makedirs(os.path.dirname(self.quota_file), exist_ok=True)
-            
-            data = {}
-            for api_name, quota in self.quotas.items():
-                data[api_name] = asdict(quota)
-            
-            with open(self.quota_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            with self._lock, _locked_file(self.lock_file):
+                self._write_quota_file()
                 
         except Exception as e:
             print(f"⚠️ 保存API配额配置失败: {e}")
     
+    def _read_quota_file(self):
+        """读取配额文件（调用方持有文件锁），文件中没有的API保留本地配置"""
+        with open(self.quota_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        
+        for api_name, quota_data in data.items():
+            self.quotas[api_name] = APIQuota(**quota_data)
+    
+    def _write_quota_file(self):
+        """原子写入配额文件（临时文件 + 重命名，调用方持有文件锁）"""
+        directory = os.path.dirname(self.quota_file) or '.'
+        os.makedirs(directory, exist_ok=True)
+        
+        data = {}
+        for api_name, quota in self.quotas.items():
+            data[api_name] = asdict(quota)
+        
+        fd, tmp_path = tempfile.mkstemp(prefix='.api_quotas.', suffix='.tmp', dir=directory)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+            os.replace(tmp_path, self.quota_file)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+    
+    def _reserved(self, api_name: str) -> int:
+        """本进程尚未用完的预留次数（月度重置后作废）"""
+        reservation = self._reservations.get(api_name)
+        if not reservation or reservation[1] != self.quotas[api_name].reset_date:
+            return 0
+        return reservation[0]
+    
     def check_quota(self, api_name: str, required_calls: int = 1) -> Dict[str, Any]:
         """
         检查API配额
@@ -103,10 +174,11 @@ class APIQuotaManager:
                 "use_fallback": False
             }
         
-        quota = self.quotas[api_name]
-        
-        # 检查是否需要重置配额
-        self._check_reset_quota(api_name)
+        with self._lock:
+            # 检查是否需要重置配额
+            self._check_reset_quota(api_name)
+            quota = self.quotas[api_name]
+            reserved = self._reserved(api_name)
         
         # 检查API是否启用
         if not quota.enabled:
@@ -117,8 +189,8 @@ class APIQuotaManager:
                 "use_fallback": quota.fallback_enabled
             }
         
-        # 检查配额是否足够
-        remaining = quota.monthly_limit - quota.current_usage
+        # 检查配额是否足够（本进程的预留额度计入可用量）
+        remaining = quota.monthly_limit - quota.current_usage + reserved
         if remaining < required_calls:
             return {
                 "available": False,
@@ -148,32 +220,118 @@ class APIQuotaManager:
         if api_name not in self.quotas:
             return True  # 未配置限制的API直接允许
         
-        quota_check = self.check_quota(api_name, calls_used)
-        if not quota_check["available"]:
-            return False
-        
-        # 更新使用量
-        self.quotas[api_name].current_usage += calls_used
-        self.save_quotas()
+        with self._lock:
+            self._check_reset_quota(api_name)
+            quota = self.quotas[api_name]
+            if not quota.enabled:
+                return False
+            if calls_used <= 0:
+                return True
+            
+            reserved = self._reserved(api_name)
+            if reserved < calls_used and not self._reserve_quota(api_name, calls_used - reserved):
+                return False
+            
+            # 在本地预留额度内扣减，无需读写磁盘
+            self._reservations[api_name][0] -= calls_used
+            return True
+    
+    def _reserve_quota(self, api_name: str, needed: int) -> bool:
+        """
+        在文件锁下从共享配额文件预留一批调用次数
         
-        print(f"📊 {api_name} API使用量: {self.quotas[api_name].current_usage}/{self.quotas[api_name].monthly_limit}")
+        Args:
+            api_name: API名称
+            needed: 至少需要预留的次数
+            
+        Returns:
+            bool: 剩余配额是否足以满足 needed
+        """
+        try:
+            with _locked_file(self.lock_file):
+                if os.path.exists(self.quota_file):
+                    self._read_quota_file()
+                self._check_reset_quota(api_name, persist=False)
+                quota = self.quotas[api_name]
+                available = quota.monthly_limit - quota.current_usage
+                if not quota.enabled or available < needed:
+                    return False
+                
+                # 配额所剩不多时缩小批量，避免单个进程占住其余进程的额度
+                batch = min(self.reserve_batch, max(available // 10, 1))
+                granted = min(max(needed, batch), available)
+                quota.current_usage += granted
+                self._write_quota_file()
+        except Exception as e:
+            print(f"⚠️ 预留API配额失败: {e}")
+            return False
         
+        self._reservations[api_name] = [self._reserved(api_name) + granted, quota.reset_date]
+        print(f"📊 {api_name} API预留 {granted} 次，使用量: {quota.current_usage}/{quota.monthly_limit}")
         return True
     
-    def _check_reset_quota(self, api_name: str):
+    def flush(self):
+        """将本进程未用完的预留额度归还到共享配额文件"""
+        with self._lock:
+            pending = {
+                api_name: (reservation[0], reservation[1])
+                for api_name, reservation in self._reservations.items()
+                if reservation[0] > 0
+            }
+            self._reservations.clear()
+            if not pending:
+                return
+            
+            try:
+                with _locked_file(self.lock_file):
+                    if os.path.exists(self.quota_file):
+                        self._read_quota_file()
+                    for api_name, (unused, reset_date) in pending.items():
+                        quota = self.quotas.get(api_name)
+                        # 预留之后已跨月重置的额度无需归还
+                        if quota is not None and quota.reset_date == reset_date:
+                            quota.current_usage = max(quota.current_usage - unused, 0)
+                    self._write_quota_file()
+            except Exception as e:
+                print(f"⚠️ 归还API配额预留失败: {e}")
+    
+    def _check_reset_quota(self, api_name: str, persist: bool = True):
         """检查是否需要重置配额"""
+        if not self._reset_due(api_name):
+            return
+        
+        if not persist:
+            self._reset_quota(api_name)
+            return
+        
+        try:
+            with _locked_file(self.lock_file):
+                # 其他进程可能已完成重置，以文件中的最新状态为准
+                if os.path.exists(self.quota_file):
+                    self._read_quota_file()
+                if self._reset_due(api_name):
+                    self._reset_quota(api_name)
+                    self._write_quota_file()
+        except Exception as e:
+            print(f"⚠️ 保存API配额配置失败: {e}")
+            if self._reset_due(api_name):
+                self._reset_quota(api_name)
+    
+    def _reset_due(self, api_name: str) -> bool:
+        reset_date = datetime.strptime(self.quotas[api_name].reset_date, "%Y-%m-%d")
+        return datetime.now() >= reset_date
+    
+    def _reset_quota(self, api_name: str):
+        """重置配额并作废本进程在上个周期的预留"""
         quota = self.quotas[api_name]
         reset_date = datetime.strptime(quota.reset_date, "%Y-%m-%d")
+        quota.current_usage = 0
+        # 设置下个月的重置日期
+        next_month = reset_date.replace(day=1) + timedelta(days=32)
+        quota.reset_date = next_month.replace(day=1).strftime("%Y-%m-%d")
+        self._reservations.pop(api_name, None)
         
-        if datetime.now() >= reset_date:
-            # 重置配额
-            quota.current_usage = 0
-            # 设置下个月的重置日期
-            next_month = reset_date.replace(day=1) + timedelta(days=32)
-            quota.reset_date = next_month.replace(day=1).strftime("%Y-%m-%d")
-            
-            print(f"🔄 {api_name} API配额已重置")
-            self.save_quotas()
+        print(f"🔄 {api_name} API配额已重置")
     
     def _register_fallback_handlers(self):
         """注册降级处理器"""
@@ -218,16 +376,21 @@ class APIQuotaManager:
         """获取所有API的配额状态"""
         status = {}
         
-        for api_name, quota in self.quotas.items():
-            self._check_reset_quota(api_name)
+        # 重置检查可能重新读取配额文件并替换 self.quotas 中的条目，需遍历键的快照并在检查后重新取值
+        for api_name in list(self.quotas):
+            with self._lock:
+                self._check_reset_quota(api_name)
+                quota = self.quotas[api_name]
+                # 本进程预留但尚未使用的次数不计入使用量
+                current_usage = quota.current_usage - self._reserved(api_name)
             
-            remaining = quota.monthly_limit - quota.current_usage
-            usage_percent = (quota.current_usage / quota.monthly_limit) * 100
+            remaining = quota.monthly_limit - current_usage
+            usage_percent = (current_usage / quota.monthly_limit) * 100
             
             status[api_name] = {
                 "enabled": quota.enabled,
                 "monthly_limit": quota.monthly_limit,
-                "current_usage": quota.current_usage,
+                "current_usage": current_usage,
                 "remaining": remaining,
                 "usage_percent": round(usage_percent, 1),
                 "reset_date": quota.reset_date,
@@ -259,14 +422,24 @@ class APIQuotaManager:
 
 # 全局配额管理器实例
 _quota_manager = None
+_quota_manager_lock = threading.Lock()
 
 def get_quota_manager() -> APIQuotaManager:
     """获取全局配额管理器实例"""
     global _quota_manager
     if _quota_manager is None:
-        _quota_manager = APIQuotaManager()
+        with _quota_manager_lock:
+            if _quota_manager is None:
+                _quota_manager = APIQuotaManager()
     return _quota_manager
 
+def flush_quota_manager():
+    """进程退出时归还全局配额管理器的未用预留"""
+    if _quota_manager is not None:
+        _quota_manager.flush()
+
+atexit.register(flush_quota_manager)
+
 def check_api_quota(api_name: str, required_calls: int = 1) -> Dict[str, Any]:
     """快捷方式：检查API配额"""
     return get_quota_manager().check_quota(api_name, required_calls)
@@ -5,18 +5,147 @@ from __future__ import annotations
 import json
 import threading
 import time
+import weakref
+from bisect import bisect_left
 from contextlib import contextmanager
 from copy import deepcopy
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+# Fixed upper bounds (seconds) shared by request latency and stage duration histograms.
+LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0,
+)
+PERCENTILES: Tuple[float, ...] = (0.5, 0.95, 0.99)
+METRIC_PREFIX = "find_demand"
 
 
 def _utc_now_iso() -> str:
     return datetime.utcnow().replace(microsecond=0).isoformat() + "Z"
 
 
+def _utc_iso(timestamp: float) -> str:
+    return datetime.utcfromtimestamp(timestamp).replace(microsecond=0).isoformat() + "Z"
+
+
+class LatencyHistogram:
+    """Fixed-bucket histogram; cheap to update and mergeable across shards."""
+
+    __slots__ = ("bounds", "counts", "count", "total", "max")
+
+    def __init__(self, bounds: Tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # last slot is the +Inf bucket
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        if value < 0.0:
+            value = 0.0
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        for index, bucket_count in enumerate(other.counts):
+            self.counts[index] += bucket_count
+        self.count += other.count
+        self.total += other.total
+        if other.max > self.max:
+            self.max = other.max
+
+    def percentile(self, quantile: float) -> float:
+        """Estimate a quantile by linear interpolation inside the matching bucket."""
+        if self.count == 0:
+            return 0.0
+        rank = quantile * self.count
+        cumulative = 0
+        lower = 0.0
+        for index, bucket_count in enumerate(self.counts):
+            upper = self.bounds[index] if index < len(self.bounds) else self.max
+            if bucket_count and cumulative + bucket_count >= rank:
+                fraction = (rank - cumulative) / bucket_count
+                return min(lower + (upper - lower) * fraction, self.max)
+            cumulative += bucket_count
+            lower = upper
+        return self.max
+
+    def percentiles(self) -> Dict[str, float]:
+        summary = {f"p{int(q * 100)}": self.percentile(q) for q in PERCENTILES}
+        summary["max"] = self.max
+        return summary
+
+    def cumulative_buckets(self) -> Iterable[Tuple[str, int]]:
+        cumulative = 0
+        for index, bucket_count in enumerate(self.counts):
+            cumulative += bucket_count
+            bound = _format_number(self.bounds[index]) if index < len(self.bounds) else "+Inf"
+            yield bound, cumulative
+
+
+class _RequestShard:
+    """Per-thread request accumulator; its lock is only contended while merging on read."""
+
+    __slots__ = ("lock", "total", "errors", "rate_limited", "by_status", "by_host", "last_request", "owner")
+
+    def __init__(self, owner: Optional[threading.Thread] = None) -> None:
+        self.lock = threading.Lock()
+        self.total = 0
+        self.errors = 0
+        self.rate_limited = 0
+        self.by_status: Dict[str, List[int]] = {}
+        # host -> [total, errors, rate_limited, LatencyHistogram]
+        self.by_host: Dict[str, List[Any]] = {}
+        self.last_request: Optional[Tuple[Any, ...]] = None
+        # recording thread, held weakly so finished threads can be detected; None for aggregates
+        self.owner = weakref.ref(owner) if owner is not None else None
+
+    def is_orphaned(self) -> bool:
+        if self.owner is None:
+            return False
+        thread = self.owner()
+        return thread is None or not thread.is_alive()
+
+    def absorb(self, other: "_RequestShard") -> None:
+        """Add ``other``'s counts into this shard; the caller holds ``other.lock``."""
+        self.total += other.total
+        self.errors += other.errors
+        self.rate_limited += other.rate_limited
+        for status, (count, errors) in other.by_status.items():
+            status_entry = self.by_status.get(status)
+            if status_entry is None:
+                status_entry = self.by_status[status] = [0, 0]
+            status_entry[0] += count
+            status_entry[1] += errors
+        for host, (total, errors, rate_limited, histogram) in other.by_host.items():
+            merged = self.by_host.get(host)
+            if merged is None:
+                merged = self.by_host[host] = [0, 0, 0, LatencyHistogram()]
+            merged[0] += total
+            merged[1] += errors
+            merged[2] += rate_limited
+            merged[3].merge(histogram)
+        if other.last_request and (self.last_request is None or other.last_request[0] >= self.last_request[0]):
+            self.last_request = other.last_request
+
+
+def _format_number(value: float) -> str:
+    if value == int(value):
+        return f"{value:.1f}"
+    return repr(float(value))
+
+
+def _escape_label(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
 @dataclass
 class _StageToken:
     name: str
@@ -37,6 +166,12 @@ class TelemetryManager:
         with self._lock:
             now = _utc_now_iso()
             self._session_started = time.perf_counter()
+            # request metrics are accumulated in per-thread shards and merged on read
+            self._local = threading.local()
+            self._shards: List[_RequestShard] = []
+            # shards of finished threads are folded in here so the shard list tracks live threads only
+            self._retired_requests = _RequestShard()
+            self._stage_histograms: Dict[str, LatencyHistogram] = {}
             self._data: Dict[str, Any] = {
                 "run_id": run_id or now,
                 "session_started_at": now,
@@ -45,13 +180,6 @@ class TelemetryManager:
                     "stages": {},
                     "counters": {},
                     "gauges": {},
-                    "requests": {
-                        "total": 0,
-                        "errors": 0,
-                        "rate_limited": 0,
-                        "by_host": {},
-                        "by_status": {},
-                    },
                     "events": [],
                 },
             }
@@ -104,6 +232,11 @@ class TelemetryManager:
             if status != "completed":
                 stage_entry["failures"] += 1
 
+            histogram = self._stage_histograms.get(token.name)
+            if histogram is None:
+                histogram = self._stage_histograms[token.name] = LatencyHistogram()
+            histogram.observe(duration)
+
     def end_stage(
         self,
         token: _StageToken,
@@ -150,44 +283,94 @@ class TelemetryManager:
         ok: bool,
         elapsed: Optional[float] = None,
     ) -> None:
-        with self._lock:
-            metrics = self._data["metrics"]["requests"]
-            metrics["total"] += 1
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._register_shard()
 
+        rate_limited = status == 429
+        with shard.lock:
+            shard.total += 1
             if not ok:
-                metrics["errors"] += 1
+                shard.errors += 1
+            if rate_limited:
+                shard.rate_limited += 1
             if status is not None:
-                status_key = str(status)
-                by_status = metrics["by_status"]
-                status_entry = by_status.setdefault(status_key, {"count": 0, "errors": 0})
-                status_entry["count"] += 1
+                status_entry = shard.by_status.get(status)
+                if status_entry is None:
+                    status_entry = shard.by_status[status] = [0, 0]
+                status_entry[0] += 1
                 if not ok:
-                    status_entry["errors"] += 1
-                if status == 429:
-                    metrics["rate_limited"] += 1
+                    status_entry[1] += 1
 
-            host_entry = metrics["by_host"].setdefault(
-                host or "unknown",
-                {"total": 0, "errors": 0, "rate_limited": 0, "latency_sum": 0.0},
-            )
-            host_entry["total"] += 1
+            host_key = host or "unknown"
+            host_entry = shard.by_host.get(host_key)
+            if host_entry is None:
+                host_entry = shard.by_host[host_key] = [0, 0, 0, LatencyHistogram()]
+            host_entry[0] += 1
             if not ok:
-                host_entry["errors"] += 1
-            if status == 429:
-                host_entry["rate_limited"] += 1
+                host_entry[1] += 1
+            if rate_limited:
+                host_entry[2] += 1
             if elapsed is not None:
-                host_entry["latency_sum"] += max(elapsed, 0.0)
+                host_entry[3].observe(elapsed)
+
+            # keep a raw tuple for quick debugging; formatting happens on read
+            shard.last_request = (time.time(), host, method, url, status, ok, elapsed)
+
+    def _register_shard(self) -> _RequestShard:
+        shard = _RequestShard(threading.current_thread())
+        with self._lock:
+            self._retire_orphaned_shards()
+            self._shards.append(shard)
+            self._local.shard = shard
+        return shard
+
+    def _retire_orphaned_shards(self) -> None:
+        """Fold shards whose threads have finished into the retired aggregate; caller holds ``self._lock``."""
+        live: List[_RequestShard] = []
+        for shard in self._shards:
+            if shard.is_orphaned():
+                with shard.lock:
+                    self._retired_requests.absorb(shard)
+            else:
+                live.append(shard)
+        self._shards = live
 
-            # store last request preview for quick debugging
-            metrics["last_request"] = {
+    def _merge_requests(self) -> Tuple[Dict[str, Any], Dict[str, List[Any]]]:
+        """Merge per-thread shards into request totals plus per-host histograms."""
+        merged = _RequestShard()
+        # hold the registry lock so a shard cannot be retired (and counted twice) mid-merge;
+        # recording threads only take their own shard lock
+        with self._lock:
+            self._retire_orphaned_shards()
+            merged.absorb(self._retired_requests)
+            for shard in self._shards:
+                with shard.lock:
+                    merged.absorb(shard)
+
+        by_status = {
+            str(status): {"count": count, "errors": errors}
+            for status, (count, errors) in merged.by_status.items()
+        }
+        requests: Dict[str, Any] = {
+            "total": merged.total,
+            "errors": merged.errors,
+            "rate_limited": merged.rate_limited,
+            "by_host": {},
+            "by_status": by_status,
+        }
+        if merged.last_request is not None:
+            timestamp, host, method, url, status, ok, elapsed = merged.last_request
+            requests["last_request"] = {
                 "host": host,
                 "method": method,
                 "url": url,
                 "status": status,
                 "ok": ok,
                 "elapsed": elapsed,
-                "timestamp": _utc_now_iso(),
+                "timestamp": _utc_iso(timestamp),
             }
+        return requests, merged.by_host
 
     # ------------------------------------------------------------------
     # Event helpers
@@ -208,27 +391,121 @@ class TelemetryManager:
     # ------------------------------------------------------------------
     def snapshot(self) -> Dict[str, Any]:
         with self._lock:
-            data = deepcopy(self._data)
+            metrics = self._data["metrics"]
+            data = {key: value for key, value in self._data.items() if key != "metrics"}
+            data["metadata"] = deepcopy(data["metadata"])
+            # stage entries only hold scalars plus payload references that are replaced, never mutated
+            data["metrics"] = {
+                "stages": {name: dict(entry) for name, entry in metrics["stages"].items()},
+                "counters": dict(metrics["counters"]),
+                "gauges": dict(metrics["gauges"]),
+                "events": list(metrics["events"]),
+            }
+            stage_percentiles = {name: hist.percentiles() for name, hist in self._stage_histograms.items()}
         uptime = max(time.perf_counter() - self._session_started, 0.0)
         data["uptime_seconds"] = uptime
 
-        # compute average latency per host when data available
-        for host_entry in data["metrics"]["requests"].get("by_host", {}).values():
-            total = host_entry.get("total", 0)
-            latency_sum = host_entry.pop("latency_sum", 0.0)
-            if total > 0:
-                host_entry["avg_latency"] = latency_sum / total
-            else:
-                host_entry["avg_latency"] = 0.0
+        for name, entry in data["metrics"]["stages"].items():
+            if name in stage_percentiles:
+                entry["duration_percentiles"] = stage_percentiles[name]
+
+        requests, by_host = self._merge_requests()
+        for host, (total, errors, rate_limited, histogram) in by_host.items():
+            requests["by_host"][host] = {
+                "total": total,
+                "errors": errors,
+                "rate_limited": rate_limited,
+                "latency_sum": histogram.total,
+                "avg_latency": histogram.total / total if total > 0 else 0.0,
+                "latency_percentiles": histogram.percentiles(),
+            }
+        data["metrics"]["requests"] = requests
         data["captured_at"] = _utc_now_iso()
         return data
 
+    # ------------------------------------------------------------------
+    # OpenMetrics export
+    # ------------------------------------------------------------------
+    def render_openmetrics(self) -> str:
+        """Render counters, gauges and latency histograms in OpenMetrics text format."""
+        with self._lock:
+            stages = {name: dict(entry) for name, entry in self._data["metrics"]["stages"].items()}
+            stage_histograms = {name: deepcopy(hist) for name, hist in self._stage_histograms.items()}
+            counters = dict(self._data["metrics"]["counters"])
+            gauges = dict(self._data["metrics"]["gauges"])
+            run_id = self._data["run_id"]
+        requests, by_host = self._merge_requests()
+        uptime = max(time.perf_counter() - self._session_started, 0.0)
+
+        lines: List[str] = []
+
+        def family(name: str, metric_type: str, help_text: str) -> str:
+            full_name = f"{METRIC_PREFIX}_{name}"
+            lines.append(f"# TYPE {full_name} {metric_type}")
+            lines.append(f"# HELP {full_name} {help_text}")
+            return full_name
+
+        def sample(name: str, labels: Dict[str, Any], value: Any) -> None:
+            rendered = ",".join(f'{key}="{_escape_label(val)}"' for key, val in labels.items())
+            label_part = f"{{{rendered}}}" if rendered else ""
+            lines.append(f"{name}{label_part} {value}")
+
+        def histogram_samples(name: str, labels: Dict[str, Any], hist: LatencyHistogram) -> None:
+            for bound, cumulative in hist.cumulative_buckets():
+                sample(f"{name}_bucket", dict(labels, le=bound), cumulative)
+            sample(f"{name}_count", labels, hist.count)
+            sample(f"{name}_sum", labels, repr(hist.total))
+
+        name = family("run", "info", "Telemetry run identifier.")
+        sample(f"{name}_info", {"run_id": run_id}, 1)
+        name = family("uptime_seconds", "gauge", "Seconds since the telemetry session started.")
+        sample(name, {}, repr(uptime))
+
+        for metric, help_text, index in (
+            ("requests", "HTTP requests issued per host.", 0),
+            ("request_errors", "Failed HTTP requests per host.", 1),
+            ("requests_rate_limited", "HTTP 429 responses per host.", 2),
+        ):
+            name = family(metric, "counter", help_text)
+            for host, entry in sorted(by_host.items()):
+                sample(f"{name}_total", {"host": host}, entry[index])
+
+        name = family("request_latency_seconds", "histogram", "HTTP request latency per host.")
+        for host, entry in sorted(by_host.items()):
+            histogram_samples(name, {"host": host}, entry[3])
+
+        name = family("stage_duration_seconds", "histogram", "Workflow stage duration.")
+        for stage_name, hist in sorted(stage_histograms.items()):
+            histogram_samples(name, {"stage": stage_name}, hist)
+        name = family("stage_failures", "counter", "Workflow stage runs that did not complete.")
+        for stage_name, entry in sorted(stages.items()):
+            sample(f"{name}_total", {"stage": stage_name}, entry.get("failures", 0))
+
+        name = family("counter", "counter", "Workflow counters recorded via increment_counter.")
+        for key, value in sorted(counters.items()):
+            sample(f"{name}_total", {"key": key}, value)
+        name = family("gauge", "gauge", "Numeric workflow gauges recorded via set_gauge.")
+        for key, value in sorted(gauges.items()):
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                sample(name, {"key": key}, value)
+
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def write_openmetrics(self, output_path: Path) -> Path:
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path.write_text(self.render_openmetrics(), encoding="utf-8")
+        return output_path
+
     def write_snapshot(self, output_path: Path) -> Path:
         output_path = Path(output_path)
         output_path.parent.mkdir(parents=True, exist_ok=True)
         payload = self.snapshot()
         with output_path.open("w", encoding="utf-8") as fh:
             json.dump(payload, fh, ensure_ascii=False, indent=2)
+        # OpenMetrics text lives next to the JSON snapshot (telemetry.json -> telemetry.prom)
+        self.write_openmetrics(output_path.with_suffix(".prom"))
         return output_path
 
 
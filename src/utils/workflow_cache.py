@@ -1,13 +1,44 @@
-"""Workflow-level cache manager for --all pipeline resume support."""
+"""Workflow-level cache manager for --all pipeline resume support.
+
+Stage outputs are stored in a compact binary container: msgpack (listed in
+requirements.txt), falling back to compact JSON when it is not installed, and
+zlib-compressed either way.  Tabular parts such as
+``DataFrame.to_dict('records')`` lists are laid out column-wise, and each stage
+entry is addressed by a content hash of the inputs that produced it so that
+identical inputs can reuse earlier outputs.
+"""
 
 from __future__ import annotations
 
+import hashlib
 import json
+import os
 import shutil
+import tempfile
 import time
+import zlib
 from pathlib import Path
 from typing import Any, Dict, Optional
 
+try:
+    import msgpack  # type: ignore
+except ImportError:  # pragma: no cover - fall back to compressed JSON
+    msgpack = None
+
+
+STAGE_FILE_MAGIC = b"FDWC1"
+CODEC_MSGPACK = b"m"
+CODEC_JSON = b"j"
+# 同一阶段保留的不同输入版本数量
+MAX_STAGE_ENTRIES = 3
+LATEST_INPUT_KEY = "latest"
+# zlib 级别 3 在体积与写入耗时之间取得平衡
+STAGE_COMPRESS_LEVEL = 3
+
+_RECORDS_MARKER = "__records__"
+_FRAME_MARKER = "__frame__"
+_SCALAR_TYPES = frozenset({str, int, float, bool, type(None)})
+
 
 def _utc_timestamp() -> str:
     return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
@@ -23,6 +54,88 @@ def _json_default(value: Any):  # pragma: no cover - helper for complex objects
     return str(value)
 
 
+def _is_dataframe(value: Any) -> bool:
+    return type(value).__name__ == "DataFrame" and hasattr(value, "to_dict") and hasattr(value, "columns")
+
+
+def _is_scalar_column(values: Any) -> bool:
+    return set(map(type, values)) <= _SCALAR_TYPES
+
+
+def _encode_column(values: list) -> list:
+    return values if _is_scalar_column(values) else [_encode_value(item) for item in values]
+
+
+def _decode_column(values: list) -> list:
+    return values if _is_scalar_column(values) else [_decode_value(item) for item in values]
+
+
+def _encode_value(value: Any) -> Any:
+    """Normalise a payload into plain containers, storing tabular data column-wise."""
+    if value is None or isinstance(value, (str, bool, int, float)):
+        return value
+    if isinstance(value, dict):
+        return {str(key): _encode_value(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        if len(value) > 1 and isinstance(value[0], dict):
+            columns = list(value[0].keys())
+            if columns and all(isinstance(row, dict) and list(row.keys()) == columns for row in value):
+                return {
+                    _RECORDS_MARKER: {
+                        "columns": [str(column) for column in columns],
+                        "data": [_encode_column([row[column] for row in value]) for column in columns],
+                    }
+                }
+        return _encode_column(list(value))
+    if isinstance(value, (set, frozenset)):
+        return [_encode_value(item) for item in value]
+    if _is_dataframe(value):
+        frame = value.astype(object).where(value.notnull(), None)
+        return {
+            _FRAME_MARKER: {
+                "columns": [str(column) for column in frame.columns],
+                "data": [_encode_column(frame[column].tolist()) for column in frame.columns],
+            }
+        }
+    if hasattr(value, "item") and type(value).__module__ == "numpy":
+        return value.item()
+    return _json_default(value)
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, list):
+        return _decode_column(value)
+    if not isinstance(value, dict):
+        return value
+    if len(value) == 1:
+        if _RECORDS_MARKER in value:
+            table = value[_RECORDS_MARKER]
+            columns = table["columns"]
+            data = [_decode_column(column) for column in table["data"]]
+            return [dict(zip(columns, row)) for row in zip(*data)]
+        if _FRAME_MARKER in value:
+            import pandas as pd
+
+            table = value[_FRAME_MARKER]
+            data = {column: _decode_column(values) for column, values in zip(table["columns"], table["data"])}
+            return pd.DataFrame(data, columns=table["columns"])
+    return {key: _decode_value(item) for key, item in value.items()}
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{path.name}.", dir=str(path.parent))
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
 class WorkflowCacheManager:
     """Manages persisted stage outputs for the --all workflow."""
 
@@ -66,9 +179,32 @@ class WorkflowCacheManager:
         if self.verbose:
             print(f"[WorkflowCache] {message}")
 
-    def _stage_file(self, stage: str) -> Path:
+    @staticmethod
+    def input_key(inputs: Optional[Any]) -> str:
+        """Content hash identifying the inputs a stage was computed from."""
+        if inputs is None:
+            return LATEST_INPUT_KEY
+        canonical = json.dumps(inputs, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=_json_default)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+    def _stage_file(self, stage: str, key: str = LATEST_INPUT_KEY) -> Path:
+        return self.cache_dir / f"{stage}.{key}.bin"
+
+    def _legacy_stage_file(self, stage: str) -> Path:
         return self.cache_dir / f"{stage}.json"
 
+    def _entries(self, stage: str) -> Dict[str, Dict[str, Any]]:
+        """Stage entries keyed by input hash; state written by older versions maps to one legacy entry."""
+        metadata = self._state.get("stages", {}).get(stage)
+        if not isinstance(metadata, dict):
+            return {}
+        entries = metadata.get("entries")
+        if entries is None and metadata.get("path"):
+            entries = {"legacy": {"path": metadata["path"], "cached_at": metadata.get("cached_at")}}
+            metadata["entries"] = entries
+            metadata["input_key"] = "legacy"
+        return entries or {}
+
     def _load_state(self) -> None:
         if not self.state_path.exists():
             return
@@ -82,8 +218,8 @@ class WorkflowCacheManager:
 
     def _save_state(self) -> None:
         try:
-            with self.state_path.open("w", encoding="utf-8") as fh:
-                json.dump(self._state, fh, ensure_ascii=False, indent=2)
+            data = json.dumps(self._state, ensure_ascii=False, separators=(",", ":"))
+            _write_atomic(self.state_path, data.encode("utf-8"))
         except Exception as exc:  # pragma: no cover - disk issues
             self._log(f"Failed to persist state.json: {exc}")
 
@@ -96,22 +232,68 @@ class WorkflowCacheManager:
             return True
         return age > self.ttl_seconds
 
+    @staticmethod
+    def _unlink(path: Path) -> None:
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+    def _drop_entry(self, stage: str, key: str) -> None:
+        entries = self._entries(stage)
+        entry = entries.pop(key, None)
+        if entry:
+            self._unlink(self.cache_dir / entry["path"])
+        metadata = self._state.get("stages", {}).get(stage)
+        if metadata is None:
+            return
+        if not entries:
+            self._state["stages"].pop(stage, None)
+        elif metadata.get("input_key") == key:
+            latest_key = next(reversed(entries))
+            metadata.update(entries[latest_key], input_key=latest_key)
+
     def _purge_expired(self) -> None:
-        stages = dict(self._state.get("stages", {}))
         changed = False
-        for stage, metadata in stages.items():
-            path = self._stage_file(stage)
-            if not path.exists() or self._is_expired(path):
-                if path.exists():
-                    try:
-                        path.unlink()
-                    except OSError:
-                        pass
-                self._state["stages"].pop(stage, None)
-                changed = True
+        for stage in list(self._state.get("stages", {})):
+            for key, entry in list(self._entries(stage).items()):
+                path = self.cache_dir / entry["path"]
+                if not path.exists() or self._is_expired(path):
+                    self._drop_entry(stage, key)
+                    changed = True
         if changed:
             self._save_state()
 
+    @staticmethod
+    def _serialize(record: Dict[str, Any]) -> bytes:
+        encoded = _encode_value(record)
+        if msgpack is not None:
+            codec, body = CODEC_MSGPACK, msgpack.packb(encoded, use_bin_type=True)
+        else:
+            codec = CODEC_JSON
+            body = json.dumps(encoded, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        return STAGE_FILE_MAGIC + codec + zlib.compress(body, STAGE_COMPRESS_LEVEL)
+
+    @staticmethod
+    def _deserialize(path: Path) -> Any:
+        raw = path.read_bytes()
+        if path.suffix == ".json":
+            return json.loads(raw.decode("utf-8"))
+        header_size = len(STAGE_FILE_MAGIC)
+        if raw[:header_size] != STAGE_FILE_MAGIC:
+            raise ValueError("unknown stage file format")
+        codec = raw[header_size:header_size + 1]
+        body = zlib.decompress(raw[header_size + 1:])
+        if codec == CODEC_MSGPACK:
+            if msgpack is None:
+                raise ValueError("stage stored with msgpack but msgpack is not installed")
+            decoded = msgpack.unpackb(body, raw=False, strict_map_key=False)
+        elif codec == CODEC_JSON:
+            decoded = json.loads(body.decode("utf-8"))
+        else:
+            raise ValueError(f"unknown stage codec {codec!r}")
+        return _decode_value(decoded)
+
     # ------------------------------------------------------------------
     # Public API
     # ------------------------------------------------------------------
@@ -128,57 +310,74 @@ class WorkflowCacheManager:
     def clear_stage(self, stage: str) -> None:
         if not self.enabled:
             return
-        path = self._stage_file(stage)
-        if path.exists():
-            try:
-                path.unlink()
-            except OSError:
-                pass
+        for entry in self._entries(stage).values():
+            self._unlink(self.cache_dir / entry["path"])
+        self._unlink(self._legacy_stage_file(stage))
         self._state.get("stages", {}).pop(stage, None)
         self._save_state()
 
-    def store_stage(self, stage: str, payload: Dict[str, Any]) -> None:
+    def store_stage(self, stage: str, payload: Dict[str, Any], *, inputs: Optional[Any] = None) -> None:
+        """Persist a stage payload; ``inputs`` (if given) addresses the entry by content hash."""
         if not self.enabled:
             return
-        record = {"cached_at": _utc_timestamp(), "payload": payload}
-        path = self._stage_file(stage)
+        key = self.input_key(inputs)
+        record = {"cached_at": _utc_timestamp(), "input_key": key, "payload": payload}
+        path = self._stage_file(stage, key)
         try:
-            with path.open("w", encoding="utf-8") as fh:
-                json.dump(record, fh, ensure_ascii=False, indent=2, default=_json_default)
-            self._state.setdefault("stages", {})[stage] = {
-                "path": path.name,
-                "cached_at": record["cached_at"],
-            }
+            _write_atomic(path, self._serialize(record))
+            entry = {"path": path.name, "cached_at": record["cached_at"]}
+
+            metadata = self._state.setdefault("stages", {}).setdefault(stage, {})
+            entries = self._entries(stage)
+            entries.pop(key, None)
+            entries[key] = entry
+            metadata.update(entry, input_key=key, entries=entries)
+            while len(entries) > MAX_STAGE_ENTRIES:
+                oldest_key = next(iter(entries))
+                self._unlink(self.cache_dir / entries.pop(oldest_key)["path"])
+
             self._save_state()
             self._log(f"Stage '{stage}' stored -> {path}")
         except Exception as exc:  # pragma: no cover - disk issues
             self._log(f"Failed to store stage '{stage}': {exc}")
 
-    def load_stage(self, stage: str) -> Optional[Dict[str, Any]]:
+    def load_stage(self, stage: str, *, inputs: Optional[Any] = None) -> Optional[Dict[str, Any]]:
+        """Load the latest stage entry, or the one computed from ``inputs`` when provided."""
         if not self.enabled:
             return None
-        path = self._stage_file(stage)
+        entries = self._entries(stage)
+        if inputs is None:
+            key = self._state.get("stages", {}).get(stage, {}).get("input_key")
+        else:
+            key = self.input_key(inputs)
+        entry = entries.get(key) if key else None
+        if entry is None:
+            return None
+
+        path = self.cache_dir / entry["path"]
         if not path.exists():
+            self._drop_entry(stage, key)
+            self._save_state()
             return None
         if self._is_expired(path):
             self._log(f"Stage '{stage}' expired; removing")
-            self.clear_stage(stage)
+            self._drop_entry(stage, key)
+            self._save_state()
             return None
         try:
-            with path.open("r", encoding="utf-8") as fh:
-                data = json.load(fh)
+            data = self._deserialize(path)
             if not isinstance(data, dict):
                 raise ValueError("invalid stage payload")
             data.setdefault("cached_at", _utc_timestamp())
             return data
         except Exception as exc:
             self._log(f"Failed to load stage '{stage}': {exc}")
-            self.clear_stage(stage)
+            self._drop_entry(stage, key)
+            self._save_state()
             return None
 
-    def has_stage(self, stage: str) -> bool:
-        return self.load_stage(stage) is not None
+    def has_stage(self, stage: str, *, inputs: Optional[Any] = None) -> bool:
+        return self.load_stage(stage, inputs=inputs) is not None
 
     def list_stages(self) -> Dict[str, Any]:
         return dict(self._state.get("stages", {})) if self.enabled else {}
-
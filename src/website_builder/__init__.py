@@ -3,18 +3,28 @@
 
 """
 基于搜索意图的网站自动建设工具包
+
+各导出项在首次访问时才导入：子模块（如 seo_optimizer、html_generator）可单独使用，
+不受其他建站模块缺失或导入开销的影响
 """
 
-from src.website_builder.simple_intent_website_builder import SimpleIntentWebsiteBuilder
-from src.website_builder.builder_core import IntentBasedWebsiteBuilder
-from src.website_builder.structure_generator import WebsiteStructureGenerator
-from src.website_builder.content_planner import ContentPlanGenerator
-from src.website_builder.page_templates import PageTemplateManager
-from src.website_builder.utils import (
-    ensure_dir, load_data_file, save_json_file, 
-    get_intent_description, generate_url_slug, 
-    format_date, truncate_text, count_words
-)
+import importlib
+
+_LAZY_EXPORTS = {
+    'SimpleIntentWebsiteBuilder': '.simple_intent_website_builder',
+    'IntentBasedWebsiteBuilder': '.builder_core',
+    'WebsiteStructureGenerator': '.structure_generator',
+    'ContentPlanGenerator': '.content_planner',
+    'PageTemplateManager': '.page_templates',
+    'ensure_dir': '.utils',
+    'load_data_file': '.utils',
+    'save_json_file': '.utils',
+    'get_intent_description': '.utils',
+    'generate_url_slug': '.utils',
+    'format_date': '.utils',
+    'truncate_text': '.utils',
+    'count_words': '.utils',
+}
 
 __all__ = [
     'SimpleIntentWebsiteBuilder',
@@ -31,3 +41,16 @@ __all__ = [
     'truncate_text',
     'count_words'
 ]
+
+
+def __getattr__(name):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -21,7 +21,10 @@ from src.website_builder.utils import ensure_dir, load_data_file, save_json_file
 class IntentBasedWebsiteBuilder:
     """基于搜索意图的网站自动建设工具核心类"""
 
-    def __init__(self, intent_data_path: str = None, output_dir: str = "output", config: Dict = None):
+    def __init__(self, intent_data_path: str = None, output_dir: str = "output", config: Dict = None,
+                 analyzer: Optional[IntentAnalyzer] = None,
+                 template_manager: Optional[PageTemplateManager] = None,
+                 website_deployer: Any = None):
         """
         初始化网站建设工具
         
@@ -29,6 +32,9 @@ class IntentBasedWebsiteBuilder:
             intent_data_path: 意图数据文件路径（CSV或JSON）
             output_dir: 输出目录
             config: 配置参数
+            analyzer: 可复用的意图分析器（批量建站时共享只读实例）
+            template_manager: 可复用的页面模板管理器
+            website_deployer: 可复用的网站部署器
         """
         # 初始化属性
         self.intent_data_path = intent_data_path
@@ -45,22 +51,25 @@ class IntentBasedWebsiteBuilder:
         self.output_dir = os.path.join(self.base_output_dir, f"{project_name}_{timestamp}")
         
         # 创建意图分析器（启用建站建议功能）
-        self.analyzer = IntentAnalyzer(
+        self.analyzer = analyzer or IntentAnalyzer(
             use_v2=True,
             enable_website_recommendations=True
         )
         
         # 创建页面模板管理器
-        self.template_manager = PageTemplateManager()
+        self.template_manager = template_manager or PageTemplateManager()
         
         # 创建网站部署器
-        deployment_config_path = self.config.get('deployment_config_path')
-        try:
-            from src.website_builder.website_deployer import WebsiteDeployer
-            self.website_deployer = WebsiteDeployer(deployment_config_path)
-        except ImportError:
-            self.website_deployer = None
-            print("警告: 部署功能不可用，请检查部署模块")
+        if website_deployer is not None:
+            self.website_deployer = website_deployer
+        else:
+            deployment_config_path = self.config.get('deployment_config_path')
+            try:
+                from src.website_builder.website_deployer import WebsiteDeployer
+                self.website_deployer = WebsiteDeployer(deployment_config_path)
+            except ImportError:
+                self.website_deployer = None
+                print("警告: 部署功能不可用，请检查部署模块")
         
         # 创建输出目录
         ensure_dir(self.output_dir)
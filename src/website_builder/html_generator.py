@@ -7,15 +7,35 @@ HTML网站生成器 - 将网站结构转换为实际的HTML文件
 
 import os
 import json
-from typing import Dict, Any, List
+import hashlib
+import inspect
+import sys
+from typing import Dict, Any, List, Optional, Callable, Iterable, Iterator
 from datetime import datetime
 
+# 增量构建清单，记录每个输出文件的输入哈希与内容哈希
+MANIFEST_FILENAME = '.build_manifest.json'
+MANIFEST_VERSION = 1
+
+def _update_code_digest(digest, code):
+    """把代码对象（含嵌套函数与lambda）的字节码和字符串常量计入摘要"""
+    digest.update(code.co_code)
+    for const in code.co_consts:
+        if isinstance(const, str):
+            digest.update(const.encode('utf-8'))
+        elif inspect.iscode(const):
+            _update_code_digest(digest, const)
+
 class HTMLGenerator:
     """HTML网站生成器类"""
     
-    def __init__(self, output_dir: str = "generated_website", use_tailwind: bool = False):
+    def __init__(self, output_dir: str = "generated_website", use_tailwind: bool = False,
+                 incremental: bool = True):
         self.output_dir = output_dir
         self.use_tailwind = use_tailwind
+        self.incremental = incremental
+        self.last_build_stats: Dict[str, int] = {}
+        self._build: Optional[Dict[str, Any]] = None
         self.ensure_output_dir()
     
     def ensure_output_dir(self):
@@ -808,70 +828,94 @@ document.addEventListener('DOMContentLoaded', function() {
     });
 });"""
     
-    def generate_website(self, structure_file: str, content_plan_file: str = None):
-        """生成完整网站"""
+    def generate_website(self, structure_file: str, content_plan_file: str = None,
+                         incremental: Optional[bool] = None):
+        """生成完整网站
+
+        增量模式下根据构建清单跳过输入未变化的页面，内容未变化的文件不会被重写，
+        从而保留其修改时间，便于下游部署按文件差异上传。
+        """
         # 读取网站结构
         with open(structure_file, 'r', encoding='utf-8') as f:
             structure = json.load(f)
         
-        print("Starting website generation...")
-        
-        # Generate homepage
-        homepage_html = self.generate_homepage(structure)
-        with open(os.path.join(self.output_dir, 'index.html'), 'w', encoding='utf-8') as f:
-            f.write(homepage_html)
-        print("✅ Homepage generation completed")
+        incremental = self.incremental if incremental is None else incremental
+        self._begin_build(incremental)
+        print("Starting website generation..." + (" (incremental)" if incremental else ""))
         
-        # Generate intent pages
-        intent_pages = structure.get('intent_pages', {})
-        for intent, pages in intent_pages.items():
-            intent_html = self.generate_intent_page(intent, pages)
-            intent_file = os.path.join(self.output_dir, 'intent', f'{intent.lower()}.html')
-            with open(intent_file, 'w', encoding='utf-8') as f:
-                f.write(intent_html)
+        try:
+            # Generate homepage
+            self._render_output(
+                'index.html',
+                ('homepage', structure),
+                lambda: self.generate_homepage(structure),
+            )
+            print("✅ Homepage generation completed")
             
-            # Generate keyword pages
-            for page in pages:
-                if page.get('type') == 'keyword':
-                    keyword = page.get('keyword', '')
-                    keyword_html = self.generate_keyword_page(keyword, intent)
-                    keyword_slug = keyword.replace(' ', '-').lower()
-                    keyword_file = os.path.join(self.output_dir, 'keyword', f'{keyword_slug}.html')
-                    with open(keyword_file, 'w', encoding='utf-8') as f:
-                        f.write(keyword_html)
-        
-        print(f"✅ Intent pages and keyword pages generation completed")
-        
-        # Generate CSS file - 直接在根目录创建 styles.css
-        css_content = self.generate_css()
-        with open(os.path.join(self.output_dir, 'styles.css'), 'w', encoding='utf-8') as f:
-            f.write(css_content)
-        print("✅ CSS stylesheet generation completed")
-        
-        # Generate JavaScript file - 直接在根目录创建 script.js
-        js_content = self.generate_js()
-        with open(os.path.join(self.output_dir, 'script.js'), 'w', encoding='utf-8') as f:
-            f.write(js_content)
-        print("✅ JavaScript file generation completed")
-        
-        # Generate sitemap
-        self.generate_sitemap(structure)
-        print("✅ Sitemap generation completed")
+            # Generate intent pages
+            intent_pages = structure.get('intent_pages', {})
+            for intent, pages in intent_pages.items():
+                self._render_output(
+                    f"intent/{intent.lower()}.html",
+                    ('intent', intent, pages),
+                    lambda intent=intent, pages=pages: self.generate_intent_page(intent, pages),
+                )
+                
+                # Generate keyword pages
+                for page in pages:
+                    if page.get('type') == 'keyword':
+                        keyword = page.get('keyword', '')
+                        keyword_slug = keyword.replace(' ', '-').lower()
+                        self._render_output(
+                            f"keyword/{keyword_slug}.html",
+                            ('keyword', keyword, intent),
+                            lambda keyword=keyword, intent=intent: self.generate_keyword_page(keyword, intent),
+                        )
+            
+            print(f"✅ Intent pages and keyword pages generation completed")
+            
+            # Generate CSS file - 直接在根目录创建 styles.css
+            self._render_output('styles.css', ('css',), self.generate_css)
+            print("✅ CSS stylesheet generation completed")
+            
+            # Generate JavaScript file - 直接在根目录创建 script.js
+            self._render_output('script.js', ('js',), self.generate_js)
+            print("✅ JavaScript file generation completed")
+            
+            # Generate sitemap
+            self.generate_sitemap(structure)
+            print("✅ Sitemap generation completed")
+            
+            self._finish_build()
+        finally:
+            self._build = None
         
+        stats = self.last_build_stats
         print(f"\n🎉 Website generation completed! Files saved in: {self.output_dir}")
         print(f"📁 Total generated files: {self.count_generated_files()}")
+        if incremental:
+            print(
+                f"♻️ Incremental build: {stats['written']} written, {stats['unchanged']} unchanged, "
+                f"{stats['skipped']} skipped, {stats['removed']} removed"
+            )
     
     def generate_sitemap(self, structure: Dict[str, Any]):
-        """生成网站地图"""
-        sitemap_content = """<?xml version="1.0" encoding="UTF-8"?>
+        """生成网站地图（逐条流式写入，内容未变化时保留原文件）"""
+        self._stream_output('sitemap.xml', self._iter_sitemap(structure))
+    
+    @staticmethod
+    def _iter_sitemap(structure: Dict[str, Any]) -> Iterator[str]:
+        """按条目生成网站地图XML片段"""
+        today = datetime.now().strftime('%Y-%m-%d')
+        yield f"""<?xml version="1.0" encoding="UTF-8"?>
 <urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
     <url>
         <loc>https://example.com/</loc>
-        <lastmod>{date}</lastmod>
+        <lastmod>{today}</lastmod>
         <changefreq>daily</changefreq>
         <priority>1.0</priority>
     </url>
-""".format(date=datetime.now().strftime('%Y-%m-%d'))
+"""
         
         # 添加意图页面
         intent_pages = structure.get('intent_pages', {})
@@ -879,18 +923,163 @@ document.addEventListener('DOMContentLoaded', function() {
             for page in pages:
                 url = page.get('url', '')
                 if url:
-                    sitemap_content += f"""    <url>
+                    yield f"""    <url>
         <loc>https://example.com{url}</loc>
-        <lastmod>{datetime.now().strftime('%Y-%m-%d')}</lastmod>
+        <lastmod>{today}</lastmod>
         <changefreq>weekly</changefreq>
         <priority>0.8</priority>
     </url>
 """
         
-        sitemap_content += "</urlset>"
+        yield "</urlset>"
+    
+    # ------------------------------------------------------------------
+    # 增量构建
+    # ------------------------------------------------------------------
+    def _renderer_fingerprint(self) -> str:
+        """渲染代码的指纹，生成器（含子类）所在模块的代码变化时令所有页面失效
+
+        按模块整体计算，辅助方法和模块级函数的改动同样会使缓存失效。
+        """
+        digest = hashlib.sha256(f"{MANIFEST_VERSION}:{type(self).__name__}:{self.use_tailwind}".encode('utf-8'))
+        modules = []
+        for cls in type(self).__mro__[:-1]:
+            module = sys.modules.get(cls.__module__)
+            if module is not None and module not in modules:
+                modules.append(module)
+        for module in modules:
+            try:
+                digest.update(inspect.getsource(module).encode('utf-8'))
+            except (OSError, TypeError):
+                # 无法取得源码时退回到模块内全部函数的字节码
+                for _, func in sorted(inspect.getmembers(module, inspect.isfunction)):
+                    _update_code_digest(digest, func.__code__)
+                for _, cls in sorted(inspect.getmembers(module, inspect.isclass)):
+                    for _, func in sorted(vars(cls).items()):
+                        func = getattr(func, '__func__', func)
+                        if inspect.isfunction(func):
+                            _update_code_digest(digest, func.__code__)
+        return digest.hexdigest()
+    
+    def _load_manifest(self) -> Dict[str, Any]:
+        manifest_path = os.path.join(self.output_dir, MANIFEST_FILENAME)
+        if not os.path.exists(manifest_path):
+            return {}
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ 构建清单读取失败，执行全量构建: {e}")
+            return {}
+        return manifest if isinstance(manifest, dict) else {}
+    
+    def _begin_build(self, incremental: bool):
+        renderer = self._renderer_fingerprint()
+        previous: Dict[str, Dict[str, Any]] = {}
+        if incremental:
+            manifest = self._load_manifest()
+            if manifest.get('version') == MANIFEST_VERSION:
+                previous = manifest.get('files') or {}
+                if manifest.get('renderer') != renderer:
+                    # 模板变化：输入哈希全部失效，但仍可按内容哈希跳过写入
+                    previous = {
+                        path: {'content': entry.get('content')}
+                        for path, entry in previous.items()
+                    }
+        self._build = {
+            'incremental': incremental,
+            'renderer': renderer,
+            'previous': previous,
+            'files': {},
+        }
+        self.last_build_stats = {'written': 0, 'unchanged': 0, 'skipped': 0, 'removed': 0}
+    
+    def _finish_build(self):
+        build = self._build
+        # 清理上次构建生成、本次已不存在的页面
+        for rel_path in set(build['previous']) - set(build['files']):
+            stale_file = os.path.join(self.output_dir, rel_path)
+            if os.path.exists(stale_file):
+                os.remove(stale_file)
+                self.last_build_stats['removed'] += 1
+        
+        manifest = {
+            'version': MANIFEST_VERSION,
+            'renderer': build['renderer'],
+            'generated_at': datetime.now().isoformat(),
+            'files': build['files'],
+        }
+        manifest_path = os.path.join(self.output_dir, MANIFEST_FILENAME)
+        tmp_path = manifest_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=1, sort_keys=True)
+        os.replace(tmp_path, manifest_path)
+    
+    def _render_output(self, rel_path: str, inputs: Any, render: Callable[[], str]):
+        """渲染单个输出文件；输入未变化且文件仍存在时直接跳过渲染"""
+        build = self._build
+        if build is None:
+            self._write_output(rel_path, render())
+            return
+        
+        input_hash = hashlib.sha256(
+            json.dumps(inputs, ensure_ascii=False, sort_keys=True, default=str).encode('utf-8')
+        ).hexdigest()
+        previous = build['previous'].get(rel_path)
+        if (
+            build['incremental']
+            and previous
+            and previous.get('input') == input_hash
+            and os.path.exists(os.path.join(self.output_dir, rel_path))
+        ):
+            build['files'][rel_path] = previous
+            self.last_build_stats['skipped'] += 1
+            return
         
-        with open(os.path.join(self.output_dir, 'sitemap.xml'), 'w', encoding='utf-8') as f:
-            f.write(sitemap_content)
+        self._write_output(rel_path, render(), input_hash)
+    
+    def _write_output(self, rel_path: str, content: str, input_hash: Optional[str] = None):
+        content_hash = hashlib.sha256(content.encode('utf-8')).hexdigest()
+        target = os.path.join(self.output_dir, rel_path)
+        if not self._is_unchanged(rel_path, content_hash):
+            with open(target, 'w', encoding='utf-8') as f:
+                f.write(content)
+        self._record_output(rel_path, content_hash, input_hash)
+    
+    def _stream_output(self, rel_path: str, chunks: Iterable[str]):
+        """流式写入临时文件并同步计算哈希，内容未变化时丢弃临时文件"""
+        target = os.path.join(self.output_dir, rel_path)
+        tmp_path = target + '.tmp'
+        digest = hashlib.sha256()
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for chunk in chunks:
+                digest.update(chunk.encode('utf-8'))
+                f.write(chunk)
+        content_hash = digest.hexdigest()
+        if self._is_unchanged(rel_path, content_hash):
+            os.remove(tmp_path)
+        else:
+            os.replace(tmp_path, target)
+        self._record_output(rel_path, content_hash)
+    
+    def _is_unchanged(self, rel_path: str, content_hash: str) -> bool:
+        if self._build is None:
+            return False
+        previous = self._build['previous'].get(rel_path) or {}
+        return (
+            previous.get('content') == content_hash
+            and os.path.exists(os.path.join(self.output_dir, rel_path))
+        )
+    
+    def _record_output(self, rel_path: str, content_hash: str, input_hash: Optional[str] = None):
+        if self._build is None:
+            return
+        unchanged = self._is_unchanged(rel_path, content_hash)
+        self.last_build_stats['unchanged' if unchanged else 'written'] += 1
+        entry = {'content': content_hash}
+        if input_hash:
+            entry['input'] = input_hash
+        self._build['files'][rel_path] = entry
     
     def count_generated_files(self) -> int:
         """统计生成的文件数量"""
@@ -907,10 +1096,11 @@ def main():
     parser.add_argument('--structure', '-s', required=True, help='网站结构JSON文件路径')
     parser.add_argument('--content', '-c', help='内容计划JSON文件路径')
     parser.add_argument('--output', '-o', default='generated_website', help='输出目录')
+    parser.add_argument('--full', action='store_true', help='忽略构建清单，全量重新生成')
     
     args = parser.parse_args()
     
-    generator = HTMLGenerator(args.output)
+    generator = HTMLGenerator(args.output, incremental=not args.full)
     generator.generate_website(args.structure, args.content)
 
 if __name__ == "__main__":
@@ -5,10 +5,34 @@ SEO优化器 - 为生成的网站添加高质量SEO优化
 import json
 import re
 from datetime import datetime
-from typing import Dict, List, Optional
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple, Union
 from pathlib import Path
 
 
+# 各优化步骤匹配的元素
+_HEAD_OPEN_RE = re.compile(r'(<head[^>]*>)')
+_HEAD_CLOSE_RE = re.compile(r'(</head>)')
+_IMG_RE = re.compile(r'<img([^>]*?)(?<!alt=")(?<!alt=\')>')
+_IMG_SRC_RE = re.compile(r'src=["\']([^"\']*)["\']')
+_MAIN_OPEN_RE = re.compile(r'(<main[^>]*>)')
+_FOOTER_OPEN_RE = re.compile(r'(<footer[^>]*>)')
+_INTERNAL_LINK_RE = re.compile(r'<a\s+href="(#[^"]*|/[^"]*)"([^>]*?)>([^<]*)</a>')
+
+# 优化规则：(触发子串, 正则, 替换模板或回调)；触发子串不存在时该规则必然不匹配
+SEORule = Tuple[str, 're.Pattern', Union[str, Callable]]
+
+
+@lru_cache(maxsize=32)
+def _compile_combined_pattern(patterns: Tuple[str, ...]) -> 're.Pattern':
+    """将多条规则的正则合并为一个交替模式，每条规则对应一个命名分组
+
+    所有规则都匹配以"<"开头的标签，前置的先行断言让扫描跳过其余位置而不必逐个尝试各分支。
+    """
+    alternatives = '|'.join(f'(?P<r{index}>{pattern})' for index, pattern in enumerate(patterns))
+    return re.compile(f'(?=<)(?:{alternatives})')
+
+
 class SEOOptimizer:
     """SEO优化器类"""
     
@@ -31,36 +55,80 @@ class SEOOptimizer:
         Returns:
             优化后的HTML内容
         """
-        # 1. 添加基础SEO标签
-        html_content = self._add_basic_seo_tags(html_content, config)
-        
-        # 2. 添加Open Graph标签
-        html_content = self._add_open_graph_tags(html_content, config)
-        
-        # 3. 添加Twitter Cards
-        html_content = self._add_twitter_cards(html_content, config)
-        
-        # 4. 添加结构化数据
-        html_content = self._add_structured_data(html_content, config)
-        
-        # 5. 优化图片alt属性
-        html_content = self._optimize_images(html_content, config)
-        
-        # 6. 添加面包屑导航
-        html_content = self._add_breadcrumb_navigation(html_content, config)
-        
-        # 7. 添加FAQ部分
-        html_content = self._add_faq_section(html_content, config)
+        return self._apply_rules_single_pass(html_content, self._build_rules(config))
+    
+    def _build_rules(self, config: Dict) -> List[SEORule]:
+        """按原有优化顺序构建规则列表"""
+        rules = [
+            # 1. 添加基础SEO标签
+            self._basic_seo_rule(config),
+            # 2. 添加Open Graph标签
+            self._open_graph_rule(config),
+            # 3. 添加Twitter Cards
+            self._twitter_cards_rule(config),
+            # 4. 添加结构化数据
+            self._structured_data_rule(config),
+            # 5. 优化图片alt属性
+            self._images_rule(config),
+            # 6. 添加面包屑导航
+            self._breadcrumb_rule(config),
+            # 7. 添加FAQ部分
+            self._faq_rule(config),
+            # 8. 优化内部链接
+            self._internal_links_rule(config),
+        ]
+        return [rule for rule in rules if rule is not None]
+    
+    @staticmethod
+    def _apply_rule(html_content: str, rule: Optional[SEORule]) -> str:
+        if rule is None:
+            return html_content
+        return rule[1].sub(rule[2], html_content)
+    
+    @staticmethod
+    def _apply_rules_from(fragment: str, rules: List[SEORule], start: int) -> str:
+        """对片段依次应用从 start 开始的规则（等价于逐步全文替换在该片段上的效果）"""
+        # 片段本身就是首条规则的一次完整匹配；回调直接作用于该匹配，模板仍交给 sub（其模板解析有缓存）
+        _, pattern, replacement = rules[start]
+        if callable(replacement):
+            fragment = replacement(pattern.match(fragment))
+        else:
+            fragment = pattern.sub(replacement, fragment)
+        for trigger, pattern, replacement in rules[start + 1:]:
+            if trigger in fragment:
+                fragment = pattern.sub(replacement, fragment)
+        return fragment
+    
+    def _apply_rules_single_pass(self, html_content: str, rules: List[SEORule]) -> str:
+        """
+        一次扫描完成全部优化
         
-        # 8. 优化内部链接
-        html_content = self._optimize_internal_links(html_content, config)
+        各规则匹配的都是以"<"开头、互不重叠的标签片段，因此只需用合并后的模式扫描一遍原文：
+        每个命中片段交给首个匹配的规则处理，再依次应用其后的规则（例如同一个<head>上
+        叠加的多组标签），未命中的文本原样保留，最后一次拼接输出，结果与逐步全文替换一致。
+        """
+        if not rules:
+            return html_content
         
-        return html_content
+        patterns: List[str] = []
+        first_rule: Dict[str, int] = {}
+        for index, (_, pattern, _) in enumerate(rules):
+            if pattern.pattern not in patterns:
+                first_rule[f'r{len(patterns)}'] = index
+                patterns.append(pattern.pattern)
+        combined = _compile_combined_pattern(tuple(patterns))
+        
+        apply_rules_from = self._apply_rules_from
+        return combined.sub(
+            lambda match: apply_rules_from(match.group(), rules, first_rule[match.lastgroup]),
+            html_content
+        )
     
     def _add_basic_seo_tags(self, html_content: str, config: Dict) -> str:
         """添加基础SEO标签"""
-        head_pattern = r'(<head[^>]*>)'
-        
+        return self._apply_rule(html_content, self._basic_seo_rule(config))
+    
+    def _basic_seo_rule(self, config: Dict) -> SEORule:
         # 构建基础SEO标签
         seo_tags = []
         
@@ -98,12 +166,13 @@ class SEOOptimizer:
         
         seo_tags_str = '\n'.join(seo_tags) + '\n'
         
-        return re.sub(head_pattern, r'\1\n' + seo_tags_str, html_content)
+        return ('<head', _HEAD_OPEN_RE, r'\1\n' + seo_tags_str)
     
     def _add_open_graph_tags(self, html_content: str, config: Dict) -> str:
         """添加Open Graph标签"""
-        head_pattern = r'(<head[^>]*>)'
-        
+        return self._apply_rule(html_content, self._open_graph_rule(config))
+    
+    def _open_graph_rule(self, config: Dict) -> SEORule:
         og_tags = []
         
         # 基础OG标签
@@ -131,12 +200,13 @@ class SEOOptimizer:
         
         og_tags_str = '\n'.join(og_tags) + '\n'
         
-        return re.sub(head_pattern, r'\1\n' + og_tags_str, html_content)
+        return ('<head', _HEAD_OPEN_RE, r'\1\n' + og_tags_str)
     
     def _add_twitter_cards(self, html_content: str, config: Dict) -> str:
         """添加Twitter Cards"""
-        head_pattern = r'(<head[^>]*>)'
-        
+        return self._apply_rule(html_content, self._twitter_cards_rule(config))
+    
+    def _twitter_cards_rule(self, config: Dict) -> SEORule:
         twitter_tags = []
         
         # Twitter Card类型
@@ -160,12 +230,13 @@ class SEOOptimizer:
         
         twitter_tags_str = '\n'.join(twitter_tags) + '\n'
         
-        return re.sub(head_pattern, r'\1\n' + twitter_tags_str, html_content)
+        return ('<head', _HEAD_OPEN_RE, r'\1\n' + twitter_tags_str)
     
     def _add_structured_data(self, html_content: str, config: Dict) -> str:
         """添加结构化数据"""
-        head_pattern = r'(</head>)'
-        
+        return self._apply_rule(html_content, self._structured_data_rule(config))
+    
+    def _structured_data_rule(self, config: Dict) -> Optional[SEORule]:
         structured_data = []
         
         # 网站基础结构化数据
@@ -186,20 +257,21 @@ class SEOOptimizer:
             ])
             schema_scripts += '\n'
             
-            return re.sub(head_pattern, schema_scripts + r'\1', html_content)
+            return ('</head>', _HEAD_CLOSE_RE, schema_scripts + r'\1')
         
-        return html_content
+        return None
     
     def _optimize_images(self, html_content: str, config: Dict) -> str:
         """优化图片alt属性"""
+        return self._apply_rule(html_content, self._images_rule(config))
+    
+    def _images_rule(self, config: Dict) -> SEORule:
         # 为没有alt属性的img标签添加alt
-        img_pattern = r'<img([^>]*?)(?<!alt=")(?<!alt=\')>'
-        
         def add_alt_attribute(match):
             img_attrs = match.group(1)
             
             # 尝试从src中提取描述性文本
-            src_match = re.search(r'src=["\']([^"\']*)["\']', img_attrs)
+            src_match = _IMG_SRC_RE.search(img_attrs)
             if src_match:
                 src = src_match.group(1)
                 # 从文件名生成alt文本
@@ -214,15 +286,17 @@ class SEOOptimizer:
             
             return f'<img{img_attrs} alt="{config.get("site_name", "Image")}">'
         
-        return re.sub(img_pattern, add_alt_attribute, html_content)
+        return ('<img', _IMG_RE, add_alt_attribute)
     
     def _add_breadcrumb_navigation(self, html_content: str, config: Dict) -> str:
         """添加面包屑导航"""
+        return self._apply_rule(html_content, self._breadcrumb_rule(config))
+    
+    def _breadcrumb_rule(self, config: Dict) -> Optional[SEORule]:
         if not config.get('add_breadcrumb', True):
-            return html_content
+            return None
         
         # 在main标签后添加面包屑
-        main_pattern = r'(<main[^>]*>)'
         
         breadcrumb_html = '''
     <nav aria-label="Breadcrumb" class="breadcrumb-nav" style="padding: 10px 0; margin-bottom: 20px;">
@@ -243,15 +317,17 @@ class SEOOptimizer:
         </div>
     </nav>'''
         
-        return re.sub(main_pattern, r'\1' + breadcrumb_html, html_content)
+        return ('<main', _MAIN_OPEN_RE, r'\1' + breadcrumb_html)
     
     def _add_faq_section(self, html_content: str, config: Dict) -> str:
         """添加FAQ部分"""
+        return self._apply_rule(html_content, self._faq_rule(config))
+    
+    def _faq_rule(self, config: Dict) -> Optional[SEORule]:
         if not config.get('faqs'):
-            return html_content
+            return None
         
         # 在footer前添加FAQ
-        footer_pattern = r'(<footer[^>]*>)'
         
         faq_items = []
         for i, faq in enumerate(config['faqs'], 1):
@@ -275,12 +351,14 @@ class SEOOptimizer:
     </section>
     '''
         
-        return re.sub(footer_pattern, faq_section + r'\1', html_content)
+        return ('<footer', _FOOTER_OPEN_RE, faq_section + r'\1')
     
     def _optimize_internal_links(self, html_content: str, config: Dict) -> str:
         """优化内部链接"""
+        return self._apply_rule(html_content, self._internal_links_rule(config))
+    
+    def _internal_links_rule(self, config: Dict) -> SEORule:
         # 为内部链接添加title属性
-        internal_link_pattern = r'<a\s+href="(#[^"]*|/[^"]*)"([^>]*?)>([^<]*)</a>'
         
         def add_title_to_link(match):
             href = match.group(1)
@@ -299,7 +377,7 @@ class SEOOptimizer:
             
             return f'<a href="{href}"{attrs} title="{title}">{text}</a>'
         
-        return re.sub(internal_link_pattern, add_title_to_link, html_content)
+        return ('<a', _INTERNAL_LINK_RE, add_title_to_link)
     
     def _generate_website_schema(self, config: Dict) -> Optional[Dict]:
         """生成网站结构化数据"""
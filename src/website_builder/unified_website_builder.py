@@ -51,7 +51,7 @@ class UnifiedWebsiteBuilder:
             enable_seo: 是否启用SEO优化
         """
         self.intent_data_path = intent_data_path
-        self.output_dir = output_dir
+        self.base_output_dir = output_dir
         self.config = config or {}
         self.enable_seo = enable_seo and SEO_AVAILABLE
         
@@ -74,17 +74,24 @@ class UnifiedWebsiteBuilder:
         else:
             self.seo_engine = None
         
-        # 初始化HTML生成器
+        # 初始化HTML生成器：标准生成器固定输出到按项目命名的目录（不带时间戳），
+        # 使增量构建清单能在多次运行之间复用；Tailwind 生成器没有构建清单，
+        # 无法清理旧页面，仍输出到带时间戳的项目目录
         use_tailwind = self.config.get('use_tailwind', False)
         if use_tailwind:
-            self.html_generator = TailwindHTMLGenerator(self.core_builder.output_dir)
+            self.site_output_dir = self.core_builder.output_dir
+            self.html_generator = TailwindHTMLGenerator(self.site_output_dir)
             print("✅ 使用 TailwindCSS 生成器")
         else:
-            self.html_generator = HTMLGenerator(self.core_builder.output_dir)
+            self.site_output_dir = self.config.get('site_output_dir') or os.path.join(
+                output_dir, f"{self.config.get('project_name', 'website')}_site"
+            )
+            self.html_generator = HTMLGenerator(self.site_output_dir)
             print("✅ 使用标准 HTML 生成器")
         
         print(f"🚀 统一网站建设工具初始化完成")
         print(f"📁 输出目录: {self.core_builder.output_dir}")
+        print(f"🌐 站点目录: {self.site_output_dir}")
         print(f"🔧 SEO优化: {'启用' if self.enable_seo else '禁用'}")
 
     def load_intent_data(self) -> bool:
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import json
+
+from src.utils.api_quota_manager import APIQuotaManager
+
+
+def _usage(path, api_name):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)[api_name]['current_usage']
+
+
+def test_use_quota_reserves_in_batches_and_releases_unused(tmp_path):
+    quota_file = str(tmp_path / 'api_quotas.json')
+    manager = APIQuotaManager(quota_file, reserve_batch=20)
+
+    assert all(manager.use_quota('GOOGLE_ADS') for _ in range(5))
+    # 一次预留覆盖多次调用，文件中记录的是预留量
+    assert _usage(quota_file, 'GOOGLE_ADS') == 20
+    assert manager.get_quota_status()['GOOGLE_ADS']['current_usage'] == 5
+
+    manager.flush()
+    assert _usage(quota_file, 'GOOGLE_ADS') == 5
+
+
+def test_reservations_across_managers_never_exceed_limit(tmp_path):
+    quota_file = str(tmp_path / 'api_quotas.json')
+    first = APIQuotaManager(quota_file, reserve_batch=30)
+    second = APIQuotaManager(quota_file, reserve_batch=30)
+
+    granted = 0
+    for _ in range(80):
+        granted += first.use_quota('SERPAPI')
+        granted += second.use_quota('SERPAPI')
+
+    assert granted == 100
+    assert not first.use_quota('SERPAPI')
+    assert not second.use_quota('SERPAPI')
+
+    first.flush()
+    second.flush()
+    assert _usage(quota_file, 'SERPAPI') == 100
+
+
+def test_quota_status_survives_reload_during_reset(tmp_path):
+    quota_file = str(tmp_path / 'api_quotas.json')
+    manager = APIQuotaManager(quota_file)
+
+    # 另一个进程写入了新的 API 条目，且本地某个配额已到重置日期
+    with open(quota_file, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    first_api = next(iter(manager.quotas))
+    data[first_api].update(current_usage=7, reset_date='2000-01-01')
+    data['EXTRA_API'] = {'name': 'EXTRA_API', 'monthly_limit': 50, 'current_usage': 3, 'reset_date': '2999-01-01'}
+    with open(quota_file, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    manager.quotas[first_api].reset_date = '2000-01-01'
+
+    status = manager.get_quota_status()
+
+    assert status[first_api]['current_usage'] == 0
+    assert status[first_api]['reset_date'] == '2000-02-01'
+    assert 'EXTRA_API' in manager.quotas
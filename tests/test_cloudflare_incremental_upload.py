@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import json
+from json import loads
+
+from src.deployment import cloudflare_deployer
+from src.deployment.cloudflare_deployer import CloudflareDeployer
+
+
+class _FakeResponse:
+    def __init__(self, payload, status_code=200):
+        self._payload = payload
+        self.status_code = status_code
+        self.text = json.dumps(payload)
+
+    def json(self):
+        return self._payload
+
+
+class _FakePagesAPI:
+    """模拟 Cloudflare Pages 直传接口，记录远端已有的资源哈希"""
+
+    def __init__(self):
+        self.stored = {}
+        self.checked = []
+        self.uploaded_keys = []
+        self.deploy_manifests = []
+
+    def Session(self):
+        return self
+
+    def close(self):
+        pass
+
+    def get(self, url, headers=None, **kwargs):
+        assert url.endswith('/upload-token')
+        return _FakeResponse({'result': {'jwt': 'jwt-token'}})
+
+    def post(self, url, headers=None, json=None, files=None, **kwargs):
+        if url.endswith('/pages/assets/check-missing'):
+            self.checked.append(list(json['hashes']))
+            return _FakeResponse({'result': [h for h in json['hashes'] if h not in self.stored]})
+        if url.endswith('/pages/assets/upload'):
+            for item in json:
+                self.stored[item['key']] = item['value']
+                self.uploaded_keys.append(item['key'])
+            return _FakeResponse({'result': {}})
+        if url.endswith('/pages/assets/upsert-hashes'):
+            return _FakeResponse({'result': True})
+        if url.endswith('/deployments'):
+            self.deploy_manifests.append(loads(files['manifest'][1]))
+            return _FakeResponse({'result': {'id': f'dep-{len(self.deploy_manifests)}', 'url': 'https://demo.pages.dev'}})
+        raise AssertionError(url)
+
+
+def _write_site(root, pages):
+    for rel_path, content in pages.items():
+        target = root / rel_path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(content, encoding='utf-8')
+
+
+def _deploy(tmp_path, source_dir):
+    deployer = CloudflareDeployer({
+        'api_token': 'token',
+        'account_id': 'acc',
+        'project_name': 'demo',
+        'manifest_dir': str(tmp_path / 'manifests'),
+    })
+    staging = tmp_path / 'staging'
+    staging.mkdir(exist_ok=True)
+    assert deployer.prepare_files(str(source_dir), str(staging))
+    assert deployer.validate_files(str(staging))[0]
+    assert deployer.upload_files(str(staging))
+    return deployer
+
+
+def test_incremental_upload_sends_only_changed_files(tmp_path, monkeypatch):
+    api = _FakePagesAPI()
+    monkeypatch.setattr(cloudflare_deployer.requests, 'Session', api.Session)
+
+    site = tmp_path / 'site'
+    _write_site(site, {
+        'index.html': '<html>home</html>',
+        'keyword/a.html': '<html>a</html>',
+        'keyword/b.html': '<html>b</html>',
+        '.build_manifest.json': '{}',
+    })
+
+    first = _deploy(tmp_path, site)
+    assert first.upload_stats['uploaded'] == 3
+    assert not any((tmp_path / 'staging').iterdir())
+    assert set(api.deploy_manifests[0]) == {'/index.html', '/keyword/a.html', '/keyword/b.html'}
+
+    (site / 'keyword' / 'b.html').write_text('<html>b2</html>', encoding='utf-8')
+    second = _deploy(tmp_path, site)
+
+    assert second.upload_stats['changed'] == 1
+    assert second.upload_stats['uploaded'] == 1
+    # 只有变化的文件被重新读取计算哈希，但全部哈希都交给服务端比对
+    assert second.upload_stats['hashed'] == 1
+    assert api.checked[-1] == sorted(set(api.deploy_manifests[1].values()))
+    assert len(api.deploy_manifests[1]) == 3
+    assert second.deployment_id == 'dep-2'
+
+
+def test_assets_missing_remotely_are_reuploaded_even_if_unchanged(tmp_path, monkeypatch):
+    api = _FakePagesAPI()
+    monkeypatch.setattr(cloudflare_deployer.requests, 'Session', api.Session)
+
+    site = tmp_path / 'site'
+    _write_site(site, {'index.html': '<html>home</html>', 'about.html': '<html>about</html>'})
+    _deploy(tmp_path, site)
+
+    # 服务端清理了未变化文件的资源，本地清单仍记录着它
+    purged = api.deploy_manifests[0]['/about.html']
+    del api.stored[purged]
+
+    second = _deploy(tmp_path, site)
+
+    assert second.upload_stats['changed'] == 0
+    assert second.upload_stats['hashed'] == 0
+    assert second.upload_stats['uploaded'] == 1
+    assert api.uploaded_keys[-1] == purged
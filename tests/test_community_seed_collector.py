@@ -0,0 +1,39 @@
+import time
+
+import pandas as pd
+
+from src.collectors.community_seed_collector import CommunitySeedCollector, SourceSnapshot
+
+
+class _StubSource:
+    def __init__(self, name, queries, delay=0.0):
+        self.name = name
+        self.queries = queries
+        self.delay = delay
+
+    def collect(self, limit=30):
+        time.sleep(self.delay)
+        frame = pd.DataFrame({'query': self.queries, 'source': self.name})
+        return frame, SourceSnapshot(source=self.name, attempted=1, succeeded=1)
+
+
+def test_sources_run_concurrently_and_slow_source_times_out():
+    collector = CommunitySeedCollector(
+        reddit_collector=_StubSource('reddit', ['ai notes', 'pdf tool'], delay=0.2),
+        product_hunt_collector=_StubSource('product_hunt', ['pdf tool', 'voice clone'], delay=0.2),
+        source_timeout=1.0,
+    )
+    collector.register_source('slow', lambda max_items: _StubSource('slow', ['never'], delay=3).collect())
+
+    started = time.perf_counter()
+    combined, diagnostics = collector.collect(max_items=10)
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 1.8
+    assert combined['query'].tolist() == ['ai notes', 'pdf tool', 'voice clone']
+
+    sources = {item['source']: item for item in diagnostics['sources']}
+    assert 0.15 < sources['reddit']['latency_seconds'] < 1.0
+    assert sources['slow']['failed'] == 1
+    assert sources['slow']['extra']['timed_out'] is True
+    assert diagnostics['latency_seconds'] < 1.8
@@ -0,0 +1,56 @@
+import pandas as pd
+import pytest
+
+from src.demand_mining.analyzers.competitor_analyzer import CompetitorAnalyzer
+
+
+def _serp_payload(*links):
+    return {
+        "organic_results": [
+            {"title": f"Result {i}", "link": link, "snippet": "snippet"}
+            for i, link in enumerate(links, start=1)
+        ]
+    }
+
+
+@pytest.fixture
+def analyzer():
+    analyzer = CompetitorAnalyzer()
+    # 禁止任何网络请求：竞争分析只能使用传入或缓存的SERP数据
+    analyzer.serp_analyzer = None
+    return analyzer
+
+
+def test_batch_scoring_uses_serp_payloads_and_authority_index(analyzer):
+    df = pd.DataFrame({"query": ["python tutorial", "tiny niche tool", "no data keyword"]})
+    serp_results = {
+        "python tutorial": _serp_payload(
+            "https://www.github.com/python/cpython",
+            "https://stackoverflow.com/questions/1",
+            "https://docs.python.org/3/tutorial/index.html",
+        ),
+        "tiny niche tool": _serp_payload(
+            "https://some-small-blog.net/posts/2023/tiny-niche-tool-review",
+            "https://another-hobby-site.xyz/tools/niche/tiny",
+        ),
+    }
+
+    result = analyzer.analyze_competitors(df, serp_results=serp_results)
+
+    assert result["serp_data_available"].tolist() == [True, True, False]
+    assert result.loc[0, "top_competitor_domain"] == "www.github.com"
+    # www.github.com 与 stackoverflow.com 命中 domain_authority_db
+    assert result.loc[0, "avg_domain_authority"] > result.loc[1, "avg_domain_authority"]
+    assert result.loc[0, "competition_score"] > result.loc[1, "competition_score"]
+    assert result.loc[1, "competition_grade"] in {"D", "F", "C"}
+    assert pd.isna(result.loc[2, "competition_score"])
+    assert pd.isna(result.loc[2, "competition_grade"])
+    assert result.loc[2, "recommended_strategy"] == "缺少SERP数据，需要进一步分析"
+
+
+def test_missing_serp_source_scores_nothing(analyzer):
+    df = pd.DataFrame({"query": ["anything"]})
+    result = analyzer.analyze_competitors(df)
+    assert not result["serp_data_available"].any()
+    summary = analyzer.generate_competitor_summary(result)
+    assert summary["total_keywords"] == 1
@@ -0,0 +1,115 @@
+import os
+
+import pytest
+
+pytest.importorskip("cryptography")
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from config import crypto_manager
+from config.config_manager import ConfigManager, clear_config_cache
+from config.crypto_manager import ConfigCrypto
+
+
+def _new_key():
+    return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+
+def _env_value(private_key):
+    pem = private_key.private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=serialization.NoEncryption(),
+    ).decode()
+    # 与部署环境一致：换行以字面 \n 写入环境变量
+    return pem.replace('\n', '\\n')
+
+
+def _write_encrypted(path, private_key, config, stamp_ns=None):
+    crypto = ConfigCrypto(key_sources=['env'])
+    crypto.public_key = private_key.public_key()
+    path.write_text(crypto.encrypt_config(config), encoding='utf-8')
+    if stamp_ns is not None:
+        os.utime(path, ns=(stamp_ns, stamp_ns))
+
+
+@pytest.fixture(autouse=True)
+def clean_caches():
+    clear_config_cache()
+    crypto_manager._private_key_cache.clear()
+    yield
+    clear_config_cache()
+    crypto_manager._private_key_cache.clear()
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    config_manager = ConfigManager()
+    config_manager.encrypted_file = str(tmp_path / '.env.encrypted')
+    # 只从环境变量取私钥，避免读取用户目录下的密钥或交互输入
+    config_manager.crypto = ConfigCrypto(key_sources=['env'])
+    config_manager.crypto.private_key_path = str(tmp_path / 'missing.key')
+
+    decrypt_calls = []
+    original = config_manager.crypto.decrypt_config
+
+    def counting_decrypt(data):
+        decrypt_calls.append(data)
+        return original(data)
+
+    monkeypatch.setattr(config_manager.crypto, 'decrypt_config', counting_decrypt)
+    config_manager.decrypt_calls = decrypt_calls
+    return config_manager
+
+
+def test_encrypted_config_is_decrypted_once_while_unchanged(manager, tmp_path, monkeypatch):
+    key = _new_key()
+    monkeypatch.setenv('RSA_PRIVATE_KEY', _env_value(key))
+    _write_encrypted(tmp_path / '.env.encrypted', key, {'API_TOKEN': 'alpha'})
+
+    assert manager._load_encrypted_config() == {'API_TOKEN': 'alpha'}
+    assert manager._load_encrypted_config() == {'API_TOKEN': 'alpha'}
+    assert len(manager.decrypt_calls) == 1
+
+    # 缓存按文件共享：新的管理器实例同样命中
+    other = ConfigManager()
+    other.encrypted_file = manager.encrypted_file
+    other.crypto = manager.crypto
+    assert other._load_encrypted_config() == {'API_TOKEN': 'alpha'}
+    assert len(manager.decrypt_calls) == 1
+
+
+def test_encrypted_config_is_reloaded_after_file_change(manager, tmp_path, monkeypatch):
+    key = _new_key()
+    monkeypatch.setenv('RSA_PRIVATE_KEY', _env_value(key))
+    path = tmp_path / '.env.encrypted'
+    _write_encrypted(path, key, {'API_TOKEN': 'alpha'}, stamp_ns=1_000_000_000)
+    assert manager._load_encrypted_config() == {'API_TOKEN': 'alpha'}
+
+    _write_encrypted(path, key, {'API_TOKEN': 'bravo'}, stamp_ns=2_000_000_000)
+
+    assert manager._load_encrypted_config() == {'API_TOKEN': 'bravo'}
+    assert len(manager.decrypt_calls) == 2
+
+
+def test_env_key_rotation_reloads_private_key_and_config(manager, tmp_path, monkeypatch):
+    old_key, new_key = _new_key(), _new_key()
+    path = tmp_path / '.env.encrypted'
+    stamp = 1_000_000_000
+
+    monkeypatch.setenv('RSA_PRIVATE_KEY', _env_value(old_key))
+    _write_encrypted(path, old_key, {'API_TOKEN': 'alpha'}, stamp_ns=stamp)
+    assert manager._load_encrypted_config() == {'API_TOKEN': 'alpha'}
+    size = path.stat().st_size
+
+    # 轮换密钥并用新密钥重新加密；文件的修改时间与大小保持不变
+    monkeypatch.setenv('RSA_PRIVATE_KEY', _env_value(new_key))
+    _write_encrypted(path, new_key, {'API_TOKEN': 'bravo'}, stamp_ns=stamp)
+    assert path.stat().st_size == size
+
+    assert manager._load_encrypted_config() == {'API_TOKEN': 'bravo'}
+    assert len(manager.decrypt_calls) == 2
+    loaded = ConfigCrypto(key_sources=['env'])
+    loaded.private_key_path = manager.crypto.private_key_path
+    assert loaded.load_private_key().public_key().public_numbers() == new_key.public_key().public_numbers()
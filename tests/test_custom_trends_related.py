@@ -0,0 +1,361 @@
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+import src.collectors.custom_trends_collector as collector_module
+import src.collectors.google_trends_session as session_module
+from src.collectors.custom_trends_collector import CustomTrendsCollector
+
+
+class _StubSession:
+    def get_session(self):
+        return None
+
+
+def _related_widget(widget_id, keyword):
+    return {
+        "id": widget_id,
+        "token": f"token-{keyword}",
+        "request": {
+            "restriction": {
+                "complexKeywordsRestriction": {"keyword": [{"type": "BROAD", "value": keyword}]}
+            }
+        },
+    }
+
+
+def _ranked_payload(keyword):
+    return {
+        "default": {
+            "rankedList": [
+                {"rankedKeyword": [{"query": f"{keyword} top", "value": 100}]},
+                {"rankedKeyword": [{"query": f"{keyword} rising", "value": 250}]},
+            ]
+        }
+    }
+
+
+@pytest.fixture
+def collector(monkeypatch):
+    monkeypatch.setattr(session_module, "get_global_session", lambda: _StubSession())
+    return CustomTrendsCollector(max_widget_workers=5)
+
+
+def test_batched_related_queries_map_each_widget_to_its_keyword(collector, monkeypatch):
+    keywords = ["alpha", "beta", "gamma", "delta", "epsilon", "zeta"]
+    calls = {"explore": 0, "widget": 0, "in_flight": 0, "max_in_flight": 0}
+    lock = threading.Lock()
+
+    def fake_get_data(url, method="get", trim_chars=0, use_cache=True, **kwargs):
+        if url == collector.GENERAL_URL:
+            calls["explore"] += 1
+            batch = [item["keyword"] for item in json.loads(kwargs["params"]["req"])["comparisonItem"]]
+            # 乱序返回，验证映射不依赖 widget 顺序
+            widgets = [_related_widget(f"RELATED_QUERIES_{i}", kw) for i, kw in enumerate(batch)]
+            return {"widgets": [{"id": "TIMESERIES"}] + widgets[::-1]}
+
+        with lock:
+            calls["widget"] += 1
+            calls["in_flight"] += 1
+            calls["max_in_flight"] = max(calls["max_in_flight"], calls["in_flight"])
+        time.sleep(0.05)
+        with lock:
+            calls["in_flight"] -= 1
+        keyword = json.loads(kwargs["params"]["req"])["restriction"]["complexKeywordsRestriction"]["keyword"][0]["value"]
+        return _ranked_payload(keyword)
+
+    monkeypatch.setattr(collector, "_get_data", fake_get_data)
+    results = collector.batch_related_queries(keywords, delay_per_batch=0)
+
+    assert calls["explore"] == 2
+    assert calls["widget"] == len(keywords)
+    assert calls["max_in_flight"] > 1
+    assert set(results) == set(keywords)
+    for keyword in keywords:
+        assert results[keyword]["top"]["query"].tolist() == [f"{keyword} top"]
+        assert results[keyword]["rising"]["query"].tolist() == [f"{keyword} rising"]
+
+
+def test_single_keyword_related_topics_without_suffix(collector, monkeypatch):
+    def fake_get_data(url, method="get", trim_chars=0, use_cache=True, **kwargs):
+        if url == collector.GENERAL_URL:
+            return {"widgets": [{"id": "RELATED_TOPICS", "token": "t", "request": {}}]}
+        return {
+            "default": {
+                "rankedList": [
+                    {"rankedKeyword": [{"topic": {"title": "Python", "type": "Language"}, "value": 100}]},
+                    {"rankedKeyword": []},
+                ]
+            }
+        }
+
+    monkeypatch.setattr(collector, "_get_data", fake_get_data)
+    collector.build_payload(["python"])
+    results = collector.related_topics()
+
+    assert list(results) == ["python"]
+    assert results["python"]["top"]["topic_title"].tolist() == ["Python"]
+    assert results["python"]["rising"].empty
+
+
+def test_related_for_shares_one_token_between_queries_and_topics(collector, monkeypatch):
+    explore_calls = []
+
+    def fake_get_data(url, method="get", trim_chars=0, use_cache=True, **kwargs):
+        if url == collector.GENERAL_URL:
+            explore_calls.append(kwargs["params"]["req"])
+            widgets = []
+            for i, kw in enumerate(["alpha", "beta"]):
+                widgets.append(_related_widget(f"RELATED_QUERIES_{i}", kw))
+                widgets.append(_related_widget(f"RELATED_TOPICS_{i}", kw))
+            return {"widgets": widgets}
+        keyword = json.loads(kwargs["params"]["req"])["restriction"]["complexKeywordsRestriction"]["keyword"][0]["value"]
+        return _ranked_payload(keyword)
+
+    monkeypatch.setattr(collector, "_get_data", fake_get_data)
+    results = collector.related_for(["alpha", "beta"], timeframe="today 3-m")
+
+    assert len(explore_calls) == 1
+    assert collector.kw_list == []
+    assert set(results["queries"]) == set(results["topics"]) == {"alpha", "beta"}
+    assert results["queries"]["beta"]["rising"]["query"].tolist() == ["beta rising"]
+
+
+def test_fetch_widgets_returns_full_profile_from_one_token(collector, monkeypatch):
+    calls = {"explore": 0, "widget_urls": []}
+    lock = threading.Lock()
+
+    def fake_get_data(url, method="get", trim_chars=0, use_cache=True, **kwargs):
+        if url == collector.GENERAL_URL:
+            calls["explore"] += 1
+            return {"widgets": [
+                {"id": "TIMESERIES", "token": "ts", "request": {}},
+                {"id": "GEO_MAP", "token": "geo", "request": {}},
+                _related_widget("RELATED_TOPICS", "python"),
+                _related_widget("RELATED_QUERIES", "python"),
+            ]}
+        with lock:
+            calls["widget_urls"].append(url)
+        if url == collector.INTEREST_OVER_TIME_URL:
+            return {"default": {"timelineData": [
+                {"time": "1704067200", "formattedTime": "Jan 1, 2024", "value": [40]},
+                {"time": "1704672000", "formattedTime": "Jan 8, 2024", "value": [55]},
+            ]}}
+        if url == collector.INTEREST_BY_REGION_URL:
+            assert json.loads(kwargs["params"]["req"])["resolution"] == "REGION"
+            return {"default": {"geoMapData": [{"geoName": "Texas", "geoCode": "US-TX", "value": [100]}]}}
+        return _ranked_payload("python")
+
+    monkeypatch.setattr(collector, "_get_data", fake_get_data)
+    profile = collector.fetch_widgets(["python"], resolution="REGION")
+
+    assert calls["explore"] == 1
+    assert len(calls["widget_urls"]) == 4
+    assert set(profile) == set(collector.WIDGET_SPECS)
+    assert profile["interest_over_time"]["python"].tolist() == [40, 55]
+    assert profile["interest_by_region"]["geoName"].tolist() == ["Texas"]
+    assert profile["related_queries"]["python"]["top"]["query"].tolist() == ["python top"]
+    assert "python" in profile["related_topics"]
+
+
+def test_fetch_widgets_rejects_unknown_widget(collector):
+    assert collector.fetch_widgets(["python"], widgets=["nope"]) == {}
+
+
+def test_interest_over_time_parses_numeric_time_into_typed_index(collector):
+    response = {"default": {"timelineData": [
+        {"time": "1704067200", "formattedTime": "Dec 31, 2023 – Jan 6, 2024", "value": [40, 7, 99]},
+        {"time": "1704672000", "formattedTime": "Jan 7 – 13, 2024", "value": [55, 8, 99]},
+    ]}}
+
+    df = collector._parse_interest_over_time(response, ["alpha", "beta"])
+
+    assert str(df.index.dtype) == "datetime64[ns]"
+    assert df.index.name == "date"
+    assert df.index[1] == pd.Timestamp("2024-01-08")
+    assert list(df.columns) == ["alpha", "beta"]
+    assert df["beta"].tolist() == [7, 8]
+
+
+def test_interest_over_time_falls_back_to_formatted_time(collector):
+    response = {"default": {"timelineData": [
+        {"formattedTime": "Jan 1, 2024", "value": [40]},
+        {"formattedTime": "Jan 8, 2024", "value": [55]},
+    ]}}
+
+    df = collector._parse_interest_over_time(response, ["alpha"])
+
+    assert df.index[0] == pd.Timestamp("2024-01-01")
+    assert df["alpha"].tolist() == [40, 55]
+
+
+class _ScriptedTrendsSession:
+    """按预设状态码响应的会话替身；第一代会话在所有并发请求都到达后统一返回429"""
+
+    def __init__(self, status, barrier=None):
+        self.status = status
+        self.barrier = barrier
+        self.closed = False
+
+    def get_session(self):
+        return SimpleNamespace(headers={}, proxies={})
+
+    def make_request(self, method, url, timeout=None, **kwargs):
+        if self.barrier is not None:
+            self.barrier.wait(timeout=5)
+        return SimpleNamespace(status_code=self.status, text='{"ok": true}', raise_for_status=lambda: None)
+
+    def close(self, discard=False):
+        self.closed = True
+
+
+def test_concurrent_429s_reset_the_global_session_once(collector, monkeypatch):
+    threads_count = 3
+    throttled = _ScriptedTrendsSession(429, threading.Barrier(threads_count))
+    created = []
+
+    def new_session():
+        created.append(_ScriptedTrendsSession(200))
+        return created[-1]
+
+    monkeypatch.setattr(session_module, "_global_session", throttled)
+    monkeypatch.setattr(session_module, "GoogleTrendsSession", new_session)
+    monkeypatch.setattr(session_module, "get_global_session", lambda: session_module._global_session)
+    for name in ("wait_for_next_request", "get_rate_limiter_stats"):
+        monkeypatch.setattr(collector_module, name, lambda: None)
+    monkeypatch.setattr(collector_module, "register_rate_limit_event", lambda severity: 0.0)
+    monkeypatch.setattr(collector, "_calculate_retry_delay", lambda attempt, base_delay=None: 0.0)
+    collector.trends_session = throttled
+
+    results = [None] * threads_count
+
+    def worker(index):
+        results[index] = collector._get_data("https://trends.example/api", params={"i": index}, use_cache=False)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(threads_count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [{"ok": True}] * threads_count
+    assert len(created) == 1
+    assert throttled.closed
+    assert collector.trends_session is created[0]
+
+
+def test_widget_requests_stop_after_a_429(collector, monkeypatch):
+    keywords = ["alpha", "beta", "gamma", "delta", "epsilon"]
+    collector.max_widget_workers = 2
+    widget_calls = []
+    lock = threading.Lock()
+
+    def fake_get_data(url, method="get", trim_chars=0, use_cache=True, **kwargs):
+        if url == collector.GENERAL_URL:
+            widgets = []
+            for i, kw in enumerate(keywords):
+                widgets.append(_related_widget(f"RELATED_QUERIES_{i}", kw))
+                widgets.append(_related_widget(f"RELATED_TOPICS_{i}", kw))
+            return {"widgets": widgets}
+        keyword = json.loads(kwargs["params"]["req"])["restriction"]["complexKeywordsRestriction"]["keyword"][0]["value"]
+        with lock:
+            widget_calls.append(keyword)
+        if keyword == "alpha":
+            # 与 _get_data 遇到429时一致：记录限流状态并返回空结果
+            collector._request_state.rate_limited = True
+            return {}
+        time.sleep(0.05)
+        return _ranked_payload(keyword)
+
+    monkeypatch.setattr(collector, "_get_data", fake_get_data)
+    results = collector.related_for(keywords)
+
+    # 只有遇到429时已在进行中的请求会完成，其余请求不再发起
+    assert len(widget_calls) <= collector.max_widget_workers
+    assert not results["queries"]["epsilon"] and not results["topics"]["epsilon"]
+    # 限流状态传回调用线程，外层并发抓取可据此停止
+    assert collector._request_state.rate_limited is True
+
+
+class _ThreadRecordingSession:
+    """记录每次请求所在线程的会话替身"""
+
+    def __init__(self, thread_bound):
+        self.thread_bound = thread_bound
+        self.request_threads = []
+        self._lock = threading.Lock()
+
+    def get_session(self):
+        return SimpleNamespace(headers={}, proxies={})
+
+    def make_request(self, method, url, timeout=None, **kwargs):
+        with self._lock:
+            self.request_threads.append(threading.get_ident())
+        if url == CustomTrendsCollector.GENERAL_URL:
+            widgets = []
+            for i, kw in enumerate(["alpha", "beta"]):
+                widgets.append(_related_widget(f"RELATED_QUERIES_{i}", kw))
+                widgets.append(_related_widget(f"RELATED_TOPICS_{i}", kw))
+            for widget in widgets:
+                # 每个 widget 独立 token，避免请求缓存合并相同参数
+                widget["token"] = widget["id"]
+            body = ")]}'" + json.dumps({"widgets": widgets})
+        else:
+            keyword = json.loads(kwargs["params"]["req"])["restriction"]["complexKeywordsRestriction"]["keyword"][0]["value"]
+            time.sleep(0.02)
+            body = ")]}'," + json.dumps(_ranked_payload(keyword))
+        return SimpleNamespace(status_code=200, text=body, raise_for_status=lambda: None)
+
+
+@pytest.mark.parametrize("thread_bound", [True, False])
+def test_widget_requests_stay_on_calling_thread_for_thread_bound_sessions(collector, monkeypatch, thread_bound):
+    session = _ThreadRecordingSession(thread_bound)
+    for name in ("wait_for_next_request", "get_rate_limiter_stats"):
+        monkeypatch.setattr(collector_module, name, lambda: None)
+    collector.trends_session = session
+
+    results = collector.related_for(["alpha", "beta"])
+
+    assert results["queries"]["beta"]["rising"]["query"].tolist() == ["beta rising"]
+    assert len(session.request_threads) == 5
+    caller = threading.get_ident()
+    if thread_bound:
+        # Playwright 同步对象只能在创建它的线程上使用
+        assert set(session.request_threads) == {caller}
+    else:
+        assert set(session.request_threads[1:]) != {caller}
+
+
+class _KeywordTrendsSession(_ThreadRecordingSession):
+    def make_request(self, method, url, timeout=None, **kwargs):
+        with self._lock:
+            self.request_threads.append(threading.get_ident())
+        if url == CustomTrendsCollector.GENERAL_URL:
+            body = ")]}'" + json.dumps({"widgets": [
+                {"id": "TIMESERIES", "token": "ts", "request": {}},
+                _related_widget("RELATED_QUERIES", "python"),
+            ]})
+        elif url == CustomTrendsCollector.INTEREST_OVER_TIME_URL:
+            body = ")]}'," + json.dumps({"default": {"timelineData": [
+                {"time": "1704067200", "formattedTime": "Jan 1, 2024", "value": [40]},
+            ]}})
+        else:
+            body = ")]}'," + json.dumps(_ranked_payload("python"))
+        return SimpleNamespace(status_code=200, text=body, raise_for_status=lambda: None)
+
+
+def test_keyword_trends_with_thread_bound_session_returns_data(collector, monkeypatch):
+    session = _KeywordTrendsSession(thread_bound=True)
+    for name in ("wait_for_next_request", "get_rate_limiter_stats"):
+        monkeypatch.setattr(collector_module, name, lambda: None)
+    collector.trends_session = session
+
+    result = collector.get_keyword_trends("python")
+
+    assert result["interest_over_time"]["python"].tolist() == [40]
+    assert result["related_queries"]["python"]["top"]["query"].tolist() == ["python top"]
+    assert session.request_threads == [threading.get_ident()] * 3
@@ -0,0 +1,58 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_stats_do_not_load_lazy_managers():
+    # 在独立进程中检查 sys.modules，避免其他测试已导入的模块干扰结果
+    code = (
+        "import json, sys\n"
+        "from src.demand_mining_manager import IntegratedDemandMiningManager\n"
+        "manager = IntegratedDemandMiningManager()\n"
+        "stats = manager.get_manager_stats()\n"
+        "print(json.dumps({'stats': stats,\n"
+        "                  'created': [manager._keyword_manager is not None,\n"
+        "                              manager._discovery_manager is not None,\n"
+        "                              manager._trend_manager is not None],\n"
+        "                  'modules': sorted(sys.modules)}))\n"
+    )
+    completed = subprocess.run(
+        [sys.executable, '-c', code],
+        cwd=PROJECT_ROOT,
+        stdin=subprocess.DEVNULL,
+        capture_output=True,
+        text=True,
+        timeout=300,
+    )
+    assert completed.returncode == 0, completed.stderr
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+
+    assert result['stats'] == {
+        'keyword_manager': '未加载',
+        'discovery_manager': '未加载',
+        'trend_manager': '未加载',
+    }
+    assert result['created'] == [False, False, False]
+    assert 'src.demand_mining.managers.keyword_manager' not in result['modules']
+    assert 'src.demand_mining.managers.discovery_manager' not in result['modules']
+    assert 'src.demand_mining.managers.trend_manager' not in result['modules']
+
+
+def test_stats_report_managers_that_are_loaded():
+    from src.demand_mining_manager import IntegratedDemandMiningManager
+
+    class _StubManager:
+        def get_stats(self):
+            return {'total': 3}
+
+    manager = IntegratedDemandMiningManager()
+    manager._trend_manager = _StubManager()
+
+    stats = manager.get_manager_stats()
+
+    assert stats['trend_manager'] == {'total': 3}
+    assert stats['keyword_manager'] == stats['discovery_manager'] == '未加载'
+    assert manager._keyword_manager is None and manager._discovery_manager is None
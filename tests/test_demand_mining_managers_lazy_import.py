@@ -0,0 +1,64 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+SUBMODULES = [
+    'src.demand_mining.managers.base_manager',
+    'src.demand_mining.managers.keyword_manager',
+    'src.demand_mining.managers.discovery_manager',
+    'src.demand_mining.managers.trend_manager',
+    'src.demand_mining.managers.task_manager',
+]
+
+
+def _run(code):
+    # 在独立进程中检查 sys.modules，避免其他测试已导入的模块干扰结果
+    completed = subprocess.run(
+        [sys.executable, '-c', code],
+        cwd=PROJECT_ROOT,
+        stdin=subprocess.DEVNULL,
+        capture_output=True,
+        text=True,
+        timeout=300,
+    )
+    assert completed.returncode == 0, completed.stderr
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def test_package_import_does_not_load_manager_submodules():
+    loaded = _run(
+        "import json, sys\n"
+        "import src.demand_mining.managers\n"
+        "print(json.dumps(sorted(sys.modules)))\n"
+    )
+    assert not set(SUBMODULES) & set(loaded)
+
+
+def test_accessing_one_manager_loads_only_its_module():
+    loaded = _run(
+        "import json, sys\n"
+        "from src.demand_mining.managers import TaskManager\n"
+        "print(json.dumps(sorted(sys.modules)))\n"
+    )
+    assert 'src.demand_mining.managers.task_manager' in loaded
+    assert 'src.demand_mining.managers.keyword_manager' not in loaded
+    assert 'src.demand_mining.managers.discovery_manager' not in loaded
+
+
+def test_every_exported_name_resolves():
+    result = _run(
+        "import json\n"
+        "import src.demand_mining.managers as managers\n"
+        "print(json.dumps({name: [getattr(managers, name).__name__, getattr(managers, name).__module__]\n"
+        "                  for name in managers.__all__}))\n"
+    )
+    from src.demand_mining import managers
+
+    assert set(result) == set(managers.__all__)
+    for name, (resolved_name, module) in result.items():
+        assert resolved_name == name
+        assert module.startswith('src.demand_mining.managers.')
+    assert set(managers.__all__) <= set(dir(managers))
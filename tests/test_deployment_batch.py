@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.deployment.deployment_manager import DeploymentManager
+
+
+class _PagesState:
+    def __init__(self, fail_first=(), delay=0.0, fail_status=503):
+        self.lock = threading.Lock()
+        self.fail_first = set(fail_first)
+        self.fail_status = fail_status
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+        self.deployments = {}
+        self.deploy_calls = {}
+
+
+def _make_handler(state):
+    class Handler(BaseHTTPRequestHandler):
+        """模拟 Cloudflare Pages API 的最小本地服务"""
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, payload, status=200):
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _read_body(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            return self.rfile.read(length) if length else b''
+
+        def do_GET(self):
+            path = self.path
+            if path.endswith('/upload-token'):
+                return self._send({'result': {'jwt': 'jwt'}})
+            if '/deployments/' in path:
+                return self._send({'result': {'latest_stage': {'status': 'success', 'name': 'deploy'},
+                                              'url': state.deployments.get(path.rsplit('/', 1)[-1], '')}})
+            return self._send({'result': {}})
+
+        def do_POST(self):
+            body = self._read_body()
+            path = self.path
+            if path.endswith('/check-missing'):
+                return self._send({'result': json.loads(body)['hashes']})
+            if path.endswith('/upload') or path.endswith('/upsert-hashes'):
+                return self._send({'result': True})
+            if path.endswith('/deployments'):
+                project = path.split('/projects/')[1].split('/')[0]
+                with state.lock:
+                    calls = state.deploy_calls.get(project, 0) + 1
+                    state.deploy_calls[project] = calls
+                    state.active += 1
+                    state.peak = max(state.peak, state.active)
+                try:
+                    time.sleep(state.delay)
+                    if project in state.fail_first and calls == 1:
+                        return self._send({'errors': ['request failed']}, status=state.fail_status)
+                    deployment_id = f'{project}-{calls}'
+                    state.deployments[deployment_id] = f'https://{project}.pages.dev'
+                    return self._send({'result': {'id': deployment_id, 'url': f'https://{project}.pages.dev'}})
+                finally:
+                    with state.lock:
+                        state.active -= 1
+            return self._send({'result': {}})
+
+    return Handler
+
+
+@pytest.fixture
+def pages_server():
+    servers = []
+
+    def start(**kwargs):
+        state = _PagesState(**kwargs)
+        server = ThreadingHTTPServer(('127.0.0.1', 0), _make_handler(state))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return state, f'http://127.0.0.1:{server.server_address[1]}'
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def _make_sites(tmp_path, api_base, count):
+    sites = []
+    for i in range(count):
+        source = tmp_path / 'projects' / f'site{i}' / 'website_source'
+        source.mkdir(parents=True)
+        (source / 'index.html').write_text(f'<html>{i}</html>', encoding='utf-8')
+        sites.append({
+            'source_dir': str(source),
+            'deployer_name': 'cloudflare',
+            'custom_config': {
+                'api_token': 'token',
+                'account_id': 'acc',
+                'project_name': f'site-{i}',
+                'api_base': api_base,
+                'manifest_dir': str(tmp_path / 'manifests'),
+            },
+        })
+    return sites
+
+
+def test_batch_deploy_runs_concurrently_within_provider_limit(tmp_path, pages_server):
+    state, api_base = pages_server(delay=0.1)
+    manager = DeploymentManager()
+    sites = _make_sites(tmp_path, api_base, 6)
+
+    report = manager.deploy_websites_batch(sites, max_workers=6, provider_limits={'cloudflare': 3})
+
+    assert report['succeeded'] == 6
+    assert [r['project_name'] for r in report['results']] == [f'site-{i}' for i in range(6)]
+    assert state.peak <= 3
+    assert report['duration'] < report['serial_duration']
+    assert report['provider_stats']['cloudflare']['success'] == 6
+
+
+def test_batch_deploy_retries_transient_failures(tmp_path, pages_server):
+    state, api_base = pages_server(fail_first={'site-1'})
+    manager = DeploymentManager()
+    sites = _make_sites(tmp_path, api_base, 2)
+    sites.append({'source_dir': str(tmp_path / 'missing'), 'deployer_name': 'cloudflare'})
+
+    report = manager.deploy_websites_batch(sites, max_workers=2, max_retries=2, retry_backoff=0.01)
+
+    assert report['succeeded'] == 2
+    assert report['failed'] == 1
+    assert report['results'][1]['attempts'] == 2
+    assert report['results'][2]['attempts'] == 0
+    assert state.deploy_calls['site-1'] == 2
+
+
+def test_batch_deploy_does_not_retry_permanent_failures(tmp_path, pages_server):
+    state, api_base = pages_server(fail_first={'site-0'}, fail_status=400)
+    manager = DeploymentManager()
+    sites = _make_sites(tmp_path, api_base, 2)
+    # 配置验证失败：缺少 API Token
+    del sites[1]['custom_config']['api_token']
+
+    report = manager.deploy_websites_batch(sites, max_workers=2, max_retries=3, retry_backoff=0.01)
+
+    assert report['failed'] == 2
+    assert [r['attempts'] for r in report['results']] == [1, 1]
+    assert report['results'][1]['result'].startswith('配置验证失败')
+    assert state.deploy_calls == {'site-0': 1}
+
+
+def test_source_dir_removed_before_deploy_is_not_retried(tmp_path, pages_server):
+    _, api_base = pages_server()
+    manager = DeploymentManager()
+    site = _make_sites(tmp_path, api_base, 1)[0]
+    site['source_dir'] = str(tmp_path / 'gone')
+
+    result = manager._deploy_site_with_retry(0, site, 'cloudflare', threading.BoundedSemaphore(1), 3, 0.01)
+
+    assert not result['success']
+    assert result['attempts'] == 1
+    assert result['result'].startswith('源文件目录不存在')
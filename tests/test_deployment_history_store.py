@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+
+from src.deployment.deployment_history_store import DeploymentHistoryStore
+
+
+def _record(i, deployer='cloudflare', project='site-a', success=True):
+    return {
+        'timestamp': f'2025-01-01T00:{i // 60:02d}:{i % 60:02d}',
+        'deployer': deployer,
+        'source_dir': f'output/{project}/website_source',
+        'project_directory': project,
+        'success': success,
+        'result': f'https://{project}.pages.dev',
+    }
+
+
+def test_store_keeps_full_history_and_filters_by_index(tmp_path):
+    store = DeploymentHistoryStore(str(tmp_path))
+    for i in range(150):
+        store.append(_record(
+            i,
+            deployer='vercel' if i % 3 == 0 else 'cloudflare',
+            project='site_b' if i % 2 else 'site-a',
+            success=i % 5 != 0,
+        ))
+
+    assert store.count() == 150
+    assert len(store.query()) == 150
+
+    recent = store.query(limit=3, newest_first=True)
+    assert [r['timestamp'] for r in recent] == [_record(i)['timestamp'] for i in (149, 148, 147)]
+
+    vercel_ok = store.query(deployer='vercel', success_only=True)
+    assert all(r['deployer'] == 'vercel' and r['success'] for r in vercel_ok)
+    assert len(vercel_ok) == len([i for i in range(150) if i % 3 == 0 and i % 5 != 0])
+
+    # 项目按前缀匹配，下划线按字面匹配而不是通配符
+    assert len(store.query(project='site_')) == 75
+    assert len(store.query(project='site')) == 150
+    assert len(store.query(project='site-a')) == 75
+    assert store.query(project='e_b') == []
+    assert store.query(project='site.') == []
+
+    stats = store.get_stats()
+    assert stats['total_deployments'] == 150
+    assert stats['successful_deployments'] == 120
+    assert stats['deployer_stats']['vercel']['total'] == 50
+    assert stats['project_stats']['site_b']['last_deployment'] == _record(149)['timestamp']
+
+
+def test_project_filter_uses_project_index(tmp_path):
+    store = DeploymentHistoryStore(str(tmp_path))
+    store.append(_record(0, project='demo_20250101'))
+    store._ensure_database()
+
+    captured = []
+    original_connect = store._connect
+
+    def explaining_connect():
+        conn = original_connect()
+        conn.set_trace_callback(captured.append)
+        return conn
+
+    store._connect = explaining_connect
+    assert len(store.query(project='demo_')) == 1
+    sql = next(statement for statement in captured if statement.startswith('SELECT record'))
+
+    with sqlite3.connect(store.db_path) as conn:
+        plan = ' '.join(row[-1] for row in conn.execute('EXPLAIN QUERY PLAN ' + sql))
+    assert 'idx_project' in plan
+
+
+def test_store_imports_legacy_json_once(tmp_path):
+    legacy = [_record(0), _record(1, success=False)]
+    (tmp_path / 'deployment_history.json').write_text(json.dumps(legacy), encoding='utf-8')
+
+    store = DeploymentHistoryStore(str(tmp_path))
+    store.append(_record(2))
+    assert store.count() == 3
+
+    reopened = DeploymentHistoryStore(str(tmp_path))
+    assert reopened.count() == 3
+    assert reopened.get_stats()['failed_deployments'] == 1
@@ -0,0 +1,103 @@
+import json
+import os
+
+from src.website_builder import html_generator
+from src.website_builder import unified_website_builder as unified
+
+
+class _StubAnalyzer:
+    INTENT_DESCRIPTIONS = {'I': '信息', 'T': '交易'}
+
+
+def _structure(transactional_keyword):
+    return {
+        'homepage': {'title': 'Demo', 'description': 'demo site'},
+        'intent_pages': {
+            'I': [{'type': 'keyword', 'keyword': 'python tutorial', 'url': '/keyword/python-tutorial.html'}],
+            'T': [{'type': 'keyword', 'keyword': transactional_keyword, 'url': f'/keyword/{transactional_keyword}.html'}],
+        },
+    }
+
+
+def _mtimes(site_dir):
+    stamps = {}
+    for root, _, files in os.walk(site_dir):
+        for name in files:
+            path = os.path.join(root, name)
+            stamps[os.path.relpath(path, site_dir)] = os.stat(path).st_mtime_ns
+    return stamps
+
+
+def _builder(output_dir, monkeypatch, **config):
+    monkeypatch.setattr('src.website_builder.builder_core.IntentAnalyzer', lambda **kwargs: _StubAnalyzer())
+    return unified.UnifiedWebsiteBuilder(
+        output_dir=str(output_dir),
+        config={'project_name': 'demo', **config},
+        enable_seo=False,
+    )
+
+
+def _run(output_dir, site_dir, monkeypatch, transactional_keyword):
+    builder = _builder(output_dir, monkeypatch, site_output_dir=str(site_dir))
+    builder.core_builder.website_structure = _structure(transactional_keyword)
+    builder.core_builder.content_plan = [{'title': 'Intro', 'type': 'article'}]
+    return builder, builder.generate_website_source()
+
+
+def test_site_dir_is_stable_across_runs(tmp_path, monkeypatch):
+    first = _builder(tmp_path, monkeypatch)
+    second = _builder(tmp_path, monkeypatch)
+
+    assert first.html_generator.output_dir == second.html_generator.output_dir == str(tmp_path / 'demo_site')
+    assert first.core_builder.output_dir != first.html_generator.output_dir
+
+
+def test_tailwind_site_keeps_timestamped_dir(tmp_path, monkeypatch):
+    # Tailwind 生成器没有构建清单，共用固定目录会残留已删除的页面
+    builder = _builder(tmp_path, monkeypatch, use_tailwind=True)
+
+    assert builder.site_output_dir == builder.html_generator.output_dir == builder.core_builder.output_dir
+    assert builder.site_output_dir != str(tmp_path / 'demo_site')
+
+
+def test_renderer_fingerprint_covers_helper_code(tmp_path, monkeypatch):
+    generator = html_generator.HTMLGenerator(str(tmp_path / 'site'))
+    before = generator._renderer_fingerprint()
+    assert generator._renderer_fingerprint() == before
+
+    # 修改非渲染入口的辅助代码同样使指纹变化
+    source = "# helper v2\n" + html_generator.inspect.getsource(html_generator)
+    monkeypatch.setattr(html_generator.inspect, 'getsource', lambda module: source)
+
+    assert generator._renderer_fingerprint() != before
+
+
+def test_rebuild_only_rewrites_changed_pages(tmp_path, monkeypatch):
+    site = tmp_path / 'site'
+    first, site_dir = _run(tmp_path / 'run1', site, monkeypatch, 'buy-widgets')
+    assert site_dir == str(site)
+    before = _mtimes(site_dir)
+    assert 'keyword/buy-widgets.html' in before
+
+    # 保证修改时间可区分
+    for path in before:
+        os.utime(os.path.join(site_dir, path), ns=(1, 1))
+    before = _mtimes(site_dir)
+
+    second, second_dir = _run(tmp_path / 'run2', site, monkeypatch, 'widget-deals')
+    after = _mtimes(second_dir)
+
+    assert second_dir == site_dir
+    stats = second.html_generator.last_build_stats
+    assert stats['skipped'] >= 1
+    assert stats['removed'] == 1
+
+    assert after['keyword/python-tutorial.html'] == before['keyword/python-tutorial.html']
+    assert after['intent/i.html'] == before['intent/i.html']
+    assert after['styles.css'] == before['styles.css']
+    assert after['intent/t.html'] != before['intent/t.html']
+    assert 'keyword/widget-deals.html' in after
+    assert 'keyword/buy-widgets.html' not in after
+
+    manifest = json.loads((site / html_generator.MANIFEST_FILENAME).read_text(encoding='utf-8'))
+    assert 'keyword/widget-deals.html' in manifest['files']
@@ -0,0 +1,102 @@
+import json
+import os
+
+import pytest
+
+from src import integrated_workflow as iw
+
+
+class _FakeDeployer:
+    def __init__(self, deployment_config_path):
+        self.deployment_config_path = deployment_config_path
+        self.sites = []
+
+
+class _FakeBuilder:
+    """按意图数据与部署配置确定性地生成页面，替代真实建站流程"""
+
+    def __init__(self, intent_data_path, output_dir, config, website_deployer=None, **shared):
+        self.intent_data_path = intent_data_path
+        self.output_dir = os.path.join(output_dir, config['project_name'])
+        self.config = config
+        self.website_deployer = website_deployer
+        self.rows = []
+
+    def load_intent_data(self):
+        with open(self.intent_data_path, encoding='utf-8') as fh:
+            self.rows = json.load(fh)
+        return True
+
+    def generate_website_structure(self):
+        return {}
+
+    def create_content_plan(self):
+        return []
+
+    def generate_website_source(self):
+        # 部署器按站点独立：同一实例被多个站点复用时 sites 会累积
+        self.website_deployer.sites.append(self.config['project_name'])
+        os.makedirs(self.output_dir, exist_ok=True)
+        page = {
+            'query': self.rows[0]['query'],
+            'intent': self.rows[0]['intent_primary'],
+            'template': self.config['template_type'],
+            'deployment_config_path': self.website_deployer.deployment_config_path,
+            'deployer_sites': len(self.website_deployer.sites),
+        }
+        with open(os.path.join(self.output_dir, 'index.json'), 'w', encoding='utf-8') as fh:
+            json.dump(page, fh, ensure_ascii=False, sort_keys=True)
+        return self.output_dir
+
+
+KEYWORDS = [
+    {'keyword': 'ai photo editor', 'opportunity_score': 80,
+     'intent': {'primary_intent': 'T', 'website_recommendations': {'website_type': 'SaaS工具'}}},
+    {'keyword': 'python tutorial', 'opportunity_score': 70,
+     'intent': {'primary_intent': 'I', 'website_recommendations': {'website_type': '教程网站'}}},
+    {'keyword': 'best vpn review', 'opportunity_score': 65,
+     'intent': {'primary_intent': 'C', 'website_recommendations': {'website_type': '评测网站'}}},
+]
+
+
+@pytest.fixture(autouse=True)
+def fake_build(monkeypatch):
+    monkeypatch.setattr(iw, 'IntentBasedWebsiteBuilder', _FakeBuilder)
+    monkeypatch.setattr(iw, '_create_website_deployer', _FakeDeployer)
+    monkeypatch.setattr(iw, '_BUILD_WORKER_RESOURCES', {})
+
+
+def _workflow(tmp_path, name, **config):
+    workflow = iw.IntegratedWorkflow.__new__(iw.IntegratedWorkflow)
+    workflow.config = config
+    workflow.output_base_dir = str(tmp_path / name)
+    workflow._ensure_output_dirs()
+    return workflow
+
+
+def _build(workflow):
+    results = workflow._batch_generate_websites(KEYWORDS)
+    assert [r['status'] for r in results] == ['success'] * len(KEYWORDS)
+    pages = {}
+    for result in results:
+        with open(os.path.join(result['source_dir'], 'index.json'), encoding='utf-8') as fh:
+            pages[result['keyword']] = json.load(fh)
+    return pages
+
+
+def test_serial_and_parallel_builds_produce_identical_sites(tmp_path):
+    serial = _build(_workflow(tmp_path, 'serial', website_build_workers=1, deployment_config_path='deploy.json'))
+    parallel = _build(_workflow(tmp_path, 'parallel', website_build_workers=2, deployment_config_path='deploy.json'))
+
+    assert serial == parallel
+    assert {page['template'] for page in serial.values()} == {'saas', 'tutorial', 'review'}
+    # 每个站点拿到独立的部署器
+    assert all(page['deployer_sites'] == 1 for page in serial.values())
+
+
+def test_serial_builds_use_each_workflows_deployment_config(tmp_path):
+    first = _build(_workflow(tmp_path, 'first', website_build_workers=1, deployment_config_path='first.json'))
+    second = _build(_workflow(tmp_path, 'second', website_build_workers=1, deployment_config_path='second.json'))
+
+    assert {page['deployment_config_path'] for page in first.values()} == {'first.json'}
+    assert {page['deployment_config_path'] for page in second.values()} == {'second.json'}
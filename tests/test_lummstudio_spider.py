@@ -0,0 +1,166 @@
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from src.spider import lummstudio_spider as spider_module
+from src.spider.lummstudio_spider import LummStudioSpider
+
+ARTICLES = 3
+
+
+def _listing():
+    cards = ''.join(
+        f'<a class="card padding--lg cardContainer_x" href="/docs/seo/a{i}">'
+        f'<h2 class="cardTitle_x" title="Article {i}">Article {i}</h2>'
+        f'<p class="cardDescription_x" title="日期：2024-01-0{i}">日期：2024-01-0{i}</p></a>'
+        for i in range(1, ARTICLES + 1)
+    )
+    return f'<html><body><main>{cards}</main></body></html>'.encode('utf-8')
+
+
+def _article(i):
+    return (
+        f'<html><head><meta name="description" content="desc {i}"></head><body>'
+        f'<main><h1>Article {i}</h1><p>Body {i}</p><img src="/img/{i}.png"></main></body></html>'
+    ).encode('utf-8')
+
+
+class _SiteServer:
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.requests = []
+        self.lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                with server.lock:
+                    server.requests.append((self.path, time.monotonic(), self.headers.get('If-None-Match')))
+                time.sleep(server.latency)
+                path = self.path
+                if path == '/docs/seo/miniclass':
+                    return self._send(_listing(), 'text/html; charset=utf-8')
+                match = re.fullmatch(r'/docs/seo/a(\d+)', path)
+                if match:
+                    etag = f'"a{match.group(1)}"'
+                    if self.headers.get('If-None-Match') == etag:
+                        self.send_response(304)
+                        self.end_headers()
+                        return
+                    return self._send(_article(int(match.group(1))), 'text/html; charset=utf-8', etag)
+                match = re.fullmatch(r'/img/(\d+)\.png', path)
+                if match:
+                    return self._send(f'png-{match.group(1)}'.encode(), 'image/png')
+                self.send_response(404)
+                self.end_headers()
+
+            def _send(self, body, content_type, etag=None):
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                if etag:
+                    self.send_header('ETag', etag)
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        self.base = f'http://127.0.0.1:{self.httpd.server_address[1]}'
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def site():
+    server = _SiteServer()
+    yield server
+    server.close()
+
+
+@pytest.fixture(autouse=True)
+def workdir(tmp_path, monkeypatch):
+    # save_data / save_markdown 写入相对路径
+    monkeypatch.chdir(tmp_path)
+
+
+def _crawl(monkeypatch, pages_dir, base, async_mode, host_interval=0.0):
+    monkeypatch.setattr(spider_module, 'HTML_PAGES_DIR', str(pages_dir))
+    monkeypatch.setattr(spider_module, 'CRAWL_STATE_FILE', str(pages_dir / '.crawl_state.json'))
+    spider = LummStudioSpider(host_interval=host_interval)
+    spider.base_url = base
+    spider.start_url = f'{base}/docs/seo/miniclass'
+    return spider, spider.crawl(async_mode=async_mode)
+
+
+def _seed_stale_files(pages_dir):
+    (pages_dir / 'images' / 'Old').mkdir(parents=True)
+    (pages_dir / 'images' / 'Old' / 'gone.png').write_bytes(b'old')
+    (pages_dir / '20230101_Old.html').write_text('<html>old</html>', encoding='utf-8')
+
+
+def _snapshot(pages_dir):
+    files = {}
+    for path in sorted(pages_dir.rglob('*')):
+        if path.is_file() and path.name != '.crawl_state.json':
+            content = path.read_bytes()
+            if path.suffix == '.html':
+                content = re.sub(rb'<strong>\xe7\x88\xac\xe5\x8f\x96\xe6\x97\xb6\xe9\x97\xb4:</strong>[^<]*', b'', content)
+            files[path.relative_to(pages_dir).as_posix()] = content
+    return files
+
+
+def test_async_crawl_output_matches_sync_and_removes_old_files(site, tmp_path, monkeypatch):
+    monkeypatch.setattr(spider_module.time, 'sleep', lambda seconds: None)
+    sync_dir, async_dir = tmp_path / 'sync', tmp_path / 'async'
+    for pages_dir in (sync_dir, async_dir):
+        _seed_stale_files(pages_dir)
+
+    _, sync_result = _crawl(monkeypatch, sync_dir, site.base, async_mode=False)
+    _, async_result = _crawl(monkeypatch, async_dir, site.base, async_mode=True)
+
+    assert sync_result['total_articles'] == async_result['total_articles'] == ARTICLES
+    sync_files, async_files = _snapshot(sync_dir), _snapshot(async_dir)
+    assert sync_files == async_files
+    assert '20230101_Old.html' not in async_files
+    assert 'images/Old/gone.png' not in async_files
+    assert not (async_dir / 'images' / 'Old').exists()
+    assert sorted(name for name in async_files if name.startswith('images/')) == [
+        f'images/Article {i}/{i}.png' for i in range(1, ARTICLES + 1)
+    ]
+
+
+def test_recrawl_reuses_articles_and_keeps_their_images(site, tmp_path, monkeypatch):
+    pages_dir = tmp_path / 'pages'
+    _crawl(monkeypatch, pages_dir, site.base, async_mode=True)
+    first = _snapshot(pages_dir)
+    site.requests.clear()
+
+    spider, result = _crawl(monkeypatch, pages_dir, site.base, async_mode=True)
+
+    assert result['stats']['articles_not_modified'] == ARTICLES
+    assert result['stats']['images_downloaded'] == 0
+    article_requests = [r for r in site.requests if r[0].startswith('/docs/seo/a')]
+    assert len(article_requests) == ARTICLES and all(r[2] for r in article_requests)
+    assert not any(r[0].startswith('/img/') for r in site.requests)
+    assert _snapshot(pages_dir).keys() == first.keys()
+
+
+def test_async_crawl_respects_host_interval(site, tmp_path, monkeypatch):
+    interval = 0.1
+    _crawl(monkeypatch, tmp_path / 'pages', site.base, async_mode=True, host_interval=interval)
+
+    # 列表页 + 每篇文章 + 每张图片，全部指向同一主机
+    starts = sorted(stamp for _, stamp, _ in site.requests)
+    assert len(starts) == 1 + 2 * ARTICLES
+    assert starts[-1] - starts[0] >= (len(starts) - 1) * interval * 0.9
+    assert min(later - earlier for earlier, later in zip(starts, starts[1:])) >= interval * 0.5
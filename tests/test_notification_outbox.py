@@ -0,0 +1,79 @@
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from src.demand_mining.core.notification import NotificationConfig, NotificationManager, Priority, Task
+
+
+def _start_webhook(statuses, delay=0.0):
+    """本地替身 webhook：按顺序返回给定状态码（用完后返回200），记录收到的消息"""
+    received = []
+    statuses = list(statuses)
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            time.sleep(delay)
+            body = self.rfile.read(int(self.headers["Content-Length"]))
+            received.append(json.loads(body))
+            self.send_response(statuses.pop(0) if statuses else 200)
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            self.wfile.write(b"{}")
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, received
+
+
+def _manager(tmp_path, server, **overrides):
+    config = NotificationConfig(
+        email_enabled=False,
+        wechat_enabled=True,
+        wechat_webhook_url=f"http://127.0.0.1:{server.server_address[1]}/hook",
+        outbox_path=str(tmp_path / "outbox.db"),
+        retry_backoff=0.01,
+        **overrides,
+    )
+    return NotificationManager(config)
+
+
+def test_send_returns_immediately_and_retries_via_outbox(tmp_path):
+    server, received = _start_webhook([500], delay=0.3)
+    manager = _manager(tmp_path, server)
+    try:
+        started = time.perf_counter()
+        assert manager.send_notification("hello", "subject") == {"wechat": True}
+        assert time.perf_counter() - started < 0.2
+
+        deadline = time.time() + 5
+        while manager.outbox.get_stats()["sent"] < 1 and time.time() < deadline:
+            manager.flush(timeout=2)
+        assert manager.outbox.get_stats() == {"pending": 0, "sent": 1, "failed": 0}
+        assert len(received) == 2
+    finally:
+        manager.close()
+        server.shutdown()
+
+
+def test_task_reminders_are_coalesced_into_one_digest(tmp_path):
+    server, received = _start_webhook([])
+    manager = _manager(tmp_path, server, digest_window=30)
+    deadline = datetime.now() + timedelta(hours=2)
+    try:
+        manager.send_task_reminder([Task("1", "验证搜索量", "", Priority.HIGH, deadline)])
+        manager.send_task_reminder([Task("2", "更新竞品分析", "", Priority.LOW, deadline)])
+        assert received == []
+
+        stats = manager.flush(timeout=5)
+        assert stats["sent"] == 2
+        assert len(received) == 1
+        content = received[0]["text"]["content"]
+        assert "验证搜索量" in content and "更新竞品分析" in content
+    finally:
+        manager.close()
+        server.shutdown()
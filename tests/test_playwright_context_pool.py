@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import time
+
+from src.collectors.playwright_context_pool import PlaywrightContextPool
+
+
+class _FakeContext:
+    def __init__(self):
+        self.closed = False
+        self.extra_headers = {}
+        self.request = object()
+
+    def cookies(self):
+        if self.closed:
+            raise RuntimeError("context closed")
+        return []
+
+    def set_extra_http_headers(self, headers):
+        self.extra_headers = dict(headers)
+
+    def close(self):
+        self.closed = True
+
+
+class _FakeBrowser:
+    def __init__(self):
+        self.contexts = []
+        self.connected = True
+
+    def new_context(self, **kwargs):
+        context = _FakeContext()
+        self.contexts.append(context)
+        return context
+
+    def is_connected(self):
+        return self.connected
+
+    def close(self):
+        self.connected = False
+
+
+class _FakeChromium:
+    def __init__(self):
+        self.launches = 0
+        self.browser = None
+
+    def launch(self, **kwargs):
+        self.launches += 1
+        self.browser = _FakeBrowser()
+        return self.browser
+
+
+class _FakePlaywright:
+    def __init__(self):
+        self.chromium = _FakeChromium()
+        self.stopped = False
+
+    def stop(self):
+        self.stopped = True
+
+
+def _make_pool(**kwargs):
+    driver = _FakePlaywright()
+    pool = PlaywrightContextPool(headless=True, playwright_factory=lambda: driver, **kwargs)
+    return pool, driver
+
+
+def test_pool_reuses_warmed_context_and_launches_once():
+    pool, driver = _make_pool()
+
+    first = pool.lease({'locale': 'en-US'}, {'User-Agent': 'ua'})
+    first.warmed = True
+    pool.release(first)
+
+    second = pool.lease({'locale': 'en-US'})
+    assert second is first
+    assert second.warmed
+    assert second.uses == 2
+    assert driver.chromium.launches == 1
+
+    stats = pool.get_stats()
+    assert stats['reused'] == 1
+    assert stats['contexts_created'] == 1
+    assert stats['leased'] == 1
+
+
+def test_pool_hands_out_distinct_contexts_concurrently():
+    pool, driver = _make_pool()
+
+    a = pool.lease({'locale': 'en-US'})
+    b = pool.lease({'locale': 'en-US'})
+    assert a.context is not b.context
+    assert driver.chromium.launches == 1
+
+    pool.release(a)
+    pool.release(b)
+    assert pool.get_stats()['idle'] == 2
+
+
+def test_pool_discards_unhealthy_and_expired_contexts():
+    pool, _ = _make_pool(max_context_age=0.01)
+
+    lease = pool.lease({'locale': 'en-US'})
+    pool.discard(lease)
+    assert lease.context.closed
+    assert pool.get_stats()['idle'] == 0
+
+    lease = pool.lease({'locale': 'en-US'})
+    pool.release(lease)
+    time.sleep(0.02)
+    fresh = pool.lease({'locale': 'en-US'})
+    assert fresh is not lease
+    assert lease.context.closed
+
+
+def test_pool_relaunches_disconnected_browser_and_closes():
+    pool, driver = _make_pool()
+
+    lease = pool.lease({'locale': 'en-US'})
+    pool.release(lease)
+    driver.chromium.browser.connected = False
+
+    replacement = pool.lease({'locale': 'en-US'})
+    assert replacement is not lease
+    assert driver.chromium.launches == 2
+
+    pool.close()
+    assert replacement.context.closed
+    assert driver.stopped
+
+
+def test_pools_close_only_on_their_owning_thread(monkeypatch):
+    import threading
+
+    import src.collectors.playwright_context_pool as pool_module
+
+    drivers = []
+
+    def make_pool(**kwargs):
+        driver = _FakePlaywright()
+        drivers.append(driver)
+        return PlaywrightContextPool(headless=True, playwright_factory=lambda: driver)
+
+    monkeypatch.setattr(pool_module, 'PlaywrightContextPool', make_pool)
+    monkeypatch.setattr(pool_module, '_all_pools', [])
+
+    errors = []
+
+    def worker(close_on_exit):
+        try:
+            pool = pool_module.get_playwright_context_pool()
+            pool.release(pool.lease({'locale': 'en-US'}))
+            if close_on_exit:
+                pool_module.close_thread_playwright_context_pool()
+        except Exception as exc:  # pragma: no cover - 失败时由断言报告
+            errors.append(exc)
+
+    for close_on_exit in (True, False):
+        thread = threading.Thread(target=worker, args=(close_on_exit,))
+        thread.start()
+        thread.join()
+
+    main_pool = pool_module.get_playwright_context_pool()
+    main_pool.release(main_pool.lease({'locale': 'en-US'}))
+
+    pool_module.shutdown_playwright_context_pools()
+
+    assert errors == []
+    closed_by_worker, left_by_worker, main_driver = drivers
+    assert closed_by_worker.stopped
+    # 主线程退出时不得跨线程操作其他线程的 Playwright 对象
+    assert not left_by_worker.stopped
+    assert main_driver.stopped
+
+
+def test_session_reset_always_reinitialises(monkeypatch):
+    from src.collectors.google_trends_session import GoogleTrendsSession
+
+    session = GoogleTrendsSession.__new__(GoogleTrendsSession)
+    session.initialized = True
+    init_calls = []
+
+    def fake_create_session():
+        # 模拟租到已预热的上下文
+        session.initialized = True
+
+    def fake_init_session():
+        init_calls.append(True)
+        session.initialized = True
+
+    monkeypatch.setattr(session, '_close_session', lambda discard=False: None, raising=False)
+    monkeypatch.setattr(session, '_create_session', fake_create_session)
+    monkeypatch.setattr(session, '_init_session', fake_init_session)
+
+    session.reset_session()
+    assert init_calls == [True]
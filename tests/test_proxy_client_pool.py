@@ -0,0 +1,217 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("fake_useragent")
+
+from src.demand_mining.core import proxy_manager as pm
+from src.demand_mining.core.proxy_manager import ProxyManager
+
+
+class _CookieServer:
+    """/login 下发 Cookie，/echo 回显收到的 Cookie 头"""
+
+    def __init__(self):
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                if self.path == "/login":
+                    body = b"ok"
+                    self.send_response(200)
+                    self.send_header("Set-Cookie", "sid=secret; Path=/")
+                else:
+                    body = (self.headers.get("Cookie") or "").encode()
+                    self.send_response(200)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def url(self, path):
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}{path}"
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class _FakeClient:
+    def __init__(self, name):
+        self.name = name
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def manager():
+    proxy_manager = ProxyManager(request_delay=(0, 0), max_requests_per_minute=1000, timeout=2)
+    yield proxy_manager
+    proxy_manager.close()
+
+
+@pytest.fixture
+def fake_clients(manager, monkeypatch):
+    created = []
+
+    def create(name):
+        client = _FakeClient(name)
+        created.append(client)
+        return client
+
+    monkeypatch.setattr(manager, "_create_requests_session", lambda: create("requests"))
+    monkeypatch.setattr(manager, "_create_httpx_client", lambda proxy_url: create(f"httpx:{proxy_url}"))
+    return created
+
+
+def _use(manager, backend, proxy_url):
+    """租用并立即归还客户端，返回客户端对象"""
+    with manager._lease_client(backend, proxy_url) as client:
+        return client
+
+
+@pytest.mark.parametrize("backend", ["requests", "httpx"])
+def test_pooled_client_does_not_carry_cookies_between_callers(manager, backend):
+    if backend == "httpx":
+        pytest.importorskip("httpx")
+    server = _CookieServer()
+    try:
+        login = manager.make_request(server.url("/login"), use_proxy=False, backend=backend)
+        # 调用方仍能读到自己响应中的 Cookie
+        assert login.cookies.get("sid") == "secret"
+
+        echo = manager.make_request(server.url("/echo"), use_proxy=False, backend=backend)
+        assert echo.text == ""
+
+        explicit = manager.make_request(server.url("/echo"), use_proxy=False, backend=backend, cookies={"lang": "en"})
+        assert explicit.text == "lang=en"
+
+        stats = manager.get_client_pool_stats()
+        assert stats["created"] == 1 and stats["reused"] == 2 and stats["open_clients"] == 1
+    finally:
+        server.close()
+
+
+def test_clients_are_reused_per_proxy_and_backend(manager, fake_clients):
+    direct = _use(manager, "requests", None)
+    assert _use(manager, "requests", None) is direct
+    via_proxy = _use(manager, "requests", "http://10.0.0.1:8080")
+    via_httpx = _use(manager, "httpx", "http://10.0.0.1:8080")
+
+    assert len({id(direct), id(via_proxy), id(via_httpx)}) == 3
+    assert manager.get_client_pool_stats() == {"created": 3, "reused": 1, "evicted": 0, "open_clients": 3}
+
+
+def test_idle_clients_are_closed_and_replaced(manager, fake_clients, monkeypatch):
+    manager.client_idle_timeout = 10
+    now = [1000.0]
+    monkeypatch.setattr(pm.time, "time", lambda: now[0])
+
+    first = _use(manager, "requests", None)
+    busy = _use(manager, "requests", "http://10.0.0.1:8080")
+    now[0] += 8
+    assert _use(manager, "requests", "http://10.0.0.1:8080") is busy
+    now[0] += 5
+
+    second = _use(manager, "requests", None)
+
+    assert second is not first and first.closed
+    assert not busy.closed
+    assert manager.get_client_pool_stats()["evicted"] == 1
+
+
+def test_least_recently_used_client_is_evicted_when_pool_is_full(manager, fake_clients):
+    manager.max_pooled_clients = 2
+    a = _use(manager, "requests", "http://10.0.0.1:8080")
+    b = _use(manager, "requests", "http://10.0.0.2:8080")
+    assert _use(manager, "requests", "http://10.0.0.1:8080") is a
+
+    c = _use(manager, "requests", "http://10.0.0.3:8080")
+
+    assert b.closed and not a.closed and not c.closed
+    assert ("http://10.0.0.2:8080", "requests") not in manager._clients
+    assert manager.get_client_pool_stats()["open_clients"] == 2
+
+
+def test_removing_proxy_closes_its_clients(manager, fake_clients):
+    manager.add_proxy("10.0.0.1", 8080)
+    manager.add_proxy("10.0.0.2", 8080)
+    removed_url = "http://10.0.0.1:8080"
+    removed = [_use(manager, "requests", removed_url), _use(manager, "httpx", removed_url)]
+    kept = _use(manager, "requests", "http://10.0.0.2:8080")
+    direct = _use(manager, "requests", None)
+
+    manager.remove_proxy("10.0.0.1", 8080)
+
+    assert all(client.closed for client in removed)
+    assert not kept.closed and not direct.closed
+    assert all(key[0] != removed_url for key in manager._clients)
+    assert [proxy.host for proxy in manager.proxies] == ["10.0.0.2"]
+
+
+def test_evicted_client_is_closed_only_after_release(manager, fake_clients):
+    manager.max_pooled_clients = 1
+    with manager._lease_client("requests", "http://10.0.0.1:8080") as in_flight:
+        other = _use(manager, "requests", "http://10.0.0.2:8080")
+        # 已被 LRU 移出池，但仍在使用中，不能关闭
+        assert ("http://10.0.0.1:8080", "requests") not in manager._clients
+        assert not in_flight.closed and not other.closed
+    assert in_flight.closed
+    assert manager.get_client_pool_stats() == {"created": 2, "reused": 0, "evicted": 1, "open_clients": 1}
+
+
+def test_client_in_use_is_not_idle_evicted(manager, fake_clients, monkeypatch):
+    manager.client_idle_timeout = 10
+    now = [1000.0]
+    monkeypatch.setattr(pm.time, "time", lambda: now[0])
+
+    with manager._lease_client("requests", None) as slow_call:
+        now[0] += 60
+        _use(manager, "requests", "http://10.0.0.1:8080")
+        assert not slow_call.closed
+    # 归还时刷新使用时间，随后按空闲超时正常回收
+    now[0] += 11
+    _use(manager, "requests", "http://10.0.0.1:8080")
+    assert slow_call.closed
+
+
+def test_removing_or_closing_defers_close_of_leased_clients(manager, fake_clients):
+    manager.add_proxy("10.0.0.1", 8080)
+    removed_url = "http://10.0.0.1:8080"
+    with manager._lease_client("requests", removed_url) as removed, \
+            manager._lease_client("requests", None) as direct:
+        manager.remove_proxy("10.0.0.1", 8080)
+        manager.close()
+        assert not removed.closed and not direct.closed
+        assert manager._clients == {}
+    assert removed.closed and direct.closed
+
+
+def test_concurrent_leases_never_use_a_closed_client(manager, fake_clients):
+    manager.max_pooled_clients = 2
+    errors = []
+
+    def worker(index):
+        for round_ in range(200):
+            proxy_url = f"http://10.0.0.{(index + round_) % 5}:8080"
+            with manager._lease_client("requests", proxy_url) as client:
+                if client.closed:
+                    errors.append(client.name)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert all(entry.in_use == 0 for entry in manager._clients.values())
@@ -0,0 +1,165 @@
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("fake_useragent")
+
+from src.demand_mining.core.proxy_manager import ProxyInfo, ProxyManager
+
+
+def _start_stand_in_proxy(status: int = 200, delay: float = 0.0) -> ThreadingHTTPServer:
+    """本地替身代理：对任意绝对地址请求直接返回固定状态码"""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            time.sleep(delay)
+            body = b"{}"
+            self.send_response(status)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _unused_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_concurrent_probes_record_health_and_pick_fastest():
+    fast = _start_stand_in_proxy()
+    slow = _start_stand_in_proxy(delay=0.2)
+    broken = _start_stand_in_proxy(status=502)
+    manager = ProxyManager(timeout=2, health_check={"max_workers": 4})
+    try:
+        for server in (slow, fast, broken):
+            manager.add_proxy("127.0.0.1", server.server_address[1])
+        manager.add_proxy("127.0.0.1", _unused_port())
+
+        started = time.perf_counter()
+        summary = manager.test_all_proxies(test_url="http://probe.invalid/ip")
+        # 并发探测：总耗时不应是各代理耗时之和
+        assert time.perf_counter() - started < 1.5
+        assert summary == {"total": 4, "active": 2}
+
+        by_port = {proxy.port: proxy for proxy in manager.proxies}
+        fast_proxy = by_port[fast.server_address[1]]
+        assert fast_proxy.probe_count == 1
+        assert fast_proxy.latency_ewma > 0
+        assert by_port[broken.server_address[1]].is_active is False
+        assert manager.get_best_proxy() is fast_proxy
+    finally:
+        manager.close()
+        for server in (fast, slow, broken):
+            server.shutdown()
+
+
+def test_background_refresher_reprobes_until_stopped():
+    server = _start_stand_in_proxy()
+    manager = ProxyManager(timeout=2, health_check={"test_url": "http://probe.invalid/ip"})
+    try:
+        manager.add_proxy("127.0.0.1", server.server_address[1])
+        assert manager.start_health_checks(interval=0.05)
+
+        deadline = time.time() + 5
+        while manager.proxies[0].probe_count < 3 and time.time() < deadline:
+            time.sleep(0.02)
+        assert manager.proxies[0].probe_count >= 3
+    finally:
+        manager.close()
+        server.shutdown()
+    assert manager._health_thread is None
+
+
+def test_probe_success_rate_decides_activity_without_touching_request_counts():
+    proxy = ProxyInfo("127.0.0.1", 1)
+    for ok in (True, True, True, False):
+        proxy.record_probe(ok, 0.1, min_success_rate=0.7)
+    # 单次探测失败不应直接停用稳定的代理
+    assert proxy.is_active and proxy.probe_success_rate == 0.75
+
+    proxy.record_probe(False, min_success_rate=0.7)
+    assert not proxy.is_active
+
+    proxy.record_probe(True, 0.1, min_success_rate=0.7)
+    proxy.record_probe(True, 0.1, min_success_rate=0.7)
+    assert proxy.is_active and proxy.probe_count == 7
+    # 探测不计入真实请求的成功/失败统计
+    assert proxy.success_count == proxy.failure_count == 0
+
+
+def test_recent_probe_failures_deactivate_a_long_stable_proxy():
+    proxy = ProxyInfo("127.0.0.1", 1)
+    for _ in range(100):
+        proxy.record_probe(True, 0.1, min_success_rate=0.7, window=10)
+    for _ in range(4):
+        proxy.record_probe(False, min_success_rate=0.7, window=10)
+
+    # 累计成功率仍有 96%，但最近 10 次探测只成功 6 次
+    assert (proxy.probe_count - proxy.probe_failures) / proxy.probe_count > 0.9
+    assert proxy.probe_success_rate == 0.6
+    assert not proxy.is_active
+
+    # 失败探测移出窗口后恢复启用
+    for _ in range(6):
+        proxy.record_probe(True, 0.1, min_success_rate=0.7, window=10)
+    assert not proxy.is_active
+    proxy.record_probe(True, 0.1, min_success_rate=0.7, window=10)
+    assert proxy.is_active
+
+
+def test_best_proxy_is_ranked_by_probe_health():
+    manager = ProxyManager(timeout=2)
+    try:
+        manager.add_proxy("10.0.0.1", 8080)
+        manager.add_proxy("10.0.0.2", 8080)
+        flaky, healthy = manager.proxies
+        # 请求成功率相同时，探测健康度更高的代理优先，即使其延迟更高
+        for proxy in (flaky, healthy):
+            proxy.success_count = 10
+        for ok in (True, False, True, True):
+            flaky.record_probe(ok, 0.05, min_success_rate=0.7)
+        for _ in range(4):
+            healthy.record_probe(True, 0.2, min_success_rate=0.7)
+        assert manager.get_best_proxy() is healthy
+
+        # 没有探测数据时退回按真实请求成功率排序
+        manager.add_proxy("10.0.0.3", 8080)
+        unprobed = manager.proxies[2]
+        unprobed.success_count = 1
+        assert unprobed.health_score == 1.0
+    finally:
+        manager.close()
+
+
+def test_probe_threshold_comes_from_health_check_config():
+    broken = _start_stand_in_proxy(status=502)
+    lenient = ProxyManager(timeout=2)
+    strict = ProxyManager(timeout=2, health_check={"min_success_rate": 0.95})
+    try:
+        for manager in (lenient, strict):
+            manager.add_proxy("127.0.0.1", broken.server_address[1])
+            proxy = manager.proxies[0]
+            for _ in range(9):
+                proxy.record_probe(True, 0.1)
+            assert manager.test_proxy(proxy, test_url="http://probe.invalid/ip") is False
+            assert proxy.probe_success_rate == 0.9
+        assert lenient.proxies[0].is_active is True
+        assert strict.proxies[0].is_active is False
+    finally:
+        lenient.close()
+        strict.close()
+        broken.shutdown()
@@ -0,0 +1,144 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.collectors import rss_hotspot_collector as rss_module
+from src.collectors.rss_hotspot_collector import RSSHotspotCollector
+
+ETAG = '"feed-v1"'
+LAST_MODIFIED = 'Wed, 01 May 2024 08:00:00 GMT'
+
+
+def _rss(titles):
+    items = ''.join(
+        f'<item><title>{title}</title><link>https://example.com/{i}</link></item>'
+        for i, title in enumerate(titles)
+    )
+    return f'<?xml version="1.0"?><rss><channel><title>t</title>{items}</channel></rss>'.encode()
+
+
+class _FeedServer:
+    def __init__(self):
+        self.bodies = {}
+        self.requests = []
+        self.force_304 = set()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                server.requests.append((self.path, dict(self.headers)))
+                if self.path in server.force_304:
+                    # 模拟中间代理：不论请求头如何都回 304，仅限一次
+                    server.force_304.discard(self.path)
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                if (self.headers.get('If-None-Match') == ETAG
+                        or self.headers.get('If-Modified-Since') == LAST_MODIFIED):
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                body = server.bodies[self.path]
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/rss+xml')
+                self.send_header('Content-Length', str(len(body)))
+                self.send_header('ETag', ETAG)
+                self.send_header('Last-Modified', LAST_MODIFIED)
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+
+    def url(self, path):
+        return f'http://127.0.0.1:{self.httpd.server_address[1]}{path}'
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def server():
+    feed_server = _FeedServer()
+    yield feed_server
+    feed_server.close()
+
+
+def _collector(server, tmp_path, paths, **kwargs):
+    feeds = [{'url': server.url(path), 'label': path.strip('/')} for path in paths]
+    return RSSHotspotCollector(feeds=feeds, cache_path=tmp_path / 'validators.json', **kwargs)
+
+
+def test_default_cache_path_is_anchored_to_project_root():
+    assert rss_module.DEFAULT_CACHE_PATH.is_absolute()
+    assert rss_module.DEFAULT_CACHE_PATH.parent.parent.parent.parent == rss_module.PROJECT_ROOT
+
+
+def test_conditional_get_reuses_persisted_entries(server, tmp_path):
+    server.bodies['/a'] = _rss(['Alpha', 'Beta'])
+    server.bodies['/b'] = _rss(['Gamma'])
+
+    first = _collector(server, tmp_path, ['/a', '/b'])
+    df = first.collect(max_items=10)
+    assert sorted(df['query']) == ['Alpha', 'Beta', 'Gamma']
+    assert first.last_stats == {'feeds': 2, 'fetched': 2, 'not_modified': 0, 'failed': 0}
+    # 首次请求没有缓存，不应携带条件头
+    assert all('If-None-Match' not in headers for _, headers in server.requests)
+
+    server.requests.clear()
+    # 新实例从磁盘读取缓存，验证持久化
+    second = _collector(server, tmp_path, ['/a', '/b'])
+    df = second.collect(max_items=10)
+    assert sorted(df['query']) == ['Alpha', 'Beta', 'Gamma']
+    assert second.last_stats['not_modified'] == 2
+    assert all(headers.get('If-None-Match') == ETAG for _, headers in server.requests)
+    assert all(headers.get('If-Modified-Since') == LAST_MODIFIED for _, headers in server.requests)
+
+
+def test_304_without_cached_entry_is_a_cache_miss(server, tmp_path):
+    server.bodies['/a'] = _rss(['Alpha'])
+    server.force_304.add('/a')
+
+    collector = _collector(server, tmp_path, ['/a'])
+    df = collector.collect(max_items=10)
+
+    assert df['query'].tolist() == ['Alpha']
+    assert collector.last_stats['fetched'] == 1
+    assert collector.last_stats['failed'] == 0
+    assert len(server.requests) == 2
+    assert 'If-None-Match' not in server.requests[1][1]
+
+
+def test_iterparse_stops_at_max_items_and_refetches_for_larger_limit(server, tmp_path):
+    server.bodies['/big'] = _rss([f'Item {i}' for i in range(200)])
+
+    collector = _collector(server, tmp_path, ['/big'], max_workers=1)
+    assert collector.collect(max_items=5)['query'].tolist() == [f'Item {i}' for i in range(5)]
+    assert collector.collect(max_items=5)['query'].tolist() == [f'Item {i}' for i in range(5)]
+    assert collector.last_stats['not_modified'] == 1
+
+    # 截断的缓存不足以满足更大的 max_items，必须无条件重新拉取
+    server.requests.clear()
+    assert len(collector.collect(max_items=20)) == 20
+    assert collector.last_stats['fetched'] == 1
+    assert 'If-None-Match' not in server.requests[0][1]
+
+
+def test_malformed_feed_returns_no_partial_entries(server, tmp_path):
+    server.bodies['/broken'] = (
+        b'<?xml version="1.0"?><rss><channel>'
+        b'<item><title>Alpha</title></item><item><title>Beta</tit'
+    )
+
+    collector = _collector(server, tmp_path, ['/broken'])
+    df = collector.collect(max_items=10)
+
+    assert df.empty
+    assert collector.last_stats['failed'] == 1
+    assert not (tmp_path / 'validators.json').exists()
@@ -0,0 +1,98 @@
+import re
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from src.website_builder import seo_optimizer
+
+GOLDEN_DIR = Path(__file__).parent / "fixtures" / "seo_golden"
+PAGES = ("homepage", "intent", "keyword", "edge_cases")
+FROZEN_NOW = datetime(2024, 5, 1, 8, 30, 0)
+
+CONFIGS = {
+    "full": {
+        "title": "AI Photo Tools",
+        "description": "Edit \"photos\" with AI & more",
+        "url": "https://example.com/",
+        "canonical_url": "https://example.com/",
+        "image": "https://example.com/og.png",
+        "site_name": "PhotoLab",
+        "locale": "en_US",
+        "language": "en",
+        "author": "Photo Team",
+        "copyright": "© 2024 PhotoLab",
+        "theme_color": "#123456",
+        "twitter_site": "@photolab",
+        "twitter_creator": "@creator",
+        "search_url": "https://example.com/search",
+        "page_title": "Editor",
+        "organization": {"name": "PhotoLab Inc", "url": "https://example.com", "logo": "https://example.com/logo.png"},
+        "faqs": [
+            {"question": "Is it free?", "answer": "Yes, see <a href=\"/pricing\">pricing</a>."},
+            {"question": "Offline?", "answer": "No"},
+        ],
+    },
+    "minimal": {},
+    "escapes": {
+        # 配置值会进入 re.sub 的替换模板：换行、合法转义与引号都必须保持原有处理结果
+        "title": "Line one\nLine two",
+        "description": "Tab\\tseparated 'quoted' value",
+        "robots": "noindex, \\\\nofollow",
+        "site_name": "Back\\\\slash",
+        "page_title": "Crumb \\n title",
+        "add_breadcrumb": False,
+        "twitter_card_type": "summary",
+    },
+}
+
+
+class _FrozenDatetime(datetime):
+    @classmethod
+    def now(cls, tz=None):
+        return FROZEN_NOW
+
+
+@pytest.fixture
+def optimizer(monkeypatch):
+    monkeypatch.setattr(seo_optimizer, "datetime", _FrozenDatetime)
+    return seo_optimizer.SEOOptimizer()
+
+
+def _golden_path(page, config_name):
+    return GOLDEN_DIR / "expected" / f"{page}__{config_name}.html"
+
+
+def _sequential(optimizer, html_content, config):
+    """逐步全文替换的原始流水线"""
+    for step in (
+        optimizer._add_basic_seo_tags,
+        optimizer._add_open_graph_tags,
+        optimizer._add_twitter_cards,
+        optimizer._add_structured_data,
+        optimizer._optimize_images,
+        optimizer._add_breadcrumb_navigation,
+        optimizer._add_faq_section,
+        optimizer._optimize_internal_links,
+    ):
+        html_content = step(html_content, config)
+    return html_content
+
+
+@pytest.mark.parametrize("config_name", sorted(CONFIGS))
+@pytest.mark.parametrize("page", PAGES)
+def test_single_pass_output_matches_golden(optimizer, page, config_name):
+    html_content = (GOLDEN_DIR / f"{page}.html").read_text(encoding="utf-8")
+    config = CONFIGS[config_name]
+
+    result = optimizer.optimize_html(html_content, config)
+
+    # 期望输出由单遍实现之前的版本在同一冻结时钟下生成
+    assert result == _golden_path(page, config_name).read_text(encoding="utf-8")
+    assert result == _sequential(optimizer, html_content, config)
+
+
+def test_invalid_template_escape_still_raises(optimizer):
+    html_content = (GOLDEN_DIR / "edge_cases.html").read_text(encoding="utf-8")
+    with pytest.raises(re.error):
+        optimizer.optimize_html(html_content, {"author": "C:\\path"})
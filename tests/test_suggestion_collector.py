@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import threading
+import time
+
+from src.collectors.suggestion_sources import SuggestionCollector
+
+
+class _FakeResponse:
+    def __init__(self, payload):
+        self._payload = payload
+
+    def raise_for_status(self):
+        return None
+
+    def json(self):
+        return self._payload
+
+
+class _FakeSession:
+    """按来源返回固定联想词，Reddit 来源人为放慢"""
+
+    def __init__(self, reddit_delay: float = 0.0, delay: float = 0.0):
+        self.reddit_delay = reddit_delay
+        self.delay = delay
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.started_at = {}
+        self._lock = threading.Lock()
+
+    def get(self, url, params=None, timeout=None):
+        with self._lock:
+            self.calls += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            self.started_at.setdefault(url.split('/')[2], []).append(time.monotonic())
+        try:
+            return self._respond(url, params)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def _respond(self, url, params):
+        query = params.get('q')
+        time.sleep(self.delay)
+        if 'reddit.com' in url:
+            time.sleep(self.reddit_delay)
+            return _FakeResponse({'data': {'children': [{'data': {'title': f'{query} reddit'}}]}})
+        if params.get('client') == 'youtube':
+            return _FakeResponse([query, [f'{query} youtube', f'{query} shared']])
+        if params.get('hl') == 'zh-CN':
+            return _FakeResponse([query, [f'{query} cn', f'{query} shared']])
+        return _FakeResponse([query, [f'{query} google', f'{query} shared']])
+
+
+def _make_collector(session, **kwargs):
+    collector = SuggestionCollector(min_interval=0.0, **kwargs)
+    collector.serp_api_key = None
+    collector.session = session
+    return collector
+
+
+def test_concurrent_collect_matches_sequential_order():
+    seeds = ['alpha', 'beta', 'alpha', 'gamma']
+
+    sequential = _make_collector(_FakeSession(), max_workers=1).collect(seeds, per_seed_limit=5)
+    concurrent = _make_collector(_FakeSession(), max_workers=4).collect(seeds, per_seed_limit=5)
+
+    assert [(s.term, s.source, s.seed) for s in concurrent] == [
+        (s.term, s.source, s.seed) for s in sequential
+    ]
+    assert concurrent[0].term == 'alpha google'
+    assert sum(1 for s in concurrent if s.term.endswith('shared')) == 3
+
+
+def test_slow_source_does_not_block_other_sources():
+    seeds = [f'seed{i}' for i in range(6)]
+    session = _FakeSession(reddit_delay=0.05)
+    collector = _make_collector(
+        session,
+        max_workers=4,
+        source_min_intervals={'reddit_suggestions': 0.0},
+    )
+
+    collector.collect(seeds, per_seed_limit=5)
+
+    # 串行实现任何时刻只有一个请求在途；并发时 Reddit 慢请求期间其他来源仍在请求
+    assert session.max_in_flight > 1
+    stats = collector.get_last_stats()
+    assert stats['seeds_processed'] == 6
+    assert stats['requests_sent'] == 24
+
+    sequential_session = _FakeSession(reddit_delay=0.05)
+    _make_collector(sequential_session, max_workers=1).collect(seeds, per_seed_limit=5)
+    assert sequential_session.max_in_flight == 1
+
+
+def test_sources_sharing_a_host_share_its_rate_budget():
+    session = _FakeSession()
+    interval = 0.03
+    collector = SuggestionCollector(
+        min_interval=interval,
+        max_workers=4,
+        source_min_intervals={'reddit_suggestions': 0.0},
+    )
+    collector.serp_api_key = None
+    collector.session = session
+
+    collector.collect([f'seed{i}' for i in range(4)], per_seed_limit=5)
+
+    # Google / Google CN / YouTube 联想都请求 suggestqueries.google.com，需合计遵守同一间隔
+    starts = sorted(session.started_at['suggestqueries.google.com'])
+    assert len(starts) == 12
+    # 按来源各自计时只需约 3 个间隔；共享主机预算时 12 次请求至少跨越 11 个间隔
+    assert starts[-1] - starts[0] >= 11 * interval * 0.9
+
+
+def test_max_requests_is_respected_across_sources():
+    session = _FakeSession()
+    collector = _make_collector(session, max_workers=4, max_requests=5)
+
+    collector.collect([f'seed{i}' for i in range(10)])
+
+    assert session.calls == 5
+    assert collector.get_last_stats()['requests_sent'] == 5
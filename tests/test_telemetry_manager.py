@@ -1,7 +1,10 @@
 from pathlib import Path
 import json
+import threading
 import time
 
+import pytest
+
 from src.utils.telemetry import TelemetryManager
 
 
@@ -56,3 +59,75 @@ def test_stage_context_records_metrics(tmp_path: Path):
     with output_path.open("r", encoding="utf-8") as fh:
         on_disk = json.load(fh)
     assert on_disk["metrics"]["requests"]["total"] == 2
+
+
+def test_sharded_requests_merge_into_histograms(tmp_path: Path):
+    telemetry = TelemetryManager()
+    telemetry.reset(run_id="hist-run")
+
+    def worker():
+        for i in range(100):
+            telemetry.record_request(
+                host="api.example.com",
+                method="GET",
+                url="https://api.example.com",
+                status=200,
+                ok=True,
+                elapsed=(i + 1) / 100,
+            )
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    host = telemetry.snapshot()["metrics"]["requests"]["by_host"]["api.example.com"]
+    assert host["total"] == 400
+    assert host["latency_sum"] == pytest.approx(202.0)
+    assert host["avg_latency"] == pytest.approx(202.0 / 400)
+    percentiles = host["latency_percentiles"]
+    assert 0.25 <= percentiles["p50"] <= 0.5
+    assert 0.5 <= percentiles["p95"] <= percentiles["p99"] <= percentiles["max"] == 1.0
+
+    telemetry.write_snapshot(tmp_path / "telemetry.json")
+    exported = (tmp_path / "telemetry.prom").read_text(encoding="utf-8")
+    assert 'find_demand_requests_total{host="api.example.com"} 400' in exported
+    assert 'find_demand_request_latency_seconds_bucket{host="api.example.com",le="+Inf"} 400' in exported
+    assert exported.endswith("# EOF\n")
+
+
+def test_finished_thread_shards_are_retired_without_losing_counts():
+    telemetry = TelemetryManager()
+    telemetry.reset(run_id="churn-run")
+
+    def worker(status):
+        telemetry.record_request(
+            host="api.example.com",
+            method="GET",
+            url="https://api.example.com",
+            status=status,
+            ok=status == 200,
+            elapsed=0.02,
+        )
+
+    # short-lived threads, as created by per-batch executors
+    for batch in range(20):
+        threads = [threading.Thread(target=worker, args=(429 if i == 0 else 200,)) for i in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    # only threads still alive (none here) keep a shard of their own
+    assert len(telemetry._shards) <= 5
+    requests = telemetry.snapshot()["metrics"]["requests"]
+    assert not telemetry._shards
+    assert requests["total"] == 100
+    assert requests["rate_limited"] == requests["errors"] == 20
+    assert requests["by_status"] == {"200": {"count": 80, "errors": 0}, "429": {"count": 20, "errors": 20}}
+    assert requests["by_host"]["api.example.com"]["total"] == 100
+    assert requests["last_request"]["host"] == "api.example.com"
+
+    worker(200)
+    assert telemetry.snapshot()["metrics"]["requests"]["total"] == 101
@@ -0,0 +1,51 @@
+from pathlib import Path
+
+import pytest
+
+from src.collectors.trending_keywords_collector import TrendingKeywordsCollector
+
+FIXTURE = Path(__file__).parent / "fixtures" / "trending_keywords_page.html"
+
+
+def test_lxml_parser_matches_bs4_output():
+    pytest.importorskip("lxml")
+    html = FIXTURE.read_text(encoding="utf-8")
+    collector = TrendingKeywordsCollector(concurrent_fetch=False)
+
+    expected = collector.parse_page(html, parser="bs4")
+    assert len(expected) == 50
+    assert collector.parse_page(html, parser="lxml") == expected
+
+
+def test_concurrent_fetch_keeps_page_order_and_stops_at_empty_page(monkeypatch):
+    collector = TrendingKeywordsCollector(max_workers=3, min_request_interval=0)
+    pages = {1: [{"keyword": "a"}], 2: [{"keyword": "b"}], 3: [], 4: [{"keyword": "d"}]}
+
+    fetched = []
+
+    def fake_fetch(url, polite=False):
+        page = 1 if "page=" not in url else int(url.rsplit("page=", 1)[1])
+        fetched.append(page)
+        return list(pages[page])
+
+    monkeypatch.setattr(collector, "_fetch_page_keywords", fake_fetch)
+    df = collector.fetch_trending_keywords(max_pages=4, concurrent=True)
+    assert df["keyword"].tolist() == ["a", "b"]
+    # 第一轮 (1-3) 已出现空页，第 4 页不应再被请求
+    assert sorted(fetched) == [1, 2, 3]
+
+
+def test_concurrent_fetch_continues_in_waves_until_empty_page(monkeypatch):
+    collector = TrendingKeywordsCollector(max_workers=2, min_request_interval=0)
+    pages = {1: ["a"], 2: ["b"], 3: ["c"], 4: [], 5: ["e"], 6: ["f"]}
+    fetched = []
+
+    def fake_fetch(url, polite=False):
+        page = 1 if "page=" not in url else int(url.rsplit("page=", 1)[1])
+        fetched.append(page)
+        return [{"keyword": keyword} for keyword in pages[page]]
+
+    monkeypatch.setattr(collector, "_fetch_page_keywords", fake_fetch)
+    df = collector.fetch_trending_keywords(max_pages=6, concurrent=True)
+    assert df["keyword"].tolist() == ["a", "b", "c"]
+    assert sorted(fetched) == [1, 2, 3, 4]
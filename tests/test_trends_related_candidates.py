@@ -0,0 +1,133 @@
+import random
+import threading
+import time
+
+import pandas as pd
+
+from src.command_handlers import _collect_trends_related_candidates
+
+
+class _StubTrendsCollector:
+    def __init__(self, cooldown_after=None, jitter=None):
+        self.batches = []
+        self.jitter = jitter
+        self.suggestion_calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.cooldown_after = cooldown_after
+        self._lock = threading.Lock()
+
+    def _track(self):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        # 随机耗时让任务以不同顺序完成
+        time.sleep(self.jitter.uniform(0.0, 0.05) if self.jitter else 0.05)
+        with self._lock:
+            self.in_flight -= 1
+
+    def is_in_cooldown(self):
+        return self.cooldown_after is not None and len(self.batches) >= self.cooldown_after
+
+    def get_related_for_batch(self, keywords, geo='', timeframe='today 12-m'):
+        self.batches.append(list(keywords))
+        self._track()
+        return {
+            'queries': {
+                kw: {
+                    'top': pd.DataFrame({'query': [f'{kw} shared', 'common term'], 'value': [100, 90]}),
+                    'rising': pd.DataFrame({'query': [f'{kw} rising'], 'value': [300]}),
+                }
+                for kw in keywords
+            },
+            'topics': {
+                kw: {'top': pd.DataFrame({'topic_title': [f'{kw} topic'], 'value': [50]})}
+                for kw in keywords
+            },
+        }
+
+    def get_suggestions(self, keyword):
+        with self._lock:
+            self.suggestion_calls += 1
+        self._track()
+        return [{'title': f'{keyword} rising'}, {'title': f'{keyword} suggestion'}]
+
+
+def test_seeds_share_explore_calls_and_terms_are_deduplicated():
+    seeds = [f'seed{i}' for i in range(8)]
+    collector = _StubTrendsCollector()
+
+    df = _collect_trends_related_candidates(collector, seeds, max_workers=4)
+
+    # 8 个种子只需 2 次 explore 请求，另加每个种子一次 Suggestion
+    assert [len(batch) for batch in collector.batches] == [5, 3]
+    assert collector.suggestion_calls == 8
+    assert collector.max_in_flight > 1
+
+    queries = df['query'].str.lower().tolist()
+    assert len(queries) == len(set(queries))
+    assert queries.count('common term') == 1
+    for seed in seeds:
+        assert f'{seed} rising' in queries
+        assert f'{seed} topic' in queries
+        assert f'{seed} suggestion' in queries
+
+
+def test_cooldown_stops_dispatch():
+    collector = _StubTrendsCollector(cooldown_after=0)
+    df = _collect_trends_related_candidates(collector, ['alpha', 'beta'])
+    assert df.empty
+    assert collector.batches == []
+    assert collector.suggestion_calls == 0
+
+
+def test_rows_are_merged_in_seed_order_regardless_of_completion_order():
+    seeds = [f'seed{i}' for i in range(8)]
+    serial = _collect_trends_related_candidates(_StubTrendsCollector(), seeds, max_workers=1)
+
+    for run in range(5):
+        collector = _StubTrendsCollector(jitter=random.Random(run))
+        df = _collect_trends_related_candidates(collector, seeds, max_workers=4)
+        pd.testing.assert_frame_equal(df, serial)
+
+    # 与串行采集一致：每个种子依次为相关查询、相关主题、Suggestion
+    first_seed = serial[serial['seed'] == 'seed0']
+    assert first_seed['query'].tolist() == [
+        'seed0 rising', 'seed0 shared', 'common term', 'seed0 topic', 'seed0 suggestion',
+    ]
+    assert serial[serial['query'] == 'common term']['seed'].tolist() == ['seed0']
+
+
+class _ThreadBoundStub(_StubTrendsCollector):
+    """模拟 Playwright 后端：会话只能在调用线程上使用"""
+
+    def __init__(self, concurrent):
+        super().__init__()
+        self.concurrent = concurrent
+        self.threads = set()
+
+    def supports_concurrent_requests(self):
+        return self.concurrent
+
+    def get_related_for_batch(self, keywords, geo='', timeframe='today 12-m'):
+        self.threads.add(threading.get_ident())
+        return super().get_related_for_batch(keywords, geo=geo, timeframe=timeframe)
+
+    def get_suggestions(self, keyword):
+        self.threads.add(threading.get_ident())
+        return super().get_suggestions(keyword)
+
+
+def test_thread_bound_session_is_only_used_on_calling_thread():
+    seeds = [f'seed{i}' for i in range(8)]
+    expected = _collect_trends_related_candidates(_StubTrendsCollector(), seeds, max_workers=1)
+
+    bound = _ThreadBoundStub(concurrent=False)
+    df = _collect_trends_related_candidates(bound, seeds, max_workers=4)
+    assert bound.threads == {threading.get_ident()}
+    assert bound.max_in_flight == 1
+    pd.testing.assert_frame_equal(df, expected)
+
+    free = _ThreadBoundStub(concurrent=True)
+    _collect_trends_related_candidates(free, seeds, max_workers=4)
+    assert threading.get_ident() not in free.threads
@@ -2,6 +2,9 @@ import json
 import time
 from pathlib import Path
 
+import pytest
+
+from src.utils import workflow_cache
 from src.utils.workflow_cache import WorkflowCacheManager
 
 
@@ -44,3 +47,46 @@ def test_workflow_cache_persists_state(tmp_path: Path):
     new_manager = WorkflowCacheManager(cache_dir)
     loaded = new_manager.load_stage(manager.STAGE_DISCOVERY)
     assert loaded is not None
+
+
+def test_workflow_cache_content_addressed_stages(tmp_path: Path):
+    manager = WorkflowCacheManager(tmp_path / "cache")
+    records = [{"keyword": f"kw{i}", "score": i / 10, "source": None} for i in range(5)]
+    manager.store_stage(manager.STAGE_DISCOVERY, {"records": records}, inputs={"seed_terms": ["alpha"]})
+    manager.store_stage(manager.STAGE_DISCOVERY, {"records": []}, inputs={"seed_terms": ["beta"]})
+
+    reloaded = WorkflowCacheManager(tmp_path / "cache")
+    alpha = reloaded.load_stage(manager.STAGE_DISCOVERY, inputs={"seed_terms": ["alpha"]})
+    assert alpha is not None
+    assert alpha["payload"]["records"] == records
+    assert reloaded.load_stage(manager.STAGE_DISCOVERY)["payload"]["records"] == []
+    assert reloaded.load_stage(manager.STAGE_DISCOVERY, inputs={"seed_terms": ["gamma"]}) is None
+
+
+@pytest.fixture(params=["msgpack", "json"])
+def stage_codec(request, monkeypatch):
+    if request.param == "msgpack":
+        pytest.importorskip("msgpack")
+        return workflow_cache.CODEC_MSGPACK
+    # 未安装 msgpack 时退回压缩 JSON
+    monkeypatch.setattr(workflow_cache, "msgpack", None)
+    return workflow_cache.CODEC_JSON
+
+
+def test_workflow_cache_round_trips_with_each_codec(tmp_path: Path, stage_codec):
+    manager = WorkflowCacheManager(tmp_path / "cache")
+    records = [{"keyword": f"kw{i}", "score": i / 10, "tags": ["a", i], "source": None} for i in range(20)]
+    payload = {"records": records, "meta": {1: "int key", "nested": {"ok": True}}}
+    manager.store_stage(manager.STAGE_DISCOVERY, payload, inputs={"seed_terms": ["alpha"]})
+
+    stage_files = list((tmp_path / "cache").rglob("*.bin"))
+    assert len(stage_files) == 1
+    raw = stage_files[0].read_bytes()
+    header = workflow_cache.STAGE_FILE_MAGIC
+    assert raw.startswith(header) and raw[len(header):len(header) + 1] == stage_codec
+
+    loaded = WorkflowCacheManager(tmp_path / "cache").load_stage(
+        manager.STAGE_DISCOVERY, inputs={"seed_terms": ["alpha"]}
+    )
+    assert loaded["payload"]["records"] == records
+    assert loaded["payload"]["meta"]["nested"] == {"ok": True}